@@ -0,0 +1,277 @@
+# coding: utf-8
+"""
+Tools to reduce the number of Abinit runs performed by the ``abiget_*`` methods of |AbinitInput|.
+
+The results of the methods invoking Abinit are memoized with a key computed from the input variables,
+the structure, the pseudopotentials and the Abinit build (output of ``abinit -b``).
+The in-memory cache is always active, the persistent cache (SQLite_ database) is activated with ``enable_cache``.
+
+The IBZ and the irreducible phonon perturbations are computed in python from the symmetries found by spglib
+if the input does not contain options that change the symmetries used by Abinit
+(magnetic systems, user-defined symmetries, external fields ...).
+Use ``set_fast_paths(False)`` to always call Abinit.
+The python version of the irreducible perturbations has been validated only for a few systems
+hence it is not used unless ``set_fast_phperts(True)`` is called.
+"""
+import os
+import json
+import pickle
+import hashlib
+import collections
+import numpy as np
+
+from monty.collections import AttrDict
+from abipy.core.kpoints import has_timrev_from_kptopt
+
+
+# Default location of the persistent cache.
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".abinit", "abipy", "dryrun_cache.sqlite")
+
+# Returned by get_cached if the key is not in the cache.
+MISSING = object()
+
+# Max number of results stored in memory.
+_MAX_MEMORY_ENTRIES = 512
+
+_MEMORY_CACHE = collections.OrderedDict()
+_PERSISTENT_CACHE = None
+_FAST_PATHS = True
+_FAST_PHPERTS = False
+
+# Variables changing the symmetries used by Abinit or the k-point sampling. Fast paths are disabled if present.
+_UNSUPPORTED_VARS = {
+    "nsym", "symrel", "tnons", "symafm", "spinat", "nucdipmom", "zeemanfield", "berryopt",
+    "efield", "dfield", "red_efield", "red_dfield", "jellslab", "kptrlatt", "kptbounds",
+}
+
+# Default value of tolsym in Abinit.
+_ABINIT_TOLSYM = 1e-8
+
+
+def enable_cache(filepath=None, max_bytes=None):
+    """
+    Activate the persistent cache for the results computed by Abinit.
+    Return |RobotCache| object.
+
+    Args:
+        filepath: Path of the SQLite database. None to use DEFAULT_CACHE_PATH.
+        max_bytes: Max size of the values stored in the database. None to use the default value of |RobotCache|.
+    """
+    from abipy.abio.robotcache import RobotCache
+    global _PERSISTENT_CACHE
+    disable_cache()
+    _PERSISTENT_CACHE = RobotCache(filepath=filepath if filepath is not None else DEFAULT_CACHE_PATH,
+                                   max_bytes=max_bytes)
+    return _PERSISTENT_CACHE
+
+
+def disable_cache():
+    """Deactivate the persistent cache. The content of the database is not changed."""
+    global _PERSISTENT_CACHE
+    if _PERSISTENT_CACHE is not None: _PERSISTENT_CACHE.close()
+    _PERSISTENT_CACHE = None
+
+
+def clear_memory_cache():
+    """Remove all the results stored in memory."""
+    _MEMORY_CACHE.clear()
+
+
+def set_fast_paths(value):
+    """
+    Enable (value=True) or disable the python implementation used for the IBZ and the irreducible perturbations.
+    Return previous value.
+    """
+    global _FAST_PATHS
+    old, _FAST_PATHS = _FAST_PATHS, bool(value)
+    return old
+
+
+def set_fast_phperts(value):
+    """
+    Enable (value=True) or disable the python implementation used for the irreducible phonon perturbations.
+    Requires fast paths (see ``set_fast_paths``). Return previous value.
+    """
+    global _FAST_PHPERTS
+    old, _FAST_PHPERTS = _FAST_PHPERTS, bool(value)
+    return old
+
+
+def _to_literal(obj):
+    """Convert numpy objects to python objects so that the json representation is well defined."""
+    if isinstance(obj, (np.ndarray, np.generic)): return obj.tolist()
+    if isinstance(obj, (list, tuple)): return [_to_literal(o) for o in obj]
+    if isinstance(obj, dict): return {str(k): _to_literal(v) for k, v in obj.items()}
+    return obj
+
+
+def get_input_key(method, inp, manager=None):
+    """
+    Return string with the key associated to the results of ``method`` computed by Abinit with input ``inp``.
+    The key depends on the variables, the structure, the md5 of the pseudopotentials and the Abinit build.
+    None if the Abinit build cannot be determined.
+    """
+    from abipy.flowtk import TaskManager
+    try:
+        info = TaskManager.as_manager(manager).abinit_build.info
+    except Exception:
+        return None
+    if not info: return None
+
+    data = [
+        method,
+        {k: _to_literal(v) for k, v in inp.items()},
+        _to_literal(inp.structure.to_abivars()),
+        [p.md5 for p in inp.pseudos],
+        hashlib.sha1(info.encode("utf-8")).hexdigest(),
+    ]
+    s = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()
+
+
+def get_cached(key):
+    """Return a new copy of the value associated to key or MISSING."""
+    if key is None: return MISSING
+    if key in _MEMORY_CACHE:
+        _MEMORY_CACHE.move_to_end(key)
+        return pickle.loads(_MEMORY_CACHE[key])
+
+    if _PERSISTENT_CACHE is None: return MISSING
+    value = _PERSISTENT_CACHE.get_value(key)
+    if value is not _PERSISTENT_CACHE.MISSING:
+        _put_memory(key, value)
+
+    return MISSING if value is _PERSISTENT_CACHE.MISSING else value
+
+
+def put_cached(key, value, method=""):
+    """Store the value associated to key. ``method`` is used to invalidate the entries in the persistent cache."""
+    if key is None: return
+    _put_memory(key, value)
+    if _PERSISTENT_CACHE is not None:
+        _PERSISTENT_CACHE.put_value(key, value, extractor="dryrun.%s" % method)
+
+
+def _put_memory(key, value):
+    # Values are stored in pickled form so that callers cannot modify the cached objects.
+    try:
+        _MEMORY_CACHE[key] = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return
+    _MEMORY_CACHE.move_to_end(key)
+    while len(_MEMORY_CACHE) > _MAX_MEMORY_ENTRIES:
+        _MEMORY_CACHE.popitem(last=False)
+
+
+def get_symmetries(inp):
+    """
+    Return the rotations and the fractional translations found by spglib (reduced coordinates, x' = R x + t).
+    None if the fast paths are disabled or the symmetries used by Abinit may be different.
+    """
+    if not _FAST_PATHS or any(v in inp for v in _UNSUPPORTED_VARS): return None
+    if inp.get("nspinor", 1) != 1 or inp.get("nspden", 1) == 4: return None
+
+    import spglib
+    structure = inp.structure
+    symprec = float(inp.get("tolsym", _ABINIT_TOLSYM)) * max(structure.lattice.abc)
+    cell = (structure.lattice.matrix, structure.frac_coords, structure.atomic_numbers)
+    sym = spglib.get_symmetry(cell, symprec=symprec)
+    if sym is None: return None
+    rotations, translations = sym["rotations"], sym["translations"]
+
+    # Non-primitive cell (Abinit stops unless chkprim = 0).
+    if np.count_nonzero(np.all(rotations == np.eye(3, dtype=np.int), axis=(1, 2))) != 1: return None
+
+    return rotations, translations
+
+
+def get_ibz(inp):
+    """
+    Compute the k-points in the IBZ and the weights for the homogeneous mesh defined by ``ngkpt``, ``shiftk``
+    and ``kptopt`` with the same conventions as Abinit: the first point of each star in the full mesh
+    (first index running fastest) is selected and the reduced coordinates are in ]-1/2, 1/2].
+
+    Return (points, weights) or None if the input is not supported.
+    """
+    kptopt = int(inp.get("kptopt", 1))
+    if kptopt not in (1, 2, 3, 4) or "ngkpt" not in inp: return None
+    ngkpt = np.reshape(np.array(inp["ngkpt"], dtype=np.int), (-1,))
+    shiftk = np.reshape(np.array(inp.get("shiftk", [0.5, 0.5, 0.5]), dtype=np.float), (-1, 3))
+    if len(ngkpt) != 3 or np.any(ngkpt <= 0) or len(shiftk) != 1: return None
+
+    syms = get_symmetries(inp)
+    if syms is None: return None
+    rotations = np.unique(syms[0], axis=0) if kptopt in (1, 4) else np.eye(3, dtype=np.int)[None]
+    # k-points transform with R^{-T}. The point group is closed under inversion hence we can use R^T.
+    ops = rotations.transpose(0, 2, 1)
+    if has_timrev_from_kptopt(kptopt): ops = np.concatenate([ops, -ops])
+
+    # Points of the full mesh in the order used by Abinit (first index runs fastest).
+    nkbz = np.prod(ngkpt)
+    gaddr = np.stack(np.unravel_index(np.arange(nkbz), ngkpt[::-1])[::-1], axis=1)
+    kbz = (gaddr + shiftk[0]) / ngkpt
+
+    # The index of the first point in the star is the min over the images.
+    mapping = np.arange(nkbz)
+    for op in ops:
+        rk = np.dot(kbz, op.T) * ngkpt - shiftk[0]
+        irk = np.rint(rk)
+        # Symmetry breaking shift. Let Abinit handle this case.
+        if not np.allclose(rk, irk, atol=1e-8): return None
+        irk = irk.astype(np.int) % ngkpt
+        mapping = np.minimum(mapping, irk[:, 0] + ngkpt[0] * (irk[:, 1] + ngkpt[1] * irk[:, 2]))
+
+    ik_ibz, counts = np.unique(mapping, return_counts=True)
+    points = kbz[ik_ibz]
+    points -= np.ceil(points - 0.5)
+
+    return points, counts / nkbz
+
+
+def get_irred_phperts(inp, qpt, prepgkk=0):
+    """
+    Compute the list of irreducible phonon perturbations at ``qpt`` with the same format as the one
+    produced by Abinit. Perturbations are selected in the same order as Abinit (atoms, then directions):
+    a perturbation is not irreducible if it is the image of perturbations already selected or
+    deduced via a symmetry of the little group of q (time-reversal included).
+
+    Return list of dictionaries or None if the input is not supported.
+    The irreducible set is computed only if ``set_fast_phperts(True)`` has been called.
+    """
+    syms = get_symmetries(inp)
+    if syms is None: return None
+    rotations, translations = syms
+    qpt = np.reshape(np.array(qpt, dtype=np.float), (3,))
+    qlist = [float(q) for q in qpt]
+    natom = len(inp.structure)
+
+    if prepgkk:
+        return [AttrDict(idir=idir, ipert=ipert, qpt=qlist) for ipert in range(1, natom + 1) for idir in (1, 2, 3)]
+
+    # Abinit may reduce perturbations whose image contains the perturbation itself, the python version does not.
+    if not _FAST_PHPERTS: return None
+
+    # Little group of q: R^{-T} q = q + G or -q + G if time-reversal can be used.
+    rq = np.einsum("sji,j->si", np.rint(np.linalg.inv(rotations)).astype(np.int), qpt)
+    isq = np.all(np.abs(rq - qpt - np.rint(rq - qpt)) < 1e-8, axis=1)
+    if has_timrev_from_kptopt(inp.get("kptopt", 1)):
+        isq |= np.all(np.abs(rq + qpt - np.rint(rq + qpt)) < 1e-8, axis=1)
+    rotations, translations = rotations[isq], translations[isq]
+
+    # Image of the atoms: R x_a + t = x_{indsym[s, a]} + L
+    frac_coords = inp.structure.frac_coords
+    diff = np.einsum("sij,aj->sai", rotations, frac_coords) + translations[:, None, :]
+    diff = diff[:, :, None, :] - frac_coords[None, None, :, :]
+    diff -= np.rint(diff)
+    indsym = np.linalg.norm(diff, axis=-1).argmin(axis=-1)
+
+    # Perturbation (a, i) is obtained from (indsym[s, a], j) with R_s[j, i] != 0.
+    known = np.zeros((natom, 3), dtype=bool)
+    perts = []
+    for ipert in range(natom):
+        for idir in range(3):
+            if not any(np.all(known[indsym[isym, ipert], rot[:, idir] != 0]) for isym, rot in enumerate(rotations)):
+                perts.append(AttrDict(idir=idir + 1, ipert=ipert + 1, qpt=qlist))
+            known[ipert, idir] = True
+
+    return perts
@@ -24,6 +24,7 @@ from abipy.tools.numtools import is_diagonal
 from abipy.core.structure import Structure
 from abipy.core.mixins import Has_Structure
 from abipy.core.kpoints import has_timrev_from_kptopt
+from abipy.abio import dryrun
 from abipy.abio.variable import InputVariable
 from abipy.abio.abivars import is_abivar, is_anaddb_var
 from abipy.abio.abivars_db import get_abinit_variables, get_anaddb_variables
@@ -1670,6 +1671,10 @@ with the Abinit version you are using. Please contact the AbiPy developers.""" %
         # Disable memory check.
         inp["mem_test"] = 0
 
+        key = self._get_dryrun_key("abiget_spacegroup(retdict=%s)" % bool(retdict), inp, workdir, manager)
+        value = dryrun.get_cached(key)
+        if value is not dryrun.MISSING: return value
+
         # Build a Task to run Abinit in --dry-run mode.
         task = AbinitTask.temp_shell_task(inp, workdir=workdir, manager=manager)
         task.start_and_wait(autoparal=False, exec_args=["--dry-run"])
@@ -1679,18 +1684,23 @@ with the Abinit version you are using. Please contact the AbiPy developers.""" %
         try:
             with AbinitOutputFile(task.output_file.path) as out:
                 if not retdict:
-                    return out.initial_structure
+                    value = out.initial_structure
                 else:
                     dims_dataset, spginfo_dataset = out.get_dims_spginfo_dataset(verbose=verbose)
-                    return spginfo_dataset[1]
+                    value = spginfo_dataset[1]
 
         except Exception as exc:
             self._handle_task_exception(task, exc)
 
+        dryrun.put_cached(key, value, method="abiget_spacegroup")
+        return value
+
     def abiget_ibz(self, ngkpt=None, shiftk=None, kptopt=None, workdir=None, manager=None, verbose=0):
         """
         This function computes the list of points in the IBZ and the corresponding weights.
         It should be called with an input file that contains all the mandatory variables required by ABINIT.
+        Abinit is not executed if the IBZ can be computed in python from the spglib symmetries (see `abipy.abio.dryrun`)
+        and results computed by Abinit are cached.
 
         Args:
             ngkpt: Number of divisions for the k-mesh (default None i.e. use ngkpt from self)
@@ -1724,6 +1734,16 @@ with the Abinit version you are using. Please contact the AbiPy developers.""" %
         if verbose:
             print("Computing ibz with input:\n", str(inp))
 
+        ibz = collections.namedtuple("ibz", "points weights")
+        if workdir is None:
+            # Compute the IBZ in python if the input is supported.
+            value = dryrun.get_ibz(inp)
+            if value is not None: return ibz(*value)
+
+        key = self._get_dryrun_key("abiget_ibz", inp, workdir, manager)
+        value = dryrun.get_cached(key)
+        if value is not dryrun.MISSING: return ibz(*value)
+
         # Build a Task to run Abinit in a shell subprocess
         task = AbinitTask.temp_shell_task(inp, workdir=workdir, manager=manager)
         task.start_and_wait(autoparal=False)
@@ -1731,13 +1751,22 @@ with the Abinit version you are using. Please contact the AbiPy developers.""" %
         # Read the list of k-points from the netcdf file.
         try:
             with NetcdfReader(os.path.join(task.workdir, "kpts.nc")) as r:
-                ibz = collections.namedtuple("ibz", "points weights")
-                return ibz(points=r.read_value("reduced_coordinates_of_kpoints"),
-                           weights=r.read_value("kpoint_weights"))
+                value = (r.read_value("reduced_coordinates_of_kpoints"), r.read_value("kpoint_weights"))
 
         except Exception as exc:
             self._handle_task_exception(task, exc)
 
+        dryrun.put_cached(key, value, method="abiget_ibz")
+        return ibz(*value)
+
+    def _get_dryrun_key(self, method, inp, workdir, manager):
+        """
+        Return the key used to memoize the results computed by Abinit with input ``inp``.
+        None if results should not be cached i.e. if the user wants to keep the files produced in ``workdir``.
+        """
+        if workdir is not None: return None
+        return dryrun.get_input_key(method, inp, manager=manager)
+
     def _handle_task_exception(self, task, prev_exc):
         """
         This method is called when we have executed a temporary task but we encounter
@@ -1829,26 +1858,45 @@ with the Abinit version you are using. Please contact the AbiPy developers.""" %
         if kptopt is not None: inp["kptopt"] = kptopt
         #print("Computing irred_perts with input:\n", str(inp))
 
+        # The python version always returns the perturbations for all atoms and directions.
+        all_phperts = (inp.get("rfphon") == 1 and
+                       list(np.ravel(inp.get("rfatpol", []))) == [1, len(inp.structure)] and
+                       list(np.ravel(inp.get("rfdir", []))) == [1, 1, 1])
+
+        if workdir is None and all_phperts and set(perts_vars) <= {"rfphon", "rfatpol", "rfdir", "prepgkk"}:
+            # Phonon perturbations for all atoms and directions are computed in python if the input is supported.
+            perts = dryrun.get_irred_phperts(inp, qpt, prepgkk=perts_vars.get("prepgkk", 0))
+            if perts is not None: return perts
+
+        key = self._get_dryrun_key("_abiget_irred_perts", inp, workdir, manager)
+        perts = dryrun.get_cached(key)
+        if perts is not dryrun.MISSING: return perts
+
         # Build a Task to run Abinit in a shell subprocess
         task = AbinitTask.temp_shell_task(inp, workdir=workdir, manager=manager)
         task.start_and_wait(autoparal=False)
 
         # Parse the file to get the perturbations.
         try:
-            return yaml_read_irred_perts(task.log_file.path)
+            perts = yaml_read_irred_perts(task.log_file.path)
         except Exception as exc:
             # Sometimes the previous call raises: Cannot find next YAML document in /tmp/tmpskvdr_bo/run.log
             # perhaps because the log file is still being written (?) so let's wait a bit.
             time.sleep(5.0)
             try:
-                return yaml_read_irred_perts(task.log_file.path)
+                perts = yaml_read_irred_perts(task.log_file.path)
             except Exception as exc:
                 self._handle_task_exception(task, exc)
 
+        dryrun.put_cached(key, perts, method="_abiget_irred_perts")
+        return perts
+
     def abiget_irred_phperts(self, qpt=None, ngkpt=None, shiftk=None, kptopt=None, prepgkk=0, workdir=None, manager=None):
         """
         This function, computes the list of irreducible perturbations for DFPT.
         It should be called with an input file that contains all the mandatory variables required by ABINIT.
+        Abinit is not executed if the perturbations can be computed in python from the spglib symmetries
+        (see `abipy.abio.dryrun`) and results computed by Abinit are cached.
 
         Args:
             qpt: qpoint of the phonon in reduced coordinates. Used to shift the k-mesh
@@ -2013,6 +2061,10 @@ with the Abinit version you are using. Please contact the AbiPy developers.""" %
         # Disable memory check.
         inp["mem_test"] = 0
 
+        key = self._get_dryrun_key("abiget_autoparal_pconfs", inp, workdir, manager)
+        pconfs = dryrun.get_cached(key)
+        if pconfs is not dryrun.MISSING: return pconfs
+
         # Run the job in a shell subprocess with mpi_procs = 1
         # Return code is always != 0
         task = AbinitTask.temp_shell_task(inp, workdir=workdir, manager=manager)
@@ -2025,10 +2077,12 @@ with the Abinit version you are using. Please contact the AbiPy developers.""" %
         parser = ParalHintsParser()
         try:
             pconfs = parser.parse(task.output_file.path)
-            return pconfs
         except parser.Error as exc:
             self._handle_task_exception(task, exc)
 
+        dryrun.put_cached(key, pconfs, method="abiget_autoparal_pconfs")
+        return pconfs
+
     def add_tags(self, tags):
         """
         Add tags to the input
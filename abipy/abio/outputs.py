@@ -6,6 +6,7 @@ import numpy as np
 import pandas as pd
 
 from collections import OrderedDict
+from functools import partial
 from io import StringIO
 from monty.string import is_string, marquee
 from monty.functools import lazy_property
@@ -17,7 +18,7 @@ from abipy.core.kpoints import has_timrev_from_kptopt
 from abipy.core.mixins import TextFile, AbinitNcFile, NotebookWriter
 from abipy.abio.inputs import GEOVARS
 from abipy.abio.timer import AbinitTimerParser
-from abipy.abio.robots import Robot
+from abipy.abio.robots import Robot, exec_funcs
 from abipy.flowtk import EventsParser, NetcdfReader, GroundStateScfCycle, D2DEScfCycle
 
 
@@ -879,6 +880,25 @@ def validate_output_parser(abitests_dir=None, output_files=None):  # pragma: no
     return len(errpaths)
 
 
+def _get_abo_row(abo, with_geo=True, with_dims=True, funcs=None):
+    """Return dictionary with the most important results in ``abo``. Used by AboRobot.get_dataframe."""
+    d = OrderedDict()
+
+    if with_dims:
+        dims_dataset, spg_dataset = abo.get_dims_spginfo_dataset()
+        if len(dims_dataset) > 1:
+            cprint("Multiple datasets are not supported. ARGH!", "yellow")
+        d.update(dims_dataset[1])
+
+    # Add info on structure.
+    if with_geo and abo.run_completed:
+        d.update(abo.final_structure.get_dict4pandas(with_spglib=True))
+
+    # Execute functions
+    if funcs is not None: d.update(exec_funcs(funcs, abo))
+    return d
+
+
 class AboRobot(Robot):
     """
     This robot analyzes the results contained in multiple Abinit output files.
@@ -917,7 +937,8 @@ class AboRobot(Robot):
 
         return pd.DataFrame(rows, index=my_index, columns=list(rows[0].keys()))
 
-    def get_dataframe(self, with_geo=True, with_dims=True, abspath=False, funcs=None):
+    def get_dataframe(self, with_geo=True, with_dims=True, abspath=False, funcs=None,
+                      executor=None, max_workers=None):
         """
         Return a |pandas-DataFrame| with the most important results and the filenames as index.
 
@@ -928,28 +949,10 @@ class AboRobot(Robot):
             funcs: Function or list of functions to execute to add more data to the DataFrame.
                 Each function receives a |GsrFile| object and returns a tuple (key, value)
                 where key is a string with the name of column and value is the value to be inserted.
+            executor, max_workers: Passed to ``Robot.map`` to process the files in parallel.
         """
-        rows, row_names = [], []
-        for label, abo in self.items():
-            row_names.append(label)
-            d = OrderedDict()
-
-            if with_dims:
-                dims_dataset, spg_dataset = abo.get_dims_spginfo_dataset()
-                if len(dims_dataset) > 1:
-                    cprint("Multiple datasets are not supported. ARGH!", "yellow")
-                d.update(dims_dataset[1])
-
-            # Add info on structure.
-            if with_geo and abo.run_completed:
-                d.update(abo.final_structure.get_dict4pandas(with_spglib=True))
-
-            # Execute functions
-            if funcs is not None: d.update(self._exec_funcs(funcs, abo))
-            rows.append(d)
-
-        row_names = row_names if not abspath else self._to_relpaths(row_names)
-        return pd.DataFrame(rows, index=row_names, columns=list(rows[0].keys()))
+        func = partial(_get_abo_row, with_geo=with_geo, with_dims=with_dims, funcs=funcs)
+        return self.map_to_dataframe(func, abspath=abspath, executor=executor, max_workers=max_workers)
 
     def get_time_dataframe(self):
         """
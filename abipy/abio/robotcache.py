@@ -0,0 +1,282 @@
+# coding: utf-8
+"""
+Persistent cache for the quantities extracted by robots from the output files.
+
+Results are stored in a SQLite_ database. The key depends on the absolute path of the file,
+its size and modification time and on the name, arguments and version of the extractor,
+hence modified files are automatically recomputed. The total size of the database is bounded:
+the least recently used entries are removed when ``max_bytes`` is exceeded.
+"""
+import os
+import time
+import pickle
+import hashlib
+import inspect
+import numbers
+import sqlite3
+import functools
+import numpy as np
+
+from monty.string import list_strings
+
+# Default location of the database.
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".abinit", "abipy", "robot_cache.sqlite")
+
+# Default max size of the database in bytes.
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+# Max number of parameters in a single SQL statement.
+_SQL_CHUNK = 500
+
+
+def _is_literal(obj):
+    """True if obj can be used to define the key of the extractor."""
+    if obj is None or isinstance(obj, (str, bool, numbers.Number, np.generic)):
+        return True
+    if isinstance(obj, np.ndarray):
+        return obj.size <= 100
+    if isinstance(obj, (list, tuple)):
+        return all(_is_literal(o) for o in obj)
+    return False
+
+
+def _to_literal(obj):
+    """Convert numpy objects to python objects so that repr does not depend on numpy print options."""
+    if isinstance(obj, (np.ndarray, np.generic)): return obj.tolist()
+    if isinstance(obj, (list, tuple)): return type(obj)(_to_literal(o) for o in obj)
+    return obj
+
+
+def get_extractor_key(func):
+    """
+    Return string identifying the extractor ``func`` and its arguments.
+    None if func cannot be cached e.g. lambda and local functions or functools.partial objects
+    with arguments that cannot be represented reliably.
+    The version of the extractor can be specified with the ``cache_version`` attribute of the function.
+    """
+    args, kwargs = (), {}
+    if isinstance(func, functools.partial):
+        func, args, kwargs = func.func, func.args, func.keywords
+
+    if not inspect.isfunction(func) or "<" in func.__qualname__:
+        return None
+    if not all(_is_literal(a) for a in args) or not all(_is_literal(v) for v in kwargs.values()):
+        return None
+
+    from abipy.core.release import __version__
+    sig = ", ".join([repr(_to_literal(a)) for a in args] +
+                    ["%s=%r" % (k, _to_literal(kwargs[k])) for k in sorted(kwargs)])
+
+    return "%s.%s(%s)@%s:%s" % (func.__module__, func.__qualname__, sig,
+                                getattr(func, "cache_version", 0), __version__)
+
+
+class RobotCache(object):
+    """
+    Persistent cache for the results extracted from files. Values are pickled and stored in a SQLite_ database.
+
+    Usage example:
+
+    .. code-block:: python
+
+        cache = RobotCache()
+        value = cache.get(filepath, extractor_key)
+        if value is cache.MISSING:
+            value = compute(filepath)
+            cache.put(filepath, extractor_key, value)
+    """
+    # Returned by get if the key is not in the database.
+    MISSING = object()
+
+    def __init__(self, filepath=None, max_bytes=None):
+        """
+        Args:
+            filepath: Path of the SQLite database. None to use DEFAULT_CACHE_PATH.
+            max_bytes: Max size of the values stored in the database. None to use DEFAULT_MAX_BYTES.
+        """
+        self.filepath = os.path.abspath(os.path.expanduser(filepath if filepath is not None else DEFAULT_CACHE_PATH))
+        self.max_bytes = int(max_bytes if max_bytes is not None else DEFAULT_MAX_BYTES)
+        dirname = os.path.dirname(self.filepath)
+        if not os.path.exists(dirname): os.makedirs(dirname)
+
+        self._conn = sqlite3.connect(self.filepath, timeout=30)
+        with self._conn:
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY, path TEXT, extractor TEXT, nbytes INTEGER, atime REAL, value BLOB)""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_path ON results (path)")
+
+    def __repr__(self):
+        return "<%s at %s, %d entries, %d bytes>" % (self.__class__.__name__, self.filepath, len(self), self.nbytes)
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the connection to the database."""
+        self._conn.close()
+
+    @property
+    def nbytes(self):
+        """Total size of the values stored in the database."""
+        return self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM results").fetchone()[0]
+
+    @staticmethod
+    def get_file_key(filepath, extractor):
+        """
+        Return the key associated to (filepath, extractor). The key depends on the size
+        and the modification time of the file. Raises OSError if file does not exist.
+        """
+        filepath = os.path.abspath(filepath)
+        st = os.stat(filepath)
+        s = "%s|%d|%d|%s" % (filepath, st.st_size, st.st_mtime_ns, extractor)
+        return hashlib.sha1(s.encode("utf-8")).hexdigest()
+
+    def get(self, filepath, extractor):
+        """Return the value associated to (filepath, extractor) or ``self.MISSING``."""
+        return self.get_many([filepath], extractor)[0]
+
+    def get_many(self, filepaths, extractor):
+        """
+        Return list with the values associated to (filepath, extractor) for filepath in filepaths.
+        ``self.MISSING`` is used for the values that are not in the database.
+        """
+        keys = []
+        for path in filepaths:
+            try:
+                keys.append(self.get_file_key(path, extractor))
+            except OSError:
+                keys.append(None)
+
+        found = self._load([k for k in keys if k is not None])
+        return [found.get(k, self.MISSING) for k in keys]
+
+    def get_value(self, key):
+        """
+        Return the value associated to a key that does not depend on a file
+        (see ``put_value``) or ``self.MISSING``.
+        """
+        return self._load([key]).get(key, self.MISSING)
+
+    def _load(self, keys):
+        """Return dictionary key --> unpickled value for the keys found in the database."""
+        found = {}
+        for start in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[start:start + _SQL_CHUNK]
+            query = "SELECT key, value FROM results WHERE key IN (%s)" % ",".join("?" * len(chunk))
+            for key, blob in self._conn.execute(query, chunk):
+                try:
+                    found[key] = pickle.loads(blob)
+                except Exception:
+                    # E.g. value pickled with a different version of the code. Will be recomputed.
+                    pass
+
+        if found:
+            # Update access time for the LRU policy.
+            now = time.time()
+            with self._conn:
+                self._conn.executemany("UPDATE results SET atime = ? WHERE key = ?", [(now, k) for k in found])
+
+        return found
+
+    def put(self, filepath, extractor, value):
+        """Store the value associated to (filepath, extractor)."""
+        self.put_many([(filepath, value)], extractor)
+
+    def put_many(self, path_values, extractor):
+        """
+        Store list of (filepath, value) tuples computed with the given extractor.
+        Entries associated to previous versions of the files are removed.
+        Values that cannot be pickled are ignored.
+        """
+        now, rows = time.time(), []
+        for path, value in path_values:
+            try:
+                key = self.get_file_key(path, extractor)
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                continue
+            rows.append((key, os.path.abspath(path), extractor, len(blob), now, sqlite3.Binary(blob)))
+
+        if not rows: return
+        with self._conn:
+            self._conn.executemany("DELETE FROM results WHERE path = ? AND extractor = ?",
+                                   [(r[1], r[2]) for r in rows])
+            self._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+        self.evict()
+
+    def put_value(self, key, value, extractor=""):
+        """
+        Store a value associated to an arbitrary key e.g. the hash of the input of a calculation.
+        ``extractor`` is a string used by ``invalidate``. Values that cannot be pickled are ignored.
+        """
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, "", extractor, len(blob), time.time(), sqlite3.Binary(blob)))
+
+        self.evict()
+
+    def evict(self, max_bytes=None):
+        """
+        Remove the least recently used entries until the size of the database is smaller than ``max_bytes``.
+        Use ``self.max_bytes`` if max_bytes is None. Return number of entries removed.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        excess = self.nbytes - max_bytes
+        if excess <= 0: return 0
+
+        keys = []
+        for key, nbytes in self._conn.execute("SELECT key, nbytes FROM results ORDER BY atime"):
+            keys.append(key)
+            excess -= nbytes
+            if excess <= 0: break
+
+        with self._conn:
+            self._conn.executemany("DELETE FROM results WHERE key = ?", [(k,) for k in keys])
+
+        return len(keys)
+
+    def invalidate(self, filepaths=None, extractor=None):
+        """
+        Remove entries from the database.
+
+        Args:
+            filepaths: List of paths. None for all files.
+            extractor: Remove only the entries computed with this extractor. Accepts the extractor key,
+                a prefix of the key (e.g. the full name of the function) or the function itself.
+                None for all extractors.
+
+        Return: Number of entries removed.
+        """
+        if callable(extractor):
+            func = extractor.func if isinstance(extractor, functools.partial) else extractor
+            extractor = "%s.%s(" % (func.__module__, func.__qualname__)
+
+        where, params = [], []
+        if extractor is not None:
+            where.append("extractor LIKE ?")
+            params.append(extractor.replace("%", r"\%").replace("_", r"\_") + "%")
+
+        query = "DELETE FROM results"
+        count = 0
+        with self._conn:
+            if filepaths is None:
+                if where: query += " WHERE " + " AND ".join(where) + r" ESCAPE '\'"
+                count += self._conn.execute(query, params).rowcount
+            else:
+                query += " WHERE " + " AND ".join(["path = ?"] + where) + (r" ESCAPE '\'" if where else "")
+                for path in list_strings(filepaths):
+                    count += self._conn.execute(query, [os.path.abspath(path)] + params).rowcount
+
+        return count
@@ -7,6 +7,9 @@ import sys
 import os
 import inspect
 import itertools
+import numbers
+import threading
+import collections
 import numpy as np
 
 from collections import OrderedDict, deque
@@ -20,6 +23,262 @@ from abipy.tools.plotting import (plot_xy_with_hue, add_fig_kwargs, get_ax_fig_p
     rotate_ticklabels, set_visible)
 
 
+# Arrays with more than _LIGHT_ARRAY_SIZE entries are not cached by LazyAbiFile.
+_LIGHT_ARRAY_SIZE = 1000
+
+
+def _is_light(value):
+    """
+    True if value is a small object that can be kept in memory after the file has been closed
+    e.g. numbers, strings, structures, small arrays and dictionaries/lists with light entries.
+    """
+    from pymatgen.core.structure import Structure
+    if value is None or isinstance(value, (numbers.Number, str, np.generic, Structure)):
+        return True
+    if isinstance(value, np.ndarray):
+        return value.size <= _LIGHT_ARRAY_SIZE
+    if isinstance(value, collections.abc.Mapping):
+        return len(value) <= _LIGHT_ARRAY_SIZE and all(_is_light(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return len(value) <= _LIGHT_ARRAY_SIZE and all(_is_light(v) for v in value)
+
+    return False
+
+
+def _get_light_attrs(abifile):
+    """
+    Return dictionary with the light attributes already computed by ``abifile``
+    (lazy properties are stored in the instance __dict__).
+    """
+    return {k: v for k, v in vars(abifile).items() if not k.startswith("_") and _is_light(v)}
+
+
+def _fetch_light_attrs(filepath, attrs):
+    """
+    Open file, extract the light attributes listed in ``attrs`` and close it.
+    Module-level function so that it can be executed in a process pool.
+    """
+    from abipy.abilab import abiopen
+    abifile = abiopen(filepath)
+    try:
+        d = {}
+        for aname in attrs:
+            try:
+                value = getattr(abifile, aname)
+            except AttributeError:
+                continue
+            if _is_light(value): d[aname] = value
+        d.update(_get_light_attrs(abifile))
+        return d
+    finally:
+        abifile.close()
+
+
+# Used to collect the exceptions raised by the functions executed by exec_funcs inside Robot.map
+_local = threading.local()
+
+
+def exec_funcs(funcs, arg, exceptions=None):
+    """
+    Execute list of callable functions. Each function receives arg as argument and returns a tuple (key, value).
+    Return dictionary key --> value. Exceptions are printed and appended to the ``exceptions`` list.
+    If ``exceptions`` is None, they are collected by Robot.map (if any).
+    """
+    if not isinstance(funcs, (list, tuple)): funcs = [funcs]
+    if exceptions is None: exceptions = getattr(_local, "exceptions", None)
+    d = {}
+    for func in funcs:
+        try:
+            key, value = func(arg)
+            d[key] = value
+        except Exception as exc:
+            cprint("Exception: %s" % str(exc), "red")
+            if exceptions is not None: exceptions.append(str(exc))
+    return d
+
+
+class _FileCall(object):
+    """
+    Apply ``func`` to a list of abipy files or filepaths (files are opened and closed here).
+    Return list of (result, error, exceptions) tuples where error is a string with the exception
+    raised by func (None if success) and exceptions is the list of exceptions collected by exec_funcs.
+    Instances can be sent to a process pool if func is picklable.
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, objs):
+        outs = []
+        for obj in objs:
+            _local.exceptions = exceptions = []
+            try:
+                if is_string(obj):
+                    from abipy.abilab import abiopen
+                    abifile = abiopen(obj)
+                    try:
+                        result = self.func(abifile)
+                    finally:
+                        abifile.close()
+                else:
+                    result = self.func(obj)
+                outs.append((result, None, exceptions))
+            except Exception as exc:
+                outs.append((None, "%s: %s" % (exc.__class__.__name__, str(exc)), exceptions))
+            finally:
+                _local.exceptions = None
+
+        return outs
+
+
+def _get_structure(abifile):
+    """Extract the structure from abifile. Used by Robot.get_structure_dataframes."""
+    from abipy.core.structure import Structure
+    return Structure.as_structure(abifile)
+
+
+def _get_params(abifile):
+    """Return the params of abifile or None if abifile does not have params. Used by Robot.get_params_dataframe."""
+    return getattr(abifile, "params", None)
+
+
+class FileHandlePool(object):
+    """
+    LRU pool of open files. At most ``maxsize`` files are kept open at the same time:
+    the least recently used file is closed when a new file must be opened.
+    """
+
+    def __init__(self, maxsize):
+        if maxsize < 1:
+            raise ValueError("maxsize should be >= 1 while it is: %s" % str(maxsize))
+        self.maxsize = maxsize
+        self.num_opens = 0
+        self._open = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._open)
+
+    def get(self, lazyfile):
+        """Return the abipy file associated to ``lazyfile``. Open it if needed."""
+        with self._lock:
+            abifile = self._open.get(lazyfile)
+            if abifile is not None:
+                self._open.move_to_end(lazyfile)
+                return abifile
+
+            from abipy.abilab import abiopen
+            abifile = abiopen(lazyfile.filepath)
+            self.num_opens += 1
+            self._open[lazyfile] = abifile
+            while len(self._open) > self.maxsize:
+                old, old_abifile = self._open.popitem(last=False)
+                old._release(old_abifile)
+
+            return abifile
+
+    def release(self, lazyfile):
+        """Close the file associated to ``lazyfile`` (if open)."""
+        with self._lock:
+            abifile = self._open.pop(lazyfile, None)
+            if abifile is not None:
+                lazyfile._release(abifile)
+
+    def close(self):
+        """Close all the files in the pool."""
+        with self._lock:
+            while self._open:
+                lazyfile, abifile = self._open.popitem(last=False)
+                lazyfile._release(abifile)
+
+
+class LazyAbiFile(object):
+    """
+    Proxy for an abipy file that is opened on demand by a |FileHandlePool|.
+    Attribute access is delegated to the underlying file while light results
+    (numbers, structures, params...) are cached so that they are still available
+    once the file has been closed by the pool.
+
+    The proxy is not an instance of the abipy class: use ``file_class`` to get the class
+    without opening the file and ``to_abifile`` to get the underlying abipy file.
+    """
+
+    # Used by client code to detect proxies without importing this module.
+    is_lazy = True
+
+    def __init__(self, filepath, pool):
+        self._filepath = os.path.abspath(filepath)
+        self._pool = pool
+        self._cache = {}
+
+    @property
+    def filepath(self):
+        """Absolute path of the file."""
+        return self._filepath
+
+    @property
+    def relpath(self):
+        """Relative path."""
+        try:
+            return os.path.relpath(self.filepath)
+        except OSError:
+            # current working directory may not be defined!
+            return self.filepath
+
+    @property
+    def basename(self):
+        """Basename of the file."""
+        return os.path.basename(self.filepath)
+
+    @property
+    def file_class(self):
+        """The abipy class used to open the file. Computed from the file extension, the file is not opened."""
+        from abipy.abilab import abifile_subclass_from_filename
+        return abifile_subclass_from_filename(self.filepath)
+
+    def to_abifile(self):
+        """
+        Return the underlying abipy file. The file is opened if needed.
+        The object is owned by the pool and may be closed when other files are opened.
+        """
+        return self._pool.get(self)
+
+    @property
+    def is_open(self):
+        """True if the file is open."""
+        return self in self._pool._open
+
+    def __getattr__(self, name):
+        # Invoked only if name is not found with the usual mechanism.
+        if name.startswith("__") or name in ("_filepath", "_pool", "_cache"):
+            raise AttributeError(name)
+        try:
+            return self._cache[name]
+        except KeyError:
+            value = getattr(self.to_abifile(), name)
+            if _is_light(value): self._cache[name] = value
+            return value
+
+    def __str__(self):
+        return self.to_string()
+
+    def __repr__(self):
+        return "<%s: %s>" % (type(self).__name__, self.relpath)
+
+    def update_cache(self, d):
+        """Add the light attributes in dictionary ``d`` to the cache."""
+        self._cache.update(d)
+
+    def _release(self, abifile):
+        """Save the light attributes computed by ``abifile`` and close it. Invoked by the pool."""
+        self._cache.update(_get_light_attrs(abifile))
+        abifile.close()
+
+    def close(self):
+        """Close the underlying file. The object can still be used: the file is reopened on demand."""
+        self._pool.release(self)
+
+
 class Robot(NotebookWriter):
     """
     This is the base class from which all Robot subclasses should derive.
@@ -33,6 +292,16 @@ class Robot(NotebookWriter):
             # Do something with robot. files are automatically closed when we exit.
             for label, abifile in self.items():
                 print(label)
+
+    Robots with thousands of files should be built with ``max_open_files``.
+    In this case, files are opened on demand and at most ``max_open_files`` are kept open
+    at the same time. Light metadata (structure, params, energies ...) are cached so that
+    they are still available once the file has been closed:
+
+    .. code-block:: python
+
+        robot = GsrRobot.from_dir(".", max_open_files=64)
+        robot.prefetch(attrs=("structure", "params", "energy"), max_workers=8)
     """
     # filepaths are relative to `start`. None for asbolute paths. This flag is set in trim_paths
     start = None
@@ -42,13 +311,20 @@ class Robot(NotebookWriter):
     _LINE_STYLES = ["-", ":", "--", "-.",]
     _LINE_WIDTHS = [2, ]
 
-    def __init__(self, *args):
+    def __init__(self, *args, **kwargs):
         """
         Args:
             args is a list of tuples (label, filepath)
+            max_open_files: If not None, filepaths are opened lazily and at most
+                ``max_open_files`` files are kept open at the same time.
         """
         self._abifiles, self._do_close = OrderedDict(), OrderedDict()
         self._exceptions = deque(maxlen=100)
+        max_open_files = kwargs.pop("max_open_files", None)
+        if kwargs:
+            raise ValueError("Invalid keyword arguments: %s" % str(kwargs))
+        self._pool = None if max_open_files is None else FileHandlePool(max_open_files)
+        self._cache = None
 
         for label, abifile in args:
             self.add_file(label, abifile)
@@ -77,7 +353,7 @@ class Robot(NotebookWriter):
                          str(cls.get_supported_extensions()))
 
     @classmethod
-    def from_dir(cls, top, walk=True, abspath=False):
+    def from_dir(cls, top, walk=True, abspath=False, max_open_files=None):
         """
         This class method builds a robot by scanning all files located within directory `top`.
         This method should be invoked with a concrete robot class, for example:
@@ -88,29 +364,32 @@ class Robot(NotebookWriter):
             top (str): Root directory
             walk: if True, directories inside `top` are included as well.
             abspath: True if paths in index should be absolute. Default: Relative to `top`.
+            max_open_files: Maximum number of open files. None to open all the files immediately.
         """
-        new = cls(*cls._open_files_in_dir(top, walk))
+        lazy = max_open_files is not None
+        new = cls(*cls._open_files_in_dir(top, walk, lazy=lazy), max_open_files=max_open_files)
         if not abspath: new.trim_paths(start=top)
         return new
 
     @classmethod
-    def from_dirs(cls, dirpaths, walk=True, abspath=False):
+    def from_dirs(cls, dirpaths, walk=True, abspath=False, max_open_files=None):
         """
         Similar to `from_dir` but accepts a list of directories instead of a single directory.
 
         Args:
             walk: if True, directories inside `top` are included as well.
             abspath: True if paths in index should be absolute. Default: Relative to `top`.
+            max_open_files: Maximum number of open files. None to open all the files immediately.
         """
         items = []
         for top in list_strings(dirpaths):
-            items.extend(cls._open_files_in_dir(top, walk))
-        new = cls(*items)
+            items.extend(cls._open_files_in_dir(top, walk, lazy=max_open_files is not None))
+        new = cls(*items, max_open_files=max_open_files)
         if not abspath: new.trim_paths(start=os.getcwd())
         return new
 
     @classmethod
-    def from_dir_glob(cls, pattern, walk=True, abspath=False):
+    def from_dir_glob(cls, pattern, walk=True, abspath=False, max_open_files=None):
         """
         This class method builds a robot by scanning all files located within the directories
         matching `pattern` as implemented by glob.glob
@@ -122,33 +401,38 @@ class Robot(NotebookWriter):
             pattern: Pattern string
             walk: if True, directories inside `top` are included as well.
             abspath: True if paths in index should be absolute. Default: Relative to getcwd().
+            max_open_files: Maximum number of open files. None to open all the files immediately.
         """
         import glob
         items = []
         for top in filter(os.path.isdir, glob.iglob(pattern)):
-            items += cls._open_files_in_dir(top, walk=walk)
-        new = cls(*items)
+            items += cls._open_files_in_dir(top, walk=walk, lazy=max_open_files is not None)
+        new = cls(*items, max_open_files=max_open_files)
         if not abspath: new.trim_paths(start=os.getcwd())
         return new
 
     @classmethod
-    def _open_files_in_dir(cls, top, walk):
-        """Open files in directory tree starting from `top`. Return list of Abinit files."""
+    def _open_files_in_dir(cls, top, walk, lazy=False):
+        """
+        Open files in directory tree starting from `top`. Return list of (label, Abinit file).
+        If lazy, files are not opened and the list contains (label, absolute filepath).
+        """
         if not os.path.isdir(top):
             raise ValueError("%s: no such directory" % str(top))
         from abipy.abilab import abiopen
-        items = []
         if walk:
-            for dirpath, dirnames, filenames in os.walk(top):
-                filenames = [f for f in filenames if cls.class_handles_filename(f)]
-                for f in filenames:
-                    abifile = abiopen(os.path.join(dirpath, f))
-                    if abifile is not None: items.append((abifile.filepath, abifile))
+            paths = [os.path.join(dirpath, f) for dirpath, dirnames, filenames in os.walk(top)
+                     for f in filenames if cls.class_handles_filename(f)]
         else:
-            filenames = [f for f in os.listdir(top) if cls.class_handles_filename(f)]
-            for f in filenames:
-                abifile = abiopen(os.path.join(top, f))
-                if abifile is not None: items.append((abifile.filepath, abifile))
+            paths = [os.path.join(top, f) for f in os.listdir(top) if cls.class_handles_filename(f)]
+
+        if lazy:
+            return [(os.path.abspath(p), os.path.abspath(p)) for p in paths]
+
+        items = []
+        for path in paths:
+            abifile = abiopen(path)
+            if abifile is not None: items.append((abifile.filepath, abifile))
 
         return items
 
@@ -163,17 +447,25 @@ class Robot(NotebookWriter):
                 filename.endswith("." + cls.EXT))  # This for .abo
 
     @classmethod
-    def from_files(cls, filenames, labels=None, abspath=False):
+    def from_files(cls, filenames, labels=None, abspath=False, max_open_files=None):
         """
         Build a Robot from a list of `filenames`.
         if labels is None, labels are automatically generated from absolute paths.
 
         Args:
             abspath: True if paths in index should be absolute. Default: Relative to `top`.
+            max_open_files: Maximum number of open files. None to open all the files immediately.
         """
         filenames = list_strings(filenames)
         from abipy.abilab import abiopen
         filenames = [f for f in filenames if cls.class_handles_filename(f)]
+        if max_open_files is not None:
+            # Files are opened on demand by the robot.
+            items = [(os.path.abspath(f) if labels is None else labels[i], f) for i, f in enumerate(filenames)]
+            new = cls(*items, max_open_files=max_open_files)
+            if labels is None and not abspath: new.trim_paths(start=None)
+            return new
+
         items = []
         for i, f in enumerate(filenames):
             try:
@@ -192,7 +484,7 @@ class Robot(NotebookWriter):
         return new
 
     @classmethod
-    def from_flow(cls, flow, outdirs="all", nids=None, ext=None, task_class=None):
+    def from_flow(cls, flow, outdirs="all", nids=None, ext=None, task_class=None, max_open_files=None):
         """
         Build a robot from a |Flow| object.
 
@@ -208,6 +500,7 @@ class Robot(NotebookWriter):
             ext: File extension associated to the robot. Mainly used if method is invoked with the BaseClass
             task_class: Task class or string with the class name used to select the tasks in the flow.
                 None implies no filtering.
+            max_open_files: Maximum number of open files. None to open all the files immediately.
 
         Usage example:
 
@@ -223,7 +516,8 @@ class Robot(NotebookWriter):
         Returns:
             ``Robot`` subclass.
         """
-        robot = cls() if ext is None else cls.class_for_ext(ext)()
+        robot_cls = cls if ext is None else cls.class_for_ext(ext)
+        robot = robot_cls(max_open_files=max_open_files)
         all_opts = ("flow", "work", "task")
 
         if outdirs == "all":
@@ -298,7 +592,7 @@ class Robot(NotebookWriter):
             Number of files found.
         """
         count = 0
-        for filepath, abifile in self.__class__._open_files_in_dir(top, walk):
+        for filepath, abifile in self.__class__._open_files_in_dir(top, walk, lazy=self._pool is not None):
             count += 1
             self.add_file(filepath, abifile)
 
@@ -312,12 +606,16 @@ class Robot(NotebookWriter):
             label: String used to identify the file (must be unique, ax exceptions is
                 raised if label is already present.
             abifile: Specify the file to be added. Accepts strings (filepath) or abipy file-like objects.
+                If the robot has been created with ``max_open_files``, filepaths are opened on demand.
             filter_abifile: Function that receives an ``abifile`` object and returns
                 True if the file should be added to the plotter.
         """
         if is_string(abifile):
-            from abipy.abilab import abiopen
-            abifile = abiopen(abifile)
+            if self._pool is not None:
+                abifile = LazyAbiFile(abifile, self._pool)
+            else:
+                from abipy.abilab import abiopen
+                abifile = abiopen(abifile)
             if filter_abifile is not None and not filter_abifile(abifile):
                 abifile.close()
                 return
@@ -697,6 +995,95 @@ Expecting callable or attribute name or key in abifile.params""" % (type(hue), s
                     print("Exception while closing: ", abifile.filepath)
                     print(exc)
 
+        if self._pool is not None: self._pool.close()
+        if self._cache is not None: self._cache.close()
+
+    @property
+    def cache(self):
+        """|RobotCache| object used to store the results extracted from the files. None if cache is disabled."""
+        return self._cache
+
+    def enable_cache(self, filepath=None, max_bytes=None):
+        """
+        Activate the persistent cache for the results computed by ``self.map``
+        (e.g. ``get_dataframe`` and ``get_params_dataframe``). Results are stored in a SQLite database and
+        recomputed only if the file is modified. Useful in combination with ``max_open_files``
+        as the files found in the cache are not opened at all.
+
+        Args:
+            filepath: Path of the database. None to use the default location in ~/.abinit/abipy.
+            max_bytes: Max size of the database in bytes. The least recently used entries are
+                removed when this value is exceeded. None to use the default value.
+
+        Return: |RobotCache| object.
+        """
+        from abipy.abio.robotcache import RobotCache
+        if self._cache is not None: self._cache.close()
+        self._cache = RobotCache(filepath=filepath, max_bytes=max_bytes)
+        return self._cache
+
+    def disable_cache(self):
+        """Deactivate the persistent cache. The content of the database is not changed."""
+        if self._cache is not None: self._cache.close()
+        self._cache = None
+
+    def invalidate_cache(self, labels=None, extractor=None):
+        """
+        Remove the entries associated to the files of the robot from the cache.
+
+        Args:
+            labels: List of labels. None for all the files in the robot.
+            extractor: Remove only the entries computed with this function (or key of the extractor).
+                None for all extractors.
+
+        Return: Number of entries removed.
+        """
+        if self._cache is None: return 0
+        labels = self.labels if labels is None else list_strings(labels)
+        return self._cache.invalidate(filepaths=[self._abifiles[l].filepath for l in labels], extractor=extractor)
+
+    def prefetch(self, attrs=("structure", "params"), max_workers=None, use_processes=True):
+        """
+        Extract light metadata from the files that have not been opened yet.
+        The files are opened, read and closed in a pool of workers so that the cost of the IO
+        is paid in parallel. Results are cached by the |LazyAbiFile| objects, hence
+        the subsequent access to these attributes does not require any file to be open.
+        Useful only if the robot has been created with ``max_open_files``.
+
+        Args:
+            attrs: List of attribute names to extract. The lazy properties computed while reading
+                these attributes are cached as well.
+            max_workers: Maximum number of workers. None to use the default of concurrent.futures.
+            use_processes: True to use a pool of processes, False for threads.
+                Note that netcdf files are always opened in different processes.
+
+        Return:
+            Number of files that have been prefetched.
+        """
+        lazyfiles = [f for f in self.abifiles if isinstance(f, LazyAbiFile) and not f.is_open]
+        if not lazyfiles: return 0
+        attrs = list_strings(attrs)
+
+        from concurrent import futures
+        if use_processes or any(f.filepath.endswith(".nc") for f in lazyfiles):
+            executor = futures.ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+
+        count = 0
+        with executor:
+            fs = {executor.submit(_fetch_light_attrs, f.filepath, attrs): f for f in lazyfiles}
+            for future in futures.as_completed(fs):
+                lazyfile = fs[future]
+                try:
+                    lazyfile.update_cache(future.result())
+                    count += 1
+                except Exception as exc:
+                    cprint("Exception while reading file: `%s`" % lazyfile.filepath, "red")
+                    self._exceptions.append(str(exc))
+
+        return count
+
     #@classmethod
     #def open(cls, obj, nids=None, **kwargs):
     #    """
@@ -741,16 +1128,154 @@ Expecting callable or attribute name or key in abifile.params""" % (type(hue), s
         """
         Execute list of callable functions. Each function receives arg as argument.
         """
-        if not isinstance(funcs, (list, tuple)): funcs = [funcs]
-        d = {}
-        for func in funcs:
-            try:
-                key, value = func(arg)
-                d[key] = value
-            except Exception as exc:
-                cprint("Exception: %s" % str(exc), "red")
-                self._exceptions.append(str(exc))
-        return d
+        return exec_funcs(funcs, arg, exceptions=self._exceptions)
+
+    def map(self, func, executor=None, max_workers=None, chunksize=1, use_cache=True):
+        """
+        Apply ``func`` to all the files in the robot. Generator yielding (label, result) tuples
+        in the same order as the files in the robot. Results are returned as soon as they are available.
+        The exceptions raised by ``func`` are added to ``self.exceptions`` and the file is skipped.
+        If the cache is enabled (see ``enable_cache``), the results are taken from the cache
+        and ``func`` is executed only for the files that have been modified.
+
+        Args:
+            func: Callable receiving an abipy file.
+            executor: None for serial execution. "threads" or "processes" to execute ``func`` in a pool
+                of threads/processes. Also accepts a ``concurrent.futures`` executor that won't be shutdown.
+                With processes, the files are reopened inside the workers hence ``func`` must be picklable
+                e.g. module-level function or ``functools.partial`` object.
+                Note that the netcdf library is not thread-safe.
+            max_workers: Maximum number of workers. None to use the default of concurrent.futures.
+            chunksize: Number of files passed to each worker in a single task.
+            use_cache: False to ignore the cache. Note that only module-level functions or
+                ``functools.partial`` objects with simple arguments are cached.
+
+        Example:
+
+            for label, energy in robot.map(operator.attrgetter("energy"), executor="processes"):
+                print(label, energy)
+        """
+        items = list(self.items())
+        extractor = None
+        if use_cache and self._cache is not None:
+            from abipy.abio.robotcache import get_extractor_key
+            extractor = get_extractor_key(func)
+
+        if extractor is None:
+            for label, result, error in self._map_items(func, items, executor, max_workers, chunksize):
+                if error is None: yield label, result
+            return
+
+        # Execute func only for the files that are not in the cache. Results are stored in chunks.
+        cached = self._cache.get_many([abifile.filepath for _, abifile in items], extractor)
+        missing = self._cache.MISSING
+        todo = [item for item, value in zip(items, cached) if value is missing]
+        outs = self._map_items(func, todo, executor, max_workers, chunksize)
+        path_values = []
+        try:
+            for (label, abifile), value in zip(items, cached):
+                if value is missing:
+                    label, value, error = next(outs)
+                    if error is not None: continue
+                    path_values.append((abifile.filepath, value))
+                    if len(path_values) == 100:
+                        self._cache.put_many(path_values, extractor)
+                        path_values = []
+                yield label, value
+        finally:
+            outs.close()
+            self._cache.put_many(path_values, extractor)
+
+    def _map_items(self, func, items, executor, max_workers, chunksize):
+        """
+        Apply func to the list of (label, abifile) items. Generator yielding (label, result, error)
+        where error is None if success. Exceptions are added to self.exceptions.
+        """
+        call = _FileCall(func)
+        if executor is None:
+            items = [((label,), [abifile]) for label, abifile in items]
+            outs = (call(objs) for _, objs in items)
+        else:
+            from concurrent import futures
+            own_executor = is_string(executor)
+            if own_executor:
+                if executor not in ("threads", "processes"):
+                    raise ValueError("Invalid value for executor: %s" % str(executor))
+                pool_cls = futures.ThreadPoolExecutor if executor == "threads" else futures.ProcessPoolExecutor
+                executor = pool_cls(max_workers=max_workers)
+
+            # Lazy files are reopened by the workers. This one is thread-safe.
+            use_paths = isinstance(executor, futures.ProcessPoolExecutor)
+            labels = [label for label, _ in items]
+            objs = [f.filepath if use_paths or isinstance(f, LazyAbiFile) else f for _, f in items]
+            items = [(labels[i:i + chunksize], objs[i:i + chunksize]) for i in range(0, len(objs), chunksize)]
+            fs = [executor.submit(call, objs) for _, objs in items]
+
+            def get_outs():
+                try:
+                    for (chunk_labels, _), future in zip(items, fs):
+                        try:
+                            yield future.result()
+                        except Exception as exc:
+                            # E.g. func is not picklable. Report the error for all files in the chunk.
+                            yield [(None, "%s: %s" % (exc.__class__.__name__, str(exc)), [])] * len(chunk_labels)
+                finally:
+                    if own_executor: executor.shutdown(wait=True)
+
+            outs = get_outs()
+
+        for (chunk_labels, _), chunk_outs in zip(items, outs):
+            for label, (result, error, exceptions) in zip(chunk_labels, chunk_outs):
+                self._exceptions.extend(exceptions)
+                if error is not None:
+                    cprint("Exception while processing file: `%s`\n%s" % (label, error), "red")
+                    self._exceptions.append("%s: %s" % (label, error))
+                yield label, result, error
+
+    def map_to_dataframe(self, func, index=None, abspath=False, chunk_rows=1000, **kwargs):
+        """
+        Build a |pandas-DataFrame| with the results of ``func`` executed with ``self.map``.
+        ``func`` receives an abipy file and returns a dictionary with the values of the row
+        or None if the file should be ignored. The columns are given by the keys of the first row.
+        Rows are reduced to DataFrames in chunks of ``chunk_rows`` to limit the memory
+        required by the intermediate python objects.
+
+        Args:
+            index: Index of the dataframe, if None, robot labels are used.
+                Must contain one entry per file in the robot. The entries of the files
+                that have been skipped are removed.
+            abspath: True if paths in index should be absolute. Default: Relative to getcwd().
+            chunk_rows: Number of rows in each chunk.
+            kwargs: Keyword arguments passed to ``self.map`` e.g. executor, max_workers.
+
+        Return: |pandas-DataFrame|
+        """
+        import pandas as pd
+        if index is not None and len(index) != len(self):
+            raise ValueError("index has %d entries but robot contains %d files" % (len(index), len(self)))
+
+        dfs, rows, row_names, columns = [], [], [], None
+        for label, row in self.map(func, **kwargs):
+            if row is None: continue
+            if columns is None: columns = list(row.keys())
+            rows.append(row)
+            row_names.append(label)
+            if len(rows) == chunk_rows:
+                dfs.append(pd.DataFrame(rows, index=row_names, columns=columns))
+                rows, row_names = [], []
+
+        if rows or not dfs:
+            dfs.append(pd.DataFrame(rows, index=row_names, columns=columns))
+        df = pd.concat(dfs) if len(dfs) > 1 else dfs[0]
+
+        row_names = list(df.index)
+        if index is None:
+            df.index = row_names if not abspath else self._to_relpaths(row_names)
+        else:
+            label2index = dict(zip(self.labels, index))
+            df.index = [label2index[label] for label in row_names]
+
+        return df
 
     @staticmethod
     def sortby_label(sortby, param):
@@ -767,13 +1292,16 @@ Expecting callable or attribute name or key in abifile.params""" % (type(hue), s
                 True if the file should be added to the plotter.
         """
         from abipy.core.structure import dataframes_from_structures
+        labels, structures = [], []
+        for label, structure in self.map(_get_structure):
+            if filter_abifile is not None and not filter_abifile(self._abifiles[label]): continue
+            labels.append(label)
+            structures.append(structure)
+
         if "index" not in kwargs:
-            index = list(self._abifiles.keys())
-            if not abspath: index = self._to_relpaths(index)
-            kwargs["index"] = index
+            kwargs["index"] = labels if abspath else self._to_relpaths(labels)
 
-        abifiles = self.abifiles if filter_abifile is not None else list(filter(filter_abifile, self.abifiles))
-        return dataframes_from_structures(struct_objects=abifiles, **kwargs)
+        return dataframes_from_structures(struct_objects=structures, **kwargs)
 
     def get_lattice_dataframe(self, **kwargs):
         """Return |pandas-DataFrame| with lattice parameters."""
@@ -794,12 +1322,12 @@ Expecting callable or attribute name or key in abifile.params""" % (type(hue), s
             abspath: True if paths in index should be absolute. Default: Relative to `top`.
         """
         rows, row_names = [], []
-        for label, abifile in self.items():
-            if not hasattr(abifile, "params"):
+        for label, params in self.map(_get_params):
+            if params is None:
                 import warnings
-                warnings.warn("%s does not have `params` attribute" % type(abifile))
+                warnings.warn("%s does not have `params` attribute" % type(self._abifiles[label]))
                 break
-            rows.append(abifile.params)
+            rows.append(params)
             row_names.append(label)
 
         row_names = row_names if abspath else self._to_relpaths(row_names)
@@ -334,12 +334,95 @@ class TestAbinitInput(AbipyTest):
         for a, b in zip(irred_perts, irred_perts_values):
             self.assertDictEqual(a, b)
 
+        # Cross-validate the python implementation of the IBZ and of the irreducible perturbations with Abinit.
+        from abipy.abio import dryrun
+        old_value = dryrun.set_fast_paths(False)
+        try:
+            for ngkpt, shiftk in [((2, 2, 2), (0, 0, 0)), ((4, 4, 4), (0, 0, 0)), ((3, 3, 3), (0.5, 0.5, 0.5))]:
+                ibz = inp_si.abiget_ibz(ngkpt=ngkpt, shiftk=shiftk)
+                dryrun.set_fast_paths(True)
+                fast_ibz = inp_si.abiget_ibz(ngkpt=ngkpt, shiftk=shiftk)
+                dryrun.set_fast_paths(False)
+                self.assert_almost_equal(fast_ibz.points, ibz.points)
+                self.assert_almost_equal(fast_ibz.weights, ibz.weights)
+
+            inp_bi = AbinitInput(structure=abilab.Structure(abilab.Lattice.rhombohedral(4.72, 57.2), ["Bi", "Bi"],
+                                                            [3 * [0.234], 3 * [-0.234]]),
+                                 pseudos=abidata.pseudos("83-Bi.GGA.fhi"))
+            inp_bi.set_kmesh(ngkpt=(2, 2, 2), shiftk=(0, 0, 0))
+            old_phperts = dryrun.set_fast_phperts(True)
+            try:
+                for inp, qpt in [(inp_si, (0, 0, 0)), (inp_si, (0.5, 0, 0)), (inp_si, (0.25, 0, 0)),
+                                 (inp_si, (0.1, 0.2, 0.3)), (inp_gan, (0.5, 0, 0)), (inp_gan, (0, 0, 0)),
+                                 (inp_gan, (1/3, 1/3, 0)), (inp_gan, (0.25, 0, 0)), (inp_bi, (0, 0, 0)),
+                                 (inp_bi, (0.5, 0, 0)), (inp_bi, (0.25, 0.25, 0.25))]:
+                    assert inp.abiget_irred_phperts(qpt=qpt) == dryrun.get_irred_phperts(inp, qpt)
+
+                # The python version is not used if only a subset of atoms or directions is requested.
+                perts = inp_gan._abiget_irred_perts(dict(rfphon=1, rfatpol=[1, 1], rfdir=[0, 0, 1]), qpt=(0.5, 0, 0))
+                assert perts and all(p.ipert == 1 and p.idir == 3 for p in perts)
+            finally:
+                dryrun.set_fast_phperts(old_phperts)
+        finally:
+            dryrun.set_fast_paths(old_value)
+
         # Test abiget_autoparal_pconfs
         inp_si["paral_kgb"] = 0
         pconfs = inp_si.abiget_autoparal_pconfs(max_ncpus=5)
         inp_si["paral_kgb"] = 1
         pconfs = inp_si.abiget_autoparal_pconfs(max_ncpus=5)
 
+    def test_dryrun_fast_paths(self):
+        """Testing python implementation of the methods invoking Abinit."""
+        from abipy.abio import dryrun
+        inp_si = AbinitInput(structure=abidata.cif_file("si.cif"), pseudos=abidata.pseudos("14si.pspnc"))
+        inp_si.set_kmesh(ngkpt=(4, 4, 4), shiftk=(0, 0, 0))
+
+        # Results produced by Abinit.
+        points, weights = dryrun.get_ibz(inp_si)
+        self.assert_almost_equal(points, [[0, 0, 0], [0.25, 0, 0], [0.5, 0, 0], [0.25, 0.25, 0],
+                                          [0.5, 0.25, 0], [-0.25, 0.25, 0], [0.5, 0.5, 0], [-0.25, 0.5, 0.25]])
+        self.assert_almost_equal(weights * 64, [1, 8, 4, 6, 24, 12, 3, 6])
+        ibz = inp_si.abiget_ibz(ngkpt=(2, 2, 2))
+        self.assert_equal(ibz.points, [[0., 0., 0.], [0.5, 0., 0.], [0.5, 0.5, 0.]])
+        self.assert_equal(ibz.weights, [0.125, 0.5, 0.375])
+        assert len(inp_si.abiget_ibz(kptopt=3).points) == 64
+
+        # Unsupported inputs: symmetry breaking shift, multiple shifts, magnetic systems.
+        assert dryrun.get_ibz(inp_si.new_with_vars(shiftk=[0.5, 0.5, 0.5])) is None
+        assert dryrun.get_ibz(inp_si.new_with_vars(nshiftk=2, shiftk=[0, 0, 0, 0.5, 0.5, 0.5])) is None
+        assert dryrun.get_symmetries(inp_si.new_with_vars(nsppol=2, spinat=[0, 0, 1, 0, 0, -1])) is None
+
+        # The python version of the irreducible perturbations must be activated explicitly.
+        assert len(dryrun.get_irred_phperts(inp_si, (0, 0, 0), prepgkk=1)) == 6
+        assert dryrun.get_irred_phperts(inp_si, (0, 0, 0)) is None
+        old_phperts = dryrun.set_fast_phperts(True)
+        try:
+            perts = inp_si.abiget_irred_phperts(qpt=(0, 0, 0))
+            assert perts == [{'idir': 1, 'ipert': 1, 'qpt': [0.0, 0.0, 0.0]}] and perts[0].ipert == 1
+            assert len(inp_si.abiget_irred_phperts(qpt=(0, 0, 0), prepgkk=1)) == 6
+
+            inp_gan = AbinitInput(structure=abidata.cif_file("gan.cif"),
+                                  pseudos=abidata.pseudos("31ga.pspnc", "7n.pspnc"))
+            perts = inp_gan.abiget_irred_phperts(qpt=(0.5, 0, 0))
+            assert [(p.ipert, p.idir) for p in perts] == [(1, 1), (1, 2), (1, 3), (3, 1), (3, 2), (3, 3)]
+        finally:
+            dryrun.set_fast_phperts(old_phperts)
+
+        # Cached values are returned as new objects.
+        dryrun.put_cached("foo", perts)
+        assert dryrun.get_cached("foo") == perts and dryrun.get_cached("foo") is not perts
+        assert dryrun.get_cached("bar") is dryrun.MISSING
+        cache = dryrun.enable_cache(self.get_tmpname(suffix=".sqlite"))
+        try:
+            dryrun.put_cached("foo", perts, method="test")
+            dryrun.clear_memory_cache()
+            assert dryrun.get_cached("foo") == perts and len(cache) == 1
+            assert cache.invalidate(extractor="dryrun.test") == 1
+        finally:
+            dryrun.disable_cache()
+            dryrun.clear_memory_cache()
+
     def test_dict_methods(self):
         """ Testing AbinitInput dict methods """
         inp = ebands_input(abidata.cif_file("si.cif"), abidata.pseudos("14si.pspnc"), kppa=10, ecut=2)[0]
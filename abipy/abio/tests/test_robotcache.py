@@ -0,0 +1,58 @@
+# coding: utf-8
+"""Tests for robotcache module."""
+import os
+import functools
+import numpy as np
+import abipy.data as abidata
+import abipy.abilab as abilab
+
+from abipy.core.testing import AbipyTest
+from abipy.abio.robotcache import RobotCache, get_extractor_key
+
+
+def _get_energy(abifile, scale=1):
+    return float(abifile.energy) * scale
+
+
+class RobotCacheTest(AbipyTest):
+
+    def test_robot_cache(self):
+        """Testing RobotCache"""
+        assert get_extractor_key(lambda x: x) is None
+        assert get_extractor_key(functools.partial(_get_energy, scale=object())) is None
+        key = get_extractor_key(functools.partial(_get_energy, scale=2))
+        assert "_get_energy(scale=2)" in key
+
+        gsr_path = abidata.ref_file("si_scf_GSR.nc")
+        cache_path = self.get_tmpname(suffix=".sqlite")
+        with RobotCache(cache_path) as cache:
+            assert cache.get(gsr_path, key) is cache.MISSING
+            cache.put(gsr_path, key, np.ones(3))
+            self.assert_equal(cache.get(gsr_path, key), np.ones(3))
+            assert len(cache) == 1 and cache.nbytes > 0
+            repr(cache)
+
+            # Values associated to keys that do not depend on files.
+            cache.put_value("foo", [1, 2], extractor="bar")
+            assert cache.get_value("foo") == [1, 2] and cache.get_value("spam") is cache.MISSING
+            assert cache.invalidate(extractor="bar") == 1 and len(cache) == 1
+
+            # Size-based eviction.
+            assert cache.evict(max_bytes=0) == 1 and len(cache) == 0
+            cache.put(gsr_path, key, 1.0)
+            assert cache.invalidate(filepaths=gsr_path, extractor=_get_energy) == 1 and len(cache) == 0
+
+        # Robot API. Second call should not open the files.
+        robot = abilab.GsrRobot.from_dirs(os.path.dirname(gsr_path), max_open_files=1)
+        robot.enable_cache(cache_path)
+        func = functools.partial(_get_energy, scale=2)
+        results = list(robot.map(func))
+        assert len(robot.cache) == 2 and robot._pool.num_opens == 2
+        assert list(robot.map(func)) == results and robot._pool.num_opens == 2
+        df = robot.get_params_dataframe()
+        assert len(df) == 2 and len(robot.cache) == 4
+        robot.get_params_dataframe()
+        assert robot._pool.num_opens == 4
+        assert robot.invalidate_cache(labels=robot.labels[0], extractor=func) == 1
+        assert robot.invalidate_cache() == 3
+        robot.close()
@@ -451,7 +451,7 @@ class _Field(Has_Structure):
 
         return fig
 
-    def integrate_in_spheres(self, rcut_symbol=None, out=False):
+    def integrate_in_spheres(self, rcut_symbol=None, out=False, use_symmetry=True, chunksize=None):
         """
         Integrate field (e.g. density/potential) inside atom-centered spheres of given radius.
         Can be used to get a rough estimate of the charge/magnetization associated to a given site.
@@ -460,6 +460,12 @@ class _Field(Has_Structure):
             rcut_symbol: dictionary mapping chemical element to the radius of the sphere in Angstrom.
                 or number if each element should have the same sphere. If None, covalent radii are used.
             out: Set it to False to disable output of final results
+            use_symmetry: True if only the symmetry-inequivalent atoms should be computed.
+                Used only if nspden == 1 since the magnetic order may break the symmetry of the structure.
+                Equivalent atoms are obtained from the Abinit symmetries stored in ``structure.abi_spacegroup``.
+                All atoms are computed if the structure does not have Abinit symmetries.
+            chunksize: Number of G-vectors treated at once. None to use a value such that
+                the size of the temporary arrays is bounded.
 
         Return:
             |pandas-DataFrame| with computed results (integrated density, integrated magnetization, ...)
@@ -473,23 +479,44 @@ class _Field(Has_Structure):
         elif duck.is_number_like(rcut_symbol):
             rcut_symbol = {s: float(rcut_symbol) for s in self.structure.symbol_set}
 
+        # Find the atoms that should be computed explicitly.
+        # atom2irr gives the index of the symmetry-equivalent atom in irred_atoms.
+        natom = len(self.structure)
+        if use_symmetry and self.nspden == 1 and self.structure.has_abi_spacegroup:
+            # Use the symmetries found by Abinit, the equivalent atoms are labelled by the first atom in the orbit.
+            fm_syms = np.asarray(self.structure.abi_spacegroup.symafm) == 1
+            equivalent_atoms = self.structure.indsym[:, fm_syms, 3].min(axis=1).astype(np.int)
+            irred_atoms, atom2irr = np.unique(equivalent_atoms, return_inverse=True)
+        else:
+            irred_atoms, atom2irr = np.arange(natom), np.arange(natom)
+
         # Spline bessel integrals.
         datag = np.reshape(self.datag, (self.nspden, -1))
-        #print("datag[0]", datag[0, 0] * self.structure.volume, datag.shape)
-        gvecs = self.mesh.gvecs
-        gmods = self.mesh.gmods
-        gmax = gmods.max()
         from abipy.tools import bessel
-        splines = {s: bessel.spline_int_jlqr(0, gmax, rcut_symbol[s]) for s in self.structure.symbol_set}
+        splines = {s: bessel.spline_int_jlqr(0, self.mesh.gmax, rcut_symbol[s]) for s in self.structure.symbol_set}
 
         # 4 pi sum_G n(G) e^{iGRo} int_0^{rcut} r**2 j_l(Gr} dr
+        # G-vectors are treated in chunks. For each chunk, we compute the [ng, nirr] matrix with the phases
+        # and we sum over G with one matrix-matrix multiplication per chemical symbol.
+        frac_coords = self.structure.frac_coords[irred_atoms]
+        symbol_inds = OrderedDict()
+        for i, iatom in enumerate(irred_atoms):
+            symbol_inds.setdefault(self.structure[iatom].specie.symbol, []).append(i)
+
+        if chunksize is None: chunksize = max(1, 2 * 10**6 // len(irred_atoms))
+        res_irr = np.zeros((self.nspden, len(irred_atoms)), dtype=np.complex)
+        for start, stop, gvecs, gmods in self.mesh.iter_gvecs(chunksize=chunksize):
+            phases = np.exp(2j * np.pi * np.dot(gvecs, frac_coords.T))
+            for symbol, inds in symbol_inds.items():
+                fg = datag[:, start:stop] * splines[symbol](gmods)
+                res_irr[:, inds] += np.dot(fg, phases[:, inds])
+
+        res_irr *= 4 * np.pi
+
         rows = []
         for iatom, site in enumerate(self.structure):
             symbol = site.specie.symbol
-            phases = np.exp(2j * np.pi * np.dot(gvecs, site.frac_coords))
-            fg = datag * phases * splines[symbol](gmods)
-            res_nspden = np.sum(fg, axis=1) * (4 * np.pi)
-            #print("result:", res_nspden, res_nspden.shape, (datag * fg).shape)
+            res_nspden = res_irr[:, atom2irr[iatom]]
 
             # Compute densities and magnetization.
             ntot, nup, ndown, mx, my, mz = 6 * (None,)
@@ -577,7 +604,7 @@ class Density(_DensityField):
 
     @classmethod
     def ae_core_density_on_mesh(cls, valence_density, structure, rhoc, maxr=2.0, nelec=None, tol=0.01,
-                                method='get_sites_in_sphere', small_dist_mesh=(8, 8, 8), small_dist_factor=1.5):
+                                method='mesh3d_dist_gridpoints', small_dist_mesh=(8, 8, 8), small_dist_factor=1.5):
         """
         Initialize the all electron core density of the structure from the pseudopotentials *rhoc* files.
         For points close to the atoms, the value at the grid point would be defined as the average on a finer grid
@@ -595,9 +622,9 @@ class Density(_DensityField):
                 to the value specified in nelec. Default 0.01 (1% error).
             method: different methods to perform the calculation:
 
-                * get_sites_in_sphere: based on ``Structure.get_sites_in_sphere``.
-                * mesh3d_dist_gridpoints: based on ``Mesh3D.dist_gridpoints_in_spheres``. Generally faster than
-                    ``get_sites_in_sphere``, but tests can be made for specific cases.
+                * mesh3d_dist_gridpoints: based on ``Mesh3D.get_gridpoints_in_spheres``. Fully vectorized.
+                * get_sites_in_sphere: based on ``Structure.get_sites_in_sphere``. Loops over the grid points
+                    hence it is much slower than ``mesh3d_dist_gridpoints``.
                 * get_sites_in_sphere_legacy: as get_sites_in_sphere, but part of the procedure is not vectorized
                 * mesh3d_dist_gridpoints_legacy: as mesh3d_dist_gridpoints, but part of the procedure is not vectorized
 
@@ -704,29 +731,29 @@ class Density(_DensityField):
                         total /= (nnx*nny*nnz)
                         core_den[0, igp_uc[0], igp_uc[1], igp_uc[2]] += total
         elif method == 'mesh3d_dist_gridpoints':
-            import time
             site_coords = [site.coords for site in structure]
-            start = time.time()
-            dist_gridpoints_sites = valence_density.mesh.dist_gridpoints_in_spheres(points=site_coords, radius=maxr)
             nnx, nny, nnz = small_dist_mesh
             meshgrid = np.meshgrid(np.linspace(-0.5, 0.5, nnx, endpoint=False) + 0.5 / nnx,
                                    np.linspace(-0.5, 0.5, nny, endpoint=False) + 0.5 / nny,
                                    np.linspace(-0.5, 0.5, nnz, endpoint=False) + 0.5 / nnz)
             coords_grid = np.outer(meshgrid[0], dvx) + np.outer(meshgrid[1], dvy) + np.outer(meshgrid[2], dvz)
-            for isite, dist_gridpoints_site in enumerate(dist_gridpoints_sites):
-                for igp_uc, dist, igp in dist_gridpoints_site:
-                    if dist > smallradius:
-                        core_den[0, igp_uc[0], igp_uc[1], igp_uc[2]] += rhoc_atom_splines[isite](dist)
-                    # For small distances, integrate over the small volume dv around the point as the core density
-                    # is extremely high close to the atom
-                    else:
-                        total = 0.0
-                        rpoint = valence_density.mesh.rpoint(ix=igp[0], iy=igp[1], iz=igp[2])
-                        grid_loc = rpoint + coords_grid
-                        distances = np.linalg.norm(grid_loc-site_coords[isite], axis=1)
-                        total = np.sum(rhoc_atom_splines[isite](distances))
-                        total /= (nnx*nny*nnz)
-                        core_den[0, igp_uc[0], igp_uc[1], igp_uc[2]] += total
+            dvs = np.array([dvx, dvy, dvz])
+            gridpoints_sites = valence_density.mesh.get_gridpoints_in_spheres(points=site_coords, radius=maxr)
+            for isite, (igp_uc, dists, igp) in enumerate(gridpoints_sites):
+                spline = rhoc_atom_splines[isite]
+                values = np.empty(len(dists))
+                far = dists > smallradius
+                values[far] = spline(dists[far])
+                # For small distances, integrate over the small volume dv around the point as the core density
+                # is extremely high close to the atom
+                near = ~far
+                if np.any(near):
+                    grid_loc = np.dot(igp[near], dvs)[:, None, :] + coords_grid
+                    distances = np.linalg.norm(grid_loc - site_coords[isite], axis=-1)
+                    values[near] = np.mean(np.reshape(spline(distances.ravel()), distances.shape), axis=1)
+
+                # Periodic images may give the same point in the unit cell.
+                np.add.at(core_den[0], tuple(igp_uc.T), values)
 
         elif method == 'get_sites_in_sphere':
             nnx, nny, nnz = small_dist_mesh
@@ -12,6 +12,19 @@ __all__ = [
 ]
 
 
+# Parity of the reduced components of 2k for each value of istwfk (see abinit variable).
+_ISTWFK_2K_PARITY = {
+    2: (0, 0, 0),
+    3: (1, 0, 0),
+    4: (0, 0, 1),
+    5: (1, 0, 1),
+    6: (0, 1, 0),
+    7: (1, 1, 0),
+    8: (0, 1, 1),
+    9: (1, 1, 1),
+}
+
+
 class GSphere(collections.abc.Sequence):
     """Descriptor-class for the G-sphere."""
 
@@ -31,9 +44,9 @@ class GSphere(collections.abc.Sequence):
         self._gvecs = np.reshape(np.array(gvecs), (-1, 3))
         self.npw = self.gvecs.shape[0]
 
-        self.istwfk = istwfk
-        if istwfk != 1:
-            raise NotImplementedError("istwfk %d is not implemented" % self.istwfk)
+        self.istwfk = int(istwfk)
+        if self.istwfk not in range(1, 10):
+            raise ValueError("Invalid value for istwfk: %s" % istwfk)
 
     @property
     def gvecs(self):
@@ -144,77 +157,110 @@ class GSphere(collections.abc.Sequence):
     #  """Returns the number of divisions of the FFT box enclosing the sphere."""
     #  #return ndivs
 
+    @property
+    def g0(self):
+        """
+        Reciprocal lattice vector G0 = 2k (reduced coordinates) entering the time-reversal relation
+        :math:`u(G) = u^*(-G - G0)` used by Abinit to store half of the coefficients when istwfk > 1.
+        """
+        try:
+            return self._g0
+        except AttributeError:
+            twok = 2 * self.kpoint.frac_coords
+            g0 = np.rint(twok).astype(np.int)
+            if self.istwfk != 1:
+                parity = np.array(_ISTWFK_2K_PARITY[self.istwfk])
+                if not np.allclose(twok, g0) or np.any(g0 % 2 != parity):
+                    raise ValueError("kpoint %s is not compatible with istwfk %d" % (self.kpoint, self.istwfk))
+            self._g0 = g0
+            return self._g0
+
+    def get_fft_indices(self, mesh):
+        """
+        Return the indices used to scatter/gather arrays between the sphere and the FFT ``mesh``.
+        The tables are computed once and cached for each mesh shape.
+
+        Return: (ifft, isph_conj, ifft_conj)
+            ifft: Flat index in the FFT box of each G-vector of the sphere.
+            isph_conj: Index in the sphere of the G-vectors whose partner -G-G0 is not stored (istwfk > 1).
+            ifft_conj: Flat index in the FFT box of the partners -G-G0 of the G-vectors in isph_conj.
+                isph_conj and ifft_conj are empty if istwfk == 1.
+        """
+        shape = tuple(mesh.shape)
+        try:
+            return self._fft_indices[shape]
+        except AttributeError:
+            self._fft_indices = {}
+        except KeyError:
+            pass
+
+        def flat_index(gvecs):
+            # Negative G-vectors are stored at the end of the box (Fortran convention).
+            gvecs = np.where(gvecs < 0, gvecs + shape, gvecs)
+            try:
+                return np.ravel_multi_index(gvecs.T, shape)
+            except ValueError:
+                raise ValueError("G-sphere does not fit in FFT mesh with shape %s" % str(shape))
+
+        gvecs = np.asarray(self.gvecs, dtype=np.int)
+        ifft = flat_index(gvecs)
+
+        if self.istwfk == 1:
+            isph_conj = np.empty(0, dtype=np.int)
+            ifft_conj = np.empty(0, dtype=np.int)
+        else:
+            partners = -gvecs - self.g0
+            # Exclude the G-vector that is its own partner (G = 0 at Gamma).
+            isph_conj = np.nonzero(np.any(partners != gvecs, axis=1))[0]
+            ifft_conj = flat_index(partners[isph_conj])
+
+        self._fft_indices[shape] = (ifft, isph_conj, ifft_conj)
+        return self._fft_indices[shape]
+
     def tofftmesh(self, mesh, arr_on_sphere):
         """
         Insert the array ``arr_on_sphere`` given on the sphere inside the FFT mesh.
+        If istwfk > 1, the coefficients of the G-vectors that are not stored are
+        reconstructed from :math:`u(-G-G0) = u^*(G)`.
 
         Args:
-            mesh:
-            arr_on_sphere:
+            mesh: |Mesh3D| object.
+            arr_on_sphere: Array of shape (..., npw). Leading dimensions (e.g. bands, spinors) are
+                treated as a batch.
+
+        Return: Array of shape (..., nx, ny, nz). If ``arr_on_sphere`` is 1D or has a single
+            leading entry, the array has shape (nx, ny, nz).
         """
         arr_on_sphere = np.atleast_2d(arr_on_sphere)
         ishape = arr_on_sphere.shape
-        s0 = ishape[0]
         assert self.npw == ishape[-1]
+        arr_on_sphere = np.reshape(arr_on_sphere, (-1, self.npw))
+        s0 = arr_on_sphere.shape[0]
 
-        arr_on_mesh = np.zeros((s0,) + mesh.shape, dtype=arr_on_sphere.dtype)
-
-        if self.istwfk == 1:
-            #do ipw=1,npw
-            #  i1=kg_k(1,ipw); if(i1<0)i1=i1+n1; i1=i1+1
-            #  i2=kg_k(2,ipw); if(i2<0)i2=i2+n2; i2=i2+1
-            #  i3=kg_k(3,ipw); if(i3<0)i3=i3+n3; i3=i3+1
-            #end do
-
-            n1, n2, n3 = mesh.shape
-            for sph_idx, gvec in enumerate(self.gvecs):
-                i1 = gvec[0]
-                if i1 < 0: i1 = i1 + n1
-                i2 = gvec[1]
-                if i2 < 0: i2 = i2 + n2
-                i3 = gvec[2]
-                if i3 < 0: i3 = i3 + n3
-                arr_on_mesh[..., i1, i2, i3] = arr_on_sphere[..., sph_idx]
-
-        else:
-            raise NotImplementedError("istwfk = %s not implemented" % self.istwfk)
+        ifft, isph_conj, ifft_conj = self.get_fft_indices(mesh)
+        arr_on_mesh = np.zeros((s0, mesh.size), dtype=arr_on_sphere.dtype)
+        arr_on_mesh[:, ifft] = arr_on_sphere
+        if len(isph_conj):
+            arr_on_mesh[:, ifft_conj] = arr_on_sphere[:, isph_conj].conj()
 
         if s0 == 1:
             # Reinstate input shape
-            arr_on_mesh.shape = mesh.shape
+            return np.reshape(arr_on_mesh, mesh.shape)
 
-        return arr_on_mesh
+        return np.reshape(arr_on_mesh, ishape[:-1] + tuple(mesh.shape))
 
     def fromfftmesh(self, mesh, arr_on_mesh):
         """
         Transfer ``arr_on_mesh`` given on the FFT mesh to the G-sphere.
+        Leading dimensions of ``arr_on_mesh`` are treated as a batch.
+        If istwfk > 1, only the coefficients of the G-vectors stored in the sphere are extracted.
         """
         indim = arr_on_mesh.ndim
         arr_on_mesh = mesh.reshape(arr_on_mesh)
-        ishape = arr_on_mesh.shape
-        s0 = ishape[0]
-
-        arr_on_sphere = np.empty((s0,) + (self.npw,), dtype=arr_on_mesh.dtype)
+        s0 = arr_on_mesh.shape[0]
 
-        if self.istwfk == 1:
-            #do ig=1,npwout
-            #  i1=kg_kout(1,ig); if (i1<0) i1=i1+n1; i1=i1+1
-            #  i2=kg_kout(2,ig); if (i2<0) i2=i2+n2; i2=i2+1
-            #  i3=kg_kout(3,ig); if (i3<0) i3=i3+n3; i3=i3+1
-            #end do
-            n1, n2, n3 = mesh.shape
-
-            for sph_idx, gvec in enumerate(self.gvecs):
-                i1 = gvec[0]
-                if i1 < 0: i1 = i1 + n1
-                i2 = gvec[1]
-                if i2 < 0: i2 = i2 + n2
-                i3 = gvec[2]
-                if i3 < 0: i3 = i3 + n3
-                arr_on_sphere[..., sph_idx] = arr_on_mesh[..., i1, i2, i3]
-
-        else:
-            raise NotImplementedError("istwfk %s is not implemented" % self.istwfk)
+        ifft, _, _ = self.get_fft_indices(mesh)
+        arr_on_sphere = np.reshape(arr_on_mesh, (s0, mesh.size))[:, ifft]
 
         if s0 == 1 and indim == 1:
             # Reinstate input shape
@@ -16,6 +16,7 @@ from pymatgen.core.lattice import Lattice
 from pymatgen.util.serialization import pmg_serialize
 from pymatgen.util.serialization import SlotPickleMixin
 from abipy.iotools import ETSF_Reader
+from abipy.tools import duck
 from abipy.tools.derivatives import finite_diff
 from abipy.tools.numtools import add_periodic_replicas, is_diagonal
 
@@ -28,6 +29,7 @@ __all__ = [
     "wrap_to_bz",
     "as_kpoints",
     "Kpoint",
+    "KpointHashTable",
     "KpointList",
     "KpointStar",
     "Kpath",
@@ -196,25 +198,32 @@ def kmesh_from_mpdivs(mpdivs, shifts, pbc=False, order="bz"):
     return np.array(kbz)
 
 
-def map_grid2ibz(structure, ibz, ngkpt, has_timrev, pbc=False):
+def get_grid2ibz_map(structure, ibz, ngkpt, has_timrev):
     """
-    Compute the correspondence between a *grid* of k-points in the *unit cell*
-    associated to the ``ngkpt`` mesh and the corresponding points in the IBZ.
+    Compute the correspondence between the points of the ``ngkpt`` grid in the *unit cell* (C-order)
+    and the points in the IBZ. All the (FM) symmetry operations are applied to all the IBZ points
+    at once and the grid indices are obtained with integer arithmetic.
     Requires structure with Abinit symmetries.
-    This routine is mainly used to symmetrize eigenvalues in the unit cell
-    e.g. to write BXSF files for electronic isosurfaces.
 
     Args:
         structure: Structure with (Abinit) symmetry operations.
         ibz: [*, 3] array with reduced coordinates in the in the IBZ.
         ngkpt: Mesh divisions.
         has_timrev: True if time-reversal can be used.
-        pbc: True if the mesh should contain the periodic images (closed mesh).
 
     Returns:
-        bz2ibz: 1d array with BZ --> IBZ mapping
+        named tuple with the following attributes:
+
+            bz2ibz: [nkbz] array with the index of the IBZ point (-1 if the grid point is not found).
+            bz2isym: [nkbz] array with the index of the symmetry in ``structure.abi_spacegroup.fm_symmops``.
+            bz2tsign: [nkbz] array with the time-reversal sign (+1 or -1).
+            ibz2bz: [nkibz] array with the index of the IBZ point in the grid.
+            symrec: [nsym, 3, 3] array with the rotations in reciprocal space.
+
+        so that ``k_bz = tsign * symrec[isym] k_ibz + G``
     """
     ngkpt = np.asarray(ngkpt, dtype=np.int)
+    ibz = np.reshape(ibz, (-1, 3))
 
     # Extract (FM) symmetry operations in reciprocal space.
     abispg = structure.abi_spacegroup
@@ -222,47 +231,66 @@ def map_grid2ibz(structure, ibz, ngkpt, has_timrev, pbc=False):
         raise ValueError("Structure does not contain Abinit spacegroup info!")
 
     # Extract rotations in reciprocal space (FM part).
-    symrec_fm = [o.rot_g for o in abispg.fm_symmops]
+    symrec = np.array([o.rot_g for o in abispg.fm_symmops], dtype=np.int)
+    tsigns = np.array([1, -1] if has_timrev else [1], dtype=np.int)
+
+    gp_ibz = np.rint(ibz * ngkpt).astype(np.int)
+    if not np.allclose(gp_ibz / ngkpt, ibz, atol=_ATOL_KDIFF):
+        raise ValueError("IBZ points do not belong to the grid with ngkpt: %s" % str(ngkpt))
+
+    # Compute TS k_ibz for all (tsign, isym, ik_ibz) with shape [ntsign, nsym, nkibz, 3].
+    rot_gp = tsigns[:, None, None, None] * np.einsum("sij,kj->ski", symrec, gp_ibz)[None]
+    inds = np.ravel_multi_index(np.moveaxis(rot_gp % ngkpt, -1, 0), ngkpt).ravel()
 
-    # Compute TS k_ibz.
-    bzgrid2ibz = -np.ones(ngkpt, dtype=np.int)
+    # Keep the first image found for each grid point.
+    nkbz = np.prod(ngkpt)
+    uinds, first = np.unique(inds, return_index=True)
+    bz2img = -np.ones(nkbz, dtype=np.int)
+    bz2img[uinds] = first
 
-    for ik_ibz, kibz in enumerate(ibz):
-        gp_ibz = np.array(np.rint(kibz * ngkpt), dtype=np.int)
-        for rot in symrec_fm:
-            rot_gp = np.matmul(rot, gp_ibz)
-            gp_bz = rot_gp % ngkpt
-            bzgrid2ibz[gp_bz[0], gp_bz[1], gp_bz[2]] = ik_ibz
-            if has_timrev:
-                gp_bz = (-rot_gp) % ngkpt
-                bzgrid2ibz[gp_bz[0], gp_bz[1], gp_bz[2]] = ik_ibz
+    itsign, isym, ik_ibz = np.unravel_index(np.maximum(bz2img, 0), rot_gp.shape[:3])
+    notfound = bz2img == -1
+
+    return dict2namedtuple(bz2ibz=np.where(notfound, -1, ik_ibz),
+                           bz2isym=np.where(notfound, -1, isym),
+                           bz2tsign=np.where(notfound, 0, tsigns[itsign]),
+                           ibz2bz=np.ravel_multi_index((gp_ibz % ngkpt).T, ngkpt),
+                           symrec=symrec)
+
+
+def map_grid2ibz(structure, ibz, ngkpt, has_timrev, pbc=False):
+    """
+    Compute the correspondence between a *grid* of k-points in the *unit cell*
+    associated to the ``ngkpt`` mesh and the corresponding points in the IBZ.
+    Requires structure with Abinit symmetries.
+    This routine is mainly used to symmetrize eigenvalues in the unit cell
+    e.g. to write BXSF files for electronic isosurfaces.
+    See also :func:`get_grid2ibz_map`.
+
+    Args:
+        structure: Structure with (Abinit) symmetry operations.
+        ibz: [*, 3] array with reduced coordinates in the in the IBZ.
+        ngkpt: Mesh divisions.
+        has_timrev: True if time-reversal can be used.
+        pbc: True if the mesh should contain the periodic images (closed mesh).
+
+    Returns:
+        bz2ibz: 1d array with BZ --> IBZ mapping
+    """
+    ngkpt = np.asarray(ngkpt, dtype=np.int)
+    bzgrid2ibz = get_grid2ibz_map(structure, ibz, ngkpt, has_timrev).bz2ibz.reshape(ngkpt)
 
     if pbc:
         # Add periodic replicas.
         bzgrid2ibz = add_periodic_replicas(bzgrid2ibz)
 
     if np.any(bzgrid2ibz == -1):
-        #for ik_bz, ik_ibz in enumerate(self.bzgrid2ibz): print(ik_bz, ">>>", ik_ibz)
         msg = "Found %s/%s invalid entries in bzgrid2ibz array" % ((bzgrid2ibz == -1).sum(), bzgrid2ibz.size)
         msg += "This can happen if there an inconsistency between the input IBZ and ngkpt"
         msg += "ngkpt: %s, has_timrev: %s" % (str(ngkpt), has_timrev)
         raise ValueError(msg)
 
-    bz2ibz = bzgrid2ibz.flatten()
-    return bz2ibz
-
-    """
-    for ik_bz, kbz in enumerate(bz):
-        found = False
-        for ik_ibz, kibz in enumerate(ibz):
-            if found: break
-            for symmop in structure.spacegroup:
-                krot = symmop.rotate_k(kibz)
-                if issamek(krot, kbz):
-                    bz2ibz[ik_bz] = ik_ibz
-                    found = True
-                    break
-    """
+    return bzgrid2ibz.flatten()
 
 
 def has_timrev_from_kptopt(kptopt):
@@ -330,33 +358,31 @@ def map_kpoints(other_kpoints, other_lattice, ref_lattice, ref_kpoints, ref_symr
 
             kpt_other = TS kpt_ref + G0
     """
-    ref_gprimd_inv = np.inv(np.asarray(ref_lattice).T)
+    ref_gprimd_inv = np.linalg.inv(np.asarray(ref_lattice).T)
     other_gprimd = np.asarray(other_lattice).T
     other_kpoints = np.asarray(other_kpoints).reshape((-1, 3))
     ref_kpoints = np.asarray(ref_kpoints).reshape((-1, 3))
+    ref_symrecs = np.reshape(ref_symrecs, (-1, 3, 3))
     o2r_map = len(other_kpoints) * [None]
 
-    tsigns = (1, -1) if has_timrev else (1,)
+    tsigns = np.array((1, -1) if has_timrev else (1,))
     kmap = collections.namedtuple("kmap", "ik_ref, tsign, isym, g0")
 
-    for ik_oth, okpt in enumerate(other_kpoints):
-        # Get other k-point in reduced coordinates in the referece lattice.
-        okpt_red = np.matmul(ref_gprimd_inv, np.matmul(other_gprimd, okpt))
-
-        # k_other = TS k_ref + G0
-        found = False
-        for ik_ref, kref in enumerate(ref_kpoints):
-            if found: break
-            for tsign in tsigns:
-                for isym, symrec in enumerate(ref_symrecs):
-                    krot = tsign * np.matmul(symrec, kref)
-                    if issamek(okpt_red, krot):
-                        g0 = np.rint(okpt_red - krot)
-                        o2r_map[ik_oth] = kmap(ik_ref, tsign, isym, g0)
-                        found = True
-                        break
+    # Get other k-points in reduced coordinates in the referece lattice.
+    okpts_red = np.matmul(other_kpoints, np.matmul(ref_gprimd_inv, other_gprimd).T)
+
+    # All the images TS k_ref with shape [nref, ntsign, nsym, 3].
+    # The order of the axes gives the priority when multiple images are found.
+    krots = tsigns[None, :, None, None] * np.einsum("sij,kj->ksi", ref_symrecs, ref_kpoints)[:, None]
+    iimg = KpointHashTable(krots.reshape(-1, 3)).find(okpts_red)
 
-        return o2r_map, o2r_map.count(None)
+    # k_other = TS k_ref + G0
+    for ik_oth in np.nonzero(iimg != -1)[0]:
+        ik_ref, itsign, isym = np.unravel_index(iimg[ik_oth], krots.shape[:3])
+        g0 = np.rint(okpts_red[ik_oth] - krots[ik_ref, itsign, isym])
+        o2r_map[ik_oth] = kmap(int(ik_ref), int(tsigns[itsign]), int(isym), g0)
+
+    return o2r_map, o2r_map.count(None)
 
 
 #def find_irred_kpoints_kmesh(structure, kfrac_coords):
@@ -420,41 +446,28 @@ def find_irred_kpoints_generic(structure, kfrac_coords, verbose=1):
     Return:
         irred_map: Index of the i-th irreducible k-point in the input kfrac_coords array.
 
-    .. warning::
-
-        In the worst case, the algorithm scales as nkpt ** 2 * nsym.
-        hence this routine should be used only if ``kfrac_coords`` represents
-        e.g. a path in the Brillouin zone or an arbitrary set of points.
+    A point is irreducible if none of its symmetrical images is equal to a point with smaller index.
+    The images of all the points are searched at once with a |KpointHashTable|.
     """
     start = time.time()
-    print("Removing redundant k-points. This is gonna take a while... ")
-
-    # Wrap points in [0,1[ interval.
-    uc_kcoords = np.reshape(kfrac_coords, (-1, 3)) % 1
-
-    irred_map = collections.deque()
-    irred_map.append(0)
-    kpts2irred = collections.deque()
-    kpts2irred.append((0, 0, +1))
-
-    for ik, kk in enumerate(uc_kcoords[1:]):
-        ik += 1
-        found = False
-        for ik_irr in irred_map:
-            kirr = kfrac_coords[ik_irr]
-            for isym, symmop in enumerate(structure.abi_spacegroup):
-                krot = symmop.rotate_k(kirr)
-                if issamek(krot, kk):
-                    found = True
-                    #kpts2irred[ik] = (ik_irr, isym, symmops.time_sign)
-                    break
-
-        if not found:
-            irred_map.append(ik)
+    print("Removing redundant k-points...")
+
+    kfrac_coords = np.reshape(kfrac_coords, (-1, 3))
+    nkpt = len(kfrac_coords)
+    table = KpointHashTable(kfrac_coords)
+
+    # Index of the first point equal to one of the images of the k-point.
+    first = np.arange(nkpt)
+    for symmop in structure.abi_spacegroup:
+        krots = symmop.time_sign * np.matmul(kfrac_coords, symmop.rot_g.T)
+        iimg = table.find(krots)
+        first = np.where(iimg != -1, np.minimum(first, iimg), first)
+
+    irred_map = np.nonzero(first == np.arange(nkpt))[0]
 
     print("Completed in", time.time() - start, "[s]")
     if verbose:
-        print("Entered with ", len(uc_kcoords), "k-points")
+        print("Entered with ", nkpt, "k-points")
         print("Found ", len(irred_map), "irred k-points")
 
     return dict2namedtuple(irred_map=np.array(irred_map, dtype=np.int))
@@ -763,21 +776,133 @@ class Kpoint(SlotPickleMixin):
 
     def compute_star(self, symmops, wrap_tows=True):
         """Return the star of the kpoint (tuple of |Kpoint| objects)."""
-        frac_coords = [self.frac_coords]
-
-        # TODO: This part becomes a bottleneck for large nk!
-        for sym in symmops:
-            sk_coords = sym.rotate_k(self.frac_coords, wrap_tows=wrap_tows)
+        frac_coords = [self.frac_coords] + [sym.rotate_k(self.frac_coords, wrap_tows=wrap_tows) for sym in symmops]
 
-            # Add it only if it's not already in the list.
-            for prev_coords in frac_coords:
-                if issamek(sk_coords, prev_coords): break
-            else:
-                frac_coords.append(sk_coords)
+        # Add the image only if it's not already in the list.
+        first = KpointHashTable(frac_coords).find(frac_coords)
+        frac_coords = [frac_coords[i] for i in np.nonzero(first == np.arange(len(frac_coords)))[0]]
 
         return KpointStar(self.lattice, frac_coords, weights=None, names=len(frac_coords) * [self.name])
 
 
+class KpointHashTable(object):
+    """
+    Hash table for the fast lookup of k-points (lattice translations are taken into account).
+
+    The reduced coordinates are wrapped to [0, 1) and quantized on a uniform grid of cells whose size
+    is at least twice the tolerance so that a point can only be equal to the points stored in the 2**3 cells
+    closest to it. If the points belong to a Monkhorst-Pack mesh, the rank of the point in the mesh
+    is used as hash. Lookups are vectorized: the keys are sorted once and searched with numpy.
+    """
+
+    def __init__(self, frac_coords, atol=None, mpdivs=None, shift=None):
+        """
+        Args:
+            frac_coords: [nkpt, 3] array with the reduced coordinates of the k-points.
+            atol: Tolerance used to compare k-points. Use _ATOL_KDIFF if atol is None.
+            mpdivs: Divisions of the Monkhorst-Pack mesh (optional). The mesh-rank hash is used
+                only if all the points belong to the mesh.
+            shift: Shift of the Monkhorst-Pack mesh in units of the mesh spacing.
+        """
+        self.frac_coords = np.reshape(frac_coords, (-1, 3))
+        self.nkpt = len(self.frac_coords)
+        self.atol = _ATOL_KDIFF if atol is None else float(atol)
+
+        self.mpdivs, self.shift = None, None
+        if mpdivs is not None:
+            mpdivs = np.asarray(mpdivs, dtype=np.int)
+            shift = np.zeros(3) if shift is None else np.reshape(shift, (3,))
+            ranks = self._get_mesh_ranks(self.frac_coords, mpdivs, shift)
+            if np.all(ranks != -1):
+                self.mpdivs, self.shift = mpdivs, shift
+                keys = ranks
+
+        if self.mpdivs is None:
+            # Cells must divide [0, 1) evenly else points across the wrap boundary are not in adjacent cells.
+            self._ncells = max(1, int(np.floor(0.5 / self.atol)))
+            keys = self._as_keys(self._get_cells(self.frac_coords, 0.0))
+
+        # Points with the same key are ordered by index.
+        self._order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[self._order]
+
+    def __len__(self):
+        return self.nkpt
+
+    def _get_mesh_ranks(self, frac_coords, mpdivs, shift):
+        """Rank of the points in the mesh in C-order. -1 if the point does not belong to the mesh."""
+        x = frac_coords * mpdivs - shift
+        ix = np.rint(x)
+        onmesh = np.all(np.abs(x - ix) <= self.atol * mpdivs, axis=1)
+        ranks = np.ravel_multi_index((ix.astype(np.int) % mpdivs).T, mpdivs)
+        return np.where(onmesh, ranks, -1)
+
+    def _get_cells(self, frac_coords, delta):
+        """Integer coordinates of the cells containing frac_coords + delta (wrapped to [0, 1))."""
+        cells = np.floor(((frac_coords + delta) % 1) * self._ncells).astype(np.int64)
+        # x % 1 may be rounded to 1.0 for tiny negative x.
+        return cells % self._ncells
+
+    @staticmethod
+    def _as_keys(cells):
+        """Convert the [n, 3] array with the cells to 1d array of keys that can be sorted."""
+        cells = np.ascontiguousarray(cells, dtype=np.int64)
+        return cells.view(np.dtype((np.void, cells.dtype.itemsize * 3))).ravel()
+
+    def _iter_query_keys(self, frac_coords):
+        """Yield the keys that should be searched to find frac_coords."""
+        if self.mpdivs is not None:
+            yield self._get_mesh_ranks(frac_coords, self.mpdivs, self.shift)
+        else:
+            lo, hi = self._get_cells(frac_coords, -self.atol), self._get_cells(frac_coords, +self.atol)
+            for cx, cy, cz in product((lo, hi), repeat=3):
+                yield self._as_keys(np.stack([cx[:, 0], cy[:, 1], cz[:, 2]], axis=1))
+
+    def _issame(self, ik, frac_coords):
+        """Vectorized version of issamek for self.frac_coords[ik] and frac_coords."""
+        diff = self.frac_coords[ik] - frac_coords
+        return np.all(np.abs(diff - np.rint(diff)) <= self.atol, axis=1)
+
+    def find(self, frac_coords):
+        """
+        Return |numpy-array| with the index of the first point in the table that is equal to
+        frac_coords (modulo a lattice vector). -1 if the point is not found.
+        """
+        frac_coords = np.reshape(frac_coords, (-1, 3))
+        first = np.full(len(frac_coords), self.nkpt)
+
+        for keys in self._iter_query_keys(frac_coords):
+            # Loop over the points with the same key (in general one).
+            pos = np.searchsorted(self._sorted_keys, keys)
+            todo = np.arange(len(frac_coords))
+            while len(todo):
+                ok = pos < self.nkpt
+                ok[ok] = self._sorted_keys[pos[ok]] == keys[todo[ok]]
+                todo, pos = todo[ok], pos[ok]
+                ik = self._order[pos]
+                same = self._issame(ik, frac_coords[todo])
+                first[todo[same]] = np.minimum(first[todo[same]], ik[same])
+                # The first match with this key has the smallest index.
+                todo, pos = todo[~same], pos[~same] + 1
+
+        return np.where(first == self.nkpt, -1, first)
+
+    def find_all(self, frac_coords):
+        """
+        Return |numpy-array| with the indices of all the points in the table that are equal to
+        the k-point frac_coords (modulo a lattice vector).
+        """
+        frac_coords = np.reshape(frac_coords, (1, 3))
+        found = []
+        for keys in self._iter_query_keys(frac_coords):
+            start, stop = np.searchsorted(self._sorted_keys, keys[0], side="left"), \
+                          np.searchsorted(self._sorted_keys, keys[0], side="right")
+            ik = self._order[start:stop]
+            found.append(ik[self._issame(ik, frac_coords)])
+
+        return np.unique(np.concatenate(found)).astype(np.int)
+
+
 class KpointList(collections.abc.Sequence):
     """
     Base class defining a sequence of |Kpoint| objects. Essentially consists
@@ -894,7 +1019,7 @@ class KpointList(collections.abc.Sequence):
         return self._points[slice]
 
     def __contains__(self, kpoint):
-        return kpoint in self._points
+        return self.find(kpoint) != -1
 
     def __reversed__(self):
         return self._points.__reversed__()
@@ -918,41 +1043,73 @@ class KpointList(collections.abc.Sequence):
     def __ne__(self, other):
         return not (self == other)
 
+    def get_hash_table(self, atol=None):
+        """
+        Return |KpointHashTable| used to find the k-points in self.
+        The table is built once for each value of the tolerance.
+
+        Args:
+            atol: Tolerance used to compare k-points. Use _ATOL_KDIFF if atol is None.
+        """
+        if atol is None: atol = _ATOL_KDIFF
+        if not hasattr(self, "_hash_tables"): self._hash_tables = {}
+        if atol not in self._hash_tables:
+            mpdivs, shift = None, None
+            if self.is_ibz and self.ksampling is not None and self.is_mpmesh:
+                mpdivs, shifts = self.mpdivs_shifts
+                shifts = np.reshape(shifts, (-1, 3))
+                if len(shifts) == 1: shift = shifts[0]
+                else: mpdivs = None
+            self._hash_tables[atol] = KpointHashTable(self.frac_coords, atol=atol, mpdivs=mpdivs, shift=shift)
+
+        return self._hash_tables[atol]
+
+    def find_indices(self, frac_coords, atol=None):
+        """
+        Vectorized version of `find`.
+
+        Args:
+            frac_coords: [n, 3] array with reduced coordinates.
+            atol: Tolerance used to compare k-points. Use _ATOL_KDIFF if atol is None.
+
+        Returns: |numpy-array| with the first index of each point in self. -1 if not found.
+        """
+        return self.get_hash_table(atol=atol).find(frac_coords)
+
+    @staticmethod
+    def _as_frac_coords(kpoint):
+        """Reduced coordinates from |Kpoint| or array-like object."""
+        return np.reshape(kpoint.frac_coords if hasattr(kpoint, "frac_coords") else kpoint, (3,))
+
     def index(self, kpoint):
         """
         Returns: the first index of kpoint in self.
 
         Raises: `ValueError` if not found.
         """
-        try:
-            return self._points.index(kpoint)
-        except ValueError:
+        ik = self.find(kpoint)
+        if ik == -1:
             raise ValueError("Cannot find point: %s in KpointList:\n%s" % (repr(kpoint), repr(self)))
+        return ik
 
     def get_all_kindices(self, kpoint):
         """
         Return numpy array with indexes of all the k-point
         Accepts: |Kpoint| instance or integer.
         """
-        start = self.index(kpoint)
-        k0 = self[start]
-        kinds = []
-        for ik, k in enumerate(self):
-            if k == k0: kinds.append(ik)
-        return np.array(kinds)
+        if duck.is_intlike(kpoint): kpoint = self[kpoint]
+        self.index(kpoint)
+        return self.get_hash_table().find_all(self._as_frac_coords(kpoint))
 
     def find(self, kpoint):
         """
         Returns: first index of kpoint. -1 if not found
         """
-        try:
-            return self.index(kpoint)
-        except ValueError:
-            return -1
+        return int(self.find_indices(self._as_frac_coords(kpoint))[0])
 
     def count(self, kpoint):
         """Return number of occurrences of kpoint"""
-        return self._points.count(kpoint)
+        return len(self.get_hash_table().find_all(self._as_frac_coords(kpoint)))
 
     def find_closest(self, obj):
         """
@@ -975,9 +1132,8 @@ class KpointList(collections.abc.Sequence):
         else:
             frac_coords = np.asarray(obj)
 
-        dist = np.empty(len(self))
-        for i, kpt in enumerate(self):
-            dist[i] = kpt.lattice.norm(kpt.frac_coords - frac_coords)
+        cart_diffs = np.matmul(self.frac_coords - frac_coords, self.reciprocal_lattice.matrix)
+        dist = np.sqrt(np.sum(cart_diffs ** 2, axis=1))
 
         ind = dist.argmin()
         return ind, self[ind], np.copy(dist[ind])
@@ -1053,16 +1209,8 @@ class KpointList(collections.abc.Sequence):
         """
         Remove duplicated k-points from self. Returns new :class:`KpointList` instance.
         """
-        frac_coords, good_indices = [self[0].frac_coords], [0]
-
-        for i, kpoint in enumerate(self[1:]):
-            i += 1
-            # Add it only if it's not already in the list.
-            for prev_coords in frac_coords:
-                if issamek(kpoint.frac_coords, prev_coords): break
-            else:
-                frac_coords.append(kpoint.frac_coords)
-                good_indices.append(i)
+        # Keep the first occurrence of each k-point.
+        good_indices = np.nonzero(self.find_indices(self.frac_coords) == np.arange(len(self)))[0]
 
         good_kpoints = [self[i] for i in good_indices]
 
@@ -1121,16 +1269,14 @@ class KpointList(collections.abc.Sequence):
             for ik, _ in enumerate(self):
                 k2kqg[ik] = (ik, g0)
         else:
-            # N**2 scaling but this algorithm can handle k-paths
+            # This algorithm can handle k-paths.
             # Note that in principle one could have multiple k+q in k-points
             # but only the first match is considered.
-            for ik, kpoint in enumerate(self):
-                kpq = kpoint.frac_coords + qfrac_coords
-                for ikq, ksearch in enumerate(self):
-                    if issamek(kpq, ksearch.frac_coords, atol=atol_kdiff):
-                        g0 = np.rint(kpq - ksearch.frac_coords)
-                        k2kqg[ik] = (ikq, g0)
-                        break
+            kpq = self.frac_coords + qfrac_coords
+            ikq_list = self.find_indices(kpq, atol=atol_kdiff)
+            for ik in np.nonzero(ikq_list != -1)[0]:
+                ikq = int(ikq_list[ik])
+                k2kqg[int(ik)] = (ikq, np.rint(kpq[ik] - self.frac_coords[ikq]))
 
         return k2kqg
 
@@ -1788,12 +1934,7 @@ class Ktables(object):
         self.nbz = len(self.bz)
 
         # All k-points and mapping to ir-grid points.
-        # FIXME This is slow.
-        self.bz2ibz = np.empty(len(self.bz), dtype=np.int)
-        for ik_bz, ir_gp_id in enumerate(mapping):
-            inds = np.where(uniq == ir_gp_id)
-            assert len(inds) == 1
-            self.bz2ibz[ik_bz] = inds[0]
+        self.bz2ibz = np.searchsorted(uniq, mapping)
 
     def __str__(self):
         return self.to_string()
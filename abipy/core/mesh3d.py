@@ -1,9 +1,9 @@
 # coding: utf-8
 """This module contains the class defining Uniform 3D meshes."""
 
+import itertools
 import numpy as np
 
-#from itertools import product as iproduct
 from monty.functools import lazy_property
 #from numpy.random import random
 from numpy.fft import fftn, ifftn, fftshift, ifftshift, fftfreq
@@ -297,32 +297,47 @@ class Mesh3D(object):
         gx_list = np.rint(fftfreq(self.nx) * self.nx)
         gy_list = np.rint(fftfreq(self.ny) * self.ny)
         gz_list = np.rint(fftfreq(self.nz) * self.nz)
-        #print(gz_list, gy_list, gx_list)
 
-        gvecs = np.empty((self.size, 3), dtype=np.int)
-
-        idx = -1
-        for gx in gx_list:
-            for gy in gy_list:
-                for gz in gz_list:
-                    idx += 1
-                    gvecs[idx, :] = gx, gy, gz
+        # C-order: z is the fastest index.
+        gvecs = np.array(np.meshgrid(gx_list, gy_list, gz_list, indexing="ij"), dtype=np.int)
+        gvecs = np.reshape(gvecs, (3, -1)).T.copy()
 
         return gvecs
 
     @lazy_property
     def gmods(self):
         """[ng] |numpy-array| with :math:`|G|`"""
+        return self._get_gmods(self.gvecs)
+
+    @lazy_property
+    def gmax(self):
+        """Max :math:`|G|` in the FFT box."""
+        # |G|^2 is a convex function of the reduced coordinates hence the max is on one of the corners of the box.
+        glims = [(-(n // 2), (n - 1) // 2) for n in self.shape]
+        return self._get_gmods(np.array(list(itertools.product(*glims)))).max()
+
+    def _get_gmods(self, gvecs):
+        """Compute :math:`|G|` for the reduced G-vectors ``gvecs``."""
         gmet = np.dot(self.inv_vectors.T, self.inv_vectors)
-        gmods = np.empty(self.size)
-        for i, g in enumerate(self.gvecs):
-            gmods[i] = np.dot(g, np.dot(gmet, g))
+        return 2 * np.pi * np.sqrt(np.einsum("gi,ij,gj->g", gvecs, gmet, gvecs))
 
-        return 2 * np.pi * np.sqrt(gmods)
+    def iter_gvecs(self, chunksize=None):
+        """
+        Iterate over the G-vectors of the FFT box in chunks of ``chunksize`` vectors.
+        Yield (start, stop, gvecs, gmods) where gvecs are the reduced coordinates of the G-vectors
+        in the range [start, stop) of :attr:`gvecs` and gmods their lengths.
+        The arrays are computed on the fly so that the memory is bounded by chunksize.
+        None to iterate over all the G-vectors in one step.
+        """
+        chunksize = self.size if chunksize is None else max(1, int(chunksize))
+        glists = [np.rint(fftfreq(n) * n).astype(np.int) for n in self.shape]
 
-    #@lazy_property
-    #def gmax(self)
-    #    return self.gmods.max()
+        for start in range(0, self.size, chunksize):
+            stop = min(start + chunksize, self.size)
+            # C-order: z is the fastest index.
+            ix, iy, iz = np.unravel_index(np.arange(start, stop), self.shape)
+            gvecs = np.stack((glists[0][ix], glists[1][iy], glists[2][iz]), axis=1)
+            yield start, stop, gvecs, self._get_gmods(gvecs)
 
     @lazy_property
     def rpoints(self):
@@ -435,10 +450,8 @@ class Mesh3D(object):
         Given a list of points, this function return a |numpy-array| with the indices of the closest gridpoint.
         """
         points = np.reshape(points, (-1, 3))
-        inv_vectors = self.inv_vectors
-        fcoords = [np.dot(point, inv_vectors) for point in points]
-        inds = [[np.mod(int(np.rint(pc[ii]*self.shape[ii])), self.nx) for ii in range(3)] for pc in fcoords]
-        return np.array(inds)
+        fcoords = np.dot(points, self.inv_vectors)
+        return np.mod(np.rint(fcoords * self.shape).astype(np.int), self.shape)
 
         # return [(int(np.rint(pc[ii]*self.nx)), int(np.rint(pc[0]*self.nx)),int(np.rint(pc[0]*self.nx))) for pc in coords]
         # ix = int(np.rint(coords[0]*self.nx))
@@ -446,14 +459,16 @@ class Mesh3D(object):
         # iz = int(np.rint(coords[2]*self.nz))
         # return (ix, iy, iz)
 
-    # @DW TODO Add test.
-    def dist_gridpoints_in_spheres(self, points, radius):
-        # c_ab = np.cross(self.vectors[0], self.vectors[1])
-        # c_bc = np.cross(self.vectors[1], self.vectors[2])
-        # c_ca = np.cross(self.vectors[2], self.vectors[0])
-        # h_ab = np.abs(np.dot(c_ab, self.vectors[2]) / np.linalg.norm(c_ab))
-        # h_bc = np.abs(np.dot(c_bc, self.vectors[0]) / np.linalg.norm(c_bc))
-        # h_ca = np.abs(np.dot(c_ca, self.vectors[1]) / np.linalg.norm(c_ca))
+    def get_gridpoints_in_spheres(self, points, radius):
+        """
+        Find the grid points (including their periodic images) inside the spheres
+        of given radius centered on ``points`` (cartesian coordinates).
+
+        Return:
+            List with one entry per point. Each entry is a tuple of arrays (igp_uc, dists, igp)
+            where igp is the [n, 3] array with the indices of the grid points in the sphere,
+            igp_uc are the indices folded into the unit cell and dists the distances from the center.
+        """
         maxdiag = max([np.linalg.norm(self.dvx+self.dvy+self.dvz),
                        np.linalg.norm(self.dvx+self.dvy-self.dvz),
                        np.linalg.norm(self.dvx-self.dvy+self.dvz),
@@ -467,32 +482,39 @@ class Mesh3D(object):
         a_factor = 1.01 * (radius+0.5*maxdiag) / h_bc
         b_factor = 1.01 * (radius+0.5*maxdiag) / h_ca
         c_factor = 1.01 * (radius+0.5*maxdiag) / h_ab
-        # print('HEIGHTS')
-        # print(h_ab, h_bc, h_ca)
-        # print(c_factor*h_ab, a_factor* h_bc, b_factor*h_ca)
         mins = np.array(np.floor([-a_factor, -b_factor, -c_factor]), dtype=int)
         maxes = np.array(np.ceil([a_factor, b_factor, c_factor]), dtype=int)
-        # print('AAAMINS AND MAXES', mins, maxes)
-        # maxes = np.ceil(nmax)
-        i_closest_gridpoint_points = self.i_closest_gridpoints(points=points)
-        dist_gridpoints_points = []
+
+        # Offsets of the grid points in the box enclosing the sphere (z is the fastest index).
+        offsets = np.meshgrid(*[np.arange(mins[i], maxes[i]) for i in range(3)], indexing="ij")
+        offsets = np.reshape(offsets, (3, -1)).T
+        dvs = np.array([self.dvx, self.dvy, self.dvz])
+
+        points = np.reshape(points, (-1, 3))
         r2 = radius**2
-        for ipoint, point_i_closest_gridpoint in enumerate(i_closest_gridpoint_points):
-            pp = points[ipoint]
-            dist_gridpoints = []
-            for ix in range(int(mins[0]), int(maxes[0])):
-                ipx = point_i_closest_gridpoint[0] + ix
-                for iy in range(int(mins[1]), int(maxes[1])):
-                    ipy = point_i_closest_gridpoint[1] + iy
-                    for iz in range(int(mins[2]), int(maxes[2])):
-                        ipz = point_i_closest_gridpoint[2] + iz
-                        gp = ipx*self.dvx + ipy * self.dvy + ipz * self.dvz
-                        dist2_gp_pp = np.dot(pp-gp, pp-gp)
-                        if dist2_gp_pp <= r2:
-                            dist_gridpoints.append(((np.mod(ipx, self.nx), np.mod(ipy, self.ny), np.mod(ipz, self.nz)),
-                                                    np.sqrt(dist2_gp_pp), (ipx, ipy, ipz)))
-            dist_gridpoints_points.append(dist_gridpoints)
-        return dist_gridpoints_points
+        results = []
+        for pp, i_closest in zip(points, self.i_closest_gridpoints(points=points)):
+            igp = i_closest + offsets
+            diff = pp - np.dot(igp, dvs)
+            dist2 = np.einsum("ij,ij->i", diff, diff)
+            mask = dist2 <= r2
+            igp = igp[mask]
+            results.append((np.mod(igp, self.shape), np.sqrt(dist2[mask]), igp))
+
+        return results
+
+    def dist_gridpoints_in_spheres(self, points, radius):
+        """
+        Find the grid points (including their periodic images) inside the spheres
+        of given radius centered on ``points`` (cartesian coordinates).
+
+        Return:
+            List with one entry per point. Each entry is a list of tuples (igp_uc, dist, igp)
+            with the indices of the grid point folded into the unit cell, the distance from the
+            center and the indices of the grid point. See also :meth:`get_gridpoints_in_spheres`
+        """
+        return [list(zip(map(tuple, igp_uc), dists, map(tuple, igp)))
+                for igp_uc, dists, igp in self.get_gridpoints_in_spheres(points, radius)]
 
     # def dist2_gridpoints_in_spheres(self, points, radius):
     #     # c_ab = np.cross(self.vectors[0], self.vectors[1])
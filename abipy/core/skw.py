@@ -13,8 +13,10 @@ import time
 from collections import deque, OrderedDict
 from monty.termcolor import cprint
 from monty.collections import dict2namedtuple
+from monty.functools import lazy_property
 from abipy.tools.plotting import add_fig_kwargs, get_ax_fig_plt
-from abipy.tools.numtools import gaussian, find_degs_sk
+from abipy.tools.numtools import find_degs_sk
+from abipy.tools.dos import gaussian_dos, tetra_dos
 from abipy.core.kpoints import Kpath
 from abipy.core.symmetries import mati3inv
 
@@ -80,14 +82,7 @@ class ElectronInterpolator(metaclass=abc.ABCMeta):
         bz = (grid + kshift) / mesh
 
         # All k-points and mapping to ir-grid points
-        bz2ibz = np.empty(len(bz), dtype=np.int)
-        for i, (ir_gp_id, gp) in enumerate(zip(mapping, grid)):
-            inds = np.where(uniq == ir_gp_id)
-            #print("inds", inds, "inds[0]", inds[0])
-            assert len(inds) == 1
-            bz2ibz[i] = inds[0]
-            #print("%3d ->%3d %s" % (i, ir_gp_id, (gp + [0.5, 0.5, 0.5]) / mesh))
-            #print("%3d ->%3d %s" % (i, ir_gp_id, (gp + kshift) / mesh))
+        bz2ibz = np.searchsorted(uniq, mapping)
 
         return dict2namedtuple(mesh=mesh, shift=kshift,
                                ibz=ibz, nibz=len(ibz), weights=weights,
@@ -185,7 +180,7 @@ class ElectronInterpolator(metaclass=abc.ABCMeta):
             kmesh: Three integers with the number of divisions along the reciprocal primitive axes.
             is_shift: three integers (spglib API). When is_shift is not None, the kmesh is shifted along
                 the axis in half of adjacent mesh points irrespective of the mesh numbers. None means unshited mesh.
-            method: String defining the method for the computation of the DOS.
+            method: String defining the method for the computation of the DOS: "gaussian" or "tetra".
             step: Energy step (eV) of the linear mesh.
             width: Standard deviation (eV) of the gaussian.
             mesh: Frequency mesh to use. If None, the mesh is computed automatically from the eigenvalues.
@@ -206,19 +201,26 @@ class ElectronInterpolator(metaclass=abc.ABCMeta):
         nw = len(wmesh)
         values = np.zeros((self.nsppol, nw))
 
-        # TODO: Write cython version.
         if method == "gaussian":
+            weights = np.broadcast_to(k.weights[:, None], (k.nibz, self.nband))
             for spin in range(self.nsppol):
-                for ik, wtk in enumerate(k.weights):
-                    for band in range(self.nband):
-                        values[spin] += wtk * gaussian(wmesh, width, center=eigens[spin, ik, band])
+                values[spin] = gaussian_dos(wmesh, eigens[spin], width, weights=weights)
 
-            # Compute IDOS
-            integral = scipy.integrate.cumtrapz(values, x=wmesh, initial=0.0)
+        elif method == "tetra":
+            # Reorder the eigenvalues in the full BZ according to the C-order used by tetra_dos.
+            cidx = np.ravel_multi_index((k.grid % k.mesh).T, k.mesh)
+            gprimd = 2 * np.pi * np.linalg.inv(self.cell[0]).T
+            for spin in range(self.nsppol):
+                eigens_bz = np.empty((k.nbz, self.nband))
+                eigens_bz[cidx] = eigens[spin, k.bz2ibz]
+                values[spin] = tetra_dos(wmesh, eigens_bz, k.mesh, gprimd)
 
         else:
             raise ValueError("Method %s is not supported" % method)
 
+        # Compute IDOS
+        integral = scipy.integrate.cumtrapz(values, x=wmesh, initial=0.0)
+
         return dict2namedtuple(mesh=wmesh, values=values, integral=integral)
         #return ElectronDos(wmesh, values, integral, is_shift, method, step, width)
 
@@ -638,7 +640,43 @@ class ElectronInterpolator(metaclass=abc.ABCMeta):
             oeigs[nband]
         """
 
-    def interp_kpts(self, kfrac_coords, dk1=False, dk2=False):
+    def eval_kpts(self, kfrac_coords, dk1=False, dk2=False):
+        """
+        Interpolate eigenvalues for all spins and bands on a block of k-points.
+        Optionally compute gradients and Hessian matrices.
+        Subclasses should provide a vectorized implementation, the default version calls `eval_sk`.
+
+        Args:
+            kfrac_coords: [nk, 3] array with k-points in reduced coordinates.
+            dk1 (bool): True if gradient is wanted.
+            dk2 (bool): True to compute 2nd order derivatives.
+
+        Return:
+            (eigens[nsppol, nk, nband], dedk[nsppol, nk, nband, 3], dedk2[nsppol, nk, nband, 3, 3])
+            dedk and dedk2 are set to None if not computed.
+        """
+        nk = len(kfrac_coords)
+        eigens = np.empty((self.nsppol, nk, self.nband))
+        dedk = None if not dk1 else np.empty((self.nsppol, nk, self.nband, 3))
+        dedk2 = None if not dk2 else np.empty((self.nsppol, nk, self.nband, 3, 3))
+
+        der1, der2 = None, None
+        for spin in range(self.nsppol):
+            for ik, newk in enumerate(kfrac_coords):
+                if dk1: der1 = dedk[spin, ik]
+                if dk2: der2 = dedk2[spin, ik]
+                eigens[spin, ik] = self.eval_sk(spin, newk, der1=der1, der2=der2)
+
+        return eigens, dedk, dedk2
+
+    def get_kchunksize(self, dk1=False, dk2=False, max_memory_mb=None):
+        """
+        Number of k-points treated in each call to `eval_kpts` by `interp_kpts`.
+        Subclasses can use `max_memory_mb` to limit the size of the workspace arrays.
+        """
+        return 1000
+
+    def interp_kpts(self, kfrac_coords, dk1=False, dk2=False, max_memory_mb=None, nprocs=None):
         """
         Interpolate energies on an arbitrary set of k-points. Optionally, compute
         gradients and Hessian matrices.
@@ -647,6 +685,9 @@ class ElectronInterpolator(metaclass=abc.ABCMeta):
             kfrac_coords: K-points in reduced coordinates.
             dk1 (bool): True if gradient is wanted.
             dk2 (bool): True to compute 2nd order derivatives.
+            max_memory_mb: Approximate memory (Mb) of the workspace arrays used for each chunk of k-points.
+                None to use the default value of the interpolator.
+            nprocs: Number of processes used to interpolate the chunks of k-points. None for serial execution.
 
         Return:
             namedtuple with:
@@ -665,18 +706,32 @@ class ElectronInterpolator(metaclass=abc.ABCMeta):
         dedk = None if not dk1 else np.empty((self.nsppol, new_nkpt, self.nband, 3))
         dedk2 = None if not dk2 else np.empty((self.nsppol, new_nkpt, self.nband, 3, 3))
 
-        der1, der2 = None, None
-        for spin in range(self.nsppol):
-            for ik, newk in enumerate(kfrac_coords):
-                if dk1: der1 = dedk[spin, ik]
-                if dk2: der2 = dedk2[spin, ik]
-                new_eigens[spin, ik] = self.eval_sk(spin, newk, der1=der1, der2=der2)
+        chunksize = self.get_kchunksize(dk1=dk1, dk2=dk2, max_memory_mb=max_memory_mb)
+        slices = [slice(i, i + chunksize) for i in range(0, new_nkpt, chunksize)]
+        chunks = [kfrac_coords[sl] for sl in slices]
+
+        if nprocs is None or nprocs <= 1 or len(chunks) <= 1:
+            results = (self.eval_kpts(kpts, dk1=dk1, dk2=dk2) for kpts in chunks)
+            self._store_chunks(slices, results, new_eigens, dedk, dedk2)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=nprocs, initializer=_init_worker, initargs=(self,)) as executor:
+                results = executor.map(_eval_kpts_worker, chunks, itertools.repeat(dk1), itertools.repeat(dk2))
+                self._store_chunks(slices, results, new_eigens, dedk, dedk2)
 
         if self.verbose:
             print("Interpolation completed in %.3f (s)" % (time.time() - start))
 
         return dict2namedtuple(eigens=new_eigens, dedk=dedk, dedk2=dedk2)
 
+    @staticmethod
+    def _store_chunks(slices, results, eigens, dedk, dedk2):
+        """Copy the results of `eval_kpts` for the chunks of k-points in the output arrays."""
+        for sl, (eigs, der1, der2) in zip(slices, results):
+            eigens[:, sl] = eigs
+            if dedk is not None: dedk[:, sl] = der1
+            if dedk2 is not None: dedk2[:, sl] = der2
+
     def interp_kpts_and_enforce_degs(self, kfrac_coords, ref_eigens, atol=1e-4):
         """
         Interpolate energies on an arbitrary set of k-points. Use `ref_eigens`
@@ -801,9 +856,7 @@ class SkwInterpolator(ElectronInterpolator):
 
         # Construct star functions for the ab-initio k-points.
         nsppol, nband, nkpt, nr = self.nsppol, self.nband, self.nkpt, self.nr
-        self.skr = np.empty((nkpt, nr), dtype=np.complex)
-        for ik, kpt in enumerate(kpts):
-            self.skr[ik] = self.get_stark(kpt)
+        self.skr = self.get_stark(np.reshape(kpts, (nkpt, 3)))
 
         # Build H(k,k') matrix (Hermitian)
         hmat = np.empty((nkpt-1, nkpt-1), dtype=np.complex)
@@ -870,9 +923,10 @@ class SkwInterpolator(ElectronInterpolator):
 
         # Compare ab-initio data with interpolated results.
         mae = 0.0
+        skw_eigens = self.eval_kpts(kpts)[0]
         for spin in range(nsppol):
             for ik, kpt in enumerate(kpts):
-                skw_eb = self.eval_sk(spin, kpt)
+                skw_eb = skw_eigens[spin, ik]
                 mae += np.abs(eigens[spin, ik] - skw_eb).sum()
                 if self.verbose >= 10:
                     # print interpolated eigenvales
@@ -925,27 +979,98 @@ class SkwInterpolator(ElectronInterpolator):
         Return:
             oeigs[nband]
         """
-        # [NB, NR] x [NR]
-        oeigs = np.matmul(self.coefs[spin], self.get_stark(kpt))
-        if not self.iscomplexobj: oeigs = oeigs.real
-
-        if der1 is not None:
-            skr_dk1 = self.get_stark_dk1(kpt)
-            for ii in range(3):
-                value = np.matmul(self.coefs[spin, :, :], skr_dk1[ii])
-                if not self.iscomplexobj: value = value.real
-                der1[:, ii] = value
-
-        if der2 is not None:
-            skr_dk2 = self.get_stark_dk2(kpt)
+        eigens, dedk, dedk2 = self.eval_kpts(np.reshape(kpt, (1, 3)), dk1=der1 is not None, dk2=der2 is not None)
+        if der1 is not None: der1[...] = dedk[spin, 0]
+        if der2 is not None: der2[...] = dedk2[spin, 0]
+
+        return eigens[spin, 0]
+
+    def eval_kpts(self, kfrac_coords, dk1=False, dk2=False):
+        """
+        Interpolate eigenvalues for all spins and bands on a block of k-points.
+        Optionally compute gradients and Hessian matrices.
+
+        The star functions are expanded in plane waves over the lattice vectors of the R-stars
+        so that all the k-points and bands are computed with matrix products.
+
+        Args:
+            kfrac_coords: [nk, 3] array with k-points in reduced coordinates.
+            dk1 (bool): True if gradient is wanted.
+            dk2 (bool): True to compute 2nd order derivatives.
+
+        Return:
+            (eigens[nsppol, nk, nband], dedk[nsppol, nk, nband, 3], dedk2[nsppol, nk, nband, 3, 3])
+            dedk and dedk2 are set to None if not computed. Derivatives are wrt k in reduced coordinates.
+        """
+        kfrac_coords = np.reshape(kfrac_coords, (-1, 3))
+        nk = len(kfrac_coords)
+        rvecs, coefs = self._rstars.rvecs, self._rstar_coefs
+
+        # [nk, nrvecs] x [nrvecs, nsppol * nband]
+        two_pi = 2.0 * np.pi
+        phases = self._get_rstar_phases(kfrac_coords)
+
+        def _contract(arr):
+            out = np.matmul(arr, coefs).reshape(nk, self.nsppol, self.nband).swapaxes(0, 1)
+            return out if self.iscomplexobj else out.real
+
+        eigens = _contract(phases)
+
+        dedk = None
+        if dk1:
+            dedk = np.stack([_contract(phases * (1j * two_pi * rvecs[:, ii])) for ii in range(3)], axis=-1)
+
+        dedk2 = None
+        if dk2:
+            shape = (self.nsppol, nk, self.nband, 3, 3)
+            dedk2 = np.empty(shape, dtype=np.complex if self.iscomplexobj else np.float)
             for jj in range(3):
                 for ii in range(jj + 1):
-                    value = np.matmul(self.coefs[spin, :, :], skr_dk2[ii,jj])
-                    if not self.iscomplexobj: value = value.real
-                    der2[:, ii, jj] = value
-                    if ii != jj: der2[jj, ii] = der2[ii, jj]
+                    dedk2[..., ii, jj] = _contract(phases * (-two_pi ** 2 * rvecs[:, ii] * rvecs[:, jj]))
+                    if ii != jj: dedk2[..., jj, ii] = dedk2[..., ii, jj]
+
+        return eigens, dedk, dedk2
+
+    # Default memory (Mb) used for the workspace arrays in `interp_kpts`.
+    max_memory_mb = 512
+
+    def get_kchunksize(self, dk1=False, dk2=False, max_memory_mb=None):
+        """
+        Number of k-points treated in each call to `eval_kpts` by `interp_kpts`.
+        Each k-point requires two complex arrays with `nrvecs` elements
+        (phases and derivative factors) plus the output arrays.
+        """
+        if max_memory_mb is None: max_memory_mb = self.max_memory_mb
+        nbytes = 32 * len(self._rstars.rvecs) + 16 * self.nsppol * self.nband * (1 + 3 * dk1 + 9 * dk2)
+        return max(1, int(max_memory_mb * 1024 ** 2 / nbytes))
+
+    @lazy_property
+    def _rstars(self):
+        """
+        Lattice vectors belonging to the stars of `self.rpts`. Return named tuple with:
+
+            rvecs: [nrvecs, 3] array with the lattice vectors sorted by star.
+            istar: [nrvecs] array with the index of the star in self.rpts.
+            mult: [nr] array with the number of vectors in each star.
+        """
+        # Rotated vectors S R with shape [nr, nsym, 3]
+        srpts = np.einsum("sij,rj->rsi", self.ptg_symrel, self.rpts)
+        istar = np.repeat(np.arange(self.nr), self.ptg_nsym)
+        rows = np.unique(np.concatenate([istar[:, None], srpts.reshape(-1, 3)], axis=1), axis=0)
+        istar, rvecs = rows[:, 0], rows[:, 1:]
+        mult = np.bincount(istar, minlength=self.nr)
 
-        return oeigs
+        return dict2namedtuple(rvecs=rvecs, istar=istar, mult=mult)
+
+    @lazy_property
+    def _rstar_coefs(self):
+        """
+        [nrvecs, nsppol * nband] array with the coefficients of the plane-wave expansion.
+        The star function is the average over the vectors of the star.
+        """
+        stars = self._rstars
+        coefs = self.coefs[:, :, stars.istar] / stars.mult[stars.istar]
+        return np.reshape(coefs, (self.nsppol * self.nband, -1)).T.copy()
 
     #def eval_skb(self, spin, kpt, band, der1=None, der2=None):
     #    """
@@ -997,20 +1122,12 @@ class SkwInterpolator(ElectronInterpolator):
         Return the star function for k-point `kpt`.
 
         Args:
-            kpt: K-point in reduced coordinates.
+            kpt: K-point in reduced coordinates. Also accepts a [nk, 3] array.
 
         Return:
-            complex array of shape [self.nr]
+            complex array of shape [self.nr] (or [nk, self.nr])
         """
-        two_pi = 2.0 * np.pi
-        skr = np.zeros(self.nr, dtype=np.complex)
-        _np_exp = np.exp
-        for omat in self.ptg_symrel:
-            sk = two_pi * np.matmul(omat.T, kpt)
-            skr += _np_exp(1.j * np.matmul(self.rpts, sk))
-        skr /= self.ptg_nsym
-
-        return skr
+        return self._sum_stars(self._get_rstar_phases(kpt))
 
     def get_stark_dk1(self, kpt):
         """
@@ -1023,20 +1140,8 @@ class SkwInterpolator(ElectronInterpolator):
             complex array [3, self.nr]  with the derivative of the
             star function wrt k in reduced coordinates.
         """
-        srk_dk1 = np.zeros((3, self.nr), dtype=np.complex)
-        two_pi = 2.0 * np.pi
-        rpts_t = self.rpts.T
-
-        for omat in self.ptg_symrel:
-            sk = two_pi * np.matmul(omat.T, kpt)
-            exp_skr = np.exp(1.j * np.matmul(self.rpts, sk))
-            for ir, rr in enumerate(self.rpts):
-                srk_dk1[:, ir] += exp_skr[ir] * np.matmul(omat, rr)
-            #for ir, or in enumerate(np.matmul(omat, rpts_t).T):
-            #    srk_dk1[:, ir] += exp_skr[ir] * or
-
-        srk_dk1 *= 1.j / self.ptg_nsym
-        return srk_dk1
+        phases, rvecs = self._get_rstar_phases(kpt), self._rstars.rvecs
+        return np.array([self._sum_stars(phases * (2j * np.pi * rvecs[:, ii])) for ii in range(3)])
 
     def get_stark_dk2(self, kpt):
         """
@@ -1049,27 +1154,36 @@ class SkwInterpolator(ElectronInterpolator):
             Complex numpy array of shape [3, 3, self.nr] with the 2nd-order derivatives
             of the star function wrt k in reduced coordinates.
         """
-        srk_dk2 = np.zeros((3, 3, self.nr), dtype=np.complex)
-        raise NotImplementedError()
-        #work = zero
-        #do isym=1,self.ptg_nsym
-        #   sk = two_pi * matmul(transpose(self%ptg_symrel(:,:,isym)), kpt)
-        #   do ir=1,self%nr
-        #     sr = matmul(self%ptg_symrel(:,:,isym), self%rpts(:,ir))
-        #     eiskr = exp(j_dpc * dot_product(sk, self%rpts(:,ir)))
-        #     do jj=1,3
-        #        do ii=1,jj
-        #            work(ii,jj,ir) = work(ii,jj,ir) + eiskr * sr(ii) * sr(jj)
-
-        #work = - work / self.ptg_nsym
-
-        #do jj=1,3
-        #   do ii=1,jj
-        #       srk_dk2(:, ii, jj) = work(ii, jj, :)
-        #       if (ii /= jj) srk_dk2(:,jj,ii) = work(:,ii,jj)
+        phases, rvecs = self._get_rstar_phases(kpt), self._rstars.rvecs
+        srk_dk2 = np.empty((3, 3, self.nr), dtype=np.complex)
+        for jj in range(3):
+            for ii in range(jj + 1):
+                srk_dk2[ii, jj] = self._sum_stars(phases * (-(2 * np.pi) ** 2 * rvecs[:, ii] * rvecs[:, jj]))
+                if ii != jj: srk_dk2[jj, ii] = srk_dk2[ii, jj]
 
         return srk_dk2
 
+    def _get_rstar_phases(self, kpt):
+        """
+        exp(2 pi i k.R) for all the lattice vectors in the R-stars. Shape [nrvecs] or [nk, nrvecs]
+        The phases are obtained from the products of the 1D phases along the reduced directions
+        as the components of R are integers. This is much faster than calling exp for each (k, R).
+        """
+        kpt = np.asarray(kpt, dtype=np.float)
+        rvecs = self._rstars.rvecs
+        rmin = rvecs.min()
+        # [..., 3, nm] array with exp(2 pi i k_d m) for m in [rmin, rmax]
+        phases_1d = np.exp(2j * np.pi * kpt[..., None] * np.arange(rmin, rvecs.max() + 1))
+        ridx = rvecs - rmin
+
+        return phases_1d[..., 0, ridx[:, 0]] * phases_1d[..., 1, ridx[:, 1]] * phases_1d[..., 2, ridx[:, 2]]
+
+    def _sum_stars(self, arr):
+        """Average the last dimension of `arr` over the vectors of each R-star."""
+        stars = self._rstars
+        starts = np.cumsum(stars.mult) - stars.mult
+        return np.add.reduceat(arr, starts, axis=-1) / stars.mult
+
     #def find_stationary_points(self, kmesh, bstart=None, bstop=None, is_shift=None)
     #    k = self.get_sampling(kmesh, is_shift)
     #    if bstart is None: bstart = self.nelect // 2 - 1
@@ -1195,6 +1309,21 @@ class SkwInterpolator(ElectronInterpolator):
         return rpts, r2vals, ok
 
 
+# Interpolator used by the worker processes of `ElectronInterpolator.interp_kpts`.
+_WORKER_INTERPOLATOR = None
+
+
+def _init_worker(interpolator):
+    """Initialize the worker process with a copy of the interpolator."""
+    global _WORKER_INTERPOLATOR
+    _WORKER_INTERPOLATOR = interpolator
+
+
+def _eval_kpts_worker(kpts, dk1, dk2):
+    """Interpolate a chunk of k-points in the worker process."""
+    return _WORKER_INTERPOLATOR.eval_kpts(kpts, dk1=dk1, dk2=dk2)
+
+
 def extract_point_group(symrel, has_timrev):
     """
     Extract the point group rotations from the spacegroup. Add time-reversal
@@ -130,7 +130,11 @@ class TestScalarField(AbipyTest):
         assert "frac_coords" in df
         self.assert_almost_equal(df["ntot"].values, 2 * [2.010537])
         self.assert_almost_equal(df["rsph_ang"].values, 2 * [1.11])
+        # Equivalent atoms are obtained from the Abinit symmetries.
+        assert si_den.structure.has_abi_spacegroup
         df = si_den.integrate_in_spheres(rcut_symbol=2, out=False)
+        same_df = si_den.integrate_in_spheres(rcut_symbol=2, use_symmetry=False, chunksize=100)
+        self.assert_almost_equal(df["ntot"].values, same_df["ntot"].values)
 
         if self.has_matplotlib():
             assert si_den.plot_line(0, 1, num=1000, show=False)
@@ -62,3 +62,61 @@ class TestGSphere(AbipyTest):
                 int_r = mesh.integrate(fr)
                 int_g = fg[...,0,0,0]
                 self.assert_almost_equal(int_r, int_g)
+
+    def test_tofftmesh_istwfk(self):
+        """Scatter/gather between G-sphere and FFT mesh with istwfk > 1"""
+        rprimd = np.eye(3)
+        mesh = Mesh3D((8, 9, 10), rprimd)
+        rng = np.random.RandomState(1)
+        allg = np.reshape(np.mgrid[-3:4, -3:4, -3:4].T, (-1, 3))
+
+        # Abinit convention for the k-points with istwfk > 1.
+        istwfk_kpoints = [
+            (1, [0, 0, 0]), (2, [0, 0, 0]), (3, [0.5, 0, 0]), (4, [0, 0, 0.5]), (5, [0.5, 0, 0.5]),
+            (6, [0, 0.5, 0]), (7, [0.5, 0.5, 0]), (8, [0, 0.5, 0.5]), (9, [0.5, 0.5, 0.5]), (6, [0, -0.5, 0]),
+        ]
+        for istwfk, kpoint in istwfk_kpoints:
+            kpoint = np.array(kpoint)
+            g0 = np.rint(2 * kpoint).astype(np.int)
+            full = allg[np.sum((allg + kpoint) ** 2, axis=1) < 8]
+            # Build coefficients fulfilling u(G) = u*(-G-G0) and store half of them.
+            index = {tuple(g): i for i, g in enumerate(full)}
+            partner = np.array([index[tuple(-g - g0)] for g in full])
+            ug_full = rng.rand(len(full)) + 1j * rng.rand(len(full))
+            if istwfk == 1:
+                stored = np.arange(len(full))
+            else:
+                ug_full = 0.5 * (ug_full + ug_full[partner].conj())
+                stored = np.nonzero(np.arange(len(full)) <= partner)[0]
+
+            gsphere = GSphere(2, rprimd, kpoint, full[stored], istwfk=istwfk)
+            assert np.all(gsphere.g0 == g0)
+            ug = ug_full[stored]
+
+            ref = mesh.czeros()
+            for g, u in zip(full, ug_full):
+                ref[tuple(g % mesh.shape)] = u
+
+            ug_mesh = gsphere.tofftmesh(mesh, ug)
+            assert ug_mesh.shape == mesh.shape
+            self.assert_almost_equal(ug_mesh, ref)
+            self.assert_almost_equal(gsphere.fromfftmesh(mesh, ref.ravel()), ug)
+
+            # Batch of bands.
+            ug_bands = np.array([ug, 2 * ug, 3 * ug]).reshape(3, 1, -1)
+            ug_mesh = gsphere.tofftmesh(mesh, ug_bands)
+            assert ug_mesh.shape == (3, 1) + mesh.shape
+            self.assert_almost_equal(ug_mesh[2, 0], 3 * ref)
+            self.assert_almost_equal(gsphere.fromfftmesh(mesh, ug_mesh), ug_bands.reshape(3, -1))
+
+            # Tables are cached.
+            assert gsphere.get_fft_indices(mesh) is gsphere.get_fft_indices(mesh)
+
+        with self.assertRaises(ValueError):
+            GSphere(2, rprimd, [0.5, 0, 0], full, istwfk=2).tofftmesh(mesh, np.zeros(len(full)))
+        with self.assertRaises(ValueError):
+            GSphere(2, rprimd, [0, 0.5, 0], full, istwfk=4).g0
+        with self.assertRaises(ValueError):
+            GSphere(2, rprimd, [0.5, 0.5, 0], full, istwfk=5).g0
+        with self.assertRaises(ValueError):
+            GSphere(2, rprimd, [0, 0, 0], [[0, 0, 0]], istwfk=10)
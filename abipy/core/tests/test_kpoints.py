@@ -8,7 +8,8 @@ import abipy.data as abidata
 from pymatgen.core.lattice import Lattice
 from abipy import abilab
 from abipy.core.kpoints import (wrap_to_ws, wrap_to_bz, issamek, Kpoint, KpointList, IrredZone, Kpath, KpointsReader,
-    has_timrev_from_kptopt, KSamplingInfo, as_kpoints, rc_list, kmesh_from_mpdivs, map_grid2ibz,
+    has_timrev_from_kptopt, KSamplingInfo, as_kpoints, rc_list, kmesh_from_mpdivs, map_grid2ibz, map_kpoints,
+    KpointHashTable, get_grid2ibz_map,
     set_atol_kdiff, set_spglib_tols, kpath_from_bounds_and_ndivsm, build_segments)  #Ktables,
 from abipy.core.testing import AbipyTest
 
@@ -247,6 +248,68 @@ class TestKpointList(AbipyTest):
             klist.index((0, 0, 0))
 
 
+class TestKpointHashTable(AbipyTest):
+
+    def test_hash_table(self):
+        """Testing KpointHashTable."""
+        # Generic points including periodic images and points close to the border of the cells.
+        frac_coords = [[1 - 1e-9, 0, 0.5], [0.3, 0.3, 0.3], [1.3, -0.7, 0.3], [0.1, 0.2, 0.3]]
+        table = KpointHashTable(frac_coords)
+        assert len(table) == 4 and table.mpdivs is None
+        self.assert_equal(table.find([[0, 0, 0.5], [1e-9, 1, -0.5], [0.3 + 2e-8, 0.3, 0.3], [0.3, 0.3, 0.3]]),
+                          [0, 0, -1, 1])
+        self.assert_equal(table.find_all([0.3, 1.3, 0.3]), [1, 2])
+        self.assert_equal(KpointHashTable(frac_coords, atol=1e-7).find([0.3 + 2e-8, 0.3, 0.3]), [1])
+
+        # Compare with brute-force search.
+        rng = np.random.RandomState(0)
+        points = rng.randint(0, 5, size=(200, 3)) / 5 + rng.randint(-2, 3, size=(200, 3))
+        queries = rng.randint(0, 5, size=(50, 3)) / 5 + 1e-9
+        found = KpointHashTable(points).find(queries)
+        for q, ik in zip(queries, found):
+            ref = [i for i, p in enumerate(points) if issamek(p, q)]
+            assert ik == (ref[0] if ref else -1)
+
+        # Non-default tolerances (0.5 / atol is not an integer) and points close to the wrap boundaries.
+        for atol in (3e-3, 7e-4):
+            centers = rng.choice([-0.5, 0.0, 0.5, 1.0], size=(300, 3))
+            points = centers + rng.uniform(-2 * atol, 2 * atol, size=(300, 3))
+            queries = centers[:100] + rng.uniform(-2 * atol, 2 * atol, size=(100, 3))
+            table = KpointHashTable(points, atol=atol)
+            for q, ik, iks in zip(queries, table.find(queries), map(table.find_all, queries)):
+                diff = points - q
+                ref = np.nonzero(np.all(np.abs(diff - np.rint(diff)) <= atol, axis=1))[0]
+                assert ik == (ref[0] if len(ref) else -1)
+                self.assert_equal(iks, ref)
+
+        # Points on a shifted MP mesh use the rank in the mesh as hash.
+        ngkpt = np.array([4, 4, 4])
+        kbz = kmesh_from_mpdivs(ngkpt, [0.5, 0.5, 0.5])
+        table = KpointHashTable(kbz, mpdivs=ngkpt, shift=[0.5, 0.5, 0.5])
+        self.assert_equal(table.mpdivs, ngkpt)
+        self.assert_equal(table.find(kbz), np.arange(len(kbz)))
+        kpq = table.find(kbz + [0.25, 0, 0])
+        assert np.all(kpq != -1)
+        assert np.all(KpointHashTable(kbz).find(kbz + [0.25, 0, 0]) == kpq)
+        assert np.all(table.find(kbz + [0.1, 0, 0]) == -1)
+        # Fallback to generic hash if points do not belong to the mesh.
+        assert KpointHashTable(kbz, mpdivs=ngkpt).mpdivs is None
+
+    def test_map_kpoints(self):
+        """Testing map_kpoints."""
+        lattice = np.eye(3)
+        symrecs = [np.eye(3, dtype=int), [[0, 1, 0], [1, 0, 0], [0, 0, 1]]]
+        ref_kpoints = [[0.1, 0.2, 0.3], [0.25, 0.25, 0.25]]
+        other_kpoints = [[-0.2, -0.1, 0.7], [0.2, 0.1, 0.3], [0.4, 0.4, 0.4]]
+        o2r_map, nmissing = map_kpoints(other_kpoints, lattice, lattice, ref_kpoints, symrecs, has_timrev=True)
+        assert nmissing == 1 and o2r_map[2] is None
+        assert o2r_map[0].ik_ref == 0 and o2r_map[0].tsign == -1 and o2r_map[0].isym == 1
+        self.assert_equal(o2r_map[0].g0, [0, 0, 1])
+        assert o2r_map[1].ik_ref == 0 and o2r_map[1].tsign == 1 and o2r_map[1].isym == 1
+        o2r_map, nmissing = map_kpoints(other_kpoints, lattice, lattice, ref_kpoints, symrecs, has_timrev=False)
+        assert nmissing == 2 and o2r_map[1].isym == 1
+
+
 class TestIrredZone(AbipyTest):
 
     def test_irredzone_api(self):
@@ -627,6 +690,24 @@ class TestKmappingTools(AbipyTest):
 
         assert not errors
 
+        # Tables with symmetry indices.
+        m = get_grid2ibz_map(self.mgb2, self.kibz, self.ngkpt, self.has_timrev)
+        self.assert_equal(m.bz2ibz, bz2ibz)
+        assert np.all(m.bz2tsign != 0) and np.all(m.bz2isym >= 0)
+        gp_ibz = np.rint(np.array(self.kibz) * self.ngkpt).astype(int)
+        gp_bz = np.rint(bz * self.ngkpt).astype(int)
+        gp_rot = m.bz2tsign[:, None] * np.einsum("kij,kj->ki", m.symrec[m.bz2isym], gp_ibz[m.bz2ibz])
+        assert np.all((gp_rot - gp_bz) % self.ngkpt == 0)
+        self.assert_equal(gp_bz[m.ibz2bz], gp_ibz % self.ngkpt)
+
+        # pbc adds the periodic images.
+        bz2ibz_pbc = map_grid2ibz(self.mgb2, self.kibz, self.ngkpt, self.has_timrev, pbc=True)
+        assert len(bz2ibz_pbc) == 19 ** 3
+        self.assert_equal(bz2ibz_pbc.reshape(19, 19, 19)[:-1, :-1, :-1].flatten(), bz2ibz)
+
+        with self.assertRaises(ValueError):
+            get_grid2ibz_map(self.mgb2, self.kibz, [17, 17, 17], self.has_timrev)
+
     #def test_with_from_structure_with_symrec(self):
     #    """Generate Ktables from a structure with Abinit symmetries."""
     #    self.mgb2 = self.get_abistructure.mgb2("mgb2_kpath_FATBANDS.nc")
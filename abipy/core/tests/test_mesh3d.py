@@ -35,6 +35,11 @@ class TestMesh3D(AbipyTest):
 
         assert gmods[0] == 0
         self.assert_almost_equal(gmods[1], 2 * np.pi)
+        self.assert_almost_equal(mesh_444.gmax, gmods.max())
+        chunks = list(mesh_443.iter_gvecs(chunksize=7))
+        assert chunks[-1][1] == mesh_443.size
+        self.assert_equal(np.concatenate([c[2] for c in chunks]), mesh_443.gvecs)
+        self.assert_almost_equal(np.concatenate([c[3] for c in chunks]), mesh_443.gmods)
 
         rpoints = mesh_444.rpoints
         assert rpoints.shape == (64, 3)
@@ -77,6 +82,15 @@ class TestMesh3D(AbipyTest):
                     r += shift
                     self.assert_equal(mesh_443.i_closest_gridpoints(r), [[ix, iy, iz]])
 
+        # Grid points in spheres. Periodic images are included.
+        points = [mesh_443.rpoint(1, 2, 0), mesh_443.vectors.sum(axis=0) / 2]
+        for (igp_uc, dists, igp), dist_gps in zip(mesh_443.get_gridpoints_in_spheres(points, radius=0.6),
+                                                 mesh_443.dist_gridpoints_in_spheres(points, radius=0.6)):
+            assert len(dists) == len(dist_gps) and np.all(dists <= 0.6)
+            self.assert_equal(igp_uc, np.mod(igp, mesh_443.shape))
+            self.assert_almost_equal(dists, [t[1] for t in dist_gps])
+        assert [0, 0, 0] in mesh_443.get_gridpoints_in_spheres(points, radius=0.6)[0][0].tolist()
+
     def test_fft(self):
         """Test FFT transforms with mesh3d"""
         rprimd = np.array([1.,0,0, 0,1,0, 0,0,1])
@@ -56,12 +56,37 @@ class TestSkwInterpolator(AbipyTest):
         assert res1.dedk.shape == (skw.nsppol, len(new_kcoords), skw.nband, 3)
         # Group velocities at Gamma should be zero by symmetry.
         self.assert_almost_equal(res1.dedk[0, 0], 0.0)
-        #assert 0
-        #res12 = skw.interp_kpts(new_kcoords, dk1=True, dk2=True)
-        #print(res12.dedk2)
+
+        # Batched evaluation in chunks (optionally with processes) should give the same results.
+        res12 = skw.interp_kpts(new_kcoords, dk1=True, dk2=True)
+        assert res12.dedk2.shape == (skw.nsppol, len(new_kcoords), skw.nband, 3, 3)
+        self.assert_almost_equal(res12.dedk2, res12.dedk2.swapaxes(-1, -2))
+        assert skw.get_kchunksize(max_memory_mb=1e-6) == 1
+        for nprocs in (None, 2):
+            res2 = skw.interp_kpts(new_kcoords, dk1=True, dk2=True, max_memory_mb=1e-6, nprocs=nprocs)
+            self.assert_almost_equal(res2.eigens, res12.eigens)
+            self.assert_almost_equal(res2.dedk, res12.dedk)
+            self.assert_almost_equal(res2.dedk2, res12.dedk2)
+        der1, der2 = np.empty((skw.nband, 3)), np.empty((skw.nband, 3, 3))
+        self.assert_almost_equal(skw.eval_sk(0, new_kcoords[2], der1=der1, der2=der2), res12.eigens[0, 2])
+        self.assert_almost_equal(der1, res12.dedk[0, 2])
+        self.assert_almost_equal(der2, res12.dedk2[0, 2])
+
+        # Compare gradients with finite differences.
+        delta = 1e-5
+        kplus, kminus = np.array(new_kcoords[2], dtype=float), np.array(new_kcoords[2], dtype=float)
+        kplus[0] += delta; kminus[0] -= delta
+        fd = (skw.interp_kpts(kplus).eigens - skw.interp_kpts(kminus).eigens) / (2 * delta)
+        self.assert_almost_equal(fd[0, 0], res12.dedk[0, 2, :, 0], decimal=4)
 
         # Test interpolation routines (high-level API).
         edos = skw.get_edos(kmesh, is_shift=None, method="gaussian", step=0.1, width=0.2, wmesh=None)
+        self.assert_almost_equal(edos.integral[0, -1], skw.nband, decimal=3)
+        tetra_edos = skw.get_edos(kmesh, is_shift=None, method="tetra", step=0.1, wmesh=None)
+        self.assert_equal(tetra_edos.mesh, edos.mesh)
+        self.assert_almost_equal(tetra_edos.integral[0, -1], skw.nband, decimal=1)
+        with self.assertRaises(ValueError):
+            skw.get_edos(kmesh, method="foo")
         #jdos = skw.get_jdos_q0(kmesh, is_shift=None, method="gaussian", step=0.1, width=0.2, wmesh=None)
         #nest = skw.get_nesting_at_e0(qpoints, kmesh, e0, width=0.2, is_shift=None)
 
@@ -11,7 +11,7 @@ import pandas as pd
 import abipy.core.abinit_units as abu
 
 from collections import OrderedDict
-from functools import lru_cache
+from functools import lru_cache, partial
 from monty.string import marquee, list_strings
 from monty.json import MSONable
 from monty.collections import AttrDict, dict2namedtuple
@@ -37,7 +37,7 @@ from abipy.tools.plotting import add_fig_kwargs, get_ax_fig_plt, get_axarray_fig
 from abipy.tools import duck
 from abipy.tools.iotools import ExitStackWithFiles
 from abipy.tools.tensors import DielectricTensor, ZstarTensor, Stress
-from abipy.abio.robots import Robot
+from abipy.abio.robots import Robot, exec_funcs
 
 
 class DdbError(Exception):
@@ -94,9 +94,9 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
     AnaddbError = AnaddbError
 
     @classmethod
-    def from_file(cls, filepath):
+    def from_file(cls, filepath, use_cache=False):
         """Needed for the :class:`TextFile` abstract interface."""
-        return cls(filepath)
+        return cls(filepath, use_cache=use_cache)
 
     @classmethod
     def from_string(cls, string):
@@ -140,10 +140,21 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         """
         return obj if isinstance(obj, cls) else cls.from_file(obj)
 
-    def __init__(self, filepath):
+    def __init__(self, filepath, use_cache=False):
+        """
+        Args:
+            filepath: Path to the DDB file.
+            use_cache: True if the binary sidecar file (see :meth:`write_cache`) should be used
+                to speed up the parsing of the blocks. The sidecar is created if it does not exist
+                or if the DDB file has been modified after the creation of the sidecar.
+        """
         super().__init__(filepath)
+        self.use_cache = use_cache
+        self._values_cache = {}
 
         self._header = self._parse_header()
+        if use_cache and not self._load_cache():
+            self.write_cache()
 
         self._structure = Structure.from_abivars(**self.header)
         # Add AbinitSpacegroup (needed in guessed_ngkpt)
@@ -342,22 +353,13 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         # 2nd derivatives (non-stat.)  - # elements :      36
         # qpt  2.50000000E-01  0.00000000E+00  0.00000000E+00   1.0
 
-        # Since there are multiple occurrences of qpt in the DDB file
+        # Since there are multiple occurrences of the same q-point in the DDB file
         # we use seen to remove duplicates.
-        self.seek(0)
-        tokens, seen = [], set()
-
-        for line in self:
-            line = line.strip()
-            if line.startswith("qpt") and line not in seen:
-                seen.add(line)
-                tokens.append(line.replace("qpt", ""))
-
-        qpoints, weights = [], []
-        for tok in tokens:
-            nums = list(map(float, tok.split()))
-            qpoints.append(nums[:3])
-            weights.append(nums[3])
+        qpoints, seen = [], set()
+        for block in self.block_index:
+            if block["qpt"] is None or block["qpt_line"] in seen: continue
+            seen.add(block["qpt_line"])
+            qpoints.append(block["qpt"])
 
         return np.reshape(qpoints, (-1, 3))
 
@@ -372,45 +374,214 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
 
             The indices follow the Abinit (Fortran) notation so they start at 1.
         """
-        # TODO: Create mapping [(idir1, ipert1), (idir2, ipert2)] --> element
         df_columns = "idir1 ipert1 idir2 ipert2 cvalue".split()
 
         dynmat = OrderedDict()
-        for block in self.blocks:
+        for iblock, block in enumerate(self.block_index):
             # skip the blocks that are not related to second order derivatives
-            first_line = block["data"][0].strip()
-            if not first_line.startswith("2nd derivatives"):
-                continue
+            if block["dord"] != 2: continue
 
             # Build q-point object.
             qpt = Kpoint(frac_coords=block["qpt"], lattice=self.structure.reciprocal_lattice, weight=None, name=None)
 
-            # Build pandas dataframe with df_columns and (idir1, ipert1, idir2, ipert2) as index.
-            # Each line in data represents an element of the dynamical matric
+            # Each row in values represents an element of the dynamical matrix
             # idir1 ipert1 idir2 ipert2 re_D im_D
-            df_rows, df_index = [], []
-            for line in block["data"]:
-                line = line.strip()
-                if line.startswith("2nd derivatives") or line.startswith("qpt"):
-                    continue
-                try:
-                    toks = line.split()
-                    idir1, ipert1 = p1 = (int(toks[0]), int(toks[1]))
-                    idir2, ipert2 = p2 = (int(toks[2]), int(toks[3]))
-                    toks[4] = toks[4].replace("D", "E")
-                    toks[5] = toks[5].replace("D", "E")
-                    cvalue = float(toks[4]) + 1j*float(toks[5])
-                except Exception as exc:
-                    cprint("exception while parsing line: %s" % line, "red")
-                    raise exc
+            values = self.get_block_values(iblock)
+            idx = values[:, :4].astype(np.int)
+            data = OrderedDict([(k, idx[:, i]) for i, k in enumerate(df_columns[:4])])
+            data["cvalue"] = values[:, 4] + 1j * values[:, 5]
+            index = pd.MultiIndex.from_arrays([idx[:, 0], idx[:, 1], idx[:, 2], idx[:, 3]])
 
-                df_index.append(p1 + p2)
-                df_rows.append(dict(idir1=idir1, ipert1=ipert1, idir2=idir2, ipert2=ipert2, cvalue=cvalue))
-
-            dynmat[qpt] = pd.DataFrame(df_rows, index=df_index, columns=df_columns)
+            dynmat[qpt] = pd.DataFrame(data, index=index, columns=df_columns)
 
         return dynmat
 
+    @lazy_property
+    def block_index(self):
+        """
+        Index of the DDB blocks built by scanning the file only once.
+        List of dictionaries. Each dictionary contains the following keys:
+        "dord" with the order of the derivative, "nel" with the number of elements,
+        "qpt" with the reduced coordinates of the (first) q-point (None if not present),
+        "qpt_line" with the string of the qpt line, "start", "stop" with the byte offsets of the block.
+        The numerical values are decoded on demand by :meth:`get_block_values`.
+        """
+        return self._build_block_index()
+
+    def _build_block_index(self):
+        dord_from_str = {b"Total energy": 0,
+                         b"1st derivatives": 1,
+                         b"2nd derivatives": 2,
+                         b"3rd derivatives": 3}
+
+        index = []
+        with open(self.filepath, "rb") as fh:
+            offset = 0
+            # skip until the beginning of the db
+            for line in fh:
+                offset += len(line)
+                if b"Number of data blocks" in line: break
+
+            block = None
+            for line in fh:
+                if b"# elements" in line:
+                    # new block --> close the previous one and detect order
+                    if block is not None:
+                        block["stop"] = offset
+                        index.append(block)
+                    tokens = line.split()
+                    s = b" ".join(tokens[:2])
+                    dord = dord_from_str.get(s, None)
+                    if dord is None:
+                        raise RuntimeError("Cannot detect derivative order from string: `%s`" % s.decode())
+                    block = dict(dord=dord, nel=int(tokens[-1]), qpt=None, qpt_line=None, start=offset)
+
+                elif b"List of bloks and their characteristics" in line:
+                    # This line is present only if DDB has been produced by mrgddb
+                    break
+
+                elif block is not None and block["qpt"] is None and line.lstrip().startswith(b"qpt"):
+                    block["qpt_line"] = line.strip().decode()
+                    block["qpt"] = list(map(float, line.split()[1:4]))
+
+                offset += len(line)
+
+            if block is not None:
+                block["stop"] = offset
+                index.append(block)
+
+        return index
+
+    def get_block_values(self, iblock):
+        """
+        Decode the numerical entries of block ``iblock`` with vectorized numpy parsing.
+        Return |numpy-array| of shape [nel, ncols]. Each row gives the Fortran indices
+        (idir, ipert) of the perturbations followed by the real and imaginary part of the element.
+        Results are cached.
+        """
+        values = self._values_cache.get(iblock)
+        if values is not None: return values
+
+        block = self.block_index[iblock]
+        with open(self.filepath, "rb") as fh:
+            fh.seek(block["start"])
+            raw = fh.read(block["stop"] - block["start"])
+
+        # The elements are stored in the last nel non-empty lines of the block.
+        lines = [l for l in raw.splitlines() if l.strip()][-block["nel"]:]
+        # Python does not support exp format with D
+        tokens = b" ".join(lines).replace(b"D", b"E").split()
+        values = np.array(tokens).astype(np.double).reshape(block["nel"], -1)
+        self._values_cache[iblock] = values
+
+        return values
+
+    def get_dynmat_array(self, qpoint):
+        """
+        Dense representation of the dynamical matrix stored in the DDB for ``qpoint``.
+        Accepts: |Kpoint| instance, reduced coordinates or integer index.
+
+        Return: namedtuple with:
+
+            dmat: Complex array of shape [3*mpert, 3*mpert] with mpert = natom + 6.
+                The element (idir1, ipert1, idir2, ipert2) (Fortran notation) is stored
+                at [3*(ipert1-1) + idir1-1, 3*(ipert2-1) + idir2-1].
+            mask: Boolean array with the same shape. True if the element is present in the DDB.
+        """
+        iq = self.qindex(qpoint)
+        qpt_line = None
+        # Find the first 2nd-order block with this q-point.
+        for iblock, block in enumerate(self.block_index):
+            if block["dord"] != 2: continue
+            if block["qpt"] is not None and np.allclose(block["qpt"], self.qpoints[iq].frac_coords):
+                qpt_line = block["qpt_line"]
+                break
+
+        if qpt_line is None:
+            raise ValueError("Cannot find 2nd-order block for qpoint: %s" % str(self.qpoints[iq]))
+
+        n = 3 * (self.natom + 6)
+        dmat = np.zeros((n, n), dtype=np.complex)
+        mask = np.zeros((n, n), dtype=np.bool)
+        values = self.get_block_values(iblock)
+        idx = values[:, :4].astype(np.int) - 1
+        i1 = 3 * idx[:, 1] + idx[:, 0]
+        i2 = 3 * idx[:, 3] + idx[:, 2]
+        dmat[i1, i2] = values[:, 4] + 1j * values[:, 5]
+        mask[i1, i2] = True
+
+        return dict2namedtuple(dmat=dmat, mask=mask)
+
+    @property
+    def cache_path(self):
+        """Path of the binary sidecar file used to cache the DDB blocks."""
+        return self.filepath + ".npz"
+
+    def _get_stat_key(self):
+        """Array with (file size, mtime) used to validate the sidecar file."""
+        stat = os.stat(self.filepath)
+        return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+    def write_cache(self, filepath=None):
+        """
+        Decode all the blocks and write the block index and the numerical values
+        to a binary sidecar file (numpy npz format) keyed on size and mtime of the DDB file
+        so that the DDB can be reopened without parsing the text.
+
+        Args:
+            filepath: Path of the sidecar file. If None, :attr:`cache_path` is used.
+
+        Return: path of the sidecar file.
+        """
+        filepath = self.cache_path if filepath is None else filepath
+        index = self.block_index
+        nb = len(index)
+        values = [self.get_block_values(i) for i in range(nb)]
+        qpts = np.array([b["qpt"] if b["qpt"] is not None else 3 * [np.nan] for b in index], dtype=np.double)
+
+        with open(filepath, "wb") as fh:
+            np.savez(fh,
+                stat_key=self._get_stat_key(),
+                dord=np.array([b["dord"] for b in index], dtype=np.int64),
+                nel=np.array([b["nel"] for b in index], dtype=np.int64),
+                start=np.array([b["start"] for b in index], dtype=np.int64),
+                stop=np.array([b["stop"] for b in index], dtype=np.int64),
+                qpts=qpts.reshape(nb, 3),
+                qpt_lines=np.array([b["qpt_line"] or "" for b in index]),
+                ncols=np.array([v.shape[1] if v.size else 0 for v in values], dtype=np.int64),
+                values=np.concatenate([v.ravel() for v in values]) if nb else np.empty(0),
+            )
+
+        return filepath
+
+    def _load_cache(self):
+        """
+        Initialize the block index and the values from the sidecar file.
+        Return False if the file does not exist or is not up-to-date.
+        """
+        if not os.path.exists(self.cache_path): return False
+        try:
+            with np.load(self.cache_path) as data:
+                if not np.array_equal(data["stat_key"], self._get_stat_key()): return False
+                index, values, vstart = [], data["values"], 0
+                columns = zip(data["dord"], data["nel"], data["start"], data["stop"],
+                              data["qpts"], data["qpt_lines"], data["ncols"])
+                for i, (dord, nel, start, stop, qpt, qpt_line, ncols) in enumerate(columns):
+                    qpt_line = str(qpt_line) or None
+                    index.append(dict(dord=int(dord), nel=int(nel), start=int(start), stop=int(stop),
+                                      qpt=None if qpt_line is None else qpt.tolist(), qpt_line=qpt_line))
+                    vstop = vstart + nel * ncols
+                    self._values_cache[i] = values[vstart:vstop].reshape(nel, ncols)
+                    vstart = vstop
+
+        except Exception as exc:
+            cprint("Exception while reading DDB sidecar file: %s\n%s" % (self.cache_path, str(exc)), "yellow")
+            self._values_cache = {}
+            return False
+
+        self.block_index = index
+        return True
+
     @lazy_property
     def blocks(self):
         """
@@ -558,9 +729,9 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         """
         Total energy in eV. None if not available.
         """
-        for block in self.blocks:
+        for iblock, block in enumerate(self.block_index):
             if block["dord"] == 0:
-                ene_ha = float(block["data"][1].split()[0].replace("D", "E"))
+                ene_ha = self.get_block_values(iblock)[0, 0]
                 return Energy(ene_ha, "Ha").to("eV")
         return None
 
@@ -570,16 +741,15 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         Cartesian forces in eV / Ang
         None if not available i.e. if the GS DDB has not been merged.
         """
-        for block in self.blocks:
+        for iblock, block in enumerate(self.block_index):
             if block["dord"] != 1: continue
             natom = len(self.structure)
             fred = np.empty((natom, 3))
-            for line in block["data"][1:]:
-                idir, ipert, fval = line.split()[:3]
-                # F --> C
-                idir, ipert = int(idir) - 1, int(ipert) - 1
-                if ipert < natom:
-                    fred[ipert, idir] = float(fval.replace("D", "E"))
+            values = self.get_block_values(iblock)
+            # F --> C
+            idir, ipert = values[:, 0].astype(np.int) - 1, values[:, 1].astype(np.int) - 1
+            atm = ipert < natom
+            fred[ipert[atm], idir[atm]] = values[atm, 2]
 
             # Fred stores d(etotal)/d(xred)
             # this array has *not* been corrected by enforcing
@@ -604,7 +774,7 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         """
         |Stress| tensor in cartesian coordinates (GPa units). None if not available.
         """
-        for block in self.blocks:
+        for iblock, block in enumerate(self.block_index):
             if block["dord"] != 1: continue
             svoigt = np.empty(6)
             # Abinit stress is in cart coords and Ha/Bohr**3
@@ -618,11 +788,10 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
                 (2, shear): 4,
                 (3, shear): 5}
 
-            for line in block["data"][1:]:
-                idir, ipert, fval = line.split()[:3]
+            for idir, ipert, fval in self.get_block_values(iblock)[:, :3]:
                 idp = int(idir), int(ipert)
                 if idp in dirper2voigt:
-                    svoigt[dirper2voigt[idp]] = float(fval.replace("D", "E"))
+                    svoigt[dirper2voigt[idp]] = fval
 
             # Convert from Ha/Bohr^3 to GPa
             return Stress.from_voigt(svoigt * abu.HaBohr3_GPa)
@@ -1486,6 +1655,27 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         path = os.path.join(task.workdir, "anaddb.nc")
         return Raman.from_file(path)
 
+    def get_phonon_interpolator(self, ngqpt=None, asr=2, chneut=1, dipdip=1, **kwargs):
+        """
+        Build a :class:`PhononInterpolator` that performs the Fourier interpolation of the
+        dynamical matrices in-process i.e. without invoking anaddb.
+        Useful to screen many DDB files as the frequencies for batches of q-points are computed with numpy.
+
+        Args:
+            ngqpt: Number of divisions for the q-mesh in the DDB file. Auto-detected if None (default).
+            asr, chneut, dipdip: Anaddb input variable. See official documentation.
+            kwargs: Passed to :class:`PhononInterpolator`
+
+        Example:
+
+            phinterp = ddb.get_phonon_interpolator()
+            phbands = phinterp.get_phbands_along_path(ndivsm=20)
+            phdos = phinterp.get_phdos(nqsmall=10)
+        """
+        from abipy.dfpt.phinterp import PhononInterpolator
+        phinterp = PhononInterpolator.from_ddb(self, ngqpt=ngqpt, asr=asr, chneut=chneut, dipdip=dipdip, **kwargs)
+        return phinterp
+
     def _run_anaddb_task(self, anaddb_input, mpi_procs, workdir, manager, verbose):
         """
         Execute an |AnaddbInput| via the shell. Return |AnaddbTask|.
@@ -2043,6 +2233,33 @@ class DielectricTensorGenerator(Has_Structure):
         return fig
 
 
+def _get_phmodes_row(ddb, qpoint, units="eV", asr=2, chneut=1, dipdip=1, with_geo=True, with_spglib=True, funcs=None):
+    """
+    Call anaddb to compute the phonon frequencies at qpoint.
+    Return dictionary with results. Used by DdbRobot.get_dataframe_at_qpoint
+    """
+    d = OrderedDict()
+
+    # Call anaddb to get the phonon frequencies. Note lo_to_splitting set to False.
+    phbands = ddb.anaget_phmodes_at_qpoint(qpoint=qpoint, asr=asr, chneut=chneut,
+       dipdip=dipdip, lo_to_splitting=False)
+    # [nq, nmodes] array
+    freqs = phbands.phfreqs[0, :] * phfactor_ev2units(units)
+
+    d.update({"mode" + str(i): freqs[i] for i in range(len(freqs))})
+
+    # Add convergence parameters
+    d.update(ddb.params)
+
+    # Add info on structure.
+    if with_geo:
+        d.update(phbands.structure.get_dict4pandas(with_spglib=with_spglib))
+
+    # Execute functions.
+    if funcs is not None: d.update(exec_funcs(funcs, ddb))
+    return d
+
+
 class DdbRobot(Robot):
     """
     This robot analyzes the results contained in multiple DDB_ files.
@@ -2170,7 +2387,8 @@ class DdbRobot(Robot):
     #    return retcode, results
 
     def get_dataframe_at_qpoint(self, qpoint=None, units="eV", asr=2, chneut=1, dipdip=1,
-                                with_geo=True, with_spglib=True, abspath=False, funcs=None):
+                                with_geo=True, with_spglib=True, abspath=False, funcs=None,
+                                executor=None, max_workers=None):
         """
         Call anaddb to compute the phonon frequencies at a single q-point using the DDB files treated
         by the robot and the given anaddb input arguments. LO-TO splitting is not included.
@@ -2187,6 +2405,8 @@ class DdbRobot(Robot):
             funcs: Function or list of functions to execute to add more data to the DataFrame.
                 Each function receives a |DdbFile| object and returns a tuple (key, value)
                 where key is a string with the name of column and value is the value to be inserted.
+            executor, max_workers: Passed to ``Robot.map`` to run anaddb in parallel
+                e.g. executor="threads".
 
         Return: |pandas-DataFrame|
         """
@@ -2199,34 +2419,9 @@ class DdbRobot(Robot):
             if any(np.any(ddb.qpoints[0] != qpoint) for ddb in self.abifiles):
                 raise ValueError("All the q-points in the DDB files must be equal")
 
-        rows, row_names = [], []
-        for i, (label, ddb) in enumerate(self.items()):
-            row_names.append(label)
-            d = OrderedDict()
-            #d = {aname: getattr(ddb, aname) for aname in attrs}
-            #d.update({"qpgap": mdf.get_qpgap(spin, kpoint)})
-
-            # Call anaddb to get the phonon frequencies. Note lo_to_splitting set to False.
-            phbands = ddb.anaget_phmodes_at_qpoint(qpoint=qpoint, asr=asr, chneut=chneut,
-               dipdip=dipdip, lo_to_splitting=False)
-            # [nq, nmodes] array
-            freqs = phbands.phfreqs[0, :] * phfactor_ev2units(units)
-
-            d.update({"mode" + str(i): freqs[i] for i in range(len(freqs))})
-
-            # Add convergence parameters
-            d.update(ddb.params)
-
-            # Add info on structure.
-            if with_geo:
-                d.update(phbands.structure.get_dict4pandas(with_spglib=with_spglib))
-
-            # Execute functions.
-            if funcs is not None: d.update(self._exec_funcs(funcs, ddb))
-            rows.append(d)
-
-        row_names = row_names if not abspath else self._to_relpaths(row_names)
-        return pd.DataFrame(rows, index=row_names, columns=list(rows[0].keys()))
+        func = partial(_get_phmodes_row, qpoint=qpoint, units=units, asr=asr, chneut=chneut, dipdip=dipdip,
+                       with_geo=with_geo, with_spglib=with_spglib, funcs=funcs)
+        return self.map_to_dataframe(func, abspath=abspath, executor=executor, max_workers=max_workers)
 
     def anaget_phonon_plotters(self, **kwargs):
         r"""
@@ -2262,7 +2457,7 @@ class DdbRobot(Robot):
         return dict2namedtuple(phbands_plotter=phbands_plotter, phdos_plotter=phdos_plotter)
 
     def anacompare_elastic(self, ddb_header_keys=None, with_structure=True, with_spglib=True,
-                           with_path=False, manager=None, verbose=0, **kwargs):
+                           with_path=False, manager=None, verbose=0, executor=None, max_workers=None, **kwargs):
         """
         Compute elastic and piezoelectric properties for all DDBs in the robot and build DataFrame.
 
@@ -2274,16 +2469,16 @@ class DdbRobot(Robot):
             with_path: True to add DDB path to dataframe
             manager: |TaskManager| object. If None, the object is initialized from the configuration file
             verbose: verbosity level. Set it to a value > 0 to get more information
+            executor, max_workers: Passed to ``Robot.map``. Use executor="threads" to run anaddb in parallel.
             kwargs: Keyword arguments passed to `ddb.anaget_elastic`.
 
         Return: DataFrame and list of ElastData objects.
         """
         ddb_header_keys = [] if ddb_header_keys is None else list_strings(ddb_header_keys)
-        df_list, elastdata_list = [], []
-        for label, ddb in self.items():
+
+        def compute(ddb):
             # Invoke anaddb to compute elastic data.
             edata = ddb.anaget_elastic(verbose=verbose, manager=manager, **kwargs)
-            elastdata_list.append(edata)
 
             # Build daframe with properties derived from the elastic tensor.
             df = edata.get_elastic_properties_dataframe()
@@ -2300,14 +2495,19 @@ class DdbRobot(Robot):
 
             # Add path to the DDB file.
             if with_path: df["ddb_path"] = ddb.filepath
+            return df, edata
 
+        df_list, elastdata_list = [], []
+        for label, (df, edata) in self.map(compute, executor=executor, max_workers=max_workers):
             df_list.append(df)
+            elastdata_list.append(edata)
 
         # Concatenate dataframes.
         return dict2namedtuple(df=pd.concat(df_list, ignore_index=True),
                                elastdata_list=elastdata_list)
 
-    def anacompare_becs(self, ddb_header_keys=None, chneut=1, tol=1e-3, with_path=False, verbose=0):
+    def anacompare_becs(self, ddb_header_keys=None, chneut=1, tol=1e-3, with_path=False, verbose=0,
+                        executor=None, max_workers=None):
         """
         Compute Born effective charges for all DDBs in the robot and build DataFrame.
         with Voigt indices as columns + metadata. Useful for convergence studies.
@@ -2319,6 +2519,7 @@ class DdbRobot(Robot):
             tol: Elements below this value are set to zero.
             with_path: True to add DDB path to dataframe
             verbose: verbosity level. Set it to a value > 0 to get more information
+            executor, max_workers: Passed to ``Robot.map``. Use executor="threads" to run anaddb in parallel.
 
         Return: ``namedtuple`` with the following attributes::
 
@@ -2326,11 +2527,10 @@ class DdbRobot(Robot):
             becs_list: list of Becs objects.
         """
         ddb_header_keys = [] if ddb_header_keys is None else list_strings(ddb_header_keys)
-        df_list, becs_list = [], []
-        for label, ddb in self.items():
+
+        def compute(ddb):
             # Invoke anaddb to compute Becs
             _, becs = ddb.anaget_epsinf_and_becs(chneut=chneut, verbose=verbose)
-            becs_list.append(becs)
             df = becs.get_voigt_dataframe(tol=tol)
 
             # Add metadata to the dataframe.
@@ -2341,14 +2541,19 @@ class DdbRobot(Robot):
 
             # Add path to the DDB file.
             if with_path: df["ddb_path"] = ddb.filepath
+            return df, becs
 
+        df_list, becs_list = [], []
+        for label, (df, becs) in self.map(compute, executor=executor, max_workers=max_workers):
             df_list.append(df)
+            becs_list.append(becs)
 
         # Concatenate dataframes.
         return dict2namedtuple(df=pd.concat(df_list, ignore_index=True).sort_values(by="site_index"),
                                becs_list=becs_list)
 
-    def anacompare_epsinf(self, ddb_header_keys=None, chneut=1, tol=1e-3, with_path=False, verbose=0):
+    def anacompare_epsinf(self, ddb_header_keys=None, chneut=1, tol=1e-3, with_path=False, verbose=0,
+                          executor=None, max_workers=None):
         r"""
         Compute (eps^\inf) electronic dielectric tensor for all DDBs in the robot and build DataFrame.
         with Voigt indices as columns + metadata. Useful for convergence studies.
@@ -2360,6 +2565,7 @@ class DdbRobot(Robot):
             tol: Elements below this value are set to zero.
             with_path: True to add DDB path to dataframe
             verbose: verbosity level. Set it to a value > 0 to get more information
+            executor, max_workers: Passed to ``Robot.map``. Use executor="threads" to run anaddb in parallel.
 
         Return: ``namedtuple`` with the following attributes::
 
@@ -2367,11 +2573,10 @@ class DdbRobot(Robot):
             epsinf_list: List of |DielectricTensor| objects with eps^{inf}
         """
         ddb_header_keys = [] if ddb_header_keys is None else list_strings(ddb_header_keys)
-        df_list, epsinf_list = [], []
-        for label, ddb in self.items():
+
+        def compute(ddb):
             # Invoke anaddb to compute e_inf
             einf, _ = ddb.anaget_epsinf_and_becs(chneut=chneut, verbose=verbose)
-            epsinf_list.append(einf)
             df = einf.get_voigt_dataframe(tol=tol)
 
             # Add metadata to the dataframe.
@@ -2382,12 +2587,18 @@ class DdbRobot(Robot):
 
             # Add path to the DDB file.
             if with_path: df["ddb_path"] = ddb.filepath
+            return df, einf
+
+        df_list, epsinf_list = [], []
+        for label, (df, einf) in self.map(compute, executor=executor, max_workers=max_workers):
             df_list.append(df)
+            epsinf_list.append(einf)
 
         # Concatenate dataframes.
         return dict2namedtuple(df=pd.concat(df_list, ignore_index=True), epsinf_list=epsinf_list)
 
-    def anacompare_eps0(self, ddb_header_keys=None, asr=2, chneut=1, tol=1e-3, with_path=False, verbose=0):
+    def anacompare_eps0(self, ddb_header_keys=None, asr=2, chneut=1, tol=1e-3, with_path=False, verbose=0,
+                        executor=None, max_workers=None):
         """
         Compute (eps^0) dielectric tensor for all DDBs in the robot and build DataFrame.
         with Voigt indices as columns + metadata. Useful for convergence studies.
@@ -2399,6 +2610,7 @@ class DdbRobot(Robot):
             tol: Elements below this value are set to zero.
             with_path: True to add DDB path to dataframe
             verbose: verbosity level. Set it to a value > 0 to get more information
+            executor, max_workers: Passed to ``Robot.map``. Use executor="threads" to run anaddb in parallel.
 
         Return: ``namedtuple`` with the following attributes::
 
@@ -2407,12 +2619,10 @@ class DdbRobot(Robot):
             dgen_list: List of DielectricTensorGenerator.
         """
         ddb_header_keys = [] if ddb_header_keys is None else list_strings(ddb_header_keys)
-        df_list, eps0_list, dgen_list = [], [], []
-        for label, ddb in self.items():
+
+        def compute(ddb):
             # Invoke anaddb to compute e_0
             gen = ddb.anaget_dielectric_tensor_generator(asr=asr, chneut=chneut, dipdip=1, verbose=verbose)
-            dgen_list.append(gen)
-            eps0_list.append(gen.eps0)
             df = gen.eps0.get_voigt_dataframe(tol=tol)
 
             # Add metadata to the dataframe.
@@ -2425,8 +2635,13 @@ class DdbRobot(Robot):
 
             # Add path to the DDB file.
             if with_path: df["ddb_path"] = ddb.filepath
+            return df, gen
 
+        df_list, eps0_list, dgen_list = [], [], []
+        for label, (df, gen) in self.map(compute, executor=executor, max_workers=max_workers):
             df_list.append(df)
+            dgen_list.append(gen)
+            eps0_list.append(gen.eps0)
 
         # Concatenate dataframes.
         return dict2namedtuple(df=pd.concat(df_list, ignore_index=True),
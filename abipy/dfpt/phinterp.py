@@ -0,0 +1,428 @@
+# coding: utf-8
+"""
+Fourier interpolation of phonons from the dynamical matrices stored in the DDB file.
+
+This module provides a pure python/numpy implementation of the algorithm used by anaddb
+(ifcflag 1): the dynamical matrices on the ab-initio q-mesh are unfolded in the full BZ
+by symmetry, the long-range dipole-dipole part is removed with an Ewald summation
+and the short-range part is Fourier transformed to real space.
+Frequencies and eigenvectors for arbitrary q-points are then obtained by evaluating
+the Fourier series for batches of q-points without spawning anaddb.
+"""
+import itertools
+import numpy as np
+import abipy.core.abinit_units as abu
+
+from monty.collections import dict2namedtuple
+from abipy.core.kpoints import Kpath, KpointList, kpath_from_bounds_and_ndivsm, kmesh_from_mpdivs
+
+
+class PhononInterpolator(object):
+    """
+    Interpolate phonon frequencies and displacements with Fourier interpolation.
+    Internally, all the quantities are in atomic units (Hartree, Bohr, electron mass).
+
+    Usage example:
+
+    .. code-block:: python
+
+        with DdbFile("out_DDB") as ddb:
+            phinterp = PhononInterpolator.from_ddb(ddb, asr=2, chneut=1, dipdip=1)
+            phbands = phinterp.get_phbands_along_path(ndivsm=20)
+            phdos = phinterp.get_phdos(nqsmall=20)
+    """
+
+    @classmethod
+    def from_ddb(cls, ddb, ngqpt=None, asr=2, chneut=1, dipdip=1, **kwargs):
+        """
+        Build the object from a |DdbFile|.
+
+        Args:
+            ddb: |DdbFile| object or filepath.
+            ngqpt: q-mesh used to compute the IFCs. If None, ``ddb.guessed_ngqpt`` is used.
+            asr: Acoustic sum rule: 0 to disable, 1 for the asymmetric version, 2 for the symmetric version.
+            chneut: 1 to impose charge neutrality on the Born effective charges.
+            dipdip: 1 to treat the dipole-dipole interaction with the Ewald technique.
+                Requires Born effective charges and epsinf in the DDB.
+            kwargs: Passed to the constructor.
+        """
+        from abipy.dfpt.ddb import DdbFile
+        ddb = DdbFile.as_ddb(ddb)
+        structure, natom = ddb.structure, ddb.natom
+        h = ddb.header
+        amu = np.array([h.amu[i - 1] for i in np.reshape(h.typat, (-1,))])
+        ngqpt = ddb.guessed_ngqpt if ngqpt is None else np.array(ngqpt, dtype=np.int)
+
+        n = 3 * natom
+        dynmats = []
+        for qpoint in ddb.qpoints:
+            dm = ddb.get_dynmat_array(qpoint)
+            if not np.all(dm.mask[:n, :n]):
+                raise ValueError("DDB does not contain all the atomic perturbations for q-point: %s" % repr(qpoint))
+            dynmats.append(dm.dmat[:n, :n])
+
+        zeff, epsinf = None, None
+        if dipdip:
+            if not ddb.has_lo_to_data(select="all"):
+                raise ValueError("dipdip 1 requires Born effective charges and epsinf in the DDB file.\n" +
+                                 "Use dipdip=0 or complete the DDB.")
+            dm = ddb.get_dynmat_array(ddb.qindex([0, 0, 0]))
+            zion = np.array([h.zion[i - 1] for i in np.reshape(h.typat, (-1,))])
+            epsinf, zeff = zeff_epsinf_from_dmat(dm.dmat, ddb.structure.lattice.matrix * abu.Ang_Bohr, zion)
+            if chneut:
+                zeff -= zeff.mean(axis=0)
+
+        return cls(structure, amu, ngqpt, ddb.qpoints.frac_coords, dynmats,
+                   h.symrel, h.tnons, has_timrev=True, zeff=zeff, epsinf=epsinf, asr=asr, **kwargs)
+
+    def __init__(self, structure, amu, ngqpt, qpoints, dynmats, symrel, tnons, has_timrev=True,
+                 zeff=None, epsinf=None, asr=2, ewald_lambda=None, atol=1e-5):
+        """
+        Args:
+            structure: |Structure| object.
+            amu: Atomic masses (atomic mass units) for each atom.
+            ngqpt: Divisions of the (unshifted) q-mesh used to compute the IFCs.
+            qpoints: [nq, 3] array with the reduced coordinates of the (irreducible) q-points.
+            dynmats: [nq, 3*natom, 3*natom] complex array with the dynamical matrices
+                in reduced coordinates as stored in the DDB (Ha units).
+            symrel: [nsym, 3, 3] symmetry operations in reduced coordinates (real space).
+            tnons: [nsym, 3] fractional translations.
+            has_timrev: True if time-reversal symmetry can be used.
+            zeff: [natom, 3, 3] Born effective charges in Cartesian coordinates. (electric field, displacement)
+            epsinf: [3, 3] electronic dielectric tensor in Cartesian coordinates.
+                The dipole-dipole part is treated only if both zeff and epsinf are given.
+            asr: Acoustic sum rule: 0 to disable, 1 for the asymmetric version, 2 for the symmetric version.
+            ewald_lambda: Ewald parameter (Bohr^-1). If None, a value is computed from the unit cell volume.
+            atol: Absolute tolerance used to compare reduced coordinates.
+        """
+        self.structure = structure
+        self.natom = natom = len(structure)
+        self.amu = np.reshape(amu, natom)
+        self.ngqpt = np.reshape(ngqpt, 3).astype(np.int)
+        self.atol = atol
+        self.asr = asr
+
+        # Lattice vectors and reciprocal lattice vectors (without 2pi) stored as rows in Bohr units.
+        self.rprimd = structure.lattice.matrix * abu.Ang_Bohr
+        self.gprimd = np.linalg.inv(self.rprimd).T
+        self.ucvol = abs(np.linalg.det(self.rprimd))
+        self.xred = np.array(structure.frac_coords)
+        self.xcart = np.matmul(self.xred, self.rprimd)
+
+        self.has_dipdip = zeff is not None and epsinf is not None
+        if self.has_dipdip:
+            self.zeff = np.reshape(zeff, (natom, 3, 3))
+            self.epsinf = np.reshape(epsinf, (3, 3))
+            if ewald_lambda is None:
+                ewald_lambda = 3.0 / self.ucvol ** (1 / 3)
+            self.ewald_lambda = ewald_lambda
+            self._gvecs = self._get_ewald_gvecs()
+
+        # Convert the dynamical matrices to Cartesian coordinates. Shape [nq, natom, 3, natom, 3]
+        qpoints = np.reshape(qpoints, (-1, 3))
+        dynmats = np.reshape(dynmats, (len(qpoints), natom, 3, natom, 3))
+        cart_dynmats = np.einsum("ai,qkiKj,bj->qkaKb", self.gprimd.T, dynmats, self.gprimd.T)
+
+        # Unfold the dynamical matrices in the full BZ and remove the dipole-dipole part.
+        qmesh, dmesh = self._unfold_dynmats(qpoints, cart_dynmats, np.reshape(symrel, (-1, 3, 3)),
+                                            np.reshape(tnons, (-1, 3)), has_timrev)
+        if self.has_dipdip:
+            dmesh -= self.get_dipdip_dynmat(qmesh)
+
+        # Enforce the acoustic sum rule on the short-range part.
+        iq0 = 0
+        assert np.all(np.abs(qmesh[iq0]) < atol)
+        asr_corr = dmesh[iq0].real.sum(axis=2)
+        if asr == 2:
+            asr_corr = 0.5 * (asr_corr + asr_corr.transpose(0, 2, 1))
+        elif asr != 1:
+            asr_corr[...] = 0
+        for iat in range(natom):
+            dmesh[:, iat, :, iat, :] -= asr_corr[iat]
+        self.asr_corr = asr_corr
+
+        self._build_ifcs(dmesh)
+
+    def _unfold_dynmats(self, qpoints, cart_dynmats, symrel, tnons, has_timrev):
+        """
+        Use the symmetries of the crystal to reconstruct the dynamical matrices on the full q-mesh.
+        Return (qmesh, dmesh) where qmesh is [nqbz, 3] array with reduced coordinates
+        and dmesh is the [nqbz, natom, 3, natom, 3] array with the Cartesian dynamical matrices.
+        The q-points in qmesh are ordered as the points of the FFT mesh in C order.
+        """
+        natom, ngqpt = self.natom, self.ngqpt
+        nqbz = np.prod(ngqpt)
+        qmesh = np.reshape(np.array(list(itertools.product(*[range(n) for n in ngqpt]))) / ngqpt, (nqbz, 3))
+
+        rmat = self.rprimd.T
+        rinv = np.linalg.inv(rmat)
+        symrec = np.array([np.linalg.inv(s).T for s in symrel])
+        symcart = np.array([rmat @ s @ rinv for s in symrel])
+
+        # Find the permutation of the atoms and the lattice vectors induced by each operation:
+        # S xred_k + t = xred_{perm[k]} + lvec[k]
+        nsym = len(symrel)
+        perms = np.empty((nsym, natom), dtype=np.int)
+        lvecs = np.empty((nsym, natom, 3))
+        for isym in range(nsym):
+            rot_xred = self.xred @ symrel[isym].T + tnons[isym]
+            diff = rot_xred[:, None, :] - self.xred[None, :, :]
+            match = np.all(np.abs(diff - np.rint(diff)) < self.atol, axis=-1)
+            if not np.all(match.sum(axis=1) == 1):
+                raise ValueError("Cannot find atom mapping for symmetry operation %d" % isym)
+            perms[isym] = np.argmax(match, axis=1)
+            lvecs[isym] = np.rint(diff[np.arange(natom), perms[isym]])
+
+        # Find the IBZ point and the operation that generates each point of the mesh.
+        times = [1, -1] if has_timrev else [1]
+        found = np.zeros(nqbz, dtype=np.bool)
+        dmesh = np.empty((nqbz, natom, 3, natom, 3), dtype=np.complex)
+
+        for iq, qpt in enumerate(qpoints):
+            for isym, itime in itertools.product(range(nsym), range(len(times))):
+                sq = symrec[isym] @ qpt
+                gidx = times[itime] * sq * ngqpt
+                if np.any(np.abs(gidx - np.rint(gidx)) > self.atol * ngqpt.max()): continue
+                gidx = np.rint(gidx).astype(np.int) % ngqpt
+                iqbz = np.ravel_multi_index(gidx, ngqpt)
+                if found[iqbz]: continue
+                found[iqbz] = True
+
+                # D(Sq)_{perm[k], perm[k']} = exp(2 pi i Sq.(L_k' - L_k)) S D(q)_{k,k'} S^T
+                perm, lv = perms[isym], lvecs[isym]
+                phase = np.exp(2j * np.pi * (lv @ sq))
+                phase = phase[None, :] * phase[:, None].conj()
+                dmat = np.einsum("ai,kiKj,bj->kaKb", symcart[isym], cart_dynmats[iq], symcart[isym])
+                dmat = dmat * phase[:, None, :, None]
+                dmat_perm = np.empty_like(dmat)
+                dmat_perm[np.ix_(perm, range(3), perm, range(3))] = dmat
+                dmesh[iqbz] = dmat_perm if times[itime] == 1 else dmat_perm.conj()
+
+        if not np.all(found):
+            raise ValueError("Cannot reconstruct the dynamical matrices on the %s q-mesh from the q-points in the DDB.\n"
+                             "Missing points: %s" % (str(ngqpt), str(qmesh[~found])))
+
+        return qmesh, dmesh
+
+    def _build_ifcs(self, dmesh):
+        """
+        Fourier transform the short-range dynamical matrices on the q-mesh to real space.
+        The lattice vectors are selected with Wigner-Seitz weights so that each pair of atoms
+        interacts through the vectors that minimize the interatomic distance in the supercell.
+        """
+        natom, ngqpt = self.natom, self.ngqpt
+        # IFCs on the supercell: ifc[L, k, a, k', b] with L the lattice vector in [0, ngqpt).
+        dmesh = np.reshape(dmesh, tuple(ngqpt) + (natom, 3, natom, 3))
+        ifc = np.fft.fftn(dmesh, axes=(0, 1, 2)) / np.prod(ngqpt)
+        ifc = np.reshape(ifc.real, (-1, natom, 3, natom, 3))
+
+        # Find the images of the supercell lattice vectors in the Wigner-Seitz cell centered on each atom.
+        lvecs = np.array(list(itertools.product(*[range(n) for n in ngqpt])))
+        shifts = np.array(list(itertools.product(range(-2, 3), repeat=3))) * ngqpt
+        images = lvecs[:, None, :] + shifts[None, :, :]
+        # Shape [nl, nimg, natom, natom]
+        dist = np.linalg.norm(
+            (images @ self.rprimd)[:, :, None, None, :] + self.xcart[None, None, None, :, :] -
+            self.xcart[None, None, :, None, :], axis=-1)
+        dmin = dist.min(axis=1, keepdims=True)
+        is_min = dist <= dmin * (1 + 1e-5) + 1e-8
+        weights = is_min / is_min.sum(axis=1, keepdims=True)
+
+        il, iimg = np.nonzero(np.any(is_min, axis=(2, 3)))
+        self.rpts = images[il, iimg]
+        # Short-range IFCs multiplied by the weights. Shape [nrpt, natom, 3, natom, 3]
+        wght = weights[il, iimg]
+        self.ifc_sr = wght[:, :, None, :, None] * ifc[il]
+
+    def _get_ewald_gvecs(self, tol=1e-14):
+        """Reciprocal lattice vectors (reduced coordinates) entering the Ewald summation."""
+        # Gaussian damping exp(-K.eps.K / (4 lambda^2)) < tol
+        eps_min = np.linalg.eigvalsh(self.epsinf).min()
+        kmax = 2 * self.ewald_lambda * np.sqrt(-np.log(tol) / eps_min)
+        # Add the length of the longest q-vector in the BZ.
+        gcart = 2 * np.pi * self.gprimd
+        kmax += np.linalg.norm(gcart, axis=1).sum()
+        nmax = [int(np.ceil(kmax / (2 * np.pi) * np.linalg.norm(self.rprimd[i]))) for i in range(3)]
+        gvecs = np.array(list(itertools.product(*[range(-n, n + 1) for n in nmax])))
+        return gvecs[np.linalg.norm(gvecs @ gcart, axis=1) <= kmax]
+
+    def get_dipdip_dynmat(self, qpoints):
+        """
+        Dipole-dipole part of the dynamical matrix computed with the Ewald technique
+        (X. Gonze and C. Lee, PRB 55, 10355 (1997)), reciprocal space contribution only.
+        The real-space term is short-ranged and it is therefore included in the interatomic force constants.
+
+        Args:
+            qpoints: [nq, 3] array with reduced coordinates.
+
+        Return: [nq, natom, 3, natom, 3] complex array in Cartesian coordinates.
+        """
+        qpoints = np.reshape(qpoints, (-1, 3))
+        cmat = self._ewald_sum(qpoints)
+        # Impose the acoustic sum rule on the dipole-dipole part.
+        if not hasattr(self, "_dipdip_q0"):
+            self._dipdip_q0 = self._ewald_sum(np.zeros((1, 3)))[0].real.sum(axis=2)
+        for iat in range(self.natom):
+            cmat[:, iat, :, iat, :] -= self._dipdip_q0[iat]
+
+        return cmat
+
+    def _ewald_sum(self, qpoints):
+        """Reciprocal space part of the Ewald sum for the dipole-dipole interaction."""
+        natom = self.natom
+        gcart = 2 * np.pi * self.gprimd
+        cmat = np.empty((len(qpoints), natom, 3, natom, 3), dtype=np.complex)
+
+        for iq, qpt in enumerate(qpoints):
+            # Use q in [-1/2, 1/2[ so that the sphere of G-vectors is centered on the BZ.
+            qpt = qpt - np.rint(qpt)
+            kcart = (qpt + self._gvecs) @ gcart
+            keps = np.einsum("ga,ab,gb->g", kcart, self.epsinf, kcart)
+            # Exclude K = 0 (non-analytical term)
+            ok = keps > 1e-12
+            kcart, keps = kcart[ok], keps[ok]
+            gauss = np.exp(-keps / (4 * self.ewald_lambda ** 2)) / keps
+            # (K.Z_k)_a exp(i K.tau_k)
+            kz = np.einsum("gc,kca->gka", kcart, self.zeff) * np.exp(1j * kcart @ self.xcart.T)[:, :, None]
+            cmat[iq] = np.einsum("g,gka,gKb->kaKb", gauss, kz, kz.conj())
+
+        return cmat * (4 * np.pi / self.ucvol)
+
+    def get_dynmat(self, qpoints):
+        """
+        Interpolated dynamical matrices in Cartesian coordinates (Ha/Bohr^2) for a batch of q-points.
+
+        Args:
+            qpoints: [nq, 3] array with reduced coordinates.
+
+        Return: [nq, 3*natom, 3*natom] complex array
+        """
+        qpoints = np.reshape(qpoints, (-1, 3))
+        nq, n = len(qpoints), 3 * self.natom
+        # D(q) = sum_R w(R) IFC(R) exp(2 pi i q.R)
+        phases = np.exp(2j * np.pi * qpoints @ self.rpts.T)
+        dmat = np.reshape(phases @ np.reshape(self.ifc_sr, (len(self.rpts), -1)), (nq, n, n))
+        if self.has_dipdip:
+            dmat += np.reshape(self.get_dipdip_dynmat(qpoints), (nq, n, n))
+
+        # Make it hermitian
+        return 0.5 * (dmat + dmat.transpose(0, 2, 1).conj())
+
+    def get_phfreqs_displ(self, qpoints, chunksize=2000):
+        """
+        Compute phonon frequencies and displacements for a batch of q-points.
+        The computation is done in chunks of ``chunksize`` q-points to limit the memory.
+
+        Return: namedtuple with:
+
+            phfreqs: [nq, 3*natom] array with frequencies in eV.
+            phdispl_cart: [nq, 3*natom, 3*natom] array with the Cartesian displacements in Angstrom.
+                The last dimension stores the cartesian components.
+        """
+        qpoints = np.reshape(qpoints, (-1, 3))
+        nq, n = len(qpoints), 3 * self.natom
+        phfreqs = np.empty((nq, n))
+        phdispl_cart = np.empty((nq, n, n), dtype=np.complex)
+
+        sqrt_mass = np.repeat(np.sqrt(self.amu * abu.amu_emass), 3)
+        for start in range(0, nq, chunksize):
+            stop = min(start + chunksize, nq)
+            dmat = self.get_dynmat(qpoints[start:stop]) / np.outer(sqrt_mass, sqrt_mass)
+            w2, eigvec = np.linalg.eigh(dmat)
+            phfreqs[start:stop] = np.sign(w2) * np.sqrt(np.abs(w2)) * abu.Ha_eV
+            # Displacements are eigvec / sqrt(M). Mode index first.
+            phdispl_cart[start:stop] = eigvec.transpose(0, 2, 1) / sqrt_mass * abu.Bohr_Ang
+
+        return dict2namedtuple(phfreqs=phfreqs, phdispl_cart=phdispl_cart)
+
+    def get_phbands(self, qpoints, kpath=False):
+        """
+        Build |PhononBands| object with the interpolated frequencies for a list of q-points.
+
+        Args:
+            qpoints: [nq, 3] array with reduced coordinates.
+            kpath: True if the q-points define a path. Used to build a |Kpath| object.
+        """
+        from abipy.dfpt.phonons import PhononBands
+        qpoints = np.reshape(qpoints, (-1, 3))
+        r = self.get_phfreqs_displ(qpoints)
+        cls = Kpath if kpath else KpointList
+        qlist = cls(self.structure.reciprocal_lattice, frac_coords=qpoints, weights=None, names=None)
+        if kpath:
+            for qpoint in qlist:
+                qpoint.set_name(self.structure.findname_in_hsym_stars(qpoint))
+
+        amu = {site.specie.Z: m for site, m in zip(self.structure, self.amu)}
+        kwargs = {}
+        if self.has_dipdip:
+            kwargs = dict(epsinf=self.epsinf, zcart=self.zeff)
+
+        return PhononBands(self.structure, qlist, r.phfreqs, r.phdispl_cart, amu=amu, **kwargs)
+
+    def get_phbands_along_path(self, ndivsm=20, qptbounds=None):
+        """
+        Interpolate the phonon band structure along a path.
+
+        Args:
+            ndivsm: Number of division for the smallest segment of the path.
+            qptbounds: Boundaries of the path. If None, the path is automatically generated from the structure.
+        """
+        if qptbounds is None: qptbounds = self.structure.calc_kptbounds()
+        qpoints = kpath_from_bounds_and_ndivsm(qptbounds, ndivsm, self.structure)
+        return self.get_phbands(qpoints, kpath=True)
+
+    def get_phdos(self, nqsmall=10, ngqpt=None, width=4e-4, step=1e-4):
+        """
+        Compute the phonon DOS with the gaussian method on a Gamma-centered q-mesh.
+
+        Args:
+            nqsmall: Number of divisions for the smallest vector of the reciprocal lattice.
+            ngqpt: Divisions of the q-mesh. Has precedence over nqsmall.
+            width: Standard deviation (eV) of the gaussian.
+            step: Energy step (eV) of the linear mesh.
+
+        Return: |PhononDos| object.
+        """
+        from abipy.dfpt.phonons import PhononDos
+        if ngqpt is None: ngqpt = self.structure.calc_ngkpt(nqsmall)
+        qpoints = kmesh_from_mpdivs(ngqpt, shifts=[0, 0, 0], order="unit_cell")
+        phfreqs = self.get_phfreqs_displ(qpoints).phfreqs
+
+        nw = int(1 + (phfreqs.max() - phfreqs.min() + 10 * width) // step)
+        mesh = np.arange(nw) * step + phfreqs.min() - 5 * width
+        values = np.zeros(nw)
+        for chunk in np.array_split(phfreqs.ravel(), max(1, phfreqs.size // 10000)):
+            values += np.exp(-0.5 * ((mesh[:, None] - chunk[None, :]) / width) ** 2).sum(axis=1)
+        values /= len(qpoints) * width * np.sqrt(2 * np.pi)
+
+        return PhononDos(mesh, values)
+
+
+def zeff_epsinf_from_dmat(dmat, rprimd, zion):
+    """
+    Extract the electronic dielectric tensor and the Born effective charges in Cartesian coordinates
+    from the dense representation of the DDB matrix at Gamma.
+
+    Args:
+        dmat: [3*mpert, 3*mpert] complex array in the Abinit reduced coordinates (see ``DdbFile.get_dynmat_array``).
+        rprimd: Lattice vectors (rows) in Bohr.
+        zion: Ionic charge of each atom. The DDB stores the electronic contribution to the effective charges.
+
+    Return: (epsinf, zeff) where zeff has shape [natom, 3, 3] and the first index in the 3x3 matrix
+        is the direction of the electric field.
+    """
+    # d/dE_cart = rprimd / (2 pi) d/dE_red, d/du_cart = gprimd d/du_red
+    natom = len(zion)
+    ucvol = abs(np.linalg.det(rprimd))
+    emat = rprimd.T / (2 * np.pi)
+    umat = np.linalg.inv(rprimd)
+    ie = 3 * (natom + 1)
+    d2ee = dmat[ie:ie+3, ie:ie+3].real
+    epsinf = np.eye(3) - 4 * np.pi / ucvol * (emat @ d2ee @ emat.T)
+
+    zeff = np.empty((natom, 3, 3))
+    for iat in range(natom):
+        d2eu = dmat[ie:ie+3, 3*iat:3*iat+3].real
+        zeff[iat] = emat @ d2eu @ umat.T + zion[iat] * np.eye(3)
+
+    return epsinf, zeff
@@ -25,6 +25,7 @@ from abipy.iotools import ETSF_Reader
 from abipy.tools import duck
 from abipy.tools.numtools import gaussian, sort_and_groupby
 from abipy.tools.plotting import add_fig_kwargs, get_ax_fig_plt, set_axlims, get_axarray_fig_plt, set_visible, set_ax_xylabels
+from .thermo import harmonic_thermo, trapz_weights
 from .phtk import match_eigenvectors, get_dyn_mat_eigenvec, open_file_phononwebsite, NonAnalyticalPh
 
 __all__ = [
@@ -2486,6 +2487,47 @@ class PhononDos(Function1D):
 
         return fig
 
+    @lazy_property
+    def _harmonic_weights(self):
+        """
+        Positive frequencies and integration weights (DOS x trapezoidal weights) used to compute
+        the thermodynamic properties in the harmonic approximation.
+        """
+        w, gw = self.mesh[self.iw0:], self.values[self.iw0:]
+        if w[0] < 1e-12:
+            w, gw = w[1:], gw[1:]
+        return w, gw * trapz_weights(w)
+
+    def get_harmonic_thermo(self, tstart=5, tstop=300, num=50):
+        """
+        Compute all the thermodynamic properties in the harmonic approximation for different temperatures.
+        Zero point energy is included in the free energy and in the internal energy.
+
+        Args:
+            tstart: The starting value (in Kelvin) of the temperature mesh.
+            tstop: The end value (in Kelvin) of the mesh.
+            num (int): optional Number of samples to generate. Default is 50.
+
+        Return: `namedtuple` with the following attributes:
+
+                tmesh: numpy array with the list of temperatures. Shape (num).
+                free_energy: free energy, in eV.
+                internal_energy: internal energy, in eV.
+                entropy: entropy, in eV/K.
+                cv: constant-volume specific heat, in eV/K.
+                zpe: zero point energy in eV.
+        """
+        tmesh = np.linspace(tstart, tstop, num=num)
+        w, weights = self._harmonic_weights
+        thermo = harmonic_thermo(w, weights, tmesh)
+
+        # Use the zero point energy integrated on the full mesh for T = 0.
+        zpe = float(self.zero_point_energy)
+        thermo.free_energy[tmesh == 0] = zpe
+        thermo.internal_energy[tmesh == 0] = zpe
+
+        return thermo._replace(zpe=zpe)
+
     def get_internal_energy(self, tstart=5, tstop=300, num=50):
         """
         Returns the internal energy, in eV, in the harmonic approximation for different temperatures
@@ -2498,22 +2540,8 @@ class PhononDos(Function1D):
 
         Return: |Function1D| object with U(T) + ZPE.
         """
-        tmesh = np.linspace(tstart, tstop, num=num)
-        w, gw = self.mesh[self.iw0:], self.values[self.iw0:]
-        if w[0] < 1e-12:
-            w, gw = self.mesh[self.iw0+1:], self.values[self.iw0+1:]
-        coth = lambda x: 1.0 / np.tanh(x)
-
-        vals = np.empty(len(tmesh))
-        for it, temp in enumerate(tmesh):
-            if temp == 0:
-                vals[it] = self.zero_point_energy
-            else:
-                wd2kt = w / (2 * abu.kb_eVK * temp)
-                vals[it] = 0.5 * np.trapz(w * coth(wd2kt) * gw, x=w)
-            #print(vals[it])
-
-        return Function1D(tmesh, vals)
+        thermo = self.get_harmonic_thermo(tstart=tstart, tstop=tstop, num=num)
+        return Function1D(thermo.tmesh, thermo.internal_energy)
 
     def get_entropy(self, tstart=5, tstop=300, num=50):
         """
@@ -2526,21 +2554,8 @@ class PhononDos(Function1D):
 
         Return: |Function1D| object with S(T).
         """
-        tmesh = np.linspace(tstart, tstop, num=num)
-        w, gw = self.mesh[self.iw0:], self.values[self.iw0:]
-        if w[0] < 1e-12:
-            w, gw = self.mesh[self.iw0+1:], self.values[self.iw0+1:]
-        coth = lambda x: 1.0 / np.tanh(x)
-
-        vals = np.empty(len(tmesh))
-        for it, temp in enumerate(tmesh):
-            if temp == 0:
-                vals[it] = 0
-            else:
-                wd2kt = w / (2 * abu.kb_eVK * temp)
-                vals[it] = np.trapz((wd2kt * coth(wd2kt) - np.log(2 * np.sinh(wd2kt))) * gw, x=w)
-
-        return Function1D(tmesh, abu.kb_eVK * vals)
+        thermo = self.get_harmonic_thermo(tstart=tstart, tstop=tstop, num=num)
+        return Function1D(thermo.tmesh, thermo.entropy)
 
     def get_free_energy(self, tstart=5, tstop=300, num=50):
         """
@@ -2554,10 +2569,8 @@ class PhononDos(Function1D):
 
         Return: |Function1D| object with F(T) = U(T) + ZPE - T x S(T)
         """
-        uz = self.get_internal_energy(tstart=tstart, tstop=tstop, num=num)
-        s = self.get_entropy(tstart=tstart, tstop=tstop, num=num)
-
-        return Function1D(uz.mesh, uz.values - s.mesh * s.values)
+        thermo = self.get_harmonic_thermo(tstart=tstart, tstop=tstop, num=num)
+        return Function1D(thermo.tmesh, thermo.free_energy)
 
     def get_cv(self, tstart=5, tstop=300, num=50):
         """
@@ -2571,21 +2584,8 @@ class PhononDos(Function1D):
 
         Return: |Function1D| object with C_v(T).
         """
-        tmesh = np.linspace(tstart, tstop, num=num)
-        w, gw = self.mesh[self.iw0:], self.values[self.iw0:]
-        if w[0] < 1e-12:
-            w, gw = self.mesh[self.iw0+1:], self.values[self.iw0+1:]
-        csch2 = lambda x: 1.0 / (np.sinh(x) ** 2)
-
-        vals = np.empty(len(tmesh))
-        for it, temp in enumerate(tmesh):
-            if temp == 0:
-                vals[it] = 0
-            else:
-                wd2kt = w / (2 * abu.kb_eVK * temp)
-                vals[it] = np.trapz(wd2kt ** 2 * csch2(wd2kt) * gw, x=w)
-
-        return Function1D(tmesh, abu.kb_eVK * vals)
+        thermo = self.get_harmonic_thermo(tstart=tstart, tstop=tstop, num=num)
+        return Function1D(thermo.tmesh, thermo.cv)
 
     @add_fig_kwargs
     def plot_harmonic_thermo(self, tstart=5, tstop=300, num=50, units="eV", formula_units=None,
@@ -2622,14 +2622,15 @@ class PhononDos(Function1D):
         # don't show the last ax if num_plots is odd.
         if num_plots % ncols != 0: ax_mat[-1, -1].axis("off")
 
+        # Compute all the thermodynamic quantities in one go.
+        thermo = self.get_harmonic_thermo(tstart=tstart, tstop=tstop, num=num)
+
         for iax, (qname, ax) in enumerate(zip(quantities, ax_mat.flat)):
             irow, icol = divmod(iax, ncols)
-            # Compute thermodynamic quantity associated to qname.
-            f1d = getattr(self, "get_" + qname)(tstart=tstart, tstop=tstop, num=num)
-            ys = f1d.values
-            if formula_units is not None: ys /= formula_units
+            ys = getattr(thermo, qname)
+            if formula_units is not None: ys = ys / formula_units
             if units == "Jmol": ys = ys * abu.e_Cb * abu.Avogadro
-            ax.plot(f1d.mesh, ys)
+            ax.plot(thermo.tmesh, ys)
 
             ax.set_title(qname, fontsize=fontsize)
             ax.grid(True)
@@ -3964,14 +3965,16 @@ class PhononDosPlotter(NotebookWriter):
         # don't show the last ax if num_plots is odd.
         if num_plots % ncols != 0: ax_mat[-1, -1].axis("off")
 
+        # Compute all the thermodynamic quantities in one go for each phdos.
+        thermos = [phdos.get_harmonic_thermo(tstart=tstart, tstop=tstop, num=num)
+                   for phdos in self._phdoses_dict.values()]
+
         for iax, (qname, ax) in enumerate(zip(quantities, ax_mat.flat)):
-            for i, (label, phdos) in enumerate(self._phdoses_dict.items()):
-                # Compute thermodynamic quantity associated to qname.
-                f1d = getattr(phdos, "get_" + qname)(tstart=tstart, tstop=tstop, num=num)
-                ys = f1d.values
-                if formula_units != 1: ys /= formula_units
+            for label, thermo in zip(self._phdoses_dict.keys(), thermos):
+                ys = getattr(thermo, qname)
+                if formula_units != 1: ys = ys / formula_units
                 if units == "Jmol": ys = ys * abu.e_Cb * abu.Avogadro
-                ax.plot(f1d.mesh, ys, label=label)
+                ax.plot(thermo.tmesh, ys, label=label)
 
             ax.set_title(qname, fontsize=fontsize)
             ax.grid(True)
@@ -14,6 +14,7 @@ from abipy.electrons.gsr import GsrFile
 from abipy.dfpt.ddb import DdbFile
 from abipy.dfpt.phonons import PhononBandsPlotter, PhononDos, PhdosFile
 from abipy.dfpt.gruneisen import GrunsNcFile
+from abipy.dfpt.thermo import harmonic_thermo
 
 
 class AbstractQHA(metaclass=abc.ABCMeta):
@@ -510,12 +511,7 @@ class QHA(AbstractQHA):
         Returns:
             A numpy array of `num` values of the vibrational contribution to the free energy
         """
-        f = np.zeros((self.nvols, num))
-
-        for i, dos in enumerate(self.doses):
-            f[i] = dos.get_free_energy(tstart, tstop, num).values
-
-        return f
+        return self.get_thermodynamic_properties(tstart=tstart, tstop=tstop, num=num).free_energy
 
     def get_thermodynamic_properties(self, tstart=0, tstop=800, num=100):
         """
@@ -535,21 +531,7 @@ class QHA(AbstractQHA):
                 entropy: entropy, in eV/K. Shape (nvols, num).
                 zpe: zero point energy in eV. Shape (nvols).
         """
-        tmesh = np.linspace(tstart, tstop, num)
-        cv = np.zeros((self.nvols, num))
-        free_energy = np.zeros((self.nvols, num))
-        entropy = np.zeros((self.nvols, num))
-        internal_energy = np.zeros((self.nvols, num))
-        zpe = np.zeros(self.nvols)
-
-        for i, d in enumerate(self.doses):
-            cv[i] = d.get_cv(tstart, tstop, num).values
-            free_energy[i] = d.get_free_energy(tstart, tstop, num).values
-            entropy[i] = d.get_entropy(tstart, tstop, num).values
-            zpe[i] = d.zero_point_energy
-
-        return dict2namedtuple(tmesh=tmesh, cv=cv, free_energy=free_energy, entropy=entropy,
-                               zpe=zpe)
+        return _stack_doses_thermo(self.doses, tstart, tstop, num)
 
 
 class QHA3PF(AbstractQHA):
@@ -624,23 +606,36 @@ class QHA3PF(AbstractQHA):
                 entropy: entropy, in eV/K. Shape (nvols, num).
                 zpe: zero point energy in eV. Shape (nvols).
         """
-        tmesh = np.linspace(tstart, tstop, num)
-        cv = self._get_thermodynamic_prop("cv", tstart, tstop, num)
-        free_energy = self._get_thermodynamic_prop("free_energy", tstart, tstop, num)
-        entropy = self._get_thermodynamic_prop("entropy", tstart, tstop, num)
-        zpe = np.zeros(self.nvols)
+        thermo = _stack_doses_thermo(self.doses, tstart, tstop, num)
+
+        return dict2namedtuple(tmesh=thermo.tmesh, cv=self._fit_volumes(thermo.cv),
+                               free_energy=self._fit_volumes(thermo.free_energy),
+                               entropy=self._fit_volumes(thermo.entropy), zpe=self._fit_volumes(thermo.zpe))
 
-        for i, dos in zip(self.ind_doses, self.doses):
-            zpe[i] = dos.zero_point_energy
+    def _fit_volumes(self, prop_doses):
+        """
+        Helper function to extend the values of a thermodynamic property computed with the doses to all the volumes.
+        The values for the volumes without phonon DOS are obtained with a polynomial fit, all the temperatures
+        are fitted at once.
+
+        Args:
+            prop_doses: Numpy array with shape (ndoses, ...) with the values of the property for the doses.
+
+        Returns:
+            Numpy array with the values of the property at the different volumes with shape (nvols, ...).
+        """
+        prop_doses = np.asarray(prop_doses)
+        p = np.zeros((self.nvols,) + prop_doses.shape[1:])
+        p[self.ind_doses] = prop_doses
 
         dos_vols = self.volumes[self.ind_doses]
         missing_vols = self.volumes[self._ind_energy_only]
 
-        fit_params = np.polyfit(dos_vols, zpe[self.ind_doses], self.fit_degree)
-        zpe[self._ind_energy_only] = np.poly1d(fit_params)(missing_vols)
+        fit_params = np.polyfit(dos_vols, prop_doses.reshape(len(dos_vols), -1), self.fit_degree)
+        fitted = np.dot(np.vander(missing_vols, self.fit_degree + 1), fit_params)
+        p[self._ind_energy_only] = fitted.reshape((len(missing_vols),) + prop_doses.shape[1:])
 
-        return dict2namedtuple(tmesh=tmesh, cv=cv, free_energy=free_energy, entropy=entropy,
-                               zpe=zpe)
+        return p
 
     def _get_thermodynamic_prop(self, name, tstart, tstop, num):
         """
@@ -648,7 +643,7 @@ class QHA3PF(AbstractQHA):
 
         Args:
             name: name of the property to calculate. Possible values in "internal_energy",
-                "free_energy", "entropy", "c_v".
+                "free_energy", "entropy", "cv".
             tstart: The starting value (in Kelvin) of the temperature mesh.
             tstop: The end value (in Kelvin) of the mesh.
             num: int, optional Number of samples to generate. Default is 100.
@@ -657,22 +652,8 @@ class QHA3PF(AbstractQHA):
             Numpy array with the values of the thermodynamic properties at the different
             volumes with size (nvols, num).
         """
-        prop_doses = np.array([getattr(dos, "get_" + name)(tstart, tstop, num).values for dos in self.doses])
-
-        p = np.zeros((self.nvols, num))
-
-        for i, prop_dos in zip(self.ind_doses, prop_doses):
-            p[i] = prop_dos
-
-        dos_vols = self.volumes[self.ind_doses]
-        missing_vols = self.volumes[self._ind_energy_only]
-
-        # generate fit objects from the known dos values
-        for i_temp in range(num):
-            fit_params = np.polyfit(dos_vols, prop_doses[:, i_temp], self.fit_degree)
-            p[self._ind_energy_only, i_temp] = np.poly1d(fit_params)(missing_vols)
-
-        return p
+        thermo = _stack_doses_thermo(self.doses, tstart, tstop, num)
+        return self._fit_volumes(getattr(thermo, name))
 
     def get_vib_free_energies(self, tstart=0, tstop=800, num=100):
         """
@@ -770,23 +751,14 @@ class QHA3P(AbstractQHA):
                 zpe: zero point energy in eV. Shape (nvols).
         """
         w = self.fitted_frequencies
-
         tmesh = np.linspace(tstart, tstop, num)
         weights = self.grun.doses['qpoints'].weights
 
-        free_energy = np.zeros((self.nvols, num))
-        cv = np.zeros((self.nvols, num))
-        entropy = np.zeros((self.nvols, num))
-        zpe = np.zeros(self.nvols)
-
-        for i in range(self.nvols):
-            free_energy[i] = [get_free_energy(w[i], weights, t) for t in tmesh]
-            cv[i] = [get_cv(w[i], weights, t) for t in tmesh]
-            entropy[i] = [get_entropy(w[i], weights, t) for t in tmesh]
-            zpe[i] = get_zero_point_energy(w, weights)
+        # All the volumes, temperatures, q-points and branches are computed at once.
+        thermo = harmonic_thermo(w.reshape(self.nvols, -1), _qpoint_weights(w[0], weights).reshape(-1), tmesh)
 
-        return dict2namedtuple(tmesh=tmesh, cv=cv, free_energy=free_energy, entropy=entropy,
-                               zpe=zpe)
+        return dict2namedtuple(tmesh=tmesh, cv=thermo.cv, free_energy=thermo.free_energy,
+                               entropy=thermo.entropy, zpe=thermo.zpe)
 
     @lazy_property
     def fitted_frequencies(self):
@@ -828,17 +800,28 @@ class QHA3P(AbstractQHA):
         Returns:
             A numpy array of `num` values of the vibrational contribution to the free energy
         """
-        w = self.fitted_frequencies
+        return self.get_thermodynamic_properties(tstart=tstart, tstop=tstop, num=num).free_energy
 
-        tmesh = np.linspace(tstart, tstop, num)
-        weights = self.grun.doses['qpoints'].weights
 
-        f = np.zeros((self.nvols, num))
+def _stack_doses_thermo(doses, tstart, tstop, num):
+    """
+    Compute the thermodynamic properties in the harmonic approximation for a list of |PhononDos|.
+    Return `namedtuple` with arrays of shape (ndoses, num) and zpe with shape (ndoses).
+    """
+    thermos = [dos.get_harmonic_thermo(tstart, tstop, num) for dos in doses]
+
+    return dict2namedtuple(tmesh=thermos[0].tmesh,
+                           cv=np.array([t.cv for t in thermos]),
+                           free_energy=np.array([t.free_energy for t in thermos]),
+                           internal_energy=np.array([t.internal_energy for t in thermos]),
+                           entropy=np.array([t.entropy for t in thermos]),
+                           zpe=np.array([t.zpe for t in thermos]))
 
-        for i in range(self.nvols):
-            f[i] = [get_free_energy(w[i], weights, t) for t in tmesh]
 
-        return f
+def _qpoint_weights(w, weights):
+    """Broadcast the weights of the q-points (first axis of w) to the shape of w."""
+    weights = np.asarray(weights)
+    return np.broadcast_to(weights.reshape(weights.shape + (1,) * (w.ndim - 1)), w.shape)
 
 
 def get_free_energy(w, weights, t):
@@ -850,13 +833,8 @@ def get_free_energy(w, weights, t):
          weights: the weights of the q-points
          t: the temperature
     """
-    wdkt = w / (abu.kb_eVK * t)
-
-    # if w=0 set fe=0
-    fe = np.choose(w > 0, (0, w / 2 + abu.kb_eVK * t * np.log(1 - np.exp(-wdkt))))
-    ind = np.where(w >= 0)
-
-    return np.dot(weights[ind[0]], fe[ind]).sum()
+    w = np.asarray(w)
+    return harmonic_thermo(w.reshape(-1), _qpoint_weights(w, weights).reshape(-1), [t]).free_energy[0]
 
 
 def get_cv(w, weights, t):
@@ -868,13 +846,8 @@ def get_cv(w, weights, t):
          weights: the weights of the q-points
          t: the temperature
     """
-    wdkt = w / (abu.kb_eVK * t)
-
-    # if w=0 set cv=0
-    cv = np.choose(w > 0, (0, abu.kb_eVK * wdkt ** 2 * np.exp(wdkt) / (np.exp(wdkt) - 1) ** 2))
-    ind = np.where(w >= 0)
-
-    return np.dot(weights[ind[0]], cv[ind]).sum()
+    w = np.asarray(w)
+    return harmonic_thermo(w.reshape(-1), _qpoint_weights(w, weights).reshape(-1), [t]).cv[0]
 
 
 def get_zero_point_energy(w, weights):
@@ -885,10 +858,8 @@ def get_zero_point_energy(w, weights):
          w: the phonon frequencies
          weights: the weights of the q-points
     """
-    zpe = np.choose(w > 0, (0, w / 2))
-    ind = np.where(w >= 0)
-
-    return np.dot(weights[ind[0]], zpe[ind]).sum()
+    w = np.asarray(w)
+    return harmonic_thermo(w.reshape(-1), _qpoint_weights(w, weights).reshape(-1), []).zpe
 
 
 def get_entropy(w, weights, t):
@@ -900,13 +871,8 @@ def get_entropy(w, weights, t):
          weights: the weights of the q-points
          t: the temperature
     """
-    wd2kt = w / (2 * abu.kb_eVK * t)
-    coth = lambda x: 1.0 / np.tanh(x)
-
-    s = np.choose(w > 0, (0, w*coth(wd2kt) / 2 / t - abu.kb_eVK * np.log(2 * np.sinh(wd2kt))))
-    ind = np.where(w >= 0)
-
-    return np.dot(weights[ind[0]], s[ind]).sum()
+    w = np.asarray(w)
+    return harmonic_thermo(w.reshape(-1), _qpoint_weights(w, weights).reshape(-1), [t]).entropy[0]
 
 
 class AbstractQmeshAnalyzer(metaclass=abc.ABCMeta):
@@ -96,11 +96,33 @@ class DdbTest(AbipyTest):
 
             assert ddb.replace_block_for_qpoint(ddb.qpoints[0], blocks[0]["data"])
 
+            # Test block index and vectorized decoding.
+            assert len(ddb.block_index) == 1
+            assert ddb.block_index[0]["dord"] == 2 and ddb.block_index[0]["nel"] == 36
+            assert ddb.block_index[0]["qpt"] == [0.25, 0, 0]
+            values = ddb.get_block_values(0)
+            assert values.shape == (36, 6)
+            self.assert_almost_equal(values[0], [1, 1, 1, 1, 0.80977066582497E+01, -0.46347282336361E-16])
+            dm = ddb.get_dynmat_array(ddb.qpoints[0])
+            assert dm.dmat.shape == (3 * (ddb.natom + 6), 3 * (ddb.natom + 6))
+            assert dm.mask.sum() == 36
+            self.assert_almost_equal(dm.dmat[5, 5], 0.49482344898401E+01 - 0.44885664256253E-17j)
+
+            # Test binary sidecar.
+            cache_path = ddb.write_cache(filepath=self.get_tmpname(suffix=".npz"))
+            assert os.path.exists(cache_path)
+
             # Write new DDB file.
             tmp_file = self.get_tmpname(text=True)
             ddb.write(tmp_file)
             with DdbFile(tmp_file) as new_ddb:
                 assert ddb.qpoints == new_ddb.qpoints
+                assert not os.path.exists(new_ddb.cache_path)
+                with DdbFile(tmp_file, use_cache=True) as cached_ddb:
+                    assert os.path.exists(cached_ddb.cache_path)
+                with DdbFile(tmp_file, use_cache=True) as cached_ddb:
+                    assert cached_ddb.qpoints == new_ddb.qpoints
+                    self.assert_equal(cached_ddb.get_block_values(0), new_ddb.get_block_values(0))
                 assert DdbFile.as_ddb(new_ddb) is new_ddb
                 # Call anaddb to check if we can read new DDB
                 phbands = new_ddb.anaget_phmodes_at_qpoint(qpoint=new_ddb.qpoints[0], verbose=1)
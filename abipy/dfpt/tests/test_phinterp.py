@@ -0,0 +1,59 @@
+"""Tests for phinterp module"""
+import os
+import numpy as np
+import abipy.data as abidata
+
+from abipy.core.testing import AbipyTest
+from abipy.dfpt.ddb import DdbFile
+from abipy.dfpt.phonons import PhononBands, PhononDos
+from abipy.dfpt.phinterp import PhononInterpolator
+
+
+class PhononInterpolatorTest(AbipyTest):
+
+    def test_alas_interpolation(self):
+        """Testing Fourier interpolation of AlAs phonons with dipole-dipole."""
+        ddb_path = os.path.join(abidata.dirpath, "refs", "alas_phonons", "trf2_3.ddb.out")
+        # Reference results computed by anaddb with asr 1, chneut 1, dipdip 1 on the 4x4x4 q-mesh.
+        ref_phbands = PhononBands.from_file(abidata.ref_file("trf2_5.out_PHBST.nc"))
+
+        with DdbFile(ddb_path) as ddb:
+            phinterp = ddb.get_phonon_interpolator(asr=1, chneut=1, dipdip=1)
+            assert isinstance(phinterp, PhononInterpolator)
+            assert phinterp.has_dipdip
+            self.assert_equal(phinterp.ngqpt, [4, 4, 4])
+            self.assert_almost_equal(np.diag(phinterp.epsinf), 3 * [9.76060478], decimal=5)
+            self.assert_almost_equal(phinterp.zeff[0], 2.11579216 * np.eye(3), decimal=5)
+
+            # Compare with anaddb.
+            phbands = phinterp.get_phbands(ref_phbands.qpoints.frac_coords)
+            assert phbands.phfreqs.shape == ref_phbands.phfreqs.shape
+            assert np.abs(phbands.phfreqs - ref_phbands.phfreqs).max() < 2e-3
+            assert np.abs(phbands.phfreqs - ref_phbands.phfreqs).mean() < 2e-4
+            # Frequencies on the ab-initio q-mesh must be exact.
+            self.assert_almost_equal(phinterp.get_phfreqs_displ([0.5, 0.5, 0]).phfreqs,
+                                     ref_phbands.phfreqs[20:21], decimal=6)
+            # Norm of the displacements (Angstrom).
+            self.assert_almost_equal(np.linalg.norm(phbands.phdispl_cart[20], axis=1),
+                                     np.linalg.norm(ref_phbands.phdispl_cart[20], axis=1), decimal=6)
+
+            # Acoustic modes at Gamma.
+            assert np.all(np.abs(phinterp.get_phfreqs_displ([0, 0, 0]).phfreqs[0, :3]) < 1e-6)
+
+            phbands = phinterp.get_phbands_along_path(ndivsm=5)
+            assert phbands.nqpt > 5
+            phdos = phinterp.get_phdos(ngqpt=[4, 4, 4])
+            assert isinstance(phdos, PhononDos)
+            self.assert_almost_equal(phdos.integral_value, 3 * ddb.natom, decimal=3)
+
+            # Without dipole-dipole.
+            phinterp = ddb.get_phonon_interpolator(asr=2, dipdip=0)
+            assert not phinterp.has_dipdip
+            self.assert_almost_equal(phinterp.get_phfreqs_displ([0.5, 0.5, 0]).phfreqs,
+                                     ref_phbands.phfreqs[20:21], decimal=6)
+
+    def test_incomplete_ddb(self):
+        """Testing PhononInterpolator with DDB that does not contain the full q-mesh."""
+        with DdbFile(os.path.join(abidata.dirpath, "refs", "alas_phonons", "trf2_3.ddb.out")) as ddb:
+            with self.assertRaises(ValueError):
+                ddb.get_phonon_interpolator(ngqpt=[8, 8, 8], dipdip=0)
@@ -389,6 +389,13 @@ class PhononDosTest(AbipyTest):
         f = phdos.get_free_energy()
         self.assert_almost_equal(f.values, (u - s.mesh * s.values).values)
 
+        # All the quantities in one go. T = 0 gives the zero point energy.
+        thermo = phdos.get_harmonic_thermo(tstart=0, tstop=300, num=51)
+        self.assert_almost_equal(thermo.internal_energy[1:], phdos.get_internal_energy(tstart=6, num=50).values)
+        self.assert_almost_equal(thermo.cv[1:], phdos.get_cv(tstart=6, num=50).values)
+        self.assert_almost_equal(thermo.free_energy[0], phdos.zero_point_energy)
+        assert thermo.entropy[0] == 0 and thermo.zpe == phdos.zero_point_energy
+
         self.assertAlmostEqual(phdos.debye_temp, 469.01524830328606)
         self.assertAlmostEqual(phdos.get_acoustic_debye_temp(len(ncfile.structure)), 372.2576492728813)
 
@@ -0,0 +1,51 @@
+"""Tests for thermo module."""
+import numpy as np
+import abipy.core.abinit_units as abu
+
+from abipy.core.testing import AbipyTest
+from abipy.dfpt.thermo import harmonic_thermo, trapz_weights
+
+
+class HarmonicThermoTest(AbipyTest):
+
+    def test_einstein_model(self):
+        """Testing harmonic_thermo with Einstein oscillators."""
+        # Two volumes with three modes. Zero and negative frequencies are ignored.
+        w = np.array([[0.01, 0.02, 0.0], [0.015, -0.001, 0.03]])
+        weights = np.array([1.0, 2.0, 3.0])
+        tmesh = [0, 100, 300, 800]
+        thermo = harmonic_thermo(w, weights, tmesh)
+        assert thermo.free_energy.shape == (2, 4) and thermo.zpe.shape == (2,)
+        self.assert_almost_equal(thermo.zpe, [0.025, 0.0525])
+
+        # Reference values computed with the textbook expressions.
+        for ivol, (wv, wts) in enumerate([(w[0, :2], weights[:2]), (w[1, [0, 2]], weights[[0, 2]])]):
+            for it, temp in enumerate(tmesh[1:], start=1):
+                x = wv / (2 * abu.kb_eVK * temp)
+                u = 0.5 * np.sum(wts * wv / np.tanh(x))
+                s = abu.kb_eVK * np.sum(wts * (x / np.tanh(x) - np.log(2 * np.sinh(x))))
+                cv = abu.kb_eVK * np.sum(wts * x ** 2 / np.sinh(x) ** 2)
+                self.assert_almost_equal(thermo.internal_energy[ivol, it], u)
+                self.assert_almost_equal(thermo.entropy[ivol, it], s)
+                self.assert_almost_equal(thermo.free_energy[ivol, it], u - temp * s)
+                self.assert_almost_equal(thermo.cv[ivol, it], cv)
+
+        # T = 0 limit.
+        self.assert_equal(thermo.free_energy[:, 0], thermo.zpe)
+        self.assert_equal(thermo.internal_energy[:, 0], thermo.zpe)
+        self.assert_equal(thermo.entropy[:, 0], 0)
+        self.assert_equal(thermo.cv[:, 0], 0)
+
+        # Chunks of modes must give the same results.
+        small = harmonic_thermo(w, weights, tmesh, max_memory_mb=1e-6)
+        self.assert_almost_equal(small.free_energy, thermo.free_energy)
+        self.assert_almost_equal(small.cv, thermo.cv)
+
+        with self.assertRaises(ValueError):
+            harmonic_thermo(w, weights, [-1, 100])
+
+    def test_trapz_weights(self):
+        """Testing trapz_weights."""
+        x = np.array([0.0, 0.1, 0.3, 0.35, 1.0])
+        f = np.sin(x)
+        self.assert_almost_equal(np.dot(trapz_weights(x), f), np.trapz(f, x=x))
@@ -0,0 +1,99 @@
+# coding: utf-8
+"""
+Thermodynamic properties of the harmonic crystal computed from phonon energies and integration weights.
+
+All the temperatures and all the sets of frequencies (e.g. the volumes used in the quasi-harmonic approximation)
+are treated with broadcasting operations. The modes are processed in chunks to limit the memory
+allocated for the (..., nmodes, ntemp) temporary arrays.
+"""
+import numpy as np
+import abipy.core.abinit_units as abu
+
+from monty.collections import dict2namedtuple
+
+
+__all__ = [
+    "harmonic_thermo",
+    "trapz_weights",
+]
+
+
+def trapz_weights(x):
+    """
+    Return the weights of the trapezoidal rule for the (possibly non-uniform) mesh ``x``
+    so that ``np.dot(trapz_weights(x), f) == np.trapz(f, x=x)``.
+    """
+    x = np.asarray(x)
+    wts = np.zeros(len(x))
+    if len(x) < 2: return wts
+    dx = np.diff(x)
+    wts[:-1] += dx / 2
+    wts[1:] += dx / 2
+    return wts
+
+
+def harmonic_thermo(w, weights, tmesh, max_memory_mb=256):
+    """
+    Compute the thermodynamic properties in the harmonic approximation for all the temperatures in ``tmesh``.
+    Modes with w <= 0 do not contribute. The values for T = 0 are given by the T --> 0 limit.
+
+    Args:
+        w: Array of shape (..., nmodes) with the phonon energies in eV. The leading dimensions
+            (e.g. the volumes) are preserved in the output.
+        weights: Integration weights broadcastable to the shape of w e.g. the weights of the q-points
+            or the values of the phonon DOS multiplied by the weights of the integration rule (see trapz_weights).
+        tmesh: List of temperatures in K.
+        max_memory_mb: Max memory (Mb) allocated for the temporary arrays.
+
+    Returns:
+        `namedtuple` with the following attributes. Arrays have shape (..., ntemp) unless specified otherwise.
+
+            tmesh: numpy array with the list of temperatures. Shape (ntemp).
+            free_energy: free energy, in eV, zero point energy included.
+            internal_energy: internal energy, in eV, zero point energy included.
+            entropy: entropy, in eV/K.
+            cv: constant-volume specific heat, in eV/K.
+            zpe: zero point energy in eV. Shape (...).
+    """
+    tmesh = np.reshape(np.array(tmesh, dtype=np.float), (-1,))
+    if np.any(tmesh < 0):
+        raise ValueError("Temperatures should be >= 0 but got: %s" % str(tmesh))
+
+    w = np.asarray(w, dtype=np.float)
+    shape, nmodes, ntemp = w.shape[:-1], w.shape[-1], len(tmesh)
+    weights = np.broadcast_to(weights, w.shape).reshape(-1, nmodes)
+    w = w.reshape(-1, nmodes)
+
+    # Remove the contribution of w <= 0. Use w = 1 to avoid divisions by zero.
+    weights = np.where(w > 0, weights, 0.0)
+    w = np.where(w > 0, w, 1.0)
+    zpe = np.einsum("lm,lm->l", weights, w) / 2
+
+    values = np.zeros((4, len(w), ntemp))
+    fe, ue, se, cv = values
+    has_t = tmesh > 0
+    kt = abu.kb_eVK * tmesh[has_t]
+
+    if len(kt):
+        # Six (nsets, chunk, ntemp) arrays are allocated for each chunk of modes.
+        chunksize = max(1, int(max_memory_mb * 1024 ** 2 / (6 * 8 * len(w) * len(kt))))
+        for start in range(0, nmodes, chunksize):
+            wc, wtc = w[:, start:start + chunksize, None], weights[:, start:start + chunksize]
+            y = wc / kt
+            # Stable expressions for log(1 - exp(-y)) and for the Bose-Einstein occupation 1 / (exp(y) - 1).
+            emy = np.exp(-y)
+            log1me = np.log1p(-emy)
+            occ = emy / -np.expm1(-y)
+            fe[:, has_t] += np.einsum("lm,lmt->lt", wtc, log1me) * kt
+            ue[:, has_t] += np.einsum("lm,lmt->lt", wtc, wc * occ)
+            se[:, has_t] += np.einsum("lm,lmt->lt", wtc, y * occ - log1me)
+            cv[:, has_t] += np.einsum("lm,lmt->lt", wtc, y ** 2 * occ * (occ + 1))
+
+    fe += zpe[:, None]
+    ue += zpe[:, None]
+    se *= abu.kb_eVK
+    cv *= abu.kb_eVK
+
+    shape = shape + (ntemp,)
+    return dict2namedtuple(tmesh=tmesh, free_energy=fe.reshape(shape), internal_energy=ue.reshape(shape),
+                           entropy=se.reshape(shape), cv=cv.reshape(shape), zpe=zpe.reshape(shape[:-1]))
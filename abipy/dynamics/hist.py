@@ -5,6 +5,7 @@ import numpy as np
 import pymatgen.core.units as units
 
 from collections import OrderedDict
+from functools import partial
 from monty.functools import lazy_property
 from monty.collections import AttrDict
 from monty.string import marquee, list_strings
@@ -13,7 +14,7 @@ from pymatgen.analysis.structure_analyzer import RelaxationAnalyzer
 from abipy.tools.plotting import add_fig_kwargs, get_ax_fig_plt, get_axarray_fig_plt, set_visible
 from abipy.core.structure import Structure
 from abipy.core.mixins import AbinitNcFile, NotebookWriter
-from abipy.abio.robots import Robot
+from abipy.abio.robots import Robot, exec_funcs
 from abipy.iotools import ETSF_Reader
 import abipy.core.abinit_units as abu
 
@@ -538,6 +539,31 @@ class HistFile(AbinitNcFile, NotebookWriter):
         return self._write_nb_nbpath(nb, nbpath)
 
 
+def _get_hist_row(hist, with_geo=True, with_spglib=True, attrs=(), funcs=None):
+    """Return dictionary with the final results in ``hist``. Used by HistRobot.get_dataframe."""
+    d = OrderedDict()
+
+    initial_fstas_dict = hist.get_fstats_dict(step=0)
+    final_fstas_dict = hist.get_fstats_dict(step=-1)
+
+    # Add info on structure.
+    if with_geo:
+        d.update(hist.final_structure.get_dict4pandas(with_spglib=with_spglib))
+
+    for aname in attrs:
+        if aname in ("final_fmin", "final_fmax", "final_fmean", "final_fstd", "final_drift",):
+            value = final_fstas_dict[aname.replace("final_", "")]
+        elif aname in ("initial_fmin", "initial_fmax", "initial_fmean", "initial_fstd", "initial_drift"):
+            value = initial_fstas_dict[aname.replace("initial_", "")]
+        else:
+            value = getattr(hist, aname, None)
+        d[aname] = value
+
+    # Execute functions
+    if funcs is not None: d.update(exec_funcs(funcs, hist))
+    return d
+
+
 class HistRobot(Robot):
     """
     This robot analyzes the results contained in multiple HIST.nc_ files.
@@ -559,7 +585,8 @@ class HistRobot(Robot):
         else:
             return str(s_df)
 
-    def get_dataframe(self, with_geo=True, index=None, abspath=False, with_spglib=True, funcs=None, **kwargs):
+    def get_dataframe(self, with_geo=True, index=None, abspath=False, with_spglib=True, funcs=None,
+                      executor=None, max_workers=None, **kwargs):
         """
         Return a |pandas-DataFrame| with the most important final results and the filenames as index.
 
@@ -568,6 +595,7 @@ class HistRobot(Robot):
             abspath: True if paths in index should be absolute. Default: Relative to getcwd().
             index: Index of the dataframe, if None, robot labels are used
             with_spglib: If True, spglib_ is invoked to get the space group symbol and number
+            executor, max_workers: Passed to ``Robot.map`` to process the files in parallel.
 
         kwargs:
             attrs:
@@ -586,35 +614,8 @@ class HistRobot(Robot):
             #"ecut", "pawecutdg", "tsmear", "nkpt",
         ] + kwargs.pop("attrs", [])
 
-        rows, row_names = [], []
-        for label, hist in self.items():
-            row_names.append(label)
-            d = OrderedDict()
-
-            initial_fstas_dict = hist.get_fstats_dict(step=0)
-            final_fstas_dict = hist.get_fstats_dict(step=-1)
-
-            # Add info on structure.
-            if with_geo:
-                d.update(hist.final_structure.get_dict4pandas(with_spglib=with_spglib))
-
-            for aname in attrs:
-                if aname in ("final_fmin", "final_fmax", "final_fmean", "final_fstd", "final_drift",):
-                    value = final_fstas_dict[aname.replace("final_", "")]
-                elif aname in ("initial_fmin", "initial_fmax", "initial_fmean", "initial_fstd", "initial_drift"):
-                    value = initial_fstas_dict[aname.replace("initial_", "")]
-                else:
-                    value = getattr(hist, aname, None)
-                d[aname] = value
-
-            # Execute functions
-            if funcs is not None: d.update(self._exec_funcs(funcs, hist))
-            rows.append(d)
-
-        import pandas as pd
-        row_names = row_names if not abspath else self._to_relpaths(row_names)
-        index = row_names if index is None else index
-        return pd.DataFrame(rows, index=index, columns=list(rows[0].keys()))
+        func = partial(_get_hist_row, with_geo=with_geo, with_spglib=with_spglib, attrs=attrs, funcs=funcs)
+        return self.map_to_dataframe(func, index=index, abspath=abspath, executor=executor, max_workers=max_workers)
 
     @property
     def what_list(self):
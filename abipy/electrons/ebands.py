@@ -24,11 +24,12 @@ from pymatgen.electronic_structure.core import Spin as PmgSpin
 from abipy.core.func1d import Function1D
 from abipy.core.mixins import Has_Structure, NotebookWriter
 from abipy.core.kpoints import (Kpoint, KpointList, Kpath, IrredZone, KSamplingInfo, KpointsReaderMixin,
-    Ktables, has_timrev_from_kptopt, map_grid2ibz) #, kmesh_from_mpdivs)
+    Ktables, has_timrev_from_kptopt, get_grid2ibz_map) #, kmesh_from_mpdivs)
 from abipy.core.structure import Structure
 from abipy.iotools import ETSF_Reader
 from abipy.tools import duck
-from abipy.tools.numtools import gaussian
+from abipy.tools.numtools import add_periodic_replicas
+from abipy.tools.dos import gaussian_dos, tetra_dos
 from abipy.tools.plotting import (set_axlims, add_fig_kwargs, get_ax_fig_plt, get_axarray_fig_plt,
     get_ax3d_fig_plt, rotate_ticklabels, set_visible, plot_unit_cell, set_ax_xylabels)
 
@@ -863,6 +864,18 @@ class ElectronBands(Has_Structure):
                 return True
         return False
 
+    @lazy_property
+    def grid2ibz_map(self):
+        """
+        Mapping between the points of the k-mesh in the unit cell (C-order) and the IBZ.
+        See :func:`abipy.core.kpoints.get_grid2ibz_map` for the meaning of the attributes.
+        Requires k-points in the IBZ of a Gamma-centered k-mesh.
+        """
+        if not self.supports_fermi_surface:
+            raise ValueError("BZ --> IBZ mapping requires k-points in the IBZ of a Gamma-centered k-mesh.")
+        mpdivs, _ = self.kpoints.mpdivs_shifts
+        return get_grid2ibz_map(self.structure, self.kpoints.frac_coords, mpdivs, self.has_timrev)
+
     def kindex(self, kpoint):
         """
         The index of the k-point in the internal list of k-points.
@@ -1545,6 +1558,7 @@ class ElectronBands(Has_Structure):
 
         Args:
             method: String defining the method for the computation of the DOS.
+                "gaussian" or "tetra" for the linear tetrahedron method (requires a Gamma-centered k-mesh in the IBZ).
             step: Energy step (eV) of the linear mesh.
             width: Standard deviation (eV) of the gaussian.
 
@@ -1559,15 +1573,16 @@ class ElectronBands(Has_Structure):
         nw = int(1 + (e_max - e_min) / step)
         mesh, step = np.linspace(e_min, e_max, num=nw, endpoint=True, retstep=True)
 
-        # TODO: Write cython version.
         dos = np.zeros((self.nsppol, nw))
         if method == "gaussian":
             for spin in self.spins:
-                for k, kpoint in enumerate(self.kpoints):
-                    weight = kpoint.weight
-                    for band in range(self.nband_sk[spin,k]):
-                        e = self.eigens[spin,k,band]
-                        dos[spin] += weight * gaussian(mesh, width, center=e)
+                weights = self.kpoints.weights[:, None] * self._get_band_mask(spin)
+                dos[spin] = gaussian_dos(mesh, self.eigens[spin], width, weights=weights)
+
+        elif method == "tetra":
+            bz2ibz, ngkpt = self._get_tetra_bz2ibz()
+            for spin in self.spins:
+                dos[spin] = tetra_dos(mesh, self.eigens[spin, bz2ibz], ngkpt, self.reciprocal_lattice.matrix)
 
         else:
             raise NotImplementedError("Method %s is not supported" % method)
@@ -1581,6 +1596,25 @@ class ElectronBands(Has_Structure):
         #print("ebands.fermie", self.fermie, "edos.fermie", edos.fermie)
         return edos
 
+    def _get_band_mask(self, spin):
+        """[nkpt, mband] array with 1 if the band is treated at this (spin, k-point) else 0."""
+        return np.arange(self.mband)[None, :] < self.nband_sk[spin][:, None]
+
+    def _get_tetra_bz2ibz(self):
+        """
+        Return the mapping between the points of the (unshifted) k-mesh in the full BZ and the IBZ
+        and the mesh divisions. Used to integrate with the tetrahedron method.
+        """
+        if not self.supports_fermi_surface:
+            raise ValueError("The tetrahedron method requires k-points in the IBZ of a Gamma-centered k-mesh.")
+        if np.any(self.nband_sk != self.mband):
+            raise ValueError("The tetrahedron method requires the same number of bands at each k-point.")
+
+        bz2ibz = self.grid2ibz_map.bz2ibz
+        if np.any(bz2ibz == -1):
+            raise ValueError("Cannot map all the points of the k-mesh onto the IBZ.")
+        return bz2ibz, self.kpoints.mpdivs_shifts[0]
+
     def compare_gauss_edos(self, widths, step=0.1):
         """
         Compute the electronic DOS with the Gaussian method for different values
@@ -1677,7 +1711,7 @@ class ElectronBands(Has_Structure):
             spin: Spin index.
             valence: Int or iterable with the valence indices.
             conduction: Int or iterable with the conduction indices.
-            method (str): String defining the integraion method.
+            method (str): String defining the integration method: "gaussian" or "tetra".
             step: Energy step (eV) of the linear mesh.
             width: Standard deviation (eV) of the gaussian.
             mesh: Frequency mesh to use. If None, the mesh is computed automatically from the eigenvalues.
@@ -1711,22 +1745,23 @@ class ElectronBands(Has_Structure):
         else:
             nw = len(mesh)
 
-        jdos = np.zeros(nw)
-
         # Normalize the occupation factors.
         full = 2.0 if self.nsppol == 1 else 1.0
 
+        # Transition energies and weights with shape [nkpt, nc, nv]
+        conduction, valence = list(conduction), list(valence)
+        eigens, occfacts = self.eigens[spin], self.occfacts[spin]
+        ediff = eigens[:, conduction, None] - eigens[:, None, valence]
+        fact = (1.0 - occfacts[:, conduction, None] / full) * (occfacts[:, None, valence] / full)
+
         if method == "gaussian":
-            for k, kpoint in enumerate(self.kpoints):
-                weight = kpoint.weight
-                for c in conduction:
-                    ec = self.eigens[spin, k, c]
-                    fc = 1.0 - self.occfacts[spin,k,c] / full
-                    for v in valence:
-                        ev = self.eigens[spin, k, v]
-                        fv = self.occfacts[spin, k, v] / full
-                        fact = weight * fv * fc
-                        jdos += fact * gaussian(mesh, width, center=ec-ev)
+            jdos = gaussian_dos(mesh, ediff, width, weights=self.kpoints.weights[:, None, None] * fact)
+
+        elif method == "tetra":
+            bz2ibz, ngkpt = self._get_tetra_bz2ibz()
+            nkbz = len(bz2ibz)
+            jdos = tetra_dos(mesh, ediff[bz2ibz].reshape(nkbz, -1), ngkpt, self.reciprocal_lattice.matrix,
+                             weights=fact[bz2ibz].reshape(nkbz, -1))
 
         else:
             raise NotImplementedError("Method %s is not supported" % str(method))
@@ -2358,7 +2393,13 @@ class ElectronBands(Has_Structure):
         self.get_ebands3d().to_bxsf(filepath)
 
     def get_ebands3d(self):
-        return ElectronBands3D(self.structure, self.kpoints, self.has_timrev, self.eigens, self.fermie)
+        """
+        Build |ElectronBands3D| with the energies in the full BZ.
+        Require k-points in IBZ and gamma-centered k-mesh.
+        """
+        grid2ibz_map = self.grid2ibz_map if self.supports_fermi_surface else None
+        return ElectronBands3D(self.structure, self.kpoints, self.has_timrev, self.eigens, self.fermie,
+                               grid2ibz_map=grid2ibz_map)
 
     def derivatives(self, spin, band, order=1, acc=4):
         """
@@ -3862,7 +3903,7 @@ class ElectronDosPlotter(NotebookWriter):
 
 class Bands3D(Has_Structure):
 
-    def __init__(self, structure, ibz, has_timrev, eigens, fermie):
+    def __init__(self, structure, ibz, has_timrev, eigens, fermie, grid2ibz_map=None):
         """
         This object reconstructs by symmetry the eigenvalues in the full BZ starting from the IBZ.
         Provides methods to extract and visualize isosurfaces.
@@ -3873,6 +3914,8 @@ class Bands3D(Has_Structure):
             has_timrev:
             eigens:
             fermie
+            grid2ibz_map: Mapping between the k-mesh and the IBZ computed by
+                :func:`abipy.core.kpoints.get_grid2ibz_map`. Computed from ibz if None.
         """
         self.ibz = ibz
         self._structure = structure
@@ -3896,8 +3939,19 @@ class Bands3D(Has_Structure):
             raise ValueError("\n".join(errors))
 
         # Xcrysden requires points in the unit cell (C-order)
-        # and the mesh must include the periodic images hence pbc=True.
-        self.uc2ibz = map_grid2ibz(self.structure, self.ibz.frac_coords, mpdivs, self.has_timrev, pbc=True)
+        # and the mesh must include the periodic images.
+        if grid2ibz_map is None:
+            grid2ibz_map = get_grid2ibz_map(self.structure, self.ibz.frac_coords, mpdivs, self.has_timrev)
+        self.grid2ibz_map = grid2ibz_map
+
+        def add_pbc(arr):
+            return add_periodic_replicas(np.reshape(arr, mpdivs)).flatten()
+
+        self.uc2ibz = add_pbc(grid2ibz_map.bz2ibz)
+        if np.any(self.uc2ibz == -1):
+            raise ValueError("Found %s/%s invalid entries in uc2ibz array. ngkpt: %s, has_timrev: %s" % (
+                (self.uc2ibz == -1).sum(), self.uc2ibz.size, str(mpdivs), self.has_timrev))
+        self.uc2isym, self.uc2tsign = add_pbc(grid2ibz_map.bz2isym), add_pbc(grid2ibz_map.bz2tsign)
         self.mpdivs = mpdivs
         self.kdivs = mpdivs + 1
         self.spacing = 1.0 / mpdivs
@@ -3977,26 +4031,68 @@ class Bands3D(Has_Structure):
             |numpy-array| with scalars in unit cell. shape is **always**: (nsppol, nband, nkbz)
         """
         # Symmetrize scalars unit cell grid: e_{TSk} = e_{k}
-        ucdata_sbk = np.empty((self.nsppol, self.nband, len(self.uc2ibz)))
-
         if inshape == "skb":
             scalars = np.reshape(scalars, (self.nsppol, len(self.ibz), self.nband))
-            for ikuc, ik_ibz in enumerate(self.uc2ibz):
-                ucdata_sbk[:, :, ikuc] = scalars[:, ik_ibz, :]
+            ucdata_sbk = scalars[:, self.uc2ibz, :].transpose(0, 2, 1)
         elif inshape == "sbk":
             scalars = np.reshape(scalars, (self.nsppol, self.nband, len(self.ibz)))
-            for ikuc, ik_ibz in enumerate(self.uc2ibz):
-                ucdata_sbk[:, :, ikuc] = scalars[:, :, ik_ibz]
+            ucdata_sbk = scalars[:, :, self.uc2ibz]
         else:
             raise ValueError("Wrong inshape: %s" % str(inshape))
 
-        return ucdata_sbk
+        return np.ascontiguousarray(ucdata_sbk, dtype=np.float)
+
+    def add_ucell_vectors(self, name, vectors):
+        """
+        Add vector quantities given in the unit cell.
+
+        Args:
+            name: keyword used to store vectors.
+            vectors: cartesian vectors with shape (nsppol, nband, nkbz, 3)
+        """
+        self.ucell_vectors[name] = np.reshape(vectors, self.ucdata_shape + (3,))
+
+    def add_ibz_vectors(self, name, vectors, inshape="skb"):
+        """
+        Add vector quantities given in the IBZ i.e. symmetrize values to get array in unit cell.
+
+        Args:
+            name: keyword used to store symmetrized values.
+            vectors: cartesian vectors in IBZ. See ``inshape`` for shape
+            inshape: shape of input vectors. "skb" if (nsppol, nkibz, nband, 3)
+            "sbk" for (nsppol, nband, nkibz, 3).
+        """
+        self.add_ucell_vectors(name, self.symmetrize_ibz_vectors(vectors, inshape=inshape))
+
+    @lazy_property
+    def cart_symrec(self):
+        """[nsym, 3, 3] array with the rotations in reciprocal space in cartesian coordinates."""
+        gmat = self.reciprocal_lattice.matrix
+        return np.matmul(np.matmul(gmat.T, self.grid2ibz_map.symrec), np.linalg.inv(gmat.T))
 
-    #def add_ucell_vectors(self, name, vectors, inshape="skb"):
-    #    self.ucell_vectors[name] = np.reshape(vectors, self.ucdata + (3,))
+    def symmetrize_ibz_vectors(self, vectors, inshape="skb"):
+        """
+        Symmetrize vector quantities given in the IBZ in cartesian coordinates e.g. group velocities.
+        Use v_{TSk} = T S v_{k} where T = -1 if time-reversal is used.
+
+        Args:
+            vectors: cartesian vectors in IBZ. See `inshape` for shape
+            inshape: shape of input vectors. "skb" if (nsppol, nkibz, nband, 3)
+            "sbk" for (nsppol, nband, nkibz, 3).
+
+        Return:
+            |numpy-array| with vectors in unit cell. shape is **always**: (nsppol, nband, nkbz, 3)
+        """
+        if inshape == "skb":
+            vectors = np.reshape(vectors, (self.nsppol, len(self.ibz), self.nband, 3))
+            vectors = vectors[:, self.uc2ibz].transpose(0, 2, 1, 3)
+        elif inshape == "sbk":
+            vectors = np.reshape(vectors, (self.nsppol, self.nband, len(self.ibz), 3))[:, :, self.uc2ibz]
+        else:
+            raise ValueError("Wrong inshape: %s" % str(inshape))
 
-    #def add_ibz_vectors(self, name, scalars, inshape="skb")
-    #    self.add_ucell_vectors(name, self.symmetrize_ibz_vectors(vectors, inshape=inshape))
+        rots = self.uc2tsign[:, None, None] * self.cart_symrec[self.uc2isym]
+        return np.einsum("kij,sbkj->sbki", rots, vectors)
 
     #def wsmap(self):
         #ws = -np.ones(ngkpt, dtype=np.int)
@@ -13,6 +13,7 @@ from pymatgen.core.periodic_table import Element
 from abipy.core.mixins import AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, NotebookWriter
 from abipy.electrons.ebands import ElectronsReader
 from abipy.tools.numtools import gaussian
+from abipy.tools.dos import gaussian_dos, tetra_dos
 from abipy.tools.plotting import set_axlims, get_axarray_fig_plt, add_fig_kwargs
 
 
@@ -53,6 +54,9 @@ class FatBandsFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, N
     # Markers used for up/down bands (collinear spin)
     marker_spin = {0: "^", 1: "v"}
 
+    # Max number of atoms whose weights are kept in memory by _get_atom_weights (LRU cache).
+    atom_weights_cache_size = 16
+
     # \U starts an eight-character Unicode escape. raw strings do not work in python2.7
     # and we need a latex symbol to avoid errors in matplotlib --> replace myuparrow --> uparrow
 
@@ -157,16 +161,23 @@ class FatBandsFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, N
             for i, symb in enumerate(self.symbols):
                 self.symbol2color[symb] = cmap(i/nsymb)
 
-        # Array dimensioned with natom. Set to true if iatom has been calculated
+        # Arrays dimensioned with natom.
+        # atom2isph gives the index of the atom in the dos_fractions arrays, -1 if not calculated.
+        # has_atom is set to true if iatom has been calculated.
         if self.prtdos == 3:
-            self.has_atom = np.zeros(self.natom, dtype=bool)
-            self.has_atom[self.iatsph] = True
+            self.atom2isph = np.full(self.natom, -1, dtype=np.int)
+            self.atom2isph[self.iatsph] = np.arange(self.natsph)
+            self.has_atom = self.atom2isph >= 0
+
+        # LRU cache with the weights read by _get_atom_weights. (key, iatom) --> array
+        self._atom_weights = OrderedDict()
 
     @lazy_property
     def wal_sbk(self):
         """
         |numpy-array| of shape [natom, mbesslang, nsppol, mband, nkpt]
         with the L-contributions. Present only if prtdos == 3.
+        Note that the full array is allocated. Use ``get_wl_atom`` to access the weights of a single atom.
         """
         return self._read_wal_sbk()
 
@@ -175,100 +186,111 @@ class FatBandsFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, N
         """
         |numpy-array| of shape [natom, mbesslang**2, nsppol, mband, nkpt]
         with the LM-contribution. Present only if prtdos == 3 and prtdosm != 0
+        Note that the full array is allocated. Use ``get_wlm_atom`` to access the weights of a single atom.
         """
         return self._read_walm_sbk(key="dos_fractions_m")
 
-    def _read_wal_sbk(self, key="dos_fractions"):
-        # Read dos_fraction_m from file and build wal_sbk array of shape
-        # [natom, lmax, nsppol, mband, nkpt].
+    def _check_weights_key(self, key):
+        if self.prtdos != 3:
+            raise RuntimeError("The file does not contain L-DOS since prtdos=%i" % self.prtdos)
+        if key == "dos_fractions_m" and self.prtdosm == 0:
+            raise RuntimeError("The file does not contain LM-DOS since prtdosm=%i" % self.prtdosm)
+
+    def _read_weights(self, key):
+        # Read key from file and build array of shape [natom, nlm, nsppol, mband, nkpt].
+        # where nlm is mbesslang for dos_fractions and mbesslang**2 for dos_fractions_m.
         #
-        # In abinit the **Fortran** array has shape
+        # In abinit the **Fortran** arrays have shape
         #   dos_fractions(nkpt,mband,nsppol,ndosfraction)
+        #   dos_fractions_m(nkpt,mband,nsppol,ndosfraction*mbesslang*m_dos_flag)
         #
         # Note that Abinit allows the users to select a subset of atoms with iatsph. Moreover the order
         # of the atoms could differ from the one in the structure even when natom == natsph (unlikely but possible).
-        # To keep it simple, the code always operate on an array dimensioned with the total number of atoms
-        # Entries that are not computed are set to zero and a warning is issued.
-        if self.prtdos != 3:
-            raise RuntimeError("The file does not contain L-DOS since prtdos=%i" % self.prtdos)
-
-        wshape = (self.natom, self.mbesslang, self.nsppol, self.mband, self.nkpt)
+        # To keep it simple, this method always returns an array dimensioned with the total number of atoms.
+        # Entries that are not computed are set to zero.
+        self._check_weights_key(key)
+        filedata = self.reader.read_value(key)
+        wshape = (self.natsph, filedata.shape[0] // self.natsph) + filedata.shape[1:]
+        filedata = np.reshape(filedata, wshape)
 
         if self.natsph == self.natom and np.all(self.iatsph == np.arange(self.natom)):
             # All atoms have been calculated and the order if ok.
-            wal_sbk = np.reshape(self.reader.read_value(key), wshape)
-
+            weights = filedata
         else:
             # Need to tranfer data. Note np.zeros.
-            wal_sbk = np.zeros(wshape)
-            if self.natsph == self.natom and np.any(self.iatsph != np.arange(self.natom)):
-                print("Will rearrange filedata since iatsp != [1, 2, ...])")
-                filedata = np.reshape(self.reader.read_value(key), wshape)
-                for i, iatom in enumerate(self.iatsph):
-                    wal_sbk[iatom] = filedata[i]
-            else:
+            if self.natsph < self.natom:
                 print("natsph < natom. Will set to zero the PJDOS contributions for the atoms that are not included.")
-                assert self.natsph < self.natom
-                filedata = np.reshape(self.reader.read_value(key),
-                                     (self.natsph, self.mbesslang, self.nsppol, self.mband, self.nkpt))
-                for i, iatom in enumerate(self.iatsph):
-                    wal_sbk[iatom] = filedata[i]
+            weights = np.zeros((self.natom,) + wshape[1:])
+            weights[self.iatsph] = filedata
 
         # In principle, this should never happen (unless there's a bug in Abinit or a
         # very bad cancellation between the FFT and the PS-PAW term (pawprtden=0).
-        num_neg = np.sum(wal_sbk < 0)
+        num_neg = np.sum(weights < 0)
         if num_neg:
             print("WARNING: There are %d (%.1f%%) negative entries in LDOS weights" % (
-                  num_neg, 100 * num_neg / wal_sbk.size))
+                  num_neg, 100 * num_neg / weights.size))
 
-        return wal_sbk
+        return weights
 
-    def _read_walm_sbk(self, key="dos_fraction_m"):
-        # Read dos_fraction_m from file and build walm_sbk array of shape
-        # [natom, lmax**2, nsppol, mband, nkpt].
-        #
-        # In abinit the **Fortran** array has shape
-        #   dos_fractions_m(nkpt,mband,nsppol,ndosfraction*mbesslang*m_dos_flag)
-        #
-        # Note that Abinit allows the users to select a subset of atoms with iatsph. Moreover the order
-        # of the atoms could differ from the one in the structure even when natom == natsph (unlikely but possible).
-        # To keep it simple, the code always operate on an array dimensioned with the total number of atoms
-        # Entries that are not computed are set to zero and a warning is issued.
-        if self.prtdos != 3:
-            raise RuntimeError("The file does not contain L-DOS since prtdos=%i" % self.prtdos)
-        if self.prtdosm == 0:
-            raise RuntimeError("The file does not contain LM-DOS since prtdosm=%i" % self.prtdosm)
+    def _read_wal_sbk(self, key="dos_fractions"):
+        # Read dos_fractions from file and build wal_sbk array of shape
+        # [natom, mbesslang, nsppol, mband, nkpt].
+        return self._read_weights(key)
 
-        wshape = (self.natom, self.mbesslang**2, self.nsppol, self.mband, self.nkpt)
+    def _read_walm_sbk(self, key="dos_fractions_m"):
+        # Read dos_fractions_m from file and build walm_sbk array of shape
+        # [natom, mbesslang**2, nsppol, mband, nkpt].
+        return self._read_weights(key)
 
-        if self.natsph == self.natom and np.all(self.iatsph == np.arange(self.natom)):
-            # All atoms have been calculated and the order if ok.
-            walm_sbk = np.reshape(self.reader.read_value(key), wshape)
-
-        else:
-            # Need to tranfer data. Note np.zeros.
-            walm_sbk = np.zeros(wshape)
-            if self.natsph == self.natom and np.any(self.iatsph != np.arange(self.natom)):
-                print("Will rearrange filedata since iatsp != [1, 2, ...])")
-                filedata = np.reshape(self.reader.read_value(key), wshape)
-                for i, iatom in enumerate(self.iatsph):
-                    walm_sbk[iatom] = filedata[i]
-            else:
-                print("natsph < natom. Will set to zero the PJDOS contributions for the atoms that are not included.")
-                assert self.natsph < self.natom
-                filedata = np.reshape(self.reader.read_value(key),
-                                     (self.natsph, self.mbesslang**2, self.nsppol, self.mband, self.nkpt))
-                for i, iatom in enumerate(self.iatsph):
-                    walm_sbk[iatom] = filedata[i]
-
-        # In principle, this should never happen (unless there's a bug in Abinit or a
-        # very bad cancellation between the FFT and the PS-PAW term (pawprtden=0).
-        num_neg = np.sum(walm_sbk < 0)
-        if num_neg:
-            print("WARNING: There are %d (%.1f%%) negative entries in LDOS weights" % (
-                  num_neg, 100 * num_neg / walm_sbk.size))
+    def read_atom_weights(self, iatom, key="dos_fractions", spin=None, bands=None):
+        """
+        Read the DOS weights of atom ``iatom`` from file. Only the slice associated to the atom is read.
 
-        return walm_sbk
+        Args:
+            iatom: Index of the atom in the structure.
+            key: Name of the netcdf variable e.g. "dos_fractions" (L-contributions) or
+                "dos_fractions_m" (LM-contributions).
+            spin: Spin index. None for all spins.
+            bands: Slice or integer selecting the bands. None for all bands.
+
+        Return: |numpy-array| of shape [nlm, nsppol, mband, nkpt].
+            The spin (band) dimension is removed if spin (bands) is an integer.
+            Zeros are returned if the atom has not been calculated (see ``iatsph``).
+        """
+        self._check_weights_key(key)
+        var = self.reader.read_variable(key)
+        nlm = var.shape[0] // self.natsph
+        spin = slice(None) if spin is None else spin
+        bands = slice(None) if bands is None else bands
+
+        isph = self.atom2isph[iatom]
+        if isph >= 0:
+            return var[isph * nlm:(isph + 1) * nlm, spin, bands, :]
+
+        # Use a dummy slice to get the final shape.
+        return np.zeros(np.empty((nlm,) + var.shape[1:], dtype=np.int8)[:, spin, bands, :].shape)
+
+    def _get_atom_weights(self, iatom, key="dos_fractions", cache=True):
+        # Return [nlm, nsppol, mband, nkpt] array with the weights of iatom.
+        # Use the full array if already in memory else read the atom from file.
+        # If cache, the results are stored in a LRU cache with at most atom_weights_cache_size atoms
+        # so that plotting routines read only the atoms they need without keeping all of them in memory.
+        attr = {"dos_fractions": "wal_sbk", "dos_fractions_m": "walm_sbk"}.get(key)
+        if attr in self.__dict__:
+            return self.__dict__[attr][iatom]
+
+        k = (key, iatom)
+        if k in self._atom_weights:
+            self._atom_weights.move_to_end(k)
+            return self._atom_weights[k]
+
+        weights = self.read_atom_weights(iatom, key=key)
+        if cache and self.atom_weights_cache_size > 0:
+            self._atom_weights[k] = weights
+            while len(self._atom_weights) > self.atom_weights_cache_size:
+                self._atom_weights.popitem(last=False)
+
+        return weights
 
     @property
     def ebands(self):
@@ -338,10 +360,22 @@ class FatBandsFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, N
         for all spin and bands else the contribution for (spin, band)
         """
         if spin is None and band is None:
-            return self.wal_sbk[iatom]
+            return self._get_atom_weights(iatom)
+        else:
+            assert spin is not None and band is not None
+            return self._get_atom_weights(iatom)[:, spin, band, :]
+
+    def get_wlm_atom(self, iatom, spin=None, band=None):
+        """
+        Return the lm-dependent DOS weights for atom index ``iatom``. Requires prtdosm != 0.
+        If ``spin`` and ``band`` are not specified, the method returns the weights
+        for all spin and bands else the contribution for (spin, band)
+        """
+        if spin is None and band is None:
+            return self._get_atom_weights(iatom, key="dos_fractions_m")
         else:
             assert spin is not None and band is not None
-            return self.wal_sbk[iatom, :, spin, band, :]
+            return self._get_atom_weights(iatom, key="dos_fractions_m")[:, spin, band, :]
 
     def get_wl_symbol(self, symbol, spin=None, band=None):
         """
@@ -353,14 +387,16 @@ class FatBandsFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, N
         if spin is None and band is None:
             wl = np.zeros((self.lsize, self.nsppol, self.mband, self.nkpt))
             for iat in self.symbol2indices[symbol]:
-                for l in range(self.lmax_atom[iat]+1):
-                    wl[l] += self.wal_sbk[iat, l]
+                if not self.has_atom[iat]: continue
+                lmax = self.lmax_atom[iat]
+                wl[:lmax+1] += self._get_atom_weights(iat)[:lmax+1]
         else:
             assert spin is not None and band is not None
             wl = np.zeros((self.lsize, self.nkpt))
             for iat in self.symbol2indices[symbol]:
-                for l in range(self.lmax_atom[iat]+1):
-                    wl[l, :] += self.wal_sbk[iat, l, spin, band, :]
+                if not self.has_atom[iat]: continue
+                lmax = self.lmax_atom[iat]
+                wl[:lmax+1] += self._get_atom_weights(iat)[:lmax+1, spin, band, :]
 
         return wl
 
@@ -396,14 +432,14 @@ class FatBandsFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, N
         if spin is None and band is None:
             sp = np.zeros((self.nsppol, self.mband, self.nkpt))
             for iatom in range(self.natom):
-                for l in range(self.lmax_atom[iatom]+1):
-                    sp += self.wal_sbk[iatom, l]
+                if not self.has_atom[iatom]: continue
+                sp += self._get_atom_weights(iatom)[:self.lmax_atom[iatom]+1].sum(axis=0)
         else:
             assert spin is not None and band is not None
             sp = np.zeros((self.nkpt))
             for iatom in range(self.natom):
-                for l in range(self.lmax_atom[iatom]+1):
-                    sp += self.wal_sbk[iatom, l, spin, band, :]
+                if not self.has_atom[iatom]: continue
+                sp += self._get_atom_weights(iatom)[:self.lmax_atom[iatom]+1, spin, band, :].sum(axis=0)
 
         return 1.0 - sp
 
@@ -649,7 +685,7 @@ class FatBandsFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, N
                     yup = ebands.eigens[spin, :, band] - e0
                     ydown = yup
 
-                    w = self.walm_sbk[iatom,  l**2 + im, spin, band, :] * (fact / 2)
+                    w = self.get_wlm_atom(iatom, spin=spin, band=band)[l**2 + im] * (fact / 2)
                     y1, y2 = yup + w, ydown - w
                     # Add width around each band.
                     ax.fill_between(x, yup, y1, alpha=self.alpha, facecolor=self.l2color[l])
@@ -1617,45 +1653,96 @@ class _DosIntegrator(object):
     PJDOSes are computed lazily and stored in the integrator so that we can reuse the results
     if needed.
     """
+    # Max number of weights copied in memory when integrating a block of channels.
+    max_chunk_weights = 10 ** 7
+
     def __init__(self, fbfile, method, step, width):
         """
         """
         self.fbfile, self.method, self.step, self.width = fbfile, method, step, width
+        if method not in ("gaussian", "tetra"):
+            raise ValueError("Method %s is not supported" % self.method)
 
         # Compute Total DOS from ebands and define energy mesh.
         self.edos = fbfile.ebands.get_edos(method=method, step=step, width=width)
         self.mesh = self.edos.spin_dos[0].mesh
 
-    #@lazy_property
-    #def site_edos(self):
-    #    """Array [natom, nsppol, lmax**2]"""
+    def integrate(self, wsbk):
+        """
+        Compute the DOS weighted by ``wsbk`` for all the channels at once.
+
+        Args:
+            wsbk: [nc, nsppol, mband, nkpt] array with the weights of the nc channels.
+
+        Return: [nc, nsppol, nw] array.
+        """
+        ebands = self.fbfile.ebands
+        nc, nsppol, mband, nkpt = wsbk.shape
+        values = np.zeros((nc, nsppol, len(self.mesh)))
+        if self.method == "tetra":
+            bz2ibz, ngkpt = ebands._get_tetra_bz2ibz()
+
+        # Channels are treated in blocks so that the temporary arrays with the weights are bounded.
+        cstep = max(1, self.max_chunk_weights // (mband * (nkpt if self.method == "gaussian" else len(bz2ibz))))
+        for spin in range(nsppol):
+            if self.method == "gaussian":
+                # Weights of the k-points and mask for the bands that are not computed. Shape [mband, nkpt].
+                fact = (ebands.kpoints.weights[:, None] * ebands._get_band_mask(spin)).T
+                for start in range(0, nc, cstep):
+                    values[start:start + cstep, spin] = gaussian_dos(self.mesh, ebands.eigens[spin].T, self.width,
+                        weights=wsbk[start:start + cstep, spin] * fact)
+            else:
+                for start in range(0, nc, cstep):
+                    weights = wsbk[start:start + cstep, spin][:, :, bz2ibz].transpose(0, 2, 1)
+                    values[start:start + cstep, spin] = tetra_dos(self.mesh, ebands.eigens[spin, bz2ibz], ngkpt,
+                        ebands.reciprocal_lattice.matrix, weights=weights)
+
+        return values
+
+    @lazy_property
+    def site_lso(self):
+        """
+        [natom, lsize, nsppol, nw] array with the l-decomposed PJDOS for each atom.
+        """
+        fbfile = self.fbfile
+        site_lso = np.zeros((fbfile.natom, fbfile.lsize, fbfile.nsppol, len(self.mesh)))
+        # Atoms are read one by one from file without caching. Atoms that are not calculated give zero.
+        for iatom in range(fbfile.natom):
+            if not fbfile.has_atom[iatom]: continue
+            site_lso[iatom] = self.integrate(fbfile._get_atom_weights(iatom, cache=False)[:fbfile.lsize])
+
+        return site_lso
+
+    @lazy_property
+    def site_lmso(self):
+        """
+        [natom, mbesslang**2, nsppol, nw] array with the lm-decomposed PJDOS for each atom.
+        Requires prtdosm != 0.
+        """
+        fbfile = self.fbfile
+        site_lmso = np.zeros((fbfile.natom, fbfile.mbesslang**2, fbfile.nsppol, len(self.mesh)))
+        for iatom in range(fbfile.natom):
+            if not fbfile.has_atom[iatom]: continue
+            site_lmso[iatom] = self.integrate(fbfile._get_atom_weights(iatom, key="dos_fractions_m", cache=False))
+
+        return site_lmso
 
     @lazy_property
     def symbols_lso(self):
         """
+        :class:`OrderedDict` mapping the chemical symbol to the [lsize, nsppol, nw] array
+        with the l-decomposed PJDOS summed over the atoms of the same type.
         """
-        fbfile, ebands = self.fbfile, self.fbfile.ebands
+        fbfile, site_lso = self.fbfile, self.site_lso
 
         # Compute l-decomposed PJDOS for each type of atom.
         symbols_lso = OrderedDict()
-        if self.method == "gaussian":
-
-            for symbol in fbfile.symbols:
-                lmax = fbfile.lmax_symbol[symbol]
-                wlsbk = fbfile.get_wl_symbol(symbol)
-                lso = np.zeros((fbfile.lsize, fbfile.nsppol, len(self.mesh)))
-                for spin in range(fbfile.nsppol):
-                    for k, kpoint in enumerate(ebands.kpoints):
-                        weight = kpoint.weight
-                        for band in range(ebands.nband_sk[spin, k]):
-                            e = ebands.eigens[spin, k, band]
-                            for l in range(lmax + 1):
-                                lso[l, spin] += wlsbk[l, spin, band, k] *\
-                                                weight * gaussian(self.mesh, self.width, center=e)
-                symbols_lso[symbol] = lso
-
-        else:
-            raise ValueError("Method %s is not supported" % self.method)
+        for symbol in fbfile.symbols:
+            lso = np.zeros((fbfile.lsize, fbfile.nsppol, len(self.mesh)))
+            for iat in fbfile.symbol2indices[symbol]:
+                lmax = fbfile.lmax_atom[iat]
+                lso[:lmax + 1] += site_lso[iat, :lmax + 1]
+            symbols_lso[symbol] = lso
 
         return symbols_lso
 
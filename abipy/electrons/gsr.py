@@ -8,6 +8,7 @@ import pymatgen.core.units as units
 import abipy.core.abinit_units as abu
 
 from collections import OrderedDict
+from functools import partial
 from tabulate import tabulate
 from monty.string import list_strings, marquee
 from monty.termcolor import cprint
@@ -18,7 +19,7 @@ from pymatgen.entries.computed_entries import ComputedEntry, ComputedStructureEn
 from abipy.core.mixins import AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, NotebookWriter
 from abipy.tools.plotting import add_fig_kwargs, get_axarray_fig_plt
 from abipy.tools.tensors import Stress
-from abipy.abio.robots import Robot
+from abipy.abio.robots import Robot, exec_funcs
 from abipy.electrons.ebands import ElectronsReader, RobotWithEbands
 
 
@@ -392,6 +393,27 @@ class GsrReader(ElectronsReader):
         return EnergyTerms(**d)
 
 
+def _get_gsr_row(gsr, with_geo=True, attrs=(), funcs=None):
+    """Return dictionary with the results in ``gsr``. Used by GsrRobot.get_dataframe."""
+    d = OrderedDict()
+
+    # Add info on structure.
+    if with_geo:
+        d.update(gsr.structure.get_dict4pandas(with_spglib=True))
+
+    for aname in attrs:
+        if aname == "nkpt":
+            value = len(gsr.ebands.kpoints)
+        else:
+            value = getattr(gsr, aname, None)
+            if value is None: value = getattr(gsr.ebands, aname, None)
+        d[aname] = value
+
+    # Execute functions
+    if funcs is not None: d.update(exec_funcs(funcs, gsr))
+    return d
+
+
 class GsrRobot(Robot, RobotWithEbands):
     """
     This robot analyzes the results contained in multiple GSR.nc_ files.
@@ -401,7 +423,7 @@ class GsrRobot(Robot, RobotWithEbands):
     """
     EXT = "GSR"
 
-    def get_dataframe(self, with_geo=True, abspath=False, funcs=None, **kwargs):
+    def get_dataframe(self, with_geo=True, abspath=False, funcs=None, executor=None, max_workers=None, **kwargs):
         """
         Return a |pandas-DataFrame| with the most important GS results.
         and the filenames as index.
@@ -409,6 +431,7 @@ class GsrRobot(Robot, RobotWithEbands):
         Args:
             with_geo: True if structure info should be added to the dataframe
             abspath: True if paths in index should be absolute. Default: Relative to getcwd().
+            executor, max_workers: Passed to ``Robot.map`` to process the files in parallel.
 
         kwargs:
             attrs:
@@ -426,29 +449,8 @@ class GsrRobot(Robot, RobotWithEbands):
             "nsppol", "nspinor", "nspden",
         ] + kwargs.pop("attrs", [])
 
-        rows, row_names = [], []
-        for label, gsr in self.items():
-            row_names.append(label)
-            d = OrderedDict()
-
-            # Add info on structure.
-            if with_geo:
-                d.update(gsr.structure.get_dict4pandas(with_spglib=True))
-
-            for aname in attrs:
-                if aname == "nkpt":
-                    value = len(gsr.ebands.kpoints)
-                else:
-                    value = getattr(gsr, aname, None)
-                    if value is None: value = getattr(gsr.ebands, aname, None)
-                d[aname] = value
-
-            # Execute functions
-            if funcs is not None: d.update(self._exec_funcs(funcs, gsr))
-            rows.append(d)
-
-        row_names = row_names if not abspath else self._to_relpaths(row_names)
-        return pd.DataFrame(rows, index=row_names, columns=list(rows[0].keys()))
+        func = partial(_get_gsr_row, with_geo=with_geo, attrs=attrs, funcs=funcs)
+        return self.map_to_dataframe(func, abspath=abspath, executor=executor, max_workers=max_workers)
 
     def get_eos_fits_dataframe(self, eos_names="murnaghan"):
         """
@@ -5,8 +5,10 @@ import copy
 import warnings
 import numpy as np
 import pandas as pd
+import pymatgen.core.units as units
 
 from collections import namedtuple, OrderedDict
+from functools import partial
 from io import StringIO
 from tabulate import tabulate
 from monty.string import list_strings, is_string, marquee
@@ -17,12 +19,11 @@ from monty.bisect import find_le, find_ge
 from abipy.core.func1d import Function1D
 from abipy.core.kpoints import Kpoint, KpointList, Kpath, IrredZone, has_timrev_from_kptopt
 from abipy.core.mixins import AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter
-from abipy.iotools import ETSF_Reader
 from abipy.tools.plotting import (ArrayPlotter, add_fig_kwargs, get_ax_fig_plt, get_axarray_fig_plt, Marker,
     set_axlims, set_visible, rotate_ticklabels)
 from abipy.tools import duck
-from abipy.abio.robots import Robot
-from abipy.electrons.ebands import ElectronBands, RobotWithEbands
+from abipy.abio.robots import Robot, exec_funcs
+from abipy.electrons.ebands import ElectronBands, ElectronsReader, RobotWithEbands
 from abipy.electrons.scissors import Scissors
 
 import logging
@@ -602,9 +603,8 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         # Keep a reference to the SigresReader.
         self.reader = reader = SigresReader(self.filepath)
 
-        self._structure = reader.read_structure()
+        self._structure = reader.structure
         self.gwcalctyp = reader.gwcalctyp
-        self.ibz = reader.ibz
         self.gwkpoints = reader.gwkpoints
         self.nkcalc = len(self.gwkpoints)
 
@@ -615,14 +615,23 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         self.min_gwbstop = reader.min_gwbstop
         self.max_gwbstop = reader.max_gwbstop
 
-        self._ebands = ebands = reader.ks_bands
+        # Note that KS bands and QP results are read on demand.
+        # TODO handle the case in which nkptgw < nkibz
 
-        qplist_spin = self.qplist_spin
+    @lazy_property
+    def ibz(self):
+        """The K-points of the homogeneous mesh."""
+        return self.reader.ibz
 
-        # TODO handle the case in which nkptgw < nkibz
-        self.qpgaps = reader.read_qpgaps()
-        self.qpenes = reader.read_qpenes()
-        self.ksgaps = reader.read_ksgaps()
+    @lazy_property
+    def qpenes(self):
+        """Complex array of shape [nsppol, nkibz, nbnds] with the QP energies."""
+        return self.reader.read_qpenes()
+
+    @lazy_property
+    def ksgaps(self):
+        """[nsppol, nkibz] array with the KS gaps in eV."""
+        return self.reader.read_ksgaps()
 
     @property
     def sigma_kpoints(self):
@@ -709,7 +718,7 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
     @property
     def ebands(self):
         """|ElectronBands| with the KS energies."""
-        return self._ebands
+        return self.reader.ks_bands
 
     @property
     def has_spectral_function(self):
@@ -1078,13 +1087,12 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         Args:
             ignore_imag: Only real part is returned if ``ignore_imag``.
         """
-        df_list = []
-        for spin in range(self.nsppol):
-            for gwkpoint in self.gwkpoints:
-                df_sk = self.get_dataframe_sk(spin, gwkpoint, ignore_imag=ignore_imag)
-                df_list.append(df_sk)
+        table = self.reader.read_qptable(ignore_imag=ignore_imag)
+        kpoints = np.empty(len(self.gwkpoints), dtype=object)
+        for ik, kpoint in enumerate(self.gwkpoints):
+            kpoints[ik] = kpoint
 
-        return pd.concat(df_list)
+        return self._get_qptable_dataframe(table, kpoints[table["ikgw"]], index=table["band"])
 
     # FIXME: To maintain previous interface.
     to_dataframe = get_dataframe
@@ -1097,22 +1105,32 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
             ignore_imag: Only real part is returned if ``ignore_imag``.
             with_params: True to include convergence paramenters.
         """
-        rows, bands = [], []
         # bstart and bstop depends on kpoint.
-        ik_gw = self.reader.gwkpt2seqindex(kpoint)
-        for band in range(self.gwbstart_sk[spin, ik_gw], self.gwbstop_sk[spin, ik_gw]):
-            bands.append(band)
-            # Build dictionary with the QP results.
-            qpstate = self.reader.read_qp(spin, kpoint, band, ignore_imag=ignore_imag)
-            d = qpstate.as_dict()
-            # Add other entries that may be useful when comparing different calculations.
-            if with_params:
-                d.update(self.params)
-            rows.append(d)
-
-        import pandas as pd
-        index = len(bands) * [index] if index is not None else bands
-        return pd.DataFrame(rows, index=index, columns=list(rows[0].keys()))
+        table = self.reader.read_qptable(spin=spin, kpoint=kpoint, ignore_imag=ignore_imag)
+        nb = len(table["band"])
+        kpoints = np.empty(nb, dtype=object)
+        for i in range(nb):
+            kpoints[i] = kpoint
+        index = nb * [index] if index is not None else table["band"]
+
+        return self._get_qptable_dataframe(table, kpoints, index=index, with_params=with_params)
+
+    def _get_qptable_dataframe(self, table, kpoints, index=None, with_params=True):
+        """
+        Build |pandas-DataFrame| with the same columns as :meth:`QPState.as_dict` from the table
+        returned by :meth:`SigresReader.read_qptable`.
+        """
+        od = OrderedDict()
+        for field in QPState._fields:
+            od[field] = kpoints if field == "kpoint" else table[field]
+        od["qpeme0"] = table["qpe"] - table["e0"]
+
+        # Add other entries that may be useful when comparing different calculations.
+        if with_params:
+            for k, v in self.params.items():
+                od[k] = len(kpoints) * [v]
+
+        return pd.DataFrame(od, index=index, columns=list(od.keys()))
 
     #def plot_matrix_elements(self, mel_name, spin, kpoint, *args, **kwargs):
     #   matrix = self.reader.read_mel(mel_name, spin, kpoint):
@@ -1335,7 +1353,7 @@ if r.ks_ebands_kpath is not None:
         return self._write_nb_nbpath(nb, nbpath)
 
 
-class SigresReader(ETSF_Reader):
+class SigresReader(ElectronsReader):
     r"""
     This object provides method to read data from the SIGRES file produced ABINIT.
 
@@ -1489,9 +1507,8 @@ class SigresReader(ETSF_Reader):
     ! Frequencies used to evaluate the Derivative of Sigma.
     """
     def __init__(self, path):
-        self.ks_bands = ElectronBands.from_file(path)
-        self.nsppol = self.ks_bands.nsppol
         super().__init__(path)
+        self.nsppol = self.read_nsppol()
 
         try:
             self.nomega_r = self.read_dimvalue("nomega_r")
@@ -1506,10 +1523,7 @@ class SigresReader(ETSF_Reader):
         self.gwcalctyp = self.read_value("gwcalctyp")
         self.usepawu = self.read_value("usepawu")
 
-        # 1) The K-points of the homogeneous mesh.
-        self.ibz = self.ks_bands.kpoints
-
-        # 2) The K-points where QPState corrections have been calculated.
+        # The K-points where QPState corrections have been calculated.
         gwred_coords = self.read_redc_gwkpoints()
         self.gwkpoints = KpointList(self.structure.reciprocal_lattice, gwred_coords)
         # Find k-point name
@@ -1527,34 +1541,47 @@ class SigresReader(ETSF_Reader):
         self.min_gwbstop = np.min(self.gwbstop_sk)
         self.max_gwbstop = np.max(self.gwbstop_sk)
 
-        self._egw = self.read_value("egw", cmode="c")
-
-        # Read and save important matrix elements.
-        # All these arrays are dimensioned
+        # Matrix elements, QP energies and spectral functions are not read here.
+        # Methods read hyperslabs from file so that only the required data is read.
+        # Note that the arrays with matrix elements are dimensioned
         # vxcme(b1gw:b2gw,nkibz,nsppol*nsig_ab))
-        self._vxcme = self.read_value("vxcme")
-        self._sigxme = self.read_value("sigxme")
-        self._hhartree = self.read_value("hhartree", cmode="c")
-        self._vUme = self.read_value("vUme")
-        #if self.usepawu == 0: self._vUme.fill(0.0)
-
-        # Complex arrays
-        self._sigcmee0 = self.read_value("sigcmee0", cmode="c")
-        self._ze0 = self.read_value("ze0", cmode="c")
-
-        # Frequencies for the spectral function.
-        # Note that omega_r does not depend on (s, k, b).
-        if self.has_spfunc:
-            self._omega_r = self.read_value("omega_r")
-            self._sigcme = self.read_value("sigcme", cmode="c")
-            self._sigxcme = self.read_value("sigxcme", cmode="c")
-
-        # Self-consistent case
-        self._en_qp_diago = self.read_value("en_qp_diago")
-        # <KS|QPState>
-        self._eigvec_qp = self.read_value("eigvec_qp", cmode="c")
-
-        #self._mlda_to_qp
+
+    @lazy_property
+    def ks_bands(self):
+        """|ElectronBands| with the KS energies."""
+        return self.read_ebands()
+
+    @lazy_property
+    def ibz(self):
+        """The K-points of the homogeneous mesh."""
+        if "ks_bands" in self.__dict__: return self.ks_bands.kpoints
+        return self.read_kpoints()
+
+    @lazy_property
+    def _egw(self):
+        """QP energies. Complex array of shape [nsppol, nkibz, nbnds]."""
+        return self.read_value("egw", cmode="c")
+
+    @lazy_property
+    def _omega_r(self):
+        """Frequencies for the spectral function. Note that omega_r does not depend on (s, k, b)."""
+        return self.read_value("omega_r")
+
+    def _read_slice(self, varname, index, cmode=None):
+        """
+        Read the hyperslab ``var[index]`` of the netcdf variable ``varname``.
+        Only the values in the hyperslab are read from file.
+        If cmode == "c", the last dimension of the variable is used to build a complex array.
+        """
+        var = self.read_variable(varname)
+        if cmode is None:
+            return var[index]
+
+        if cmode != "c":
+            raise ValueError("Wrong value for cmode: %s" % str(cmode))
+        if not isinstance(index, tuple): index = (index,)
+        data = var[index + (slice(None),)]
+        return data[..., 0] + 1j * data[..., 1]
 
     #def is_selfconsistent(self, mode):
     #    return self.gwcalctyp
@@ -1600,16 +1627,10 @@ class SigresReader(ETSF_Reader):
         Args:
             ignore_imag: Only real part is returned if ``ignore_imag``.
         """
-        qps_spin = self.nsppol * [None]
-
-        for spin in range(self.nsppol):
-            qps = []
-            for gwkpoint in self.gwkpoints:
-                ik = self.gwkpt2seqindex(gwkpoint)
-                for band in range(self.gwbstart_sk[spin, ik], self.gwbstop_sk[spin, ik]):
-                    qps.append(self.read_qp(spin, gwkpoint, band, ignore_imag=ignore_imag))
-
-            qps_spin[spin] = QPList(qps)
+        table = self.read_qptable(ignore_imag=ignore_imag)
+        qps_spin = [QPList() for spin in range(self.nsppol)]
+        for qp in self._qps_from_table(table):
+            qps_spin[qp.spin].append(qp)
 
         return tuple(qps_spin)
 
@@ -1620,11 +1641,68 @@ class SigresReader(ETSF_Reader):
         Args:
             ignore_imag: Only real part is returned if ``ignore_imag``.
         """
-        ik = self.gwkpt2seqindex(kpoint)
-        bstart, bstop = self.gwbstart_sk[spin, ik], self.gwbstop_sk[spin, ik]
+        table = self.read_qptable(spin=spin, kpoint=kpoint, ignore_imag=ignore_imag)
+        return QPList(self._qps_from_table(table))
 
-        return QPList([self.read_qp(spin, kpoint, band, ignore_imag=ignore_imag)
-                      for band in range(bstart, bstop)])
+    def read_qptable(self, spin=None, kpoint=None, ignore_imag=False):
+        """
+        Read the QP results with a single read per netcdf variable. No :class:`QPState` is created.
+
+        Args:
+            spin: Spin index. None for all spins.
+            kpoint: GW k-point (|Kpoint| or index in gwkpoints). None for all the GW k-points.
+            ignore_imag: Only real part is returned if ``ignore_imag``.
+
+        Return: :class:`OrderedDict` with 1d arrays in long format i.e. one entry for each (spin, kpoint, band).
+            Keys: ``spin``, ``ikgw`` (index in gwkpoints), ``band`` and the other fields of :class:`QPState`.
+            Energies are in eV.
+        """
+        spins = range(self.nsppol) if spin is None else [spin]
+        ikgws = range(len(self.gwkpoints)) if kpoint is None else [self.gwkpt2seqindex(kpoint)]
+        spin_arr, ikgw_arr, kfile_arr, band_arr = [], [], [], []
+        for s in spins:
+            for ik in ikgws:
+                bands = np.arange(self.gwbstart_sk[s, ik], self.gwbstop_sk[s, ik])
+                spin_arr.append(np.full(len(bands), s))
+                ikgw_arr.append(np.full(len(bands), ik))
+                kfile_arr.append(np.full(len(bands), self.kpt2fileindex(self.gwkpoints[ik])))
+                band_arr.append(bands)
+
+        spin_arr, ikgw_arr, kfile_arr, band_arr = [np.concatenate(a).astype(np.int)
+                                                   for a in (spin_arr, ikgw_arr, kfile_arr, band_arr)]
+
+        def read(varname, bshift=0, cmode=None):
+            # Read the smallest hyperslab containing the states and extract the values.
+            lo = [spin_arr.min(), kfile_arr.min(), band_arr.min() - bshift]
+            hi = [spin_arr.max(), kfile_arr.max(), band_arr.max() - bshift]
+            data = self._read_slice(varname, tuple(slice(l, h + 1) for l, h in zip(lo, hi)), cmode=cmode)
+            return data[spin_arr - lo[0], kfile_arr - lo[1], band_arr - bshift - lo[2]]
+
+        def ri(a):
+            return np.real(a) if ignore_imag else a
+
+        table = OrderedDict([("spin", spin_arr), ("ikgw", ikgw_arr), ("band", band_arr)])
+        if "ks_bands" in self.__dict__:
+            table["e0"] = self.ks_bands.eigens[spin_arr, kfile_arr, band_arr]
+        else:
+            table["e0"] = read("eigenvalues") * units.Ha_to_eV
+        table["qpe"] = ri(read("egw", cmode="c"))
+        table["qpe_diago"] = ri(read("en_qp_diago"))
+        # Must shift band index (see fortran code that allocates with mdbgw)
+        table["vxcme"] = read("vxcme", bshift=self.min_gwbstart)
+        table["sigxme"] = read("sigxme", bshift=self.min_gwbstart)
+        table["sigcmee0"] = ri(read("sigcmee0", bshift=self.min_gwbstart, cmode="c"))
+        table["vUme"] = read("vUme", bshift=self.min_gwbstart)
+        table["ze0"] = ri(read("ze0", bshift=self.min_gwbstart, cmode="c"))
+
+        return table
+
+    def _qps_from_table(self, table):
+        """Build list of :class:`QPState` from the table returned by ``read_qptable``."""
+        names = [f for f in QPState._fields if f not in ("spin", "kpoint", "band")]
+        return [QPState(spin=int(spin), kpoint=self.gwkpoints[ikgw], band=int(band), **dict(zip(names, values)))
+                for spin, ikgw, band, *values in zip(table["spin"], table["ikgw"], table["band"],
+                                                     *[table[n] for n in names])]
 
     #def read_qpene(self, spin, kpoint, band)
 
@@ -1636,27 +1714,44 @@ class SigresReader(ETSF_Reader):
         Return :class`QPState` for the given (spin, kpoint, band).
         Only real part is returned if ``ignore_imag``.
         """
+        return self._read_qps(spin, kpoint, band, band + 1, ignore_imag=ignore_imag)[0]
+
+    def _read_qps(self, spin, kpoint, bstart, bstop, ignore_imag=False):
+        """
+        Return list of :class`QPState` for the given (spin, kpoint) and bands in [bstart, bstop).
+        Only the hyperslabs with these bands are read from file.
+        """
         ik_file = self.kpt2fileindex(kpoint)
+        bands = slice(bstart, bstop)
         # Must shift band index (see fortran code that allocates with mdbgw)
-        ib_gw = band - self.min_gwbstart
+        bands_gw = slice(bstart - self.min_gwbstart, bstop - self.min_gwbstart)
 
         def ri(a):
             return np.real(a) if ignore_imag else a
 
-        return QPState(
+        e0 = self.read_e0(spin, ik_file, bands)
+        qpe = ri(self._read_slice("egw", (spin, ik_file, bands), cmode="c"))
+        qpe_diago = ri(self._read_slice("en_qp_diago", (spin, ik_file, bands)))
+        # Note bands_gw index.
+        vxcme = self._read_slice("vxcme", (spin, ik_file, bands_gw))
+        sigxme = self._read_slice("sigxme", (spin, ik_file, bands_gw))
+        sigcmee0 = ri(self._read_slice("sigcmee0", (spin, ik_file, bands_gw), cmode="c"))
+        vUme = self._read_slice("vUme", (spin, ik_file, bands_gw))
+        ze0 = ri(self._read_slice("ze0", (spin, ik_file, bands_gw), cmode="c"))
+
+        return [QPState(
             spin=spin,
             kpoint=kpoint,
             band=band,
-            e0=self.read_e0(spin, ik_file, band),
-            qpe=ri(self._egw[spin, ik_file, band]),
-            qpe_diago=ri(self._en_qp_diago[spin, ik_file, band]),
-            # Note ib_gw index.
-            vxcme=self._vxcme[spin, ik_file, ib_gw],
-            sigxme=self._sigxme[spin, ik_file, ib_gw],
-            sigcmee0=ri(self._sigcmee0[spin, ik_file, ib_gw]),
-            vUme=self._vUme[spin, ik_file, ib_gw],
-            ze0=ri(self._ze0[spin, ik_file, ib_gw]),
-        )
+            e0=e0[i],
+            qpe=qpe[i],
+            qpe_diago=qpe_diago[i],
+            vxcme=vxcme[i],
+            sigxme=sigxme[i],
+            sigcmee0=sigcmee0[i],
+            vUme=vUme[i],
+            ze0=ze0[i],
+        ) for i, band in enumerate(range(bstart, bstop))]
 
     def read_qpgaps(self):
         """Read the QP gaps. Returns [nsppol, nkibz] array with QP gaps in eV."""
@@ -1667,7 +1762,10 @@ class SigresReader(ETSF_Reader):
         return self.read_value("e0gap")
 
     def read_e0(self, spin, kfile, band):
-        return self.ks_bands.eigens[spin, kfile, band]
+        """KS energy in eV. band can be an integer or a slice."""
+        if "ks_bands" in self.__dict__:
+            return self.ks_bands.eigens[spin, kfile, band]
+        return units.ArrayWithUnit(self._read_slice("eigenvalues", (spin, kfile, band)), "Ha").to("eV")
 
     def read_sigmaw(self, spin, kpoint, band):
         """Returns the real and the imaginary part of the self energy."""
@@ -1679,7 +1777,7 @@ class SigresReader(ETSF_Reader):
         ib_gw = band - self.min_gwbstart
         #ib_gw = band - self.gwbstart_sk[spin, self.gwkpt2seqindex(kpoint)]
 
-        return self._omega_r, self._sigxcme[spin,:, ik, ib_gw]
+        return self._omega_r, self._read_slice("sigxcme", (spin, slice(None), ik, ib_gw), cmode="c")
 
     def read_spfunc(self, spin, kpoint, band):
         """
@@ -1697,12 +1795,11 @@ class SigresReader(ETSF_Reader):
         ib_gw = band - self.min_gwbstart
         #ib_gw = band - self.gwbstart_sk[spin, self.gwkpt2seqindex(kpoint)]
 
-        aim_sigc = np.abs(self._sigcme[spin,:,ik,ib_gw].imag)
-        den = np.zeros(self.nomega_r)
-
-        for io, omega in enumerate(self._omega_r):
-            den[io] = (omega - self._hhartree[spin,ik,ib_gw,ib_gw].real - self._sigxcme[spin,io,ik,ib_gw].real) ** 2 + \
-                self._sigcme[spin,io,ik,ib_gw].imag ** 2
+        sigc = self._read_slice("sigcme", (spin, slice(None), ik, ib_gw), cmode="c")
+        sigxc = self._read_slice("sigxcme", (spin, slice(None), ik, ib_gw), cmode="c")
+        hhartree = self._read_slice("hhartree", (spin, ik, ib_gw, ib_gw), cmode="c")
+        aim_sigc = np.abs(sigc.imag)
+        den = (self._omega_r - hhartree.real - sigxc.real) ** 2 + sigc.imag ** 2
 
         return self._omega_r, 1./np.pi * (aim_sigc/den)
 
@@ -1713,9 +1810,9 @@ class SigresReader(ETSF_Reader):
         """
         ik = self.kpt2fileindex(kpoint)
         if band is not None:
-            return self._eigvec_qp[spin, ik, :, band]
+            return self._read_slice("eigvec_qp", (spin, ik, slice(None), band), cmode="c")
         else:
-            return self._eigvec_qp[spin, ik, :, :]
+            return self._read_slice("eigvec_qp", (spin, ik), cmode="c")
 
     def read_params(self):
         """
@@ -1751,6 +1848,27 @@ class SigresReader(ETSF_Reader):
     #    """Returns the QPState density in real space."""
 
 
+def _get_qpgap_row(sigres, spin=0, kpoint=0, with_geo=False, attrs=(), funcs=None):
+    """Return dictionary with the QP gap in ``sigres``. Used by SigresRobot.get_qpgaps_dataframe."""
+    d = OrderedDict()
+    for aname in attrs:
+        d[aname] = getattr(sigres, aname, None)
+
+    qpgap = sigres.get_qpgap(spin, kpoint)
+    d.update({"qpgap": qpgap})
+
+    # Add convergence parameters
+    d.update(sigres.params)
+
+    # Add info on structure.
+    if with_geo:
+        d.update(sigres.structure.get_dict4pandas(with_spglib=True))
+
+    # Execute functions.
+    if funcs is not None: d.update(exec_funcs(funcs, sigres))
+    return d
+
+
 class SigresRobot(Robot, RobotWithEbands):
     """
     This robot analyzes the results contained in multiple SIGRES.nc files.
@@ -1761,8 +1879,8 @@ class SigresRobot(Robot, RobotWithEbands):
     # Try to have API similar to SigEPhRobot
     EXT = "SIGRES"
 
-    def __init__(self, *args):
-        super().__init__(*args)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         if len(self.abifiles) in (0, 1): return
 
         # TODO
@@ -1824,7 +1942,8 @@ class SigresRobot(Robot, RobotWithEbands):
 
         return table
 
-    def get_qpgaps_dataframe(self, spin=None, kpoint=None, with_geo=False, abspath=False, funcs=None, **kwargs):
+    def get_qpgaps_dataframe(self, spin=None, kpoint=None, with_geo=False, abspath=False, funcs=None,
+                             executor=None, max_workers=None, **kwargs):
         """
         Return a |pandas-DataFrame| with the QP gaps for all files in the robot.
 
@@ -1833,6 +1952,7 @@ class SigresRobot(Robot, RobotWithEbands):
             kpoint
             with_geo: True if structure info should be added to the dataframe
             abspath: True if paths in index should be absolute. Default: Relative to getcwd().
+            executor, max_workers: Passed to ``Robot.map`` to process the files in parallel.
             funcs: Function or list of functions to execute to add more data to the DataFrame.
                 Each function receives a |SigresFile| object and returns a tuple (key, value)
                 where key is a string with the name of column and value is the value to be inserted.
@@ -1848,29 +1968,8 @@ class SigresRobot(Robot, RobotWithEbands):
             #"tsmear", "nkibz",
         ] + kwargs.pop("attrs", [])
 
-        rows, row_names = [], []
-        for label, sigres in self.items():
-            row_names.append(label)
-            d = OrderedDict()
-            for aname in attrs:
-                d[aname] = getattr(sigres, aname, None)
-
-            qpgap = sigres.get_qpgap(spin, kpoint)
-            d.update({"qpgap": qpgap})
-
-            # Add convergence parameters
-            d.update(sigres.params)
-
-            # Add info on structure.
-            if with_geo:
-                d.update(sigres.structure.get_dict4pandas(with_spglib=True))
-
-            # Execute functions.
-            if funcs is not None: d.update(self._exec_funcs(funcs, sigres))
-            rows.append(d)
-
-        row_names = row_names if not abspath else self._to_relpaths(row_names)
-        return pd.DataFrame(rows, index=row_names, columns=list(rows[0].keys()))
+        func = partial(_get_qpgap_row, spin=spin, kpoint=kpoint, with_geo=with_geo, attrs=attrs, funcs=funcs)
+        return self.map_to_dataframe(func, abspath=abspath, executor=executor, max_workers=max_workers)
 
     # An alias to have a common API for robots.
     get_dataframe = get_qpgaps_dataframe
@@ -67,6 +67,82 @@ class _LobsterFile(BaseFile, NotebookWriter):
     def close(self):
         """Needed by ABC."""
 
+    @classmethod
+    def from_file(cls, filepath, use_cache=False):
+        """
+        Generates an instance from the file produced by Lobster. Accepts gzipped files.
+
+        Args:
+            filepath: path to the Lobster file.
+            use_cache: True if the binary sidecar file (see :meth:`write_cache`) should be used
+                to avoid parsing the text file. The sidecar file is created if it does not exist
+                or if it is not up-to-date.
+        """
+        new = cls(filepath)
+        arrays = new._load_cache() if use_cache else None
+        from_cache = arrays is not None
+        if not from_cache:
+            arrays = cls._parse_file(filepath)
+
+        new._set_arrays(arrays)
+        if use_cache and not from_cache:
+            new.write_cache()
+
+        return new
+
+    @classmethod
+    def _parse_file(cls, filepath):
+        """
+        Parse the text file. Return dictionary with the numpy arrays
+        needed to initialize the object with :meth:`_set_arrays`.
+        """
+        raise NotImplementedError("Subclass should implement _parse_file")
+
+    def _set_arrays(self, arrays):
+        """Initialize the object from the dictionary of arrays returned by :meth:`_parse_file`."""
+        raise NotImplementedError("Subclass should implement _set_arrays")
+
+    @property
+    def cache_path(self):
+        """Path of the binary sidecar file used to cache the data read from the text file."""
+        return self.filepath + ".npz"
+
+    def _get_stat_key(self):
+        """Array with (file size, mtime) used to validate the sidecar file."""
+        stat = os.stat(self.filepath)
+        return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+    def write_cache(self, filepath=None):
+        """
+        Write the arrays read from the text file to a binary sidecar file (numpy npz format)
+        keyed on size and mtime of the Lobster file so that the file can be reopened without parsing the text.
+
+        Args:
+            filepath: Path of the sidecar file. If None, :attr:`cache_path` is used.
+
+        Return: path of the sidecar file.
+        """
+        filepath = self.cache_path if filepath is None else filepath
+        with open(filepath, "wb") as fh:
+            np.savez(fh, stat_key=self._get_stat_key(), **self._arrays)
+
+        return filepath
+
+    def _load_cache(self):
+        """
+        Read the arrays from the sidecar file.
+        Return None if the file does not exist or is not up-to-date.
+        """
+        if not os.path.exists(self.cache_path): return None
+        try:
+            with np.load(self.cache_path) as data:
+                if not np.array_equal(data["stat_key"], self._get_stat_key()): return None
+                return {k: data[k] for k in data.files if k != "stat_key"}
+
+        except Exception as exc:
+            cprint("Exception while reading Lobster sidecar file: %s\n%s" % (self.cache_path, str(exc)), "yellow")
+            return None
+
     #@add_fig_kwargs
     #def plot_with_ebands(self, ebands, fontsize=12, **kwargs):
     #    """
@@ -156,6 +232,17 @@ class CoxpFile(_LobsterFile):
     .. attribute:: fermie
 
         value of the fermi energy in eV.
+
+    .. attribute:: cop_values
+
+        |numpy-array| of shape [nsppol, npairs + 1, 2, len(energies)] with all the values stored in the file.
+        The second index runs over the average (0) and the pairs, the third one selects
+        the "single" (0) or the "integrated" (1) value. total, partial and averaged are views of this array.
+
+    .. attribute:: pair_sites, pair_types, pair_orbitals
+
+        [npairs, 2] arrays with the site indices, the chemical symbols and the orbitals of the pairs.
+        The orbitals are set to "" if the pair is not orbitalwise.
     """
 
     @property
@@ -173,17 +260,22 @@ class CoxpFile(_LobsterFile):
         return list(self.partial.keys())
 
     @classmethod
-    def from_file(cls, filepath):
+    def from_file(cls, filepath, use_cache=False):
         """
         Generates an instance of CoxpFile from the files produce by Lobster.
         Accepts gzipped files.
 
         Args:
             filepath: path to the COHPCAR.lobster or COOPCAR.lobster.
+            use_cache: True to use the binary sidecar file. See :meth:`write_cache`.
 
         Returns:
             A CoxpFile.
         """
+        return super().from_file(filepath, use_cache=use_cache)
+
+    @classmethod
+    def _parse_file(cls, filepath):
         # From lobster documentation
         # COHPCAR.lobster:
         # File that contains the pCOHPs as requested in the lobsterin file.
@@ -205,8 +297,6 @@ class CoxpFile(_LobsterFile):
                                  r')\s+(' + float_patt + r')\s+(' + float_patt + r')')
         pair_patt = re.compile(r'No\.\d+:([a-zA-Z]+)(\d+)(?:\[([a-z0-9_\-^]+)\])?->([a-zA-Z]+)(\d+)(?:\[([a-z0-9_\-^]+)\])?')
 
-        new = cls(filepath)
-
         with zopen(filepath, "rt") as f:
             # Find the header
             for line in f:
@@ -215,78 +305,106 @@ class CoxpFile(_LobsterFile):
                     n_column_groups = int(match.group(1))
                     n_spin = int(match.group(2))
                     n_en_steps = int(match.group(3))
-                    min_en = float(match.group(4))
-                    max_en = float(match.group(5))
-                    new.fermie = float(match.group(6))
+                    fermie = float(match.group(6))
                     break
             else:
                 raise ValueError("Can't find the header in file {}".format(filepath))
 
-            n_pairs = n_column_groups-1
+            n_pairs = n_column_groups - 1
 
-            count_pairs = 0
-            pairs_data = []
-            new.type_of_index = {}
             # Parse the pairs considered
-            for line in f:
+            # Each entry is a tuple: [type1, index1, orbital1, type2, index2, orbital2]
+            # with orbital1, orbital2 = None if the pair is not orbitalwise
+            pairs_data = []
+            for line in (f if n_pairs else []):
                 match = pair_patt.match(line.rstrip())
                 if match:
-                    # Adds a tuple: [type1, index1, orbital1, type2, index2, orbital2]
-                    # with orbital1, orbital2 = None if the pair is not orbitalwise
-                    type1, index1, orbital1, type2, index2, orbital2 = match.groups()
-                    # 0-based indexing
-                    index1 = int(index1) - 1
-                    index2 = int(index2) - 1
-                    pairs_data.append([type1, index1, orbital1, type2, index2, orbital2])
-                    if index1 in new.type_of_index: assert new.type_of_index[index1] == type1
-                    new.type_of_index[index1] = type1
-                    if index2 in new.type_of_index: assert new.type_of_index[index2] == type2
-                    new.type_of_index[index2] = type2
-                    count_pairs += 1
-                    if count_pairs == n_pairs:
+                    pairs_data.append(match.groups())
+                    if len(pairs_data) == n_pairs:
                         break
 
-            spins = [0, 1][:n_spin]
-
+            # Read the numerical block in one pass.
             data = np.fromstring(f.read(), dtype=np.float, sep=' ').reshape([n_en_steps, 1+n_spin*n_column_groups*2])
 
-            # Initialize and fill results
-            new.energies = data[:, 0]
-            new.averaged = defaultdict(dict)
-            new.total = tree()
-            new.partial = tree()
-
-            for i, s in enumerate(spins):
-                base_index = 1+i*n_column_groups*2
-                new.averaged[s]['single'] = data[:, base_index].copy()
-                new.averaged[s]['integrated'] = data[:, base_index+1].copy()
-                # NB (i, j) --> (j, i) symmetry is enforced to make API easier.
-                for j, p in enumerate(pairs_data):
-                    index1 = p[1]
-                    index2 = p[4]
-                    if p[2] is not None:
-                        # Partial
-                        single = data[:, base_index+2*(j+1)].copy()
-                        integrated = data[:, base_index+2*(j+1)+1].copy()
-                        new.partial[(index1, index2)][(p[2], p[5])][s]['single'] = single
-                        new.partial[(index2, index1)][(p[5], p[2])][s]['single'] = single
-                        new.partial[(index1, index2)][(p[2], p[5])][s]['integrated'] = integrated
-                        new.partial[(index2, index1)][(p[5], p[2])][s]['integrated'] = integrated
-                    else:
-                        # Total
-                        single = data[:, base_index+2*(j+1)].copy()
-                        integrated = data[:, base_index+2*(j+1)+1].copy()
-                        new.total[(index1, index2)][s]['single'] = single
-                        new.total[(index2, index1)][s]['single'] = single
-                        new.total[(index1, index2)][s]['integrated'] = integrated
-                        new.total[(index2, index1)][s]['integrated'] = integrated
-
-        new.cop_type = "unknown"
-        if "COOPCAR.lobster" in filepath: new.cop_type = "coop"
-        if "COHPCAR.lobster" in filepath: new.cop_type = "cohp"
-        new.nsppol = len(new.averaged)
+        # Store the values in a single array of shape [nsppol, n_column_groups, 2, n_en_steps]
+        # so that the (single, integrated) values of each pair are contiguous. Group 0 is the average.
+        values = data[:, 1:].reshape(n_en_steps, n_spin, n_column_groups, 2).transpose(1, 2, 3, 0)
+
+        return dict(
+            fermie=np.array(fermie),
+            energies=data[:, 0].copy(),
+            cop_values=np.ascontiguousarray(values),
+            # 0-based indexing
+            pair_sites=np.array([(int(p[1]) - 1, int(p[4]) - 1) for p in pairs_data], dtype=np.int).reshape(-1, 2),
+            pair_types=np.array([(p[0], p[3]) for p in pairs_data], dtype=str).reshape(-1, 2),
+            pair_orbitals=np.array([(p[2] or "", p[5] or "") for p in pairs_data], dtype=str).reshape(-1, 2),
+        )
+
+    def _set_arrays(self, arrays):
+        self._arrays = arrays
+        self.fermie = float(arrays["fermie"])
+        self.energies = arrays["energies"]
+        self.cop_values = arrays["cop_values"]
+        self.pair_sites = arrays["pair_sites"]
+        self.pair_types = arrays["pair_types"]
+        self.pair_orbitals = arrays["pair_orbitals"]
+        self.nsppol = len(self.cop_values)
+
+        self.type_of_index = {}
+        for (index1, index2), (type1, type2) in zip(self.pair_sites.tolist(), self.pair_types.tolist()):
+            if index1 in self.type_of_index: assert self.type_of_index[index1] == type1
+            self.type_of_index[index1] = type1
+            if index2 in self.type_of_index: assert self.type_of_index[index2] == type2
+            self.type_of_index[index2] = type2
+
+        self.cop_type = "unknown"
+        if "COOPCAR.lobster" in self.filepath: self.cop_type = "coop"
+        if "COHPCAR.lobster" in self.filepath: self.cop_type = "cohp"
 
-        return new
+    @lazy_property
+    def averaged(self):
+        """
+        Dictionary with the values averaged over all atom pairs: averaged[spin]["single"|"integrated"].
+        The arrays are views of :attr:`cop_values`.
+        """
+        averaged = defaultdict(dict)
+        for spin in range(self.nsppol):
+            averaged[spin]['single'] = self.cop_values[spin, 0, 0]
+            averaged[spin]['integrated'] = self.cop_values[spin, 0, 1]
+        return averaged
+
+    @lazy_property
+    def total(self):
+        """
+        Dictionary with the total COP: total[pair][spin]["single"|"integrated"].
+        The arrays are views of :attr:`cop_values`.
+        """
+        return self._get_pairs_dict(partial=False)
+
+    @lazy_property
+    def partial(self):
+        """
+        Dictionary with the partial COP: partial[pair][orbitals][spin]["single"|"integrated"].
+        The arrays are views of :attr:`cop_values`.
+        """
+        return self._get_pairs_dict(partial=True)
+
+    def _get_pairs_dict(self, partial):
+        results = tree()
+        # NB (i, j) --> (j, i) symmetry is enforced to make API easier.
+        for j, ((index1, index2), (orb1, orb2)) in enumerate(zip(self.pair_sites.tolist(),
+                                                                  self.pair_orbitals.tolist())):
+            if bool(orb1) != partial: continue
+            for spin in range(self.nsppol):
+                single, integrated = self.cop_values[spin, j + 1]
+                if partial:
+                    d12, d21 = results[(index1, index2)][(orb1, orb2)][spin], results[(index2, index1)][(orb2, orb1)][spin]
+                else:
+                    d12, d21 = results[(index1, index2)][spin], results[(index2, index1)][spin]
+                d12['single'] = d21['single'] = single
+                d12['integrated'] = d21['integrated'] = integrated
+
+        return results
 
     @lazy_property
     def functions_pair_lorbitals(self):
@@ -686,54 +804,94 @@ class ICoxpFile(_LobsterFile):
     .. attribute:: type_of_index
 
         Dictionary mappping site index to element string.
+
+    .. attribute:: averages
+
+        |numpy-array| with the values for each line of the file. spins, pair_sites, pair_types,
+        distances and n_bonds give the other columns. n_bonds is set to -1 if not available.
     """
 
     @classmethod
-    def from_file(cls, filepath):
+    def from_file(cls, filepath, use_cache=False):
         """
         Generates an instance of ICoxpFile from the files produce by Lobster.
         Accepts gzipped files.
 
         Args:
             filepath: path to the ICOHPLIST.lobster or ICOOPLIST.lobster.
+            use_cache: True to use the binary sidecar file. See :meth:`write_cache`.
 
         Returns:
             A ICoxpFile.
         """
-        float_patt = r'-?(?:0|[1-9]\d*)(?:\.\d*)?(?:[eE][+\-]?\d+)?'
-        header_patt = re.compile(r'.*?(over+\s#\s+bonds)?\s+for\s+spin\s+(\d).*')
-        data_patt = re.compile(r'\s+\d+\s+([a-zA-Z]+)(\d+)\s+([a-zA-Z]+)(\d+)\s+(' +
-                               float_patt + r')\s+(' + float_patt + r')(\d+)?')
+        return super().from_file(filepath, use_cache=use_cache)
 
-        new = cls(filepath)
-        new.values = tree()
+    @classmethod
+    def _parse_file(cls, filepath):
+        # Each section starts with a header line. The data lines have the following columns:
+        # COHP#  atomMU  atomNU  distance  ICOHP(eF)  [number of bonds if the values are averaged]
+        header_patt = re.compile(r'.*?(over+\s#\s+bonds)?\s+for\s+spin\s+(\d).*')
+        atom_patt = re.compile(r'([a-zA-Z]+)(\d+)$')
 
         spin = None
         avg_num_bonds = False
-        new.type_of_index = {}
+        rows = []
         with zopen(filepath, "rt") as f:
             for line in f:
                 match = header_patt.match(line.rstrip())
                 if match:
                     spin = [0, 1][int(match.group(2))-1]
                     avg_num_bonds = match.group(1) is not None
-                match = data_patt.match(line.rstrip())
-                if match:
-                    type1, index1, type2, index2, dist, avg, n_bonds = match.groups()
-                    # 0-based indexing
-                    index1 = int(index1) - 1
-                    index2 = int(index2) - 1
-                    new.type_of_index[index1] = type1
-                    new.type_of_index[index2] = type2
-                    avg_data = {'average': float(avg), 'distance': dist, 'n_bonds': int(n_bonds) if n_bonds else None}
-                    new.values[(index1, index2)][spin] = avg_data
-                    new.values[(index2, index1)][spin] = avg_data
-
-        new.cop_type = "unknown"
-        if "ICOOPLIST.lobster" in filepath: new.cop_type = "coop"
-        if "ICOHPLIST.lobster" in filepath: new.cop_type = "cohp"
+                    continue
+                tokens = line.split()
+                if len(tokens) < 5 or not tokens[0].isdigit(): continue
+                m1, m2 = atom_patt.match(tokens[1]), atom_patt.match(tokens[2])
+                if not (m1 and m2): continue
+                n_bonds = int(tokens[5]) if avg_num_bonds and len(tokens) > 5 else -1
+                # 0-based indexing
+                rows.append((spin, int(m1.group(2)) - 1, int(m2.group(2)) - 1, m1.group(1), m2.group(1),
+                             tokens[3], float(tokens[4]), n_bonds))
+
+        return dict(
+            spins=np.array([r[0] for r in rows], dtype=np.int),
+            pair_sites=np.array([r[1:3] for r in rows], dtype=np.int).reshape(-1, 2),
+            pair_types=np.array([r[3:5] for r in rows], dtype=str).reshape(-1, 2),
+            distances=np.array([r[5] for r in rows], dtype=str),
+            averages=np.array([r[6] for r in rows], dtype=np.float),
+            n_bonds=np.array([r[7] for r in rows], dtype=np.int),
+        )
+
+    def _set_arrays(self, arrays):
+        self._arrays = arrays
+        self.spins = arrays["spins"]
+        self.pair_sites = arrays["pair_sites"]
+        self.pair_types = arrays["pair_types"]
+        self.distances = arrays["distances"]
+        self.averages = arrays["averages"]
+        self.n_bonds = arrays["n_bonds"]
+
+        self.type_of_index = {}
+        for (index1, index2), (type1, type2) in zip(self.pair_sites.tolist(), self.pair_types.tolist()):
+            self.type_of_index[index1] = type1
+            self.type_of_index[index2] = type2
+
+        self.cop_type = "unknown"
+        if "ICOOPLIST.lobster" in self.filepath: self.cop_type = "coop"
+        if "ICOHPLIST.lobster" in self.filepath: self.cop_type = "cohp"
 
-        return new
+    @lazy_property
+    def values(self):
+        """
+        Dictionary with the values for each pair and spin: values[pair][spin]["average"|"distance"|"n_bonds"].
+        """
+        values = tree()
+        for spin, (index1, index2), dist, avg, n_bonds in zip(self.spins.tolist(), self.pair_sites.tolist(),
+                self.distances.tolist(), self.averages.tolist(), self.n_bonds.tolist()):
+            avg_data = {'average': avg, 'distance': dist, 'n_bonds': n_bonds if n_bonds >= 0 else None}
+            values[(index1, index2)][spin] = avg_data
+            values[(index2, index1)][spin] = avg_data
+
+        return values
 
     def to_string(self, verbose=0):
         """String representation with verbosity level `verbose`."""
@@ -816,45 +974,48 @@ class LobsterDoscarFile(_LobsterFile):
         the string representing the projected orbital (e.g. "4p_x"), the spin (i.e. 0 or 1).
         Each dictionary should contain a numpy array with a list of DOS values with the
         same size as energies.
+
+    .. attribute:: pdos_values
+
+        |numpy-array| of shape [nchannels, len(energies)] with the projected DOS.
+        pdos_sites, pdos_orbitals and pdos_spins give the site index, the orbital and the spin of each channel.
     """
 
     @classmethod
-    def from_file(cls, filepath):
+    def from_file(cls, filepath, use_cache=False):
         """
         Generates an instance from the DOSCAR.lobster file.
         Accepts gzipped files.
 
         Args:
             filepath: path to the DOSCAR.lobster.
+            use_cache: True to use the binary sidecar file. See :meth:`write_cache`.
 
         Returns:
             A LobsterDoscarFile.
         """
+        return super().from_file(filepath, use_cache=use_cache)
+
+    @classmethod
+    def _parse_file(cls, filepath):
         with zopen(filepath, "rt") as f:
             dos_data = f.readlines()
 
-        new = cls(filepath)
-
-        new.nsites = int(dos_data[0].split()[0])
+        nsites = int(dos_data[0].split()[0])
         n_energies = int(dos_data[5].split()[2])
-        new.fermie = float(dos_data[5].split()[3])
+        fermie = float(dos_data[5].split()[3])
 
         n_spin = 1 if len(dos_data[6].split()) == 3 else 2
-        spins = [0, 1][:n_spin]
-
-        # extract np array for total dos
-        tdos_data = np.fromiter((d for l in dos_data[6:6+n_energies] for d in l.split()),
-                                dtype=np.float).reshape((n_energies, 1+2*n_spin))
 
-        new.energies = tdos_data[:,0].copy()
-        new.total_dos = {}
-        for i_spin, spin in enumerate(spins):
-            new.total_dos[spin] = tdos_data[:,1+2*i_spin].copy()
+        # extract np array for total dos. Each block of numbers is parsed in one pass.
+        tdos_data = np.fromstring("".join(dos_data[6:6+n_energies]), dtype=np.float,
+                                  sep=" ").reshape((n_energies, 1+2*n_spin))
 
-        new.pdos = tree()
-        new.type_of_index = {}
-        # read partial doses
-        for i_site in range(new.nsites):
+        # read partial doses.
+        # The values are stored in a single [nchannels, n_energies] array.
+        # The site, the orbital and the spin of each channel are stored in separated arrays.
+        site_types, pdos_values, pdos_sites, pdos_orbitals, pdos_spins = [], [], [], [], []
+        for i_site in range(nsites):
             i_first_line = 5+(n_energies+1)*(i_site+1)
 
             # read orbitals
@@ -862,19 +1023,56 @@ class LobsterDoscarFile(_LobsterFile):
             tokens = dos_data[i_first_line].split(';')
             orbitals = tokens[-1].split()
             Z = int(tokens[-2].split()[-1])
-            el = Element.from_Z(Z)
-            new.type_of_index[i_site] = el.symbol
+            site_types.append(Element.from_Z(Z).symbol)
+
+            # extract np array for partial dos. Columns are ordered by (orbital, spin).
+            pdos_data = np.fromstring("".join(dos_data[i_first_line+1:i_first_line+1+n_energies]), dtype=np.float,
+                                      sep=" ").reshape((n_energies, 1+n_spin*len(orbitals)))
+            pdos_values.append(pdos_data[:, 1:].T)
+            for orb in orbitals:
+                for spin in range(n_spin):
+                    pdos_sites.append(i_site)
+                    pdos_orbitals.append(orb)
+                    pdos_spins.append(spin)
+
+        return dict(
+            fermie=np.array(fermie),
+            energies=tdos_data[:, 0].copy(),
+            total_dos_values=np.ascontiguousarray(tdos_data[:, 1:2*n_spin:2].T),
+            site_types=np.array(site_types, dtype=str),
+            pdos_values=np.concatenate(pdos_values) if pdos_values else np.empty((0, n_energies)),
+            pdos_sites=np.array(pdos_sites, dtype=np.int),
+            pdos_orbitals=np.array(pdos_orbitals, dtype=str),
+            pdos_spins=np.array(pdos_spins, dtype=np.int),
+        )
+
+    def _set_arrays(self, arrays):
+        self._arrays = arrays
+        self.fermie = float(arrays["fermie"])
+        self.energies = arrays["energies"]
+        self.total_dos_values = arrays["total_dos_values"]
+        self.pdos_values = arrays["pdos_values"]
+        self.pdos_sites = arrays["pdos_sites"]
+        self.pdos_orbitals = arrays["pdos_orbitals"]
+        self.pdos_spins = arrays["pdos_spins"]
+
+        self.nsites = len(arrays["site_types"])
+        self.type_of_index = dict(enumerate(arrays["site_types"].tolist()))
+        self.total_dos = {spin: values for spin, values in enumerate(self.total_dos_values)}
+        self.nsppol = len(self.total_dos)
 
-            # extract np array for partial dos
-            pdos_data = np.fromiter((d for l in dos_data[i_first_line+1:i_first_line+1+n_energies] for d in l.split()),
-                dtype=np.float).reshape((n_energies, 1+n_spin*len(orbitals)))
-
-            for i_orb, orb in enumerate(orbitals):
-                for i_spin, spin in enumerate(spins):
-                    new.pdos[i_site][orb][spin] = pdos_data[:, i_spin+n_spin*i_orb+1]
+    @lazy_property
+    def pdos(self):
+        """
+        Dictionary with the projected DOS: pdos[site_index][orbital][spin].
+        The arrays are views of :attr:`pdos_values`.
+        """
+        pdos = tree()
+        for values, i_site, orb, spin in zip(self.pdos_values, self.pdos_sites.tolist(),
+                                             self.pdos_orbitals.tolist(), self.pdos_spins.tolist()):
+            pdos[i_site][orb][spin] = values
 
-        new.nsppol = len(new.total_dos)
-        return new
+        return pdos
 
     def to_string(self, verbose=0):
         """String representation with Verbosity level `verbose`."""
@@ -96,6 +96,9 @@ class ElectronBandsTest(AbipyTest):
 
         ni_edos = ni_ebands_kmesh.get_edos()
         repr(ni_edos); str(ni_edos)
+        # Tetrahedron method requires a Gamma-centered mesh.
+        with self.assertRaises(ValueError):
+            ni_ebands_kmesh.get_edos(method="tetra")
         assert ni_edos.to_string(verbose=2)
         self.assert_almost_equal(ni_ebands_kmesh.get_collinear_mag(), 0.6501439036904575)
 
@@ -266,6 +269,9 @@ class ElectronBandsTest(AbipyTest):
 
         si_edos = si_ebands_kmesh.get_edos()
         repr(si_edos); str(si_edos)
+        si_tetra_edos = si_ebands_kmesh.get_edos(method="tetra")
+        self.assert_equal(si_tetra_edos.tot_dos.mesh, si_edos.tot_dos.mesh)
+        self.assert_almost_equal(si_tetra_edos.tot_idos.values[-1], si_edos.tot_idos.values[-1], decimal=1)
         assert ElectronDos.as_edos(si_edos, {}) is si_edos
         assert si_edos == si_edos and not (si_edos != si_edos)
         edos_samevals = ElectronDos.as_edos(si_ebands_kmesh, {})
@@ -343,6 +349,8 @@ class ElectronBandsTest(AbipyTest):
             jdos = si_ebands_kmesh.get_ejdos(spin, valence, conduction)
             intg = jdos.integral()[-1][-1]
             self.assert_almost_equal(intg, len(conduction) * len(valence))
+            tetra_jdos = si_ebands_kmesh.get_ejdos(spin, valence, conduction, method="tetra")
+            self.assert_almost_equal(tetra_jdos.integral()[-1][-1], len(conduction) * len(valence), decimal=1)
 
         self.serialize_with_pickle(jdos, protocols=[-1])
 
@@ -489,6 +497,20 @@ class ElectronBandsTest(AbipyTest):
             eb3d = ebands.get_ebands3d()
             repr(eb3d); str(eb3d)
             assert eb3d.to_string(verbose=2)
+            assert eb3d.grid2ibz_map is ebands.grid2ibz_map
+            nkuc = np.prod(eb3d.kdivs)
+            assert eb3d.ucdata_sbk.shape == (ebands.nsppol, ebands.mband, nkuc)
+            self.assert_equal(eb3d.ucdata_sbk[..., eb3d.uc2ibz == 0], np.repeat(
+                ebands.eigens[:, 0, :, None], np.count_nonzero(eb3d.uc2ibz == 0), axis=-1))
+
+            # Symmetrize vectors: Gamma-invariant vectors are preserved, norms are invariant.
+            vectors = np.random.rand(ebands.nsppol, len(ebands.kpoints), ebands.mband, 3)
+            ucvecs = eb3d.symmetrize_ibz_vectors(vectors)
+            assert ucvecs.shape == (ebands.nsppol, ebands.mband, nkuc, 3)
+            self.assert_almost_equal(np.linalg.norm(ucvecs, axis=-1),
+                np.linalg.norm(vectors, axis=-1)[:, eb3d.uc2ibz].transpose(0, 2, 1))
+            eb3d.add_ibz_vectors("random", vectors)
+            assert eb3d.ucell_vectors["random"].shape == eb3d.ucdata_shape + (3,)
 
             if self.has_matplotlib():
                 assert eb3d.plot_contour(band=4, spin=0, plane="xy", elevation=0, show=False)
@@ -1,9 +1,11 @@
 """Tests for electrons.bse module"""
 import itertools
+import numpy as np
 import abipy.data as abidata
 
 from abipy import abilab
 from abipy.electrons.fatbands import FatBandsFile
+from abipy.tools.numtools import gaussian
 from abipy.core.testing import AbipyTest
 
 
@@ -30,6 +32,21 @@ class TestElectronFatbands(AbipyTest):
         assert not fbnc_kpath.ebands.has_metallic_scheme
         assert fbnc_kpath.params["nkpt"] == 78
 
+        # Weights are read atom by atom. The full array is not allocated.
+        assert np.all(fbnc_kpath.has_atom) and np.all(fbnc_kpath.atom2isph == fbnc_kpath.iatsph.argsort())
+        wl = fbnc_kpath.get_wl_atom(1)
+        assert wl.shape == (fbnc_kpath.mbesslang, 1, 8, 78)
+        assert "wal_sbk" not in fbnc_kpath.__dict__
+        self.assert_equal(fbnc_kpath.read_atom_weights(1, spin=0, bands=slice(2, 4)), wl[:, 0, 2:4])
+        self.assert_equal(fbnc_kpath.get_wl_atom(1, spin=0, band=3), wl[:, 0, 3])
+        # LRU cache with bounded size.
+        fbnc_kpath.atom_weights_cache_size = 1
+        self.assert_equal(fbnc_kpath.get_wl_atom(0), fbnc_kpath.read_atom_weights(0))
+        assert list(fbnc_kpath._atom_weights.keys()) == [("dos_fractions", 0)]
+        fbnc_kpath._get_atom_weights(1, cache=False)
+        assert list(fbnc_kpath._atom_weights.keys()) == [("dos_fractions", 0)]
+        self.assert_equal(fbnc_kpath.wal_sbk[1], wl)
+
         if self.has_matplotlib():
             assert fbnc_kpath.plot_fatbands_typeview(tight_layout=True, show=False)
             assert fbnc_kpath.plot_fatbands_lview(tight_layout=True, show=False)
@@ -47,6 +64,25 @@ class TestElectronFatbands(AbipyTest):
         assert fbnc_kmesh.ebands.kpoints.is_ibz
         assert fbnc_kmesh.ebands.has_metallic_scheme
 
+        # PJDOS for all atoms and l-channels. Compare with explicit sum of gaussians.
+        intg = fbnc_kmesh.get_dos_integrator("gaussian", 0.1, 0.2)
+        assert fbnc_kmesh.get_dos_integrator("gaussian", 0.1, 0.2) is intg
+        assert intg.site_lso.shape == (fbnc_kmesh.natom, fbnc_kmesh.lsize, fbnc_kmesh.nsppol, len(intg.mesh))
+        # The integrator does not cache the weights of the atoms.
+        assert not fbnc_kmesh._atom_weights
+        symbol = fbnc_kmesh.symbols[0]
+        wl = fbnc_kmesh.get_wl_symbol(symbol)
+        ebands = fbnc_kmesh.ebands
+        k, band = 3, 2
+        ref = wl[0, 0, band, k] * ebands.kpoints[k].weight * gaussian(intg.mesh, 0.2, center=ebands.eigens[0, k, band])
+        intg.max_chunk_weights = 1
+        wsbk = np.zeros((1,) + wl.shape[1:])
+        wsbk[0, 0, band, k] = wl[0, 0, band, k]
+        self.assert_almost_equal(intg.integrate(wsbk)[0, 0], ref)
+        assert np.all(intg.symbols_lso[symbol] >= 0)
+        with self.assertRaises(ValueError):
+            fbnc_kmesh.get_dos_integrator("foo", 0.1, 0.2)
+
         if self.has_matplotlib():
             assert fbnc_kmesh.plot_pjdos_typeview(tight_layout=True, show=False)
             assert fbnc_kmesh.plot_pjdos_lview(tight_layout=True, stacked=True, show=False)
@@ -87,6 +123,7 @@ class TestElectronFatbands(AbipyTest):
         #assert fbnc_kpath.mband == 8
         assert fbnc_kpath.natsph_extra == 0
         #assert not fbnc_kpath.ebands.has_metallic_scheme
+        self.assert_equal(fbnc_kpath.get_wlm_atom(0, spin=1, band=5), fbnc_kpath.walm_sbk[0, :, 1, 5])
 
         if self.has_matplotlib():
             assert fbnc_kpath.plot_fatbands_typeview(ylims=elims, lmax=lmax, tight_layout=True, show=False)
@@ -249,5 +249,45 @@ class GsrRobotTest(AbipyTest):
         assert len(same_robot) == 2
         assert set(robot.labels) == set(same_robot.labels)
 
+        # Lazy robot with at most one open file.
+        lazy_robot = abilab.GsrRobot.from_dirs(os.path.dirname(filepath), abspath=True, max_open_files=1)
+        assert len(lazy_robot) == 2 and len(lazy_robot._pool) == 0
+        lazy_gsr = lazy_robot[filepath]
+        assert lazy_gsr.is_lazy and not lazy_gsr.is_open
+        assert lazy_gsr.file_class is abilab.GsrFile and not isinstance(lazy_gsr, abilab.GsrFile)
+        assert lazy_robot.prefetch(attrs=("structure", "params", "energy"), use_processes=False) == 2
+        assert len(lazy_robot._pool) == 0 and lazy_robot._pool.num_opens == 0
+        assert lazy_gsr.energy == robot[filepath].energy
+        assert lazy_gsr.structure == robot[filepath].structure
+        assert len(lazy_robot._pool) == 0
+        df = lazy_robot.get_dataframe()
+        assert len(df) == 2 and len(lazy_robot._pool) == 1
+        self.assert_equal(df["energy"].values, robot.get_dataframe()["energy"].values)
+        gsr = lazy_gsr.to_abifile()
+        assert isinstance(gsr, abilab.GsrFile) and lazy_gsr.is_open and len(lazy_robot._pool) == 1
+        assert gsr.filepath == lazy_gsr.filepath
+        import copy
+        assert copy.copy(lazy_gsr).filepath == lazy_gsr.filepath
+        lazy_robot.close()
+        assert len(lazy_robot._pool) == 0
+
+        # Map/reduce with processes. Exceptions are collected and the file is skipped.
+        ref_df = robot.get_dataframe()
+        df = lazy_robot.get_dataframe(executor="processes", max_workers=2)
+        assert list(df.index) == list(ref_df.index)
+        self.assert_equal(df["energy"].values, ref_df["energy"].values)
+        def energy_if_scf(gsr):
+            if "nscf" in gsr.filepath: raise RuntimeError("nscf file")
+            return float(gsr.energy)
+        results = list(robot.map(energy_if_scf, executor="threads"))
+        assert results == [(filepath, float(robot[filepath].energy))]
+        assert len(robot.exceptions) == 1 and "nscf file" in robot.exceptions[0]
+        # The entries of the explicit index associated to the files that have been skipped are removed.
+        names = ["file%d" % i for i in range(len(robot))]
+        df = robot.map_to_dataframe(lambda gsr: {"energy": energy_if_scf(gsr)}, index=names)
+        assert list(df.index) == [names[robot.labels.index(filepath)]]
+        with self.assertRaises(ValueError):
+            robot.map_to_dataframe(lambda gsr: {"energy": energy_if_scf(gsr)}, index=names[1:])
+
         robot.close()
         same_robot.close()
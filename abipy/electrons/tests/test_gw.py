@@ -111,6 +111,15 @@ class TestSigresFile(AbipyTest):
         self.assert_almost_equal(sigres.qpgaps, np.reshape(qpgaps, (1, 6)))
 
         ik = 2
+        # QP results are read from file with hyperslabs. Compare with full arrays.
+        r = sigres.reader
+        qp = sigres.get_qpcorr(spin=0, kpoint=ik, band=r.min_gwbstart + 1)
+        self.assert_almost_equal(qp.qpe, r.read_value("egw", cmode="c")[0, ik, r.min_gwbstart + 1])
+        self.assert_almost_equal(qp.sigxme, r.read_value("sigxme")[0, ik, 1])
+        self.assert_almost_equal(qp.ze0, r.read_value("ze0", cmode="c")[0, ik, 1])
+        self.assert_almost_equal(qp.e0, sigres.ebands.eigens[0, ik, r.min_gwbstart + 1])
+        self.assert_equal(r.read_eigvec_qp(0, ik), r.read_value("eigvec_qp", cmode="c")[0, ik])
+
         df = sigres.get_dataframe_sk(spin=0, kpoint=ik)
         same_df = sigres.get_dataframe_sk(spin=0, kpoint=sigres.gwkpoints[ik])
 
@@ -121,6 +130,12 @@ class TestSigresFile(AbipyTest):
         assert np.all(df["qpe"].to_numpy().real == df_real["qpe"])
 
         full_df = sigres.to_dataframe()
+        table = sigres.reader.read_qptable()
+        assert len(full_df) == len(table["band"])
+        self.assert_equal(full_df["qpe"].values, table["qpe"])
+        qplist = sigres.reader.read_qplist_sk(spin=0, kpoint=ik)
+        self.assert_equal([qp.band for qp in qplist], df.index.values)
+        self.assert_equal([qp.qpe for qp in qplist], df["qpe"].values)
 
         marker = sigres.get_marker("qpeme0")
         assert marker and len(marker.x)
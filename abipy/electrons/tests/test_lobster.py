@@ -1,12 +1,13 @@
 """Tests for electrons.lobster module"""
 import sys
 import os
+import shutil
 import numpy as np
 import abipy.data as abidata
 
 from abipy.core.testing import AbipyTest
 from abipy.abilab import abiopen, LobsterAnalyzer
-from abipy.electrons.lobster import LobsterInput
+from abipy.electrons.lobster import LobsterInput, CoxpFile
 
 lobster_gaas_dir = os.path.join(abidata.dirpath, "refs", "lobster_gaas")
 
@@ -40,6 +41,12 @@ class CoxpTest(AbipyTest):
             self.assertAlmostEqual(cohp.functions_pair[(0, 1)][0].values[200], -0.06124)
             #self.check_average(cohp)
 
+            # Dictionaries are views of the array with all the values.
+            assert cohp.cop_values.shape == (1, 18, 2, 401)
+            assert cohp.pair_sites.shape == (17, 2) and cohp.pair_orbitals[0, 0] == ""
+            assert np.shares_memory(cohp.partial[(1, 0)][("4p_x", "4s")][0]["single"], cohp.cop_values)
+            self.assert_equal(cohp.averaged[0]["integrated"], cohp.cop_values[0, 0, 1])
+
             if self.has_matplotlib():
                 assert cohp.plot(title="default values", show=False)
                 assert cohp.plot_site_pairs_total(from_site_index=[0, 1], what="single", exchange_xy=True, show=False)
@@ -72,6 +79,17 @@ class CoxpTest(AbipyTest):
             if self.has_nbformat():
                 assert coop.write_notebook(nbpath=self.get_tmpname(text=True))
 
+        # Binary sidecar file.
+        tmp_path = os.path.join(self.mkdtemp(), "GaAs_COOPCAR.lobster.gz")
+        shutil.copy(os.path.join(lobster_gaas_dir, "GaAs_COOPCAR.lobster.gz"), tmp_path)
+        coop = CoxpFile.from_file(tmp_path, use_cache=True)
+        assert os.path.exists(coop.cache_path)
+        coop_cache = CoxpFile.from_file(tmp_path, use_cache=True)
+        assert coop_cache._load_cache() is not None
+        self.assert_equal(coop_cache.cop_values, coop.cop_values)
+        assert coop_cache.type_of_index == coop.type_of_index and coop_cache.cop_type == "coop"
+        self.assertAlmostEqual(coop_cache.partial[(0, 1)][("4s", "4p_x")][0]["single"][200], 0.01466)
+
     def check_average(self, coxp):
         # averaged should contain the average over all atom pairs.
         # pair data is stored in total[pair][spin][what]
@@ -108,6 +126,7 @@ class ICoxpTest(AbipyTest):
             assert 0 in icohp.values[(0, 1)]
             self.assertAlmostEqual(icohp.values[(0, 1)][0]['average'], -4.36062)
             self.assertAlmostEqual(icohp.dataframe.average[0], -4.36062)
+            assert icohp.values[(0, 1)][0]['n_bonds'] == 4
 
             assert icohp.cop_type == "cohp"
             assert len(icohp.type_of_index) == 2
@@ -138,6 +157,8 @@ class LobsterDosTest(AbipyTest):
 
             self.assertAlmostEqual(ldos.pdos[1]["4p_x"][0][200], 0.02694)
             self.assertAlmostEqual(ldos.total_dos[0][200], 0.17824)
+            assert ldos.pdos_values.shape == (8, 401)
+            assert np.shares_memory(ldos.pdos[1]["4p_x"][0], ldos.pdos_values)
             self.check_average(ldos)
 
             if self.has_matplotlib():
@@ -11,6 +11,7 @@ import pymatgen.core.units as units
 import abipy.core.abinit_units as abu
 
 from collections import OrderedDict
+from functools import partial
 from scipy.integrate import cumtrapz, simps
 from monty.string import marquee, list_strings
 from monty.functools import lazy_property
@@ -21,7 +22,7 @@ from abipy.tools.plotting import (add_fig_kwargs, get_ax_fig_plt, get_axarray_fi
 from abipy.tools import duck
 from abipy.electrons.ebands import ElectronDos, RobotWithEbands
 from abipy.dfpt.phonons import PhononBands, PhononDos, RobotWithPhbands
-from abipy.abio.robots import Robot
+from abipy.abio.robots import Robot, exec_funcs
 from abipy.eph.common import BaseEphReader
 
 
@@ -950,6 +951,34 @@ class A2fFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter):
         return self._write_nb_nbpath(nb, nbpath)
 
 
+def _get_a2f_row(ncfile, qsamps=("qcoarse", "qintp"), with_geo=False, with_params=True, funcs=None):
+    """Return dictionary with the most important results in ``ncfile``. Used by A2fRobot.get_dataframe."""
+    d = OrderedDict()
+
+    for qsamp in qsamps:
+        a2f = ncfile.get_a2f_qsamp(qsamp)
+        d["lambda_" + qsamp] = a2f.lambda_iso
+        d["omegalog_" + qsamp] = a2f.omega_log
+
+        # Add transport properties.
+        if ncfile.has_a2ftr:
+            for qsamp in qsamps:
+                a2ftr = ncfile.get_a2ftr_qsamp(qsamp)
+                d["lambdatr_avg_" + qsamp] = a2f.lambda_tr
+
+    # Add info on structure.
+    if with_geo:
+        d.update(ncfile.structure.get_dict4pandas(with_spglib=True))
+
+    # Add convergence parameters
+    if with_params:
+        d.update(ncfile.params)
+
+    # Execute functions.
+    if funcs is not None: d.update(exec_funcs(funcs, ncfile))
+    return d
+
+
 class A2fRobot(Robot, RobotWithEbands, RobotWithPhbands):
     """
     This robot analyzes the results contained in multiple A2F.nc files.
@@ -965,7 +994,8 @@ class A2fRobot(Robot, RobotWithEbands, RobotWithPhbands):
 
     all_qsamps = ["qcoarse", "qintp"]
 
-    def get_dataframe(self, abspath=False, with_geo=False, with_params=True, funcs=None):
+    def get_dataframe(self, abspath=False, with_geo=False, with_params=True, funcs=None,
+                      executor=None, max_workers=None):
         """
         Build and return a |pandas-DataFrame| with the most important results.
 
@@ -976,40 +1006,13 @@ class A2fRobot(Robot, RobotWithEbands, RobotWithPhbands):
                 Each function receives a :class:`A2fFile` object and returns a tuple (key, value)
                 where key is a string with the name of column and value is the value to be inserted.
             with_params: False to exclude calculation parameters from the dataframe.
+            executor, max_workers: Passed to ``Robot.map`` to process the files in parallel.
 
         Return: |pandas-DataFrame|
         """
-        rows, row_names = [], []
-        for i, (label, ncfile) in enumerate(self.items()):
-            row_names.append(label)
-            d = OrderedDict()
-
-            for qsamp in self.all_qsamps:
-                a2f = ncfile.get_a2f_qsamp(qsamp)
-                d["lambda_" + qsamp] = a2f.lambda_iso
-                d["omegalog_" + qsamp] = a2f.omega_log
-
-                # Add transport properties.
-                if ncfile.has_a2ftr:
-                    for qsamp in self.all_qsamps:
-                        a2ftr = ncfile.get_a2ftr_qsamp(qsamp)
-                        d["lambdatr_avg_" + qsamp] = a2f.lambda_tr
-
-            # Add info on structure.
-            if with_geo:
-                d.update(ncfile.structure.get_dict4pandas(with_spglib=True))
-
-            # Add convergence parameters
-            if with_params:
-                d.update(ncfile.params)
-
-            # Execute functions.
-            if funcs is not None: d.update(self._exec_funcs(funcs, ncfile))
-            rows.append(d)
-
-        import pandas as pd
-        row_names = row_names if not abspath else self._to_relpaths(row_names)
-        return pd.DataFrame(rows, index=row_names, columns=list(rows[0].keys()))
+        func = partial(_get_a2f_row, qsamps=tuple(self.all_qsamps), with_geo=with_geo,
+                       with_params=with_params, funcs=funcs)
+        return self.map_to_dataframe(func, abspath=abspath, executor=executor, max_workers=max_workers)
 
     @add_fig_kwargs
     def plot_lambda_convergence(self, what="lambda", sortby=None, hue=None, ylims=None, fontsize=8,
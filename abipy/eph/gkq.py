@@ -119,71 +119,120 @@ class GkqFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, Notebo
         """(spin, nkpt, mband) array with eigenvalues on the k+q grid in eV."""
         return self.reader.read_value("eigenvalues_kq") * abu.Ha_eV
 
-    def read_all_gkq(self, mode="phonon"):
+    @lazy_property
+    def atm2nu(self):
         """
-        Read all eph matrix stored on disk.
+        (natom3_nu, natom3) complex array with the transformation from the atomic to the phonon representation,
+        including the 1/sqrt(2 w_qnu) factor. Rows associated to modes with w_qnu < EPH_WTOL are set to zero.
+        """
+        return _get_atm2nu(self.phfreqs_ha, self.phdispl_red)
+
+    def iter_gkq(self, mode="phonon", spins=None, kblock_size=None):
+        """
+        Generator over the e-ph matrix elements. K-points are read in blocks with netcdf hyperslabs
+        and the transformation to the phonon representation is performed with a single matmul per block.
 
         Args:
             mode: "phonon" if for eph matrix elements in phonon representation,
                   "atom" for perturbation along (idir, iatom).
+            spins: List of spin indices. None for all spins.
+            kblock_size: Number of k-points in each block. None to use blocks of ~64 Mb.
 
-        Return: (nsppol, nkpt, 3*natom, mband, mband) complex array.
+        Yields: (spin, kslice, gkq) where gkq is a (nk_block, 3*natom, mband, mband) complex array
+            and kslice is the slice object with the k-point indices of the block.
         """
         if mode not in ("atom", "phonon"):
             raise ValueError("Invalid mode: %s" % mode)
 
-        # Read e-ph matrix element in the atomic representation (idir, ipert)
         # Fortran array on disk has shape:
         # nctkarr_t('gkq', "dp", &
         # 'complex, max_number_of_states, max_number_of_states, number_of_phonon_modes, number_of_kpoints, number_of_spins')
-        gkq_atm = self.reader.read_value("gkq", cmode="c")
-        if mode == "atom": return gkq_atm
-
-        # Convert from atomic to phonon representation.
-        # May use np.einsum for better efficiency but oh well!
-        nband = gkq_atm.shape[-1]
-        nb2 = nband ** 2
-        assert nband == gkq_atm.shape[-2] and nband == self.ebands.nband
-        natom = len(self.structure)
-        natom3 = natom * 3
-        phfreqs_ha, phdispl_red = self.phfreqs_ha, self.phdispl_red
-        gkq_nu = np.empty_like(gkq_atm)
-        cwork = np.empty((natom3, nb2), dtype=np.complex)
-        for spin in range(self.ebands.nsppol):
-            for ik in range(self.ebands.nkpt):
-                g = np.reshape(gkq_atm[spin, ik], (-1, nb2))
-                for nu in range(natom3):
-                    if phfreqs_ha[nu] > EPH_WTOL:
-                        cwork[nu] = np.dot(phdispl_red[nu], g) / np.sqrt(2.0 * phfreqs_ha[nu])
-                    else:
-                        cwork[nu] = 0.0
-                gkq_nu[spin, ik] = np.reshape(cwork, (natom3, nband, nband))
-
-        return gkq_nu
-
-    #def get_averaged_gkq(self, spin, ik, band_k, band_kq, tol_deg=1e-3):
-    #    natom3 = len(self.structure) * 3
-    #    e_k = self.ebands.eigens[spin, ik, band_k])
-    #    e_kq = self.eigens_kq[spin, ik, band_kq]
-    #    e_k, ndeg_k, bids_k = _find_deg(spin, ik, self.ebands.eigens)
-    #    e_kq, ndeg_kq, bids_kq = _find_deg(spin, ik, self.eigens_kq)
-    #
-    #    gkq2_nu = np.zeros(natom3))
-    #    ncvar = abifile.reader.read_variable("gkq")
-    #    for ib_k in bids_k:
-    #
-    #       for ib_kq in bids_kq:
-    #           gkq_atm = ncvar[spin, ik, :, ib_k, ib_kq]
-    #           gkq_atm = gkq_atm[:, 0] + 1j * gkq_atm[:, 1]
-    #
-    #           # Transform the gkk matrix elements from (atom, red_direction) basis to phonon-mode basis.
-    #           gkq_nu = np.zeros(natom3), dtype=np.complex)
-    #           for nu in range(natom3):
-    #               if self.phfreqs_ha[nu] < eph_wtol: continue
-    #               gkq_nu[nu] = np.dot(self.phdispl_red[nu], gkq_atm) / np.sqrt(2.0 * self.phfreqs_ha[nu])
-    #        gkq2_nu += np.abs(gkq_nu[nu]) ** 2
-    #
-    #    return np.sqrt(gkq2_nu)
+        ncvar = self.reader.read_variable("gkq")
+        nsppol, nkpt, natom3, nband = ncvar.shape[:4]
+        if kblock_size is None:
+            kblock_size = max(1, (64 * 1024 ** 2) // (natom3 * nband ** 2 * 16))
+
+        spins = range(nsppol) if spins is None else spins
+        for spin in spins:
+            for start in range(0, nkpt, kblock_size):
+                kslice = slice(start, min(start + kblock_size, nkpt))
+                values = ncvar[spin, kslice]
+                gkq = values[..., 0] + 1j * values[..., 1]
+                del values
+                if mode == "phonon":
+                    # (natom3_nu, natom3) x (nk, natom3, nb2) --> (nk, natom3_nu, nb2)
+                    gkq = np.matmul(self.atm2nu, gkq.reshape(-1, natom3, nband ** 2)).reshape(gkq.shape)
+
+                yield spin, kslice, gkq
+
+    def read_all_gkq(self, mode="phonon", kblock_size=None):
+        """
+        Read all eph matrix stored on disk.
+
+        Args:
+            mode: "phonon" if for eph matrix elements in phonon representation,
+                  "atom" for perturbation along (idir, iatom).
+            kblock_size: Number of k-points read in a single block. See iter_gkq.
+
+        Return: (nsppol, nkpt, 3*natom, mband, mband) complex array.
+        """
+        if mode not in ("atom", "phonon"):
+            raise ValueError("Invalid mode: %s" % mode)
+
+        shape = self.reader.read_variable("gkq").shape[:-1]
+        assert shape[-1] == shape[-2] and shape[-1] == self.ebands.nband
+        gkq_all = np.empty(shape, dtype=np.complex)
+        for spin, kslice, gkq in self.iter_gkq(mode=mode, kblock_size=kblock_size):
+            gkq_all[spin, kslice] = gkq
+
+        return gkq_all
+
+    def read_gkq2(self, mode="phonon", kblock_size=None):
+        """
+        Compute |g|^2 without allocating the full complex array.
+        Arguments have the same meaning as in read_all_gkq.
+
+        Return: (nsppol, nkpt, 3*natom, mband, mband) real array.
+        """
+        if mode not in ("atom", "phonon"):
+            raise ValueError("Invalid mode: %s" % mode)
+
+        gkq2 = np.empty(self.reader.read_variable("gkq").shape[:-1])
+        for spin, kslice, gkq in self.iter_gkq(mode=mode, kblock_size=kblock_size):
+            gkq2[spin, kslice] = gkq.real ** 2 + gkq.imag ** 2
+
+        return gkq2
+
+    def get_averaged_gkq2(self, tol_eig=1e-3, tol_phfreq=EPH_WTOL, kblock_size=None):
+        """
+        Compute |g|^2 in the phonon representation averaged over degenerate electron states at k and k+q
+        and over degenerate phonon modes. Degeneracies are found by comparing consecutive eigenvalues
+        (assumed sorted in ascending order).
+
+        Args:
+            tol_eig: Tolerance in eV for degenerate electron states.
+            tol_phfreq: Tolerance in Ha for degenerate phonon modes.
+            kblock_size: Number of k-points read in a single block. See iter_gkq.
+
+        Return: (nsppol, nkpt, 3*natom, mband, mband) real array. Use np.sqrt to get the averaged |g|.
+        """
+        ncvar = self.reader.read_variable("gkq")
+        nband = ncvar.shape[-2]
+        eigens_k, eigens_kq = self.ebands.eigens[..., :nband], self.eigens_kq[..., :nband]
+        avg_nu = _get_degen_avg_matrix(self.phfreqs_ha, tol_phfreq)
+
+        gkq2 = np.empty(ncvar.shape[:-1])
+        for spin, kslice, gkq in self.iter_gkq(mode="phonon", kblock_size=kblock_size):
+            g2 = gkq.real ** 2 + gkq.imag ** 2
+            del gkq
+            # Average over (nu, band_k, band_kq) with averaging matrices. Shape is (nk, nu, band_k, band_kq)
+            avg_k = _get_degen_avg_matrix(eigens_k[spin, kslice], tol_eig)
+            avg_kq = _get_degen_avg_matrix(eigens_kq[spin, kslice], tol_eig)
+            g2 = np.einsum("mn,knij->kmij", avg_nu, g2)
+            g2 = np.matmul(np.matmul(avg_k[:, np.newaxis], g2), avg_kq[:, np.newaxis].transpose(0, 1, 3, 2))
+            gkq2[spin, kslice] = g2
+
+        return gkq2
 
     @add_fig_kwargs
     def plot(self, mode="phonon", with_glr=True, fontsize=8, colormap="viridis", sharey=True, **kwargs):
@@ -200,17 +249,12 @@ class GkqFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, Notebo
 
         Return: |matplotlib-Figure|
         """
-        gkq = np.abs(self.read_all_gkq(mode=mode))
+        gkq = np.sqrt(self.read_gkq2(mode=mode))
         if mode == "phonon": gkq *= abu.Ha_meV
 
-        # Compute e_{k+q} - e_k for all possible (b, b')
-        ediffs = np.empty_like(gkq)
-        for spin in range(self.ebands.nsppol):
-            for ik in range(self.ebands.nkpt):
-                for ib_kq in range(self.ebands.mband):
-                    for ib_k in range(self.ebands.mband):
-                        ed = np.abs(self.eigens_kq[spin, ik, ib_kq] - self.ebands.eigens[spin, ik, ib_k])
-                        ediffs[spin, ik, :, ib_k, ib_kq] = ed
+        # Compute |e_{k+q} - e_k| for all possible (b, b'). Shape: (nsppol, nkpt, band_k, band_kq)
+        nband = gkq.shape[-1]
+        ediffs = np.abs(self.eigens_kq[:, :, np.newaxis, :nband] - self.ebands.eigens[:, :, :nband, np.newaxis])
 
         if with_glr and mode == "phonon":
             # Add horizontal bar with matrix elements computed from Verdi's model (only G = 0, \delta_nm in bands).
@@ -231,7 +275,7 @@ class GkqFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, Notebo
         for nu, ax in enumerate(ax_list):
             idir = nu % 3
             iat = (nu - idir) // 3
-            data, c = gkq[:, :, nu, :, :].ravel(), ediffs[:,:,nu,:,:].ravel()
+            data, c = gkq[:, :, nu, :, :].ravel(), ediffs.ravel()
             # Filter items according to ediff
             index = c <= 1.2 * self.phfreqs_ha.max() * abu.Ha_eV
             data, c = data[index], c[index]
@@ -363,6 +407,38 @@ class GkqFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, Notebo
         return self._write_nb_nbpath(nb, nbpath)
 
 
+def _get_atm2nu(phfreqs_ha, phdispl_red, eph_wtol=EPH_WTOL):
+    """
+    Return (natom3_nu, natom3) complex array with the transformation of the e-ph matrix elements
+    from the atomic to the phonon representation: phdispl_red[nu] / sqrt(2 w_qnu).
+    Rows associated to modes with w_qnu < eph_wtol are set to zero.
+    """
+    phfreqs_ha = np.asarray(phfreqs_ha)
+    atm2nu = np.zeros(phdispl_red.shape, dtype=np.complex)
+    ok = phfreqs_ha >= eph_wtol
+    atm2nu[ok] = phdispl_red[ok] / np.sqrt(2.0 * phfreqs_ha[ok])[:, np.newaxis]
+    return atm2nu
+
+
+def _get_degen_avg_matrix(eigens, atol):
+    """
+    Return matrix that averages over degenerate states when applied to the last axis of eigens.
+
+    Args:
+        eigens: (..., nband) array with eigenvalues sorted in ascending order.
+        atol: Absolute tolerance for degenerate eigenvalues.
+
+    Return: (..., nband, nband) array with avg[..., i, j] = 1 / ndeg if i and j belong to the same
+        degenerate subspace with ndeg states else 0.
+    """
+    eigens = np.asarray(eigens)
+    # Consecutive states whose eigenvalues differ less than atol are assigned the same label.
+    labels = np.concatenate([np.zeros(eigens.shape[:-1] + (1,), dtype=np.int),
+                             np.cumsum(np.diff(eigens, axis=-1) > atol, axis=-1)], axis=-1)
+    same = labels[..., :, np.newaxis] == labels[..., np.newaxis, :]
+    return same / same.sum(axis=-1, keepdims=True)
+
+
 class GkqReader(ElectronsReader):
     """
     This object reads the results stored in the GKQ file produced by ABINIT.
@@ -447,22 +523,19 @@ class GkqRobot(Robot, RobotWithEbands):
                 xticks.append(iq)
                 xlabels.append(name)
 
-            phfreqs_ha, phdispl_red = abifile.phfreqs_ha, abifile.phdispl_red
-            ncvar = abifile.reader.read_variable("gkq")
-            for spin in range(nsppol):
-                gkq_atm = ncvar[spin, ik, :, band_k, band_kq]
-                gkq_atm = gkq_atm[:, 0] + 1j * gkq_atm[:, 1]
-
-                # Transform the gkk matrix elements from (atom, red_direction) basis to phonon-mode basis.
-                gkq_snuq[spin, :, iq] = 0.0
-                for nu in range(natom3):
-                    if phfreqs_ha[nu] < eph_wtol: continue
-                    gkq_snuq[spin, nu, iq] = np.dot(phdispl_red[nu], gkq_atm) / np.sqrt(2.0 * phfreqs_ha[nu])
+            phfreqs_ha = abifile.phfreqs_ha
+            atm2nu = _get_atm2nu(phfreqs_ha, abifile.phdispl_red, eph_wtol=eph_wtol)
+            # Read (nsppol, natom3) hyperslab and transform the gkk matrix elements
+            # from (atom, red_direction) basis to phonon-mode basis.
+            gkq_atm = abifile.reader.read_variable("gkq")[:, ik, :, band_k, band_kq]
+            gkq_atm = gkq_atm[..., 0] + 1j * gkq_atm[..., 1]
+            gkq_snuq[:, :, iq] = np.dot(gkq_atm, atm2nu.T)
 
             if with_glr:
                 # Compute long range part with (simplified) generalized Frohlich model.
-                gkq_lr[spin, :, iq] = glr_frohlich(qpoint, abifile.becs_cart, abifile.epsinf_cart,
-                                                   abifile.phdispl_cart_bohr, phfreqs_ha, abifile.structure, qdamp=qdamp)
+                # The model does not depend on spin.
+                gkq_lr[:, :, iq] = glr_frohlich(qpoint, abifile.becs_cart, abifile.epsinf_cart,
+                                                abifile.phdispl_cart_bohr, phfreqs_ha, abifile.structure, qdamp=qdamp)
 
         ax, fig, plt = get_ax_fig_plt(ax=ax)
 
@@ -17,6 +17,7 @@ import abipy.core.abinit_units as abu
 
 from collections import OrderedDict, namedtuple
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from tabulate import tabulate
 from monty.string import marquee, list_strings
 from monty.functools import lazy_property
@@ -35,6 +36,7 @@ __all__ = [
     "QpTempState",
     "QpTempList",
     "EphSelfEnergy",
+    "EphSelfEnergyList",
     "SigEPhFile",
     "SigEPhRobot",
     "TdepElectronBands",
@@ -680,6 +682,69 @@ class EphSelfEnergy(object):
         return fig
 
 
+class EphSelfEnergyList(object):
+    """
+    Collection of e-ph self-energies for a set of (spin, kpoint, band) states.
+    Data is stored in arrays with the state index as first dimension (structure of arrays).
+    Indexing returns :class:`EphSelfEnergy` objects whose arrays are views of the arrays of the collection.
+    """
+
+    def __init__(self, wmesh, qps, vals_e0ks, dvals_de0ks, dw_vals, vals_wr, spfunc_wr):
+        """
+        Args:
+            wmesh: [nstates, nwr] array with the frequency meshes in eV.
+            qps: List of :class:`QpTempState` objects.
+            vals_e0ks: complex [nstates, ntemp] array with Sigma_eph(omega=eKS, kT)
+            dvals_de0ks: complex [nstates, ntemp] arrays with d Sigma_eph(omega, kT) / d omega (omega=eKS)
+            dw_vals: [nstates, ntemp] array with Debye-Waller term (static)
+            vals_wr: [nstates, ntemp, nwr] complex array with Sigma_eph(omega, kT).
+            spfunc_wr: [nstates, ntemp, nwr] real array with spectral function.
+        """
+        self.qps = qps
+        self.wmesh = wmesh
+        self.vals_e0ks = vals_e0ks
+        self.dvals_de0ks = dvals_de0ks
+        self.dw_vals = dw_vals
+        self.vals_wr = vals_wr
+        self.spfunc_wr = spfunc_wr
+
+    def __len__(self):
+        return len(self.qps)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, i):
+        return EphSelfEnergy(self.wmesh[i], self.qps[i], self.vals_e0ks[i], self.dvals_de0ks[i], self.dw_vals[i],
+                             self.vals_wr[i], self.spfunc_wr[i])
+
+    @property
+    def skb_list(self):
+        """List of (spin, kpoint, band) tuples."""
+        return [qp.skb for qp in self.qps]
+
+
+def _iter_prefetch(func, args_list, prefetch=True):
+    """
+    Yield ``func(*args)`` for args in ``args_list``. If ``prefetch``, the next item is computed
+    in a background thread while the caller processes the current one.
+    The caller should not perform netcdf IO while iterating since HDF5 is not thread-safe.
+    """
+    if not prefetch:
+        for args in args_list:
+            yield func(*args)
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = None
+        for args in args_list:
+            next_future = executor.submit(func, *args)
+            if future is not None: yield future.result()
+            future = next_future
+        if future is not None: yield future.result()
+
+
 class A2feph(object):
     r"""
     Eliashberg function :math:`\alpha^2F_{nk}(\omega)`
@@ -1108,14 +1173,10 @@ class SigEPhFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
             with_params: False to exclude calculation parameters from the dataframe.
             ignore_imag: only real part is returned if ``ignore_imag``.
         """
-        df_list = []; app = df_list.append
         with_spin = self.nsppol == 2 if with_spin == "auto" else with_spin
-        for spin in range(self.nsppol):
-            for ikc, kpoint in enumerate(self.sigma_kpoints):
-                app(self.get_dataframe_sk(spin, ikc, itemp=itemp, with_params=with_params,
-                    with_spin=with_spin, ignore_imag=ignore_imag))
+        table = self.reader.read_qptable(ignore_imag=ignore_imag)
 
-        return pd.concat(df_list)
+        return self._get_qptable_dataframe(table, itemp=itemp, with_spin=with_spin, with_params=with_params)
 
     def get_gaps_dataframe(self, itemp=None, with_params=False, ignore_imag=False):
         """
@@ -1168,18 +1229,49 @@ class SigEPhFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
             with_spin: True to add column with spin index. "auto" to add it only if nsppol == 2
             ignore_imag: Only real part is returned if ``ignore_imag``.
         """
-        ikc = self.sigkpt2index(kpoint)
         with_spin = self.nsppol == 2 if with_spin == "auto" else with_spin
-        rows = []
-        for band in range(self.bstart_sk[spin, ikc], self.bstop_sk[spin, ikc]):
-            # Read QP data.
-            qp = self.reader.read_qp(spin, ikc, band, ignore_imag=ignore_imag)
-            # Convert to dataframe and add other entries useful when comparing different calculations.
-            rows.append(qp.get_dataframe(with_spin=with_spin, params=self.params if with_params else None))
+        table = self.reader.read_qptable(spin=spin, kpoint=kpoint, ignore_imag=ignore_imag)
 
-        df = pd.concat(rows)
-        if itemp is not None: df = df[df["tmesh"] == self.tmesh[itemp]]
-        return df
+        return self._get_qptable_dataframe(table, itemp=itemp, index=index, with_spin=with_spin,
+                                           with_params=with_params)
+
+    def _get_qptable_dataframe(self, table, itemp=None, index=None, with_spin=True, with_params=False):
+        """
+        Build |pandas-DataFrame| with the same columns as :meth:`QpTempState.get_dataframe`
+        from the table returned by :meth:`SigmaPhReader.read_qptable`.
+
+        Args:
+            table: QP table.
+            itemp: Temperature index, if None all temperatures are returned.
+            index: Index of the dataframe for each temperature. None to use the temperature index.
+            with_spin: False if spin index is not wanted.
+            with_params: False to exclude calculation parameters from the dataframe.
+        """
+        if itemp is not None:
+            select = table["itemp"] == itemp
+            table = OrderedDict([(k, v[select]) for k, v in table.items()])
+
+        qpe, e0, fan0, dw = table["qpe"], table["e0"], table["fan0"], table["dw"]
+        od = OrderedDict()
+        if with_spin: od["spin"] = table["spin"]
+        od["band"] = table["band"]
+        od["e0"] = e0
+        od["re_qpe"] = qpe.real
+        od["qpeme0"] = (qpe - e0).real
+        od["re_sig0"] = fan0.real + dw
+        od["imag_sig0"] = fan0.imag
+        od["ze0"] = table["ze0"]
+        od["re_fan0"] = fan0.real
+        od["dw"] = dw
+        od["tmesh"] = table["tmesh"]
+
+        # Add other entries useful when comparing different calculations.
+        if with_params:
+            for k, v in self.params.items():
+                od[k] = len(e0) * [v]
+
+        index = table["itemp"] if index is None else np.asarray(index)[table["itemp"]]
+        return pd.DataFrame(od, index=index)
 
     def get_linewidth_dos(self, method="gaussian", e0="fermie", step=0.1, width=0.2):
         """
@@ -1988,8 +2080,8 @@ class SigEPhRobot(Robot, RobotWithEbands):
     # Try to have API similar to SigresRobot
     EXT = "SIGEPH"
 
-    def __init__(self, *args):
-        super().__init__(*args)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         if len(self.abifiles) in (0, 1): return
 
         # Check dimensions and self-energy states and issue warning.
@@ -2072,18 +2164,12 @@ class SigEPhRobot(Robot, RobotWithEbands):
         """
         with_spin = any(ncfile.nsppol == 2 for ncfile in self.abifiles) if with_spin == "auto" else with_spin
 
-        df_list = []; app = df_list.append
-        for label, ncfile in self.items():
-            for spin in range(ncfile.nsppol):
-                for ikc, kpoint in enumerate(ncfile.sigma_kpoints):
-                    app(ncfile.get_dataframe_sk(spin, ikc, with_params=with_params,
-                        with_spin=with_spin, ignore_imag=ignore_imag))
-
-        return pd.concat(df_list)
+        return pd.concat([ncfile.get_dataframe(with_params=with_params, with_spin=with_spin, ignore_imag=ignore_imag)
+                          for ncfile in self.abifiles])
 
     @add_fig_kwargs
     def plot_selfenergy_conv(self, spin, kpoint, band, itemp=0, sortby=None, hue=None,
-                             colormap="jet", xlims=None, fontsize=8, **kwargs):
+                             colormap="jet", xlims=None, fontsize=8, prefetch=True, **kwargs):
         """
         Plot the convergence of the EPH self-energy wrt to the ``sortby`` parameter.
         Values can be optionally grouped by `hue`.
@@ -2106,6 +2192,7 @@ class SigEPhRobot(Robot, RobotWithEbands):
             xlims: Set the data limits for the x-axis. Accept tuple e.g. ``(left, right)``
                    or scalar e.g. ``left``. If left (right) is None, default values are used.
             fontsize: Legend and title fontsize.
+            prefetch: True to read the self-energy of the next file in a background thread.
 
         Returns: |matplotlib-Figure|
         """
@@ -2114,11 +2201,15 @@ class SigEPhRobot(Robot, RobotWithEbands):
         import matplotlib.pyplot as plt
         cmap = plt.get_cmap(colormap)
 
+        def read_sigma(ncfile):
+            return ncfile.reader.read_sigeph_skb(spin, kpoint, band)
+
+        # The self-energy of the next file is read in a background thread while plotting.
         if hue is None:
             ax_list = None
             lnp_list = self.sortby(sortby)
-            for ix, (label, ncfile, param) in enumerate(lnp_list):
-                sigma = ncfile.reader.read_sigeph_skb(spin, kpoint, band)
+            sigmas = _iter_prefetch(read_sigma, [(ncfile,) for _, ncfile, _ in lnp_list], prefetch=prefetch)
+            for ix, ((label, ncfile, param), sigma) in enumerate(zip(lnp_list, sigmas)):
                 fig = sigma.plot_tdep(itemps=itemp, ax_list=ax_list,
                     label=label, color=cmap(ix / len(lnp_list)), show=False)
                 ax_list = fig.axes
@@ -2128,11 +2219,11 @@ class SigEPhRobot(Robot, RobotWithEbands):
             nrows, ncols = 3, len(groups)
             ax_mat, fig, plt = get_axarray_fig_plt(None, nrows=nrows, ncols=ncols,
                                                    sharex=True, sharey=True, squeeze=False)
+            sigmas = _iter_prefetch(read_sigma, [(ncfile,) for g in groups for _, ncfile, _ in g], prefetch=prefetch)
             for ig, g in enumerate(groups):
                 subtitle = "%s: %s" % (self._get_label(hue), g.hvalue)
                 ax_mat[0, ig].set_title(subtitle, fontsize=fontsize)
-                for ix, (nclabel, ncfile, param) in enumerate(g):
-                    sigma = ncfile.reader.read_sigeph_skb(spin, kpoint, band)
+                for ix, ((nclabel, ncfile, param), sigma) in enumerate(zip(g, sigmas)):
                     fig = sigma.plot_tdep(itemps=itemp, ax_list=ax_mat[:, ig],
                         label="%s: %s" % (self._get_label(sortby), param),
                         color=cmap(ix / len(g)), show=False)
@@ -2870,11 +2961,8 @@ class SigmaPhReader(BaseEphReader):
             kpoint: K-point in self-energy. Accepts |Kpoint|, vector or index.
             ignore_imag: Only real part is returned if ``ignore_imag``.
         """
-        ikc = self.sigkpt2index(kpoint)
-        bstart, bstop = self.bstart_sk[spin, ikc], self.bstop_sk[spin, ikc]
-
-        return QpTempList([self.read_qp(spin, ikc, band, ignore_imag=ignore_imag)
-                           for band in range(bstart, bstop)])
+        table = self.read_qptable(spin=spin, kpoint=kpoint, ignore_imag=ignore_imag)
+        return QpTempList(self._qps_from_table(table))
 
     def read_sigeph_skb(self, spin, kpoint, band):
         """
@@ -2887,57 +2975,117 @@ class SigmaPhReader(BaseEphReader):
 
         Return: :class:`EphSelfEnergy` object.
         """
+        # Read contributions given by the Frohlich model (optional)
+        #if self.read_variable("frohl_model", default=0):
+        #    frohl_vals_e0ks = self.read_variable("frohl_vals_e0ks")[spin, ikc, ib, :, :] * abu.Ha_eV
+        #    frohl_vals_e0ks = frohl_vals_e0ks[:, 0] + 1j * frohl_vals_e0ks[:, 1]
+        #    frohl_dvals_de0ks = self.read_variable("frohl_dvals_de0ks")[spin, ikc, ib, :, :]
+        #    frohl_dvals_de0ks = frohl_dvals_de0ks[:, 0] + 1j * frohl_dvals_de0ks[:, 1]
+        #    frohl_spfunc_wr = self.read_variable("frohl_spfunc_wr")[spin, ikc, ib, :, :] / abu.Ha_eV
+
+        return self.read_sigeph_skbs([(spin, kpoint, band)])[0]
+
+    def _expand_skb_list(self, skb_list):
+        """
+        Return list of (spin, ikcalc, ib, kpoint, band) tuples from a list of (spin, kpoint, band) tuples.
+        spin and band can be integers or iterables e.g. range.
+        """
+        def as_list(obj):
+            return [obj] if duck.is_intlike(obj) else list(obj)
+
+        states = []
+        for spin, kpoint, band in skb_list:
+            for s in as_list(spin):
+                for b in as_list(band):
+                    states.append(self.get_sigma_skb_kpoint(s, kpoint, b) + (b,))
+
+        return states
+
+    def read_sigeph_skbs(self, skb_list):
+        """
+        Read the e-ph self-energies for a list of (spin, kpoint, band) states.
+        Each netcdf variable is read with a single hyperslab containing all the states.
+
+        Args:
+            skb_list: List of (spin, kpoint, band) tuples. kpoint accepts |Kpoint|, vector or index.
+                spin and band can also be lists or ranges e.g. ``[(0, 0, range(4, 8))]``
+
+        Return: :class:`EphSelfEnergyList` object.
+        """
         if self.nwr == 0:
             raise ValueError("%s does not contain spectral function data." % self.path)
 
-        spin, ikc, ib, kpoint = self.get_sigma_skb_kpoint(spin, kpoint, band)
+        states = self._expand_skb_list(skb_list)
+        if not states:
+            raise ValueError("Empty list of states")
+        spins, ikcs, ibs = (np.array([st[i] for st in states], dtype=np.int) for i in range(3))
+        lo = [spins.min(), ikcs.min(), ibs.min()]
+        box = tuple(slice(l, h + 1) for l, h in zip(lo, [spins.max(), ikcs.max(), ibs.max()]))
+
+        def read(varname, fact=None):
+            # Read the hyperslab with all the states, convert units in place and select the states.
+            var = self.read_variable(varname)
+            data = np.array(var[box + (var.ndim - 3) * (slice(None),)], dtype=np.double)
+            if fact is not None: data *= fact
+            return data[spins - lo[0], ikcs - lo[1], ibs - lo[2]]
+
+        def tocomplex(data):
+            # View (..., 2) real array as complex array without copying.
+            return np.ascontiguousarray(data).view(np.complex128)[..., 0]
 
         # Abinit fortran (Ha units)
         # wrmesh_b(nwr, max_nbcalc, nkcalc, nsppol)
         # Frequency mesh along the real axis (Ha units) used for the different bands
-        #print(spin, ikc, ib, self.read_variable("wrmesh_b").shape)
-        wmesh = self.read_variable("wrmesh_b")[spin, ikc, ib, :] * abu.Ha_eV
+        wmesh = read("wrmesh_b", fact=abu.Ha_eV)
 
         # complex(dpc) :: vals_e0ks(ntemp, max_nbcalc, nkcalc, nsppol)
         # Sigma_eph(omega=eKS, kT, band)
-        vals_e0ks = self.read_variable("vals_e0ks")[spin, ikc, ib, :, :] * abu.Ha_eV
-        vals_e0ks = vals_e0ks[:, 0] + 1j * vals_e0ks[:, 1]
+        vals_e0ks = tocomplex(read("vals_e0ks", fact=abu.Ha_eV))
 
         # complex(dpc) :: dvals_de0ks(ntemp, max_nbcalc, nkcalc, nsppol)
         # d Sigma_eph(omega, kT, band, kcalc, spin) / d omega (omega=eKS)
-        dvals_de0ks = self.read_variable("dvals_de0ks")[spin, ikc, ib, :, :]
-        dvals_de0ks = dvals_de0ks[:, 0] + 1j * dvals_de0ks[:, 1]
+        dvals_de0ks = tocomplex(read("dvals_de0ks"))
 
         # real(dp) :: dw_vals(ntemp, max_nbcalc, nkcalc, nsppol)
         # Debye-Waller term (static).
-        dw_vals = self.read_variable("dw_vals")[spin, ikc, ib, :] * abu.Ha_eV
+        dw_vals = read("dw_vals", fact=abu.Ha_eV)
 
         # complex(dpc) :: vals_wr(nwr, ntemp, max_nbcalc, nkcalc, nsppol)
         # Sigma_eph(omega, kT, band) for given (k, spin).
         # Note: enk_KS corresponds to nwr/2 + 1.
-        vals_wr = self.read_variable("vals_wr")[spin, ikc, ib, :, :, :] * abu.Ha_eV
-        vals_wr = vals_wr[:, :, 0] + 1j * vals_wr[:, :, 1]
+        vals_wr = tocomplex(read("vals_wr", fact=abu.Ha_eV))
 
         # Spectral function
         # nctkarr_t("spfunc_wr", "dp", "nwr, ntemp, max_nbcalc, nkcalc, nsppol")
-        spfunc_wr = self.read_variable("spfunc_wr")[spin, ikc, ib, :, :] / abu.Ha_eV
+        spfunc_wr = read("spfunc_wr", fact=1.0 / abu.Ha_eV)
 
-        # Read QP data. Note band instead of ib index.
-        qp = self.read_qp(spin, ikc, band)
+        # QP data (see read_qp)
+        qpe = tocomplex(read("qp_enes", fact=abu.Ha_eV))
+        try:
+            qpe_oms = read("qpoms_enes", fact=abu.Ha_eV)[..., 0]
+        except Exception:
+            cprint("Reading old deprecated sigeph file!", "yellow")
+            qpe_oms = read("qpadb_enes", fact=abu.Ha_eV)[..., 0]
+        e0 = read("ks_enes", fact=abu.Ha_eV)
+        ze0 = read("ze0_vals")
 
-        # Read contributions given by the Frohlich model (optional)
-        frohl_vals_e0ks = None; frohl_dvals_de0ks = None; frohl_spfunc_wr = None
-        #if self.read_variable("frohl_model", default=0):
-        #    frohl_vals_e0ks = self.read_variable("frohl_vals_e0ks")[spin, ikc, ib, :, :] * abu.Ha_eV
-        #    frohl_vals_e0ks = frohl_vals_e0ks[:, 0] + 1j * frohl_vals_e0ks[:, 1]
-        #    frohl_dvals_de0ks = self.read_variable("frohl_dvals_de0ks")[spin, ikc, ib, :, :]
-        #    frohl_dvals_de0ks = frohl_dvals_de0ks[:, 0] + 1j * frohl_dvals_de0ks[:, 1]
-        #    frohl_spfunc_wr = self.read_variable("frohl_spfunc_wr")[spin, ikc, ib, :, :] / abu.Ha_eV
+        qps = [QpTempState(spin=int(spin), kpoint=kpoint, band=int(band), tmesh=self.tmesh, e0=e0[i], qpe=qpe[i],
+                           ze0=ze0[i], fan0=vals_e0ks[i] - dw_vals[i], dw=dw_vals[i], qpe_oms=qpe_oms[i])
+               for i, (spin, ikc, ib, kpoint, band) in enumerate(states)]
 
-        return EphSelfEnergy(wmesh, qp, vals_e0ks, dvals_de0ks, dw_vals, vals_wr, spfunc_wr,
-                             frohl_vals_e0ks=frohl_vals_e0ks,
-                             frohl_dvals_de0ks=frohl_dvals_de0ks,
-                             frohl_spfunc_wr=frohl_spfunc_wr)
+        return EphSelfEnergyList(wmesh, qps, vals_e0ks, dvals_de0ks, dw_vals, vals_wr, spfunc_wr)
+
+    def iter_sigeph_skbs(self, skb_list, chunksize=32, prefetch=True):
+        """
+        Generator yielding the :class:`EphSelfEnergy` objects for the states in ``skb_list``.
+        States are read in chunks with :meth:`read_sigeph_skbs`. If ``prefetch``, the next chunk is read
+        in a background thread while the caller processes (e.g. plots) the current one.
+        The caller should not read from this file while iterating.
+        """
+        states = [(spin, ikc, band) for spin, ikc, _, _, band in self._expand_skb_list(skb_list)]
+        chunks = [(states[i:i + chunksize],) for i in range(0, len(states), chunksize)]
+        for sigmas in _iter_prefetch(self.read_sigeph_skbs, chunks, prefetch=prefetch):
+            yield from sigmas
 
     def read_a2feph_skb(self, spin, kpoint, band):
         """
@@ -3030,14 +3178,92 @@ class SigmaPhReader(BaseEphReader):
         Args:
             ignore_imag: Only real part is returned if ``ignore_imag``.
         """
-        qps_spin = self.nsppol * [None]
-
-        # TODO: Try to optimize this part.
-        for spin in range(self.nsppol):
-            qps = []
-            for ikc, kpoint in enumerate(self.sigma_kpoints):
-                for band in range(self.bstart_sk[spin, ikc], self.bstop_sk[spin, ikc]):
-                    qps.append(self.read_qp(spin, ikc, band, ignore_imag=ignore_imag))
-            qps_spin[spin] = QpTempList(qps)
+        table = self.read_qptable(ignore_imag=ignore_imag)
+        qps_spin = [QpTempList() for spin in range(self.nsppol)]
+        for qp in self._qps_from_table(table):
+            qps_spin[qp.spin].append(qp)
 
         return tuple(qps_spin)
+
+    def read_qptable(self, spin=None, kpoint=None, ignore_imag=False):
+        """
+        Read the QP results for all bands and temperatures with a single read per netcdf variable.
+        No :class:`QpTempState` is created.
+
+        Args:
+            spin: Spin index. None for all spins.
+            kpoint: K-point in self-energy. Accepts |Kpoint|, vector or index. None for all k-points.
+            ignore_imag: Only real part is returned if ``ignore_imag``.
+
+        Return: :class:`OrderedDict` with 1d arrays in long format i.e. one entry for each
+            (spin, kpoint, band, temperature). Keys: ``spin``, ``ikcalc``, ``band``, ``itemp``
+            and the other fields of :class:`QpTempState` (but kpoint). Energies are in eV.
+        """
+        spin_slice = slice(None) if spin is None else slice(spin, spin + 1)
+        kslice = slice(None)
+        if kpoint is not None:
+            ikc = self.sigkpt2index(kpoint)
+            kslice = slice(ikc, ikc + 1)
+
+        def read(varname, cmode=None):
+            # Read the hyperslab with all the bands and temperatures for the selected spins and k-points.
+            var = self.read_variable(varname)
+            data = np.asarray(var[(spin_slice, kslice) + (var.ndim - 2) * (slice(None),)])
+            if cmode == "c": data = data[..., 0] + 1j * data[..., 1]
+            return data
+
+        def ri(a):
+            return np.real(a) if ignore_imag else a
+
+        # (Complex) QP energies computed with the dynamic formalism.
+        # nctkarr_t("qp_enes", "dp", "two, ntemp, max_nbcalc, nkcalc, nsppol")
+        qpe = read("qp_enes", cmode="c") * abu.Ha_eV
+
+        # On-the-mass-shell QP energies.
+        # nctkarr_t("qpoms_enes", "dp", "two, ntemp, max_nbcalc, nkcalc, nsppol")
+        try:
+            qpe_oms = read("qpoms_enes")[..., 0] * abu.Ha_eV
+        except Exception:
+            cprint("Reading old deprecated sigeph file!", "yellow")
+            qpe_oms = read("qpadb_enes")[..., 0] * abu.Ha_eV
+
+        # Debye-Waller term (static).
+        # nctkarr_t("dw_vals", "dp", "ntemp, max_nbcalc, nkcalc, nsppol"),
+        dw = read("dw_vals") * abu.Ha_eV
+        # Sigma_eph(omega=eKS, kT, band, ikcalc, spin)
+        # nctkarr_t("vals_e0ks", "dp", "two, ntemp, max_nbcalc, nkcalc, nsppol")
+        fan0 = read("vals_e0ks", cmode="c") * abu.Ha_eV - dw
+        # nctkarr_t("ks_enes", "dp", "max_nbcalc, nkcalc, nsppol")
+        e0 = read("ks_enes") * abu.Ha_eV
+        # nctkarr_t("ze0_vals", "dp", "ntemp, max_nbcalc, nkcalc, nsppol")
+        ze0 = read("ze0_vals")
+
+        # Select the bands computed for each (spin, kpoint). Entries are ordered by (spin, kpoint, band, temperature)
+        spins, ikcs = np.arange(self.nsppol)[spin_slice], np.arange(self.nkcalc)[kslice]
+        s, k, ib, t = np.meshgrid(spins, ikcs, np.arange(qpe.shape[2]), np.arange(self.ntemp), indexing="ij")
+        mask = ib < self.nbcalc_sk[s, k]
+
+        return OrderedDict([
+            ("spin", s[mask]),
+            ("ikcalc", k[mask]),
+            ("band", (ib + self.bstart_sk[s, k])[mask]),
+            ("itemp", t[mask]),
+            ("tmesh", self.tmesh[t[mask]]),
+            ("e0", np.broadcast_to(e0[..., None], mask.shape)[mask]),
+            ("qpe", ri(qpe[mask])),
+            ("ze0", ze0[mask]),
+            ("fan0", ri(fan0[mask])),
+            ("dw", dw[mask]),
+            ("qpe_oms", qpe_oms[mask]),
+        ])
+
+    def _qps_from_table(self, table):
+        """Build list of :class:`QpTempState` from the table returned by ``read_qptable``."""
+        ntemp = self.ntemp
+        # Each state has ntemp consecutive entries in the table.
+        values = {k: table[k].reshape(-1, ntemp) for k in ("qpe", "ze0", "fan0", "dw", "qpe_oms")}
+
+        return [QpTempState(spin=int(spin), kpoint=self.sigma_kpoints[ikc], band=int(band), tmesh=self.tmesh,
+                            e0=e0, **{k: v[i] for k, v in values.items()})
+                for i, (spin, ikc, band, e0) in enumerate(zip(table["spin"][::ntemp], table["ikcalc"][::ntemp],
+                                                              table["band"][::ntemp], table["e0"][::ntemp]))]
@@ -0,0 +1,479 @@
+# coding: utf-8
+"""
+Boltzmann transport in the relaxation time approximation (RTA) computed in-process
+from band energies and velocities interpolated with the SKW method.
+
+The relaxation times are either constant or obtained from the e-ph linewidths
+stored in the SIGEPH.nc file (interpolated with SKW as well).
+The k-points of the IBZ are processed in chunks (optionally in parallel worker processes)
+and accumulated in the velocity-weighted densities of states. Transport tensors
+are then computed with vectorized integrals on a (temperature, chemical potential) grid.
+"""
+import numpy as np
+import abipy.core.abinit_units as abu
+
+from scipy.special import expit
+from monty.string import marquee
+from monty.functools import lazy_property
+from abipy.core.kpoints import has_timrev_from_kptopt
+from abipy.tools import duck
+from abipy.tools.dos import gaussian_dos
+from abipy.tools.plotting import add_fig_kwargs, get_ax_fig_plt
+
+
+__all__ = [
+    "SkwTransport",
+    "SkwTransportResults",
+]
+
+
+def _get_nval(ebands, bstart):
+    """Number of valence bands in the interpolated set of bands starting at ``bstart``."""
+    nelect = int(round(ebands.nelect))
+    return (nelect // 2 if ebands.nspinor == 1 else nelect) - bstart
+
+
+class SkwTransport(object):
+    """
+    Engine for the computation of transport properties in the RTA from SKW-interpolated bands.
+
+    Usage example:
+
+    .. code-block:: python
+
+        engine = SkwTransport.from_ebands(gsr.ebands, tau=1e-14)
+        res = engine.compute(kmesh=[48, 48, 48], tmesh=[300], nprocs=4)
+        print(res)
+        res.get_mobility_mu(eh=0, itemp=0, component="xx")
+    """
+
+    # Default memory (Mb) used for the workspace arrays of each chunk of k-points.
+    max_memory_mb = 512
+
+    def __init__(self, skw, structure, nval, erange, tau=1e-14, lw_skw=None, tmesh=None,
+                 spin_fact=None, min_linewidth=1e-6):
+        """
+        Args:
+            skw: |SkwInterpolator| for the band energies in eV.
+            structure: |Structure| object.
+            nval: Number of valence bands in ``skw``. Used to separate electrons from holes.
+            erange: (emin, emax) Range of the ab-initio energies in eV. Used to build the default energy mesh.
+            tau: Constant relaxation time in s. Ignored if ``lw_skw`` is given.
+            lw_skw: |SkwInterpolator| for the linewidths (eV) with shape [nsppol, nkpt, nband * ntemp]
+                where nband is the number of bands in ``skw``. None for constant relaxation time.
+            tmesh: Temperatures in K associated to the linewidths. Required if ``lw_skw`` is not None.
+            spin_fact: Spin degeneracy. None to use 2 if skw.nsppol == 1 else 1.
+            min_linewidth: Linewidths (eV) smaller than this value are set to min_linewidth
+                to avoid divergences in the relaxation times.
+        """
+        self.skw = skw
+        self.structure = structure
+        self.nval = int(nval)
+        self.erange = tuple(erange)
+        self.tau = float(tau)
+        self.lw_skw = lw_skw
+        self.tmesh = None if tmesh is None else np.reshape(np.array(tmesh, dtype=np.float), (-1,))
+        self.spin_fact = (2 if skw.nsppol == 1 else 1) if spin_fact is None else spin_fact
+        self.min_linewidth = min_linewidth
+
+        if lw_skw is not None:
+            if self.tmesh is None:
+                raise ValueError("tmesh must be provided when lifetimes are interpolated.")
+            if lw_skw.nband != skw.nband * len(self.tmesh):
+                raise ValueError("lw_skw.nband: %d != skw.nband * ntemp: %d" % (
+                    lw_skw.nband, skw.nband * len(self.tmesh)))
+
+        # Lattice vectors along the rows in Ang and point group operations in Cartesian coordinates.
+        self.lattice = np.array(structure.lattice.matrix)
+        inv_lattice = np.linalg.inv(self.lattice)
+        self.rots_cart = np.einsum("ai,sij,jb->sab", self.lattice.T, skw.ptg_symrel, inv_lattice.T)
+
+    @classmethod
+    def from_ebands(cls, ebands, tau=1e-14, lpratio=5, bstart=0, bstop=None, verbose=0):
+        """
+        Build the object from |ElectronBands| in the IBZ using a constant relaxation time.
+
+        Args:
+            ebands: |ElectronBands| object or file with energies in the IBZ.
+            tau: Relaxation time in s.
+            lpratio: Ratio between the number of star functions and the number of ab-initio k-points.
+                Large values may be required for accurate velocities.
+            bstart, bstop: Range of bands to be interpolated.
+            verbose: Verbosity level.
+        """
+        from abipy.electrons.ebands import ElectronBands
+        ebands = ElectronBands.as_ebands(ebands)
+        skw = ebands.interpolate(lpratio=lpratio, bstart=bstart, bstop=bstop, verbose=verbose).interpolator
+        eigens = ebands.eigens[:, :, bstart:bstop]
+
+        return cls(skw, ebands.structure, _get_nval(ebands, bstart), (eigens.min(), eigens.max()), tau=tau)
+
+    @classmethod
+    def from_sigeph(cls, sigeph, itemp_list=None, lpratio=5, verbose=0):
+        """
+        Build the object from a |SigEPhFile| with the e-ph linewidths computed for all the k-points in the IBZ.
+        KS energies and linewidths of the states in [max_bstart, min_bstop) are interpolated with SKW.
+
+        Args:
+            sigeph: |SigEPhFile| object.
+            itemp_list: List of temperature indices. None for all.
+            lpratio: Ratio between the number of star functions and the number of ab-initio k-points.
+            verbose: Verbosity level.
+        """
+        from abipy.core.skw import SkwInterpolator
+        ebands = sigeph.ebands
+        if len(sigeph.sigma_kpoints) != len(ebands.kpoints):
+            raise ValueError("Linewidths should be computed for all k-points in the IBZ but nkibz != nkcalc")
+
+        bstart, bstop = sigeph.reader.max_bstart, sigeph.reader.min_bstop
+        itemp_list = list(range(sigeph.ntemp)) if itemp_list is None else duck.list_ints(itemp_list)
+
+        # KS energies + i Im Sigma(e_KS) in eV with shape [nsppol, nkibz, nband, ntemp]
+        qpes = sigeph.get_qp_array(mode="ks+lifetimes")[:, :, bstart:bstop][..., itemp_list]
+        nsppol, nkpt, nband, ntemp = qpes.shape
+
+        abispg = sigeph.structure.abi_spacegroup
+        fm_symrel = [s for (s, afm) in zip(abispg.symrel, abispg.symafm) if afm == 1]
+        cell = (sigeph.structure.lattice.matrix, sigeph.structure.frac_coords, sigeph.structure.atomic_numbers)
+        has_timrev = has_timrev_from_kptopt(sigeph.reader.read_value("kptopt"))
+        kcoords = ebands.kpoints.frac_coords
+
+        eigens = qpes[..., 0].real
+        skw = SkwInterpolator(lpratio, kcoords, eigens, ebands.fermie, ebands.nelect,
+                              cell, fm_symrel, has_timrev, verbose=verbose)
+
+        # All the temperatures are interpolated at once by treating (band, temp) as a single band index.
+        lws = np.reshape(np.abs(qpes.imag), (nsppol, nkpt, nband * ntemp))
+        lw_skw = SkwInterpolator(lpratio, kcoords, lws, ebands.fermie, ebands.nelect,
+                                 cell, fm_symrel, has_timrev, verbose=verbose)
+
+        return cls(skw, sigeph.structure, _get_nval(ebands, bstart), (eigens.min(), eigens.max()),
+                   lw_skw=lw_skw, tmesh=np.asarray(sigeph.tmesh)[itemp_list])
+
+    @property
+    def ntau(self):
+        """Number of relaxation times per state (1 if constant relaxation time)."""
+        return 1 if self.lw_skw is None else len(self.tmesh)
+
+    def get_taus(self, kpts):
+        """
+        Return [nsppol, nk, nband, ntau] array with the relaxation times in s for the k-points ``kpts``.
+        """
+        nsppol, nband, nk = self.skw.nsppol, self.skw.nband, len(kpts)
+        if self.lw_skw is None:
+            return np.full((nsppol, nk, nband, 1), self.tau)
+
+        lws = np.reshape(np.abs(self.lw_skw.eval_kpts(kpts)[0]), (nsppol, nk, nband, self.ntau))
+        return 1.0 / (2 * np.maximum(lws, self.min_linewidth) * abu.eV_s)
+
+    def get_velocities(self, kpts):
+        """
+        Return (eigens, vels) with the energies in eV [nsppol, nk, nband] and the
+        group velocities in Cartesian coordinates in m/s [nsppol, nk, nband, 3].
+        """
+        eigens, dedk, _ = self.skw.eval_kpts(kpts, dk1=True)
+        # de/dk in reduced coordinates --> Cartesian coordinates (eV Ang) --> m/s
+        vels = np.matmul(dedk.real, self.lattice) * (1e-10 / (2 * np.pi * abu.hbar_eVs))
+        return eigens.real, vels
+
+    def get_histograms(self, kpts, weights, wmesh, width):
+        """
+        Accumulate the contributions of a chunk of k-points on the energy mesh ``wmesh``
+        with gaussian broadening ``width``. Results are summed over spins (without spin degeneracy factor).
+
+        Args:
+            kpts: [nk, 3] k-points in reduced coordinates.
+            weights: [nk] k-point weights (normalized to one in the full set of k-points).
+            wmesh: Linear energy mesh in eV.
+            width: Standard deviation of the gaussian in eV.
+
+        Return: [2 + 18 * ntau, nw] array. The first two rows contain the DOS of valence and conduction bands.
+            The remaining rows contain the vvtau DOS: sum_nk w_k v_a v_b tau delta(e - e_nk) with
+            shape [ntau, 2, 3, 3] where the second index selects valence/conduction bands.
+        """
+        kpts = np.reshape(kpts, (-1, 3))
+        nk, nband = len(kpts), self.skw.nband
+        eigens, vels = self.get_velocities(kpts)
+        taus = self.get_taus(kpts)
+
+        # [2, nk, nband] array with k-point weights for valence and conduction states.
+        is_cond = np.arange(nband) >= self.nval
+        wgroup = np.stack([np.outer(weights, ~is_cond), np.outer(weights, is_cond)])
+
+        hist = np.zeros((2 + 18 * self.ntau, len(wmesh)))
+        for spin in range(self.skw.nsppol):
+            # [ntau, 2, 3, 3, nk, nband] array with w_k v_a v_b tau for valence and conduction states.
+            vvtau = np.einsum("kna,knb,knt,gkn->tgabkn", vels[spin], vels[spin], taus[spin], wgroup)
+            rows = np.concatenate([wgroup, np.reshape(vvtau, (-1, nk, nband))])
+            hist += gaussian_dos(wmesh, eigens[spin], width, weights=rows)
+
+        return hist
+
+    def get_kchunksize(self, max_memory_mb=None):
+        """Number of k-points treated in each chunk by compute."""
+        if max_memory_mb is None: max_memory_mb = self.max_memory_mb
+        nbytes = 8 * self.skw.nband * (2 + 18 * self.ntau + 4 * self.skw.nsppol)
+        chunksize = max(1, int(max_memory_mb * 1024 ** 2 / nbytes))
+        return min(chunksize, self.skw.get_kchunksize(dk1=True, max_memory_mb=max_memory_mb))
+
+    def compute(self, kmesh, is_shift=None, tmesh=None, mu_mesh=None, step=0.01, width=0.05,
+                nprocs=None, max_memory_mb=None):
+        """
+        Compute transport properties on a homogeneous k-mesh.
+
+        Args:
+            kmesh: Three integers with the number of divisions along the reciprocal primitive axes.
+            is_shift: three integers (spglib API). None means unshifted mesh.
+            tmesh: List of temperatures in K. Used only for constant relaxation time (default: [300]).
+                If linewidths are interpolated, the temperatures are fixed by the linewidths.
+            mu_mesh: Chemical potentials in eV. None to use the energy mesh. Values that are not
+                on the energy mesh are obtained by linear interpolation.
+            step: Energy step (eV) of the linear mesh.
+            width: Standard deviation (eV) of the gaussian used for the densities of states.
+            nprocs: Number of processes used to compute the chunks of k-points. None for serial execution.
+            max_memory_mb: Approximate memory (Mb) of the workspace arrays used for each chunk of k-points.
+
+        Return: :class:`SkwTransportResults` object.
+        """
+        if self.lw_skw is not None:
+            if tmesh is not None:
+                raise ValueError("tmesh cannot be specified when the linewidths are interpolated.")
+            tmesh = self.tmesh
+        else:
+            tmesh = [300.0] if tmesh is None else tmesh
+
+        # Linear mesh covering all the states.
+        pad = 6 * width + step
+        wmesh = np.arange(self.erange[0] - pad, self.erange[1] + pad + step, step)
+
+        k = self.skw.get_sampling(kmesh, is_shift)
+        chunksize = self.get_kchunksize(max_memory_mb=max_memory_mb)
+        slices = [slice(i, i + chunksize) for i in range(0, k.nibz, chunksize)]
+        chunks = [(k.ibz[sl], k.weights[sl]) for sl in slices]
+
+        if nprocs is None or nprocs <= 1 or len(chunks) <= 1:
+            hist = sum(self.get_histograms(kpts, wts, wmesh, width) for kpts, wts in chunks)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=nprocs, initializer=_init_worker,
+                                     initargs=(self, wmesh, width)) as executor:
+                hist = sum(executor.map(_histograms_worker, *zip(*chunks)))
+
+        hist *= self.spin_fact
+        dos = hist[:2]
+        vvtau = np.reshape(hist[2:], (self.ntau, 2, 3, 3, len(wmesh)))
+
+        # Symmetrize the tensors computed in the IBZ.
+        vvtau = np.einsum("sai,tgijw,sbj->tgabw", self.rots_cart, vvtau, self.rots_cart) / len(self.rots_cart)
+
+        return SkwTransportResults(wmesh, dos, vvtau, tmesh, self.structure.volume, mu_mesh=mu_mesh,
+                                   kmesh=kmesh, width=width)
+
+
+# Arguments used by the worker processes of `SkwTransport.compute`.
+_WORKER_ARGS = None
+
+
+def _init_worker(engine, wmesh, width):
+    """Initialize the worker process with a copy of the engine."""
+    global _WORKER_ARGS
+    _WORKER_ARGS = (engine, wmesh, width)
+
+
+def _histograms_worker(kpts, weights):
+    """Accumulate the contributions of a chunk of k-points in the worker process."""
+    engine, wmesh, width = _WORKER_ARGS
+    return engine.get_histograms(kpts, weights, wmesh, width)
+
+
+class SkwTransportResults(object):
+    """
+    Transport properties computed by :class:`SkwTransport` on a (temperature, chemical potential) grid.
+    Arrays with index ``eh`` use 0 for electrons (conduction bands) and 1 for holes (valence bands)
+    as in the TRANSPORT.nc file.
+    """
+
+    def __init__(self, wmesh, dos, vvtau, tmesh, volume, mu_mesh=None, kmesh=None, width=None):
+        """
+        Args:
+            wmesh: Linear energy mesh in eV.
+            dos: [2, nw] DOS (states/eV per unit cell) of valence and conduction bands.
+            vvtau: [ntau, 2, 3, 3, nw] array with sum_nk w_k v_a v_b tau delta(e - e_nk) in m^2 / (s eV)
+                for valence and conduction bands. ntau is either 1 or len(tmesh).
+            tmesh: Temperatures in K.
+            mu_mesh: Chemical potentials in eV inside wmesh. None to use the energy mesh.
+            volume: Volume of the unit cell in Ang^3.
+            kmesh: K-mesh used for the integration.
+            width: Gaussian broadening in eV.
+        """
+        self.wmesh = np.asarray(wmesh)
+        self.dos = np.asarray(dos)
+        self.vvtau = np.asarray(vvtau)
+        self.tmesh = np.reshape(np.array(tmesh, dtype=np.float), (-1,))
+        self.mu_mesh = self.wmesh if mu_mesh is None else np.reshape(np.array(mu_mesh, dtype=np.float), (-1,))
+        self.volume = volume
+        self.kmesh = kmesh
+        self.width = width
+
+        if np.any(self.tmesh <= 0):
+            raise ValueError("Temperatures should be > 0 but got: %s" % str(self.tmesh))
+        if np.any(self.mu_mesh < self.wmesh[0]) or np.any(self.mu_mesh > self.wmesh[-1]):
+            raise ValueError("Chemical potentials should be inside the energy mesh [%s, %s]" % (
+                self.wmesh[0], self.wmesh[-1]))
+        if len(self.vvtau) not in (1, self.ntemp):
+            raise ValueError("Wrong shape for vvtau: %s" % str(self.vvtau.shape))
+
+    @property
+    def ntemp(self):
+        """Number of temperatures."""
+        return len(self.tmesh)
+
+    def __str__(self):
+        return self.to_string()
+
+    def to_string(self, verbose=0):
+        """String representation."""
+        lines = []; app = lines.append
+        app(marquee("SKW Transport", mark="="))
+        app("K-mesh: %s, gaussian broadening: %s (eV)" % (str(self.kmesh), self.width))
+        app("Number of temperatures: %d, number of chemical potentials: %d" % (self.ntemp, len(self.mu_mesh)))
+        app("Mobility at the intrinsic chemical potential:")
+        app("Temperature [K]     Electrons [cm^2/Vs]     Holes [cm^2/Vs]")
+        for itemp, temp in enumerate(self.tmesh):
+            app("%14.1lf %18.6lf %18.6lf" % (temp, self.get_mobility_mu(0, itemp), self.get_mobility_mu(1, itemp)))
+
+        return "\n".join(lines)
+
+    def _get_xmesh(self, itemp, nkt=40):
+        """
+        Return the energies e - mu (eV) on the linear mesh around e = mu where the Fermi-Dirac kernels
+        of the itemp-th temperature are non-negligible and kT in eV.
+        """
+        step = self.wmesh[1] - self.wmesh[0]
+        kt = abu.kb_eVK * self.tmesh[itemp]
+        half = int(np.ceil(nkt * kt / step))
+        return np.arange(-half, half + 1) * step, kt
+
+    def _on_mu_mesh(self, values):
+        """Interpolate values [..., nw] given on the energy mesh onto mu_mesh."""
+        if self.mu_mesh is self.wmesh: return values
+        from scipy.interpolate import interp1d
+        return interp1d(self.wmesh, values, axis=-1, assume_sorted=True)(self.mu_mesh)
+
+    @lazy_property
+    def onsager(self):
+        """
+        [3, 2, ntemp, nmu, 3, 3] array with the Onsager coefficients
+        L^n = e / V \int de vvtau(e) (e - mu)^n (-df/de) for n = 0, 1, 2 and valence/conduction bands.
+        Units: S/m * eV^n
+        """
+        # The integrals are computed for mu on the energy mesh as correlations with the kernels
+        # (-df/de) (e - mu)^n, whose support is limited to a few kT around mu.
+        from scipy.ndimage import correlate1d
+        fact = abu.e_Cb / (self.volume * 1e-30) * (self.wmesh[1] - self.wmesh[0])
+        values = np.empty((3, 2, self.ntemp, 3, 3, len(self.wmesh)))
+        for itemp in range(self.ntemp):
+            x, kt = self._get_xmesh(itemp)
+            occ = expit(-x / kt)
+            mdfde = occ * (1 - occ) / kt
+            vvtau = self.vvtau[itemp if len(self.vvtau) > 1 else 0]
+            for n in range(3):
+                values[n, :, itemp] = fact * correlate1d(vvtau, mdfde * x ** n, axis=-1, mode="constant")
+
+        return np.moveaxis(self._on_mu_mesh(values), -1, 3)
+
+    @lazy_property
+    def sigma(self):
+        """[ntemp, nmu, 3, 3] array with the electrical conductivity in S/m."""
+        return self.onsager[0].sum(axis=0)
+
+    @lazy_property
+    def seebeck(self):
+        """[ntemp, nmu, 3, 3] array with the Seebeck coefficient in V/K."""
+        l1 = self.onsager[1].sum(axis=0)
+        return -np.matmul(np.linalg.pinv(self.sigma), l1) / self.tmesh[:, None, None, None]
+
+    @lazy_property
+    def kappa(self):
+        """[ntemp, nmu, 3, 3] array with the electronic thermal conductivity in W/(m K)."""
+        l1, l2 = self.onsager[1].sum(axis=0), self.onsager[2].sum(axis=0)
+        return (l2 - np.matmul(l1, np.matmul(np.linalg.pinv(self.sigma), l1))) / self.tmesh[:, None, None, None]
+
+    @lazy_property
+    def carriers(self):
+        """[2, ntemp, nmu] array with the density of electrons and holes in cm^-3."""
+        # Split the occupation factors into a step function (cumulative sums) plus f(e - mu) - theta(mu - e)
+        # that decays exponentially on both sides so that n_e and n_h are accurate also inside the gap.
+        from scipy.ndimage import correlate1d
+        dos_v, dos_c = self.dos
+        cum_c = np.cumsum(dos_c) - 0.5 * dos_c
+        cum_v = np.cumsum(dos_v[::-1])[::-1] - 0.5 * dos_v
+        values = np.empty((2, self.ntemp, len(self.wmesh)))
+        for itemp in range(self.ntemp):
+            x, kt = self._get_xmesh(itemp)
+            fmt = expit(-x / kt) - np.heaviside(-x, 0.5)
+            values[0, itemp] = cum_c + correlate1d(dos_c, fmt, mode="constant")
+            values[1, itemp] = cum_v - correlate1d(dos_v, fmt, mode="constant")
+
+        values *= (self.wmesh[1] - self.wmesh[0]) / (self.volume * 1e-24)
+        return self._on_mu_mesh(values)
+
+    @lazy_property
+    def mobility(self):
+        """[2, ntemp, nmu, 3, 3] array with the mobility of electrons and holes in cm^2/(V s)."""
+        # Conductivity of electrons (conduction bands) and holes (valence bands) in S/cm.
+        sigma_eh = self.onsager[0][::-1] * 1e-2
+        ncar = self.carriers[..., None, None] * abu.e_Cb
+        return np.divide(sigma_eh, ncar, out=np.zeros_like(sigma_eh), where=ncar > 0)
+
+    def get_mu_from_doping(self, doping=0.0):
+        """
+        Return array with the chemical potential (eV) for each temperature such that
+        n_e - n_h = doping, where doping is in cm^-3 (positive for n-type).
+        """
+        net = self.carriers[0] - self.carriers[1]
+        return np.array([np.interp(doping, net[itemp], self.mu_mesh) for itemp in range(self.ntemp)])
+
+    def get_mobility_mu(self, eh, itemp, component='xx', mu=None):
+        """
+        Get the value of the mobility at chemical potential mu.
+        Same API as TransportFile.get_mobility_mu so that results can be compared.
+
+        Args:
+            eh: 0 for electrons, 1 for holes.
+            itemp: Index of the temperature.
+            component: Component of the tensor: "xx", "yy" "xy" ...
+            mu: Value of the chemical potential in eV. None to use the intrinsic chemical potential.
+        """
+        i, j = abu.s2itup(component)
+        if mu is None: mu = self.get_mu_from_doping(0.0)[itemp]
+        return np.interp(mu, self.mu_mesh, self.mobility[eh, itemp, :, i, j])
+
+    @add_fig_kwargs
+    def plot_mobility(self, eh=0, component='xx', ax=None, colormap='jet', fontsize=8, **kwargs):
+        """
+        Plot the mobility as a function of the chemical potential.
+
+        Args:
+            eh: 0 for electrons, 1 for holes.
+            component: Component to plot: "xx", "yy" "xy" ...
+            ax: |matplotlib-Axes| or None if a new figure should be created.
+            colormap: matplotlib colormap.
+            fontsize (int): fontsize for titles and legend
+
+        Return: |matplotlib-Figure|
+        """
+        i, j = abu.s2itup(component)
+        ax, fig, plt = get_ax_fig_plt(ax=ax)
+        cmap = plt.get_cmap(colormap)
+        for itemp, temp in enumerate(self.tmesh):
+            ax.plot(self.mu_mesh, self.mobility[eh, itemp, :, i, j], c=cmap(itemp / self.ntemp),
+                    label='T = %dK' % temp)
+
+        ax.grid(True)
+        ax.set_xlabel('Chemical potential (eV)')
+        ax.set_ylabel(r'mobility $\mu(\epsilon_F)$ [cm$^2$/Vs]')
+        ax.set_yscale('log')
+        ax.legend(loc="best", shadow=True, fontsize=fontsize)
+
+        return fig
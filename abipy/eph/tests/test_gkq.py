@@ -0,0 +1,163 @@
+"""Tests for gkq module."""
+import numpy as np
+import abipy.data as abidata
+import abipy.core.abinit_units as abu
+
+from abipy import abilab
+from abipy.core.kpoints import Kpoint
+from abipy.core.testing import AbipyTest
+from abipy.eph.common import glr_frohlich
+from abipy.eph.gkq import GkqFile, GkqRobot
+
+
+class _FakeGkqFile(object):
+    """
+    Minimal object with the attributes of |GkqFile| used by GkqRobot.plot_gkq2_qpath.
+    Matrix elements are random numbers, phonon displacements are the identity.
+    """
+
+    def __init__(self, ebands, structure, qpoint, seed):
+        rng = np.random.RandomState(seed)
+        natom3 = 3 * len(structure)
+        self.filepath = "fake_%s_GKQ.nc" % qpoint.name
+        self.ebands, self.structure, self.qpoint = ebands, structure, qpoint
+        self.nsppol = ebands.nsppol
+        self.phfreqs_ha = np.linspace(1e-3, 2e-3, natom3)
+        self.phdispl_red = np.eye(natom3, dtype=np.complex)
+        self.phdispl_cart_bohr = np.eye(natom3, dtype=np.complex)
+        # Charge neutrality.
+        self.becs_cart = np.array([(-1) ** iat * 2.0 * np.eye(3) for iat in range(len(structure))])
+        self.epsinf_cart = 12.0 * np.eye(3)
+        self._gkq = rng.rand(self.nsppol, ebands.nkpt, natom3, ebands.mband, ebands.mband, 2)
+        self.reader = self
+
+    def read_variable(self, varname):
+        assert varname == "gkq"
+        return self._gkq
+
+    def close(self):
+        pass
+
+
+class _FakeGkqReader(object):
+    """Return numpy arrays instead of netcdf variables."""
+
+    def __init__(self, **kwargs):
+        self.variables = kwargs
+
+    def read_variable(self, varname):
+        return self.variables[varname]
+
+
+def _make_gkqfile(phfreqs_ha, phdispl_red, eigens_k, eigens_kq, gkq_atm):
+    """
+    Build a |GkqFile| without reading a file.
+
+    Args:
+        gkq_atm: (nsppol, nkpt, 3*natom, mband, mband) complex array in the atomic representation.
+    """
+    gkqfile = GkqFile.__new__(GkqFile)
+    gkqfile.phfreqs_ha, gkqfile.phdispl_red = np.array(phfreqs_ha), np.array(phdispl_red)
+    gkqfile.ebands = type("FakeEbands", (object,), dict(eigens=np.array(eigens_k), nband=gkq_atm.shape[-1]))()
+    gkqfile.eigens_kq = np.array(eigens_kq)
+    gkqfile.reader = _FakeGkqReader(gkq=np.stack([gkq_atm.real, gkq_atm.imag], axis=-1))
+    return gkqfile
+
+
+class GkqFileTest(AbipyTest):
+
+    def test_read_gkq(self):
+        """Testing GkqFile.iter_gkq and read_gkq2 with brute-force transformation to phonon modes."""
+        rng = np.random.RandomState(0)
+        nsppol, nkpt, natom3, nband = 2, 5, 6, 3
+        # The first mode has zero frequency and must be filtered.
+        phfreqs_ha = np.array([0.0, 1e-3, 2e-3, 3e-3, 4e-3, 5e-3])
+        phdispl_red = rng.rand(natom3, natom3) + 1j * rng.rand(natom3, natom3)
+        gkq_atm = rng.rand(nsppol, nkpt, natom3, nband, nband) + 1j * rng.rand(nsppol, nkpt, natom3, nband, nband)
+        eigens = np.sort(rng.rand(nsppol, nkpt, nband), axis=-1)
+        gkqfile = _make_gkqfile(phfreqs_ha, phdispl_red, eigens, eigens, gkq_atm)
+
+        # Brute-force transformation mode by mode.
+        gkq_ph = np.zeros_like(gkq_atm)
+        for spin in range(nsppol):
+            for ik in range(nkpt):
+                for nu in range(1, natom3):
+                    gkq_ph[spin, ik, nu] = np.dot(phdispl_red[nu], gkq_atm[spin, ik].reshape(natom3, -1)).reshape(
+                        nband, nband) / np.sqrt(2 * phfreqs_ha[nu])
+
+        for kblock_size in (None, 1, 2):
+            self.assert_almost_equal(gkqfile.read_all_gkq(mode="atom", kblock_size=kblock_size), gkq_atm)
+            self.assert_almost_equal(gkqfile.read_all_gkq(mode="phonon", kblock_size=kblock_size), gkq_ph)
+            self.assert_almost_equal(gkqfile.read_gkq2(mode="atom", kblock_size=kblock_size), np.abs(gkq_atm) ** 2)
+            self.assert_almost_equal(gkqfile.read_gkq2(kblock_size=kblock_size), np.abs(gkq_ph) ** 2)
+
+        # Blocks of k-points for a single spin.
+        blocks = list(gkqfile.iter_gkq(spins=[1], kblock_size=2))
+        assert [(spin, kslice.start, kslice.stop) for spin, kslice, _ in blocks] == [(1, 0, 2), (1, 2, 4), (1, 4, 5)]
+        for spin, kslice, gkq in blocks:
+            self.assert_almost_equal(gkq, gkq_ph[spin, kslice])
+
+        with self.assertRaises(ValueError):
+            list(gkqfile.iter_gkq(mode="foo"))
+        with self.assertRaises(ValueError):
+            gkqfile.read_gkq2(mode="foo")
+
+    def test_get_averaged_gkq2(self):
+        """Testing GkqFile.get_averaged_gkq2 with degenerate states and modes."""
+        rng = np.random.RandomState(1)
+        nsppol, nkpt, natom3, nband = 1, 2, 3, 3
+        # Modes 0, 1 are degenerate. Phonon displacements are the identity.
+        phfreqs_ha = np.array([1e-3, 1e-3 + 1e-8, 2e-3])
+        # Bands 0, 1 are degenerate at k, bands 1, 2 at k+q (eV).
+        eigens_k = np.array([[[0.0, 0.0001, 1.0], [0.0, 0.0001, 1.0]]])
+        eigens_kq = np.array([[[0.0, 1.0, 1.0001], [0.0, 1.0, 1.0001]]])
+        gkq_atm = rng.rand(nsppol, nkpt, natom3, nband, nband) + 1j * rng.rand(nsppol, nkpt, natom3, nband, nband)
+        gkqfile = _make_gkqfile(phfreqs_ha, np.eye(natom3), eigens_k, eigens_kq, gkq_atm)
+
+        g2 = np.abs(gkq_atm) ** 2 / (2 * phfreqs_ha[np.newaxis, np.newaxis, :, np.newaxis, np.newaxis])
+        degen_nu = [[0, 1], [0, 1], [2]]
+        degen_k = [[0, 1], [0, 1], [2]]
+        degen_kq = [[0], [1, 2], [1, 2]]
+        ref = np.empty_like(g2)
+        for ik in range(nkpt):
+            for nu in range(natom3):
+                for ib_k in range(nband):
+                    for ib_kq in range(nband):
+                        ref[0, ik, nu, ib_k, ib_kq] = g2[0, ik][np.ix_(degen_nu[nu], degen_k[ib_k],
+                                                                   degen_kq[ib_kq])].mean()
+
+        for kblock_size in (None, 1):
+            self.assert_almost_equal(gkqfile.get_averaged_gkq2(kblock_size=kblock_size), ref)
+
+        # No averaging if the tolerances are smaller than the splittings.
+        self.assert_almost_equal(gkqfile.get_averaged_gkq2(tol_eig=0.0, tol_phfreq=0.0), g2)
+
+
+class GkqRobotTest(AbipyTest):
+
+    def test_plot_gkq2_qpath_with_glr(self):
+        """Testing GkqRobot.plot_gkq2_qpath with the long-range model."""
+        if not self.has_matplotlib():
+            raise self.SkipTest("This test requires matplotlib")
+
+        with abilab.abiopen(abidata.ref_file("si_scf_GSR.nc")) as gsr:
+            ebands, structure = gsr.ebands, gsr.structure
+
+        reclat = structure.reciprocal_lattice
+        qpoints = [Kpoint([0.1, 0, 0], reclat, name="q1"), Kpoint([0.2, 0.1, 0], reclat, name="q2")]
+        robot = GkqRobot(*[(q.name, _FakeGkqFile(ebands, structure, q, seed)) for seed, q in enumerate(qpoints)])
+
+        fig = robot.plot_gkq2_qpath(band_kq=1, band_k=0, kpoint=0, with_glr=True, nu_list=[3], show=False)
+        assert fig
+
+        # Lines for g and for the long-range model.
+        g_line, glr_line = fig.axes[0].lines[:2]
+        for iq, abifile in enumerate(robot.abifiles):
+            gkq = abifile._gkq[0, 0, :, 0, 1]
+            gkq_nu = np.dot(gkq[:, 0] + 1j * gkq[:, 1], abifile.phdispl_red.T) / np.sqrt(2 * abifile.phfreqs_ha)
+            self.assert_almost_equal(g_line.get_ydata()[iq], np.abs(gkq_nu[3]) * abu.Ha_meV)
+            glr = glr_frohlich(abifile.qpoint, abifile.becs_cart, abifile.epsinf_cart,
+                               abifile.phdispl_cart_bohr, abifile.phfreqs_ha, abifile.structure)
+            self.assert_almost_equal(glr_line.get_ydata()[iq], np.abs(glr[3]) * abu.Ha_meV)
+
+        robot.close()
@@ -87,6 +87,16 @@ class SigEPhFileTest(AbipyTest):
         data = sigeph.get_dataframe()
         assert "ze0" in data
 
+        # Bulk QP table is consistent with the QpTempState objects.
+        table = sigeph.reader.read_qptable()
+        assert len(table["band"]) == np.sum(sigeph.reader.nbcalc_sk) * sigeph.ntemp == len(data)
+        qp = sigeph.reader.read_qp(spin=0, kpoint=1, band=sigeph.reader.bstart_sk[0, 1])
+        select = (table["ikcalc"] == 1) & (table["band"] == qp.band)
+        self.assert_almost_equal(table["qpe"][select], qp.qpe)
+        self.assert_almost_equal(table["fan0"][select], qp.fan0)
+        self.assert_almost_equal(table["e0"][select], qp.e0)
+        self.assert_equal(table["tmesh"][select], sigeph.tmesh)
+
         if self.has_matplotlib():
             # Test sigeph plot methods.
             assert sigeph.plot_qpgaps_t(show=False)
@@ -116,6 +126,17 @@ class SigEPhFileTest(AbipyTest):
         if self.has_matplotlib():
             assert sigma.plot_tdep(show=False)
 
+        # Batched reader.
+        sigmas = sigeph.reader.read_sigeph_skbs([(0, [0.5, 0, 0], range(3, 5)), (0, 0, 3)])
+        assert len(sigmas) == 3 and sigmas.skb_list[0] == (0, [0.5, 0, 0], 3)
+        assert sigmas.vals_wr.shape == (3, sigeph.ntemp, sigma.nwr)
+        self.assert_equal(sigmas[0].vals_wr, sigma.vals_wr)
+        self.assert_equal(sigmas[0].spfunc_wr, sigma.spfunc_wr)
+        self.assert_equal(sigmas[0].qp.qpe, sigma.qp.qpe)
+        same_sigmas = list(sigeph.reader.iter_sigeph_skbs([(0, [0.5, 0, 0], range(3, 5)), (0, 0, 3)], chunksize=2))
+        assert [s.qp.skb for s in same_sigmas] == sigmas.skb_list
+        self.assert_equal(same_sigmas[2].vals_e0ks, sigmas[2].vals_e0ks)
+
         # Test QpTempState
         qp = sigeph.reader.read_qp(spin=0, kpoint=0, band=3, ignore_imag=False)
         repr(qp); str(qp)
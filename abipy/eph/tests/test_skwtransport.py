@@ -0,0 +1,48 @@
+"""Tests for the skwtransport module."""
+import numpy as np
+import abipy.data as abidata
+
+from abipy.core.testing import AbipyTest
+from abipy import abilab
+from abipy.eph.skwtransport import SkwTransport
+
+
+class SkwTransportTest(AbipyTest):
+
+    def test_skwtransport_from_ebands(self):
+        """Testing SkwTransport with constant relaxation time."""
+        with abilab.abiopen(abidata.ref_file("si_scf_GSR.nc")) as gsr:
+            engine = SkwTransport.from_ebands(gsr.ebands, tau=1e-14, lpratio=5)
+
+        assert engine.nval == 4 and engine.ntau == 1
+        res = engine.compute([8, 8, 8], tmesh=[300, 600], step=0.02, width=0.1)
+        assert res.ntemp == 2 and res.dos.shape == (2, len(res.wmesh))
+        repr(res); str(res)
+        assert res.to_string(verbose=2)
+
+        # Valence and conduction states (spin degeneracy included).
+        step = res.wmesh[1] - res.wmesh[0]
+        self.assert_almost_equal(res.dos.sum(axis=1) * step, [8, 8], decimal=3)
+
+        # Chunks of k-points and the process pool must give the same results.
+        res2 = engine.compute([8, 8, 8], tmesh=[300, 600], step=0.02, width=0.1, max_memory_mb=0.05, nprocs=2)
+        self.assert_almost_equal(res2.vvtau, res.vvtau)
+
+        # Cubic system --> isotropic tensors.
+        mu = res.get_mu_from_doping(1e18)
+        imu = np.abs(res.mu_mesh - mu[0]).argmin()
+        sigma = res.sigma[0, imu]
+        self.assert_almost_equal(sigma, sigma[0, 0] * np.eye(3), decimal=5)
+        assert res.seebeck[0, imu, 0, 0] < 0
+        assert res.get_mobility_mu(0, 0, mu=mu[0]) > 0
+
+        # Chemical potentials not on the energy mesh.
+        mu_mesh = res.wmesh[10:-10:3] + step / 3
+        res3 = engine.compute([8, 8, 8], tmesh=[300, 600], mu_mesh=mu_mesh, step=0.02, width=0.1)
+        assert res3.carriers.shape == (2, 2, len(mu_mesh))
+        assert res3.mobility.shape == (2, 2, len(mu_mesh), 3, 3)
+        with self.assertRaises(ValueError):
+            engine.compute([8, 8, 8], mu_mesh=[res.wmesh[0] - 1])
+
+        if self.has_matplotlib():
+            assert res.plot_mobility(component="xx", show=False)
@@ -0,0 +1,56 @@
+"""Tests for wr module."""
+import itertools
+import numpy as np
+
+from abipy.core.testing import AbipyTest
+from abipy.eph.wr import WrNcFile
+
+
+def _make_wrfile(ngqpt, ngfft, rpt):
+    """
+    Build a WrNcFile with the dimensions needed by get_wr_box without reading a file.
+    W(r, R) is given by random numbers.
+    """
+    ncfile = WrNcFile.__new__(WrNcFile)
+    ncfile.ngqpt, ncfile.ngfft = np.array(ngqpt), np.array(ngfft)
+    ncfile.rpt, ncfile.nrpt = np.array(rpt, dtype=np.float), len(rpt)
+    ncfile.nfft = np.prod(ngfft)
+    rng = np.random.RandomState(0)
+    wr = rng.rand(ncfile.nfft, ncfile.nrpt) + 1j * rng.rand(ncfile.nfft, ncfile.nrpt)
+    ncfile.read_wr = lambda **kwargs: wr
+    return ncfile, wr
+
+
+class WrNcFileTest(AbipyTest):
+
+    def test_get_wr_box(self):
+        """Testing WrNcFile.get_wr_box with brute-force reconstruction of the supercell."""
+        ngqpt, ngfft = (3, 2, 1), (4, 3, 5)
+        # Lattice vectors covering the supercell, not ordered and not centered.
+        rpt = [(i, j, k) for i, j, k in itertools.product(range(-1, 2), range(0, 2), range(0, 1))]
+        rpt = rpt[::-1]
+        ncfile, wr = _make_wrfile(ngqpt, ngfft, rpt)
+        data = ncfile.get_wr_box()
+        box_shape = ncfile.box_shape
+        assert data.shape == tuple(box_shape)
+
+        # Map (r - R) --> (ifft, iR) with ix running fastest in the unit cell FFT mesh.
+        nx, ny, nz = ngfft
+        fft_inds = [(ix, iy, iz) for iz in range(nz) for iy in range(ny) for ix in range(nx)]
+        d = {}
+        for ir, r in enumerate(np.array(rpt)):
+            for ifft, fft_ijk in enumerate(fft_inds):
+                d[tuple((np.array(fft_ijk) - r * ngfft) % box_shape)] = (ifft, ir)
+
+        # Origin of the datagrid at R0 in lattice vectors.
+        r0 = -(np.array(ngqpt) - 1) // 2 * ngfft
+        ref = np.empty(box_shape, dtype=np.complex)
+        for y in itertools.product(*[range(n) for n in box_shape]):
+            ref[y] = wr[d[tuple((np.array(y) + r0) % box_shape)]]
+
+        self.assert_equal(data, ref)
+
+        # Missing cells in the supercell.
+        ncfile, _ = _make_wrfile(ngqpt, ngfft, rpt[1:])
+        with self.assertRaises(RuntimeError):
+            ncfile.get_wr_box()
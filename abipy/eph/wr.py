@@ -2,6 +2,7 @@
 """
 Object to analyze the results stored in the WR.nc file
 """
+import os
 import numpy as np
 
 from monty.string import marquee
@@ -29,130 +30,108 @@ class WrNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         # FFT mesh.
         self.ngfft = r.read_value("ngfft")
 
-    def create_xsf(self, iatom=0, red_dir=(1, 0, 0), u=1.0, ispden=0):
+    @lazy_property
+    def box_shape(self):
+        """Shape of the FFT mesh in the supercell defined by ``ngqpt``."""
+        return self.ngqpt * self.ngfft
+
+    def get_box_inds(self):
+        """
+        Return list of three integer arrays. The i-th array has shape [nrpt, ngfft[i]] and gives the
+        index along the i-th axis of the supercell FFT mesh of the point r - R, where r is on the
+        FFT mesh of the unit cell and R is the lattice vector in ``rpt``.
+        The origin of the datagrid is shifted to R0 = -(ngqpt - 1) // 2 so that the unit cell
+        is approximately at the center of the supercell.
+        """
+        rpt = np.rint(self.rpt).astype(np.int)
+        r0 = -(self.ngqpt - 1) // 2
+        return [(np.arange(n)[np.newaxis, :] - (rpt[:, i:i+1] + r0[i]) * n) % self.box_shape[i]
+                for i, n in enumerate(self.ngfft)]
 
-        nfft, nrpt = self.nfft, self.nrpt
+    def read_wr(self, what="sr", iatom=0, red_dir=(1, 0, 0), u=1.0, ispden=0):
+        """
+        Read W(r, R) for the displacement ``u * red_dir`` of atom ``iatom``.
+        Only the perturbations with non-zero component are read from file.
 
-        nx, ny, nz = self.ngfft
-        nqx, nqy, nqz = self.ngqpt
-        box_shape = self.ngqpt * self.ngfft
-        box_size = np.product(box_shape)
-        print("ngqpt:", self.ngqpt)
-        print("nrpt:", self.nrpt)
-        print("Unit cell FFT shape:", self.ngfft)
-        print("Big box shape:", box_shape)
-        print("rpt:\n", self.rpt)
-
-        # Get FFT points in reduced coordinates of the microcell.
-        # ix is the fastest index here because we are gonna access
-        # FFT values produced by Fortran via ifft
-        fft_inds = np.empty((nfft, 3), dtype=np.int64)
-        ifft = -1
-        for iz in range(nz):
-            for iy in range(ny):
-                for ix in range(nx):
-                    ifft += 1
-                    fft_inds[ifft, :] = [ix, iy, iz]
-
-        def ig2gfft(ig, ng):
-            # Use the following indexing (N means ngfft of the adequate direction)
-            # 0 1 2 3 ... N/2    -(N-1)/2 ... -1    <= gc
-            # 1 2 3 4 ....N/2+1  N/2+2    ...  N    <= index ig
-
-            #if ( ig <= 0 or ig > ng):
-            #  # Wrong ig, returns huge. Parent code will likely crash with SIGSEV.
-            #  gc = huge(1)
-            #  return
-
-            #if (ig  > ng/2 + 1):
-            #  gc = ig - ng -1
-            #else
-            #  gc = ig -1
-
-            return gc
-
-        # Find index of (r, R) in the bigbox
-        # Use C notation (z runs faster)
-        #box2fr = np.full((box_size, 2), np.inf, dtype=np.int64)
-
-        #iffr2box = np.empty((nfft, nrpt), dtype=np.int64)
-        print("Building r-R dictionary")
-        d = {}
-        for ir, rpt in enumerate(self.rpt):
-            for ifft, fft_ijk in enumerate(fft_inds):
-                ijk = (fft_ijk - rpt * self.ngfft) % box_shape
-                key = tuple(map(int, ijk))
-                d[key] = (ifft, ir)
-                #i, j, k = ijk
-                #box_iloc = k + j * box_shape[2] + i * (box_shape[2] * box_shape[1])
-                #print(box_iloc, "(i, j, k): ", fft_ijk, "rpt:", rpt)
-                #box2fr[int(box_iloc)] = [ifft, ir]
-                #iffr2box[ifft, ir] = box_iloc
-        print("Done")
-
-        #ip = 0
-        #idir = ip % 3
-        #iatom = (ip - idir) // 3 # + 1
+        Args:
+            what: "sr" for the short-range part, "lr" for the long-range part.
+            iatom: Index of the displaced atom.
+            red_dir: Direction of the displacement in reduced coordinates.
+            u: Amplitude of the displacement.
+            ispden: Spin density component.
 
+        Return: Complex |numpy-array| of shape [nfft, nrpt]
+        """
         # nctkarr_t("v1scf_rpt_sr", "dp", "two, nrpt, nfft, nspden, natom3")
-        # use iorder = "f" to transpose the last 3 dimensions since ETSF
-        # stores data in Fortran order while AbiPy uses C-ordering.
-        # (z,y,x) --> (x,y,z)
-        # datar = transpose_last3dims(datar)
-        wsr_var = self.reader.read_variable("v1scf_rpt_sr")
-        wlr_var = self.reader.read_variable("v1scf_rpt_lr")
-
-        wsr = np.zeros(nfft, nrpt)
-        wlr = np.zeros(nfft, nrpt)
+        var = self.reader.read_variable({"sr": "v1scf_rpt_sr", "lr": "v1scf_rpt_lr"}[what])
+
+        wr = np.zeros((self.nfft, self.nrpt), dtype=np.complex)
         for idir, red_comp in enumerate(red_dir):
+            if red_comp == 0: continue
             ip = idir + 3 * iatom
-            wsr += u * red_comp * wsr_var[ip, ispden, :, :, 0]
-            wlr += u * red_comp * wlr_var[ip, ispden, :, :, 0]
-
-        print("wsr.shape:", wsr.shape)
-        print("Max |Re Wsr|:", np.max(np.abs(wsr.real)), "Max |Im Wsr|:", np.max(np.abs(wsr.imag)))
-        #print("Max |Re Wlr|:", np.max(np.abs(wlr.real)), "Max |Im Wlr|:", np.max(np.abs(wlr.imag)))
-
-        r0 = np.array([0, 0, 0], dtype=np.int)
-        qgrid = np.where(self.ngqpt > 2, self.ngqpt, 0)
-        r0 = - (self.ngqpt - 1) // 2
-        print("Origin of datagrid set at R0:", r0)
-
-        # Build datagrid in the supercell using C indexing
-        # This is what xsf_write_data expects.
-        miss = []
-        data_lr = np.empty(box_shape)
-        data_sr = np.empty(box_shape)
-
-        print("Filling data array")
-        for ix in range(box_shape[0]):
-            for iy in range(box_shape[1]):
-                for iz in range(box_shape[2]):
-                    y = np.array((ix, iy, iz), dtype=np.int)
-                    x = (y + r0) % box_shape
-                    key = tuple(map(int, x))
-                    try:
-                        ifft, ir = d[key]
-                    except KeyError:
-                        #print("Cannot find r - R with key:", key)
-                        miss.append(key)
-                        continue
-
-                    data_lr[ix, iy, iz] = wlr[ifft, ir]
-                    #data_sr[ix, iy, iz] = wsr[ifft, ir]
-
-        if miss:
-            #print(d.keys())
-            raise RuntimeError("Cannot find r-R points! nmiss:", len(miss))
+            # Read hyperslab with shape [nfft, nrpt, 2]
+            values = var[ip, ispden]
+            wr += (u * red_comp) * (values[..., 0] + 1j * values[..., 1])
 
-        super_structure = self.structure * self.ngqpt
+        return wr
+
+    def get_wr_box(self, what="sr", iatom=0, red_dir=(1, 0, 0), u=1.0, ispden=0):
+        """
+        Return complex |numpy-array| of shape ``box_shape`` with W(r - R) on the FFT mesh of the supercell
+        (C-indexing as expected by xsf_write_data). See read_wr for the meaning of the arguments.
+        """
+        # Each R fills a block of the supercell mesh (with periodic wrapping) so we only need to
+        # check that R mod ngqpt covers all the cells of the supercell.
+        cells = np.unique(np.ravel_multi_index((np.rint(self.rpt).astype(np.int) % self.ngqpt).T, self.ngqpt))
+        ncells = np.prod(self.ngqpt)
+        if len(cells) != ncells:
+            raise RuntimeError("Cannot find r-R points! nmiss: %d" % ((ncells - len(cells)) * self.nfft))
+
+        wr = self.read_wr(what=what, iatom=iatom, red_dir=red_dir, u=u, ispden=ispden)
+        xinds, yinds, zinds = self.get_box_inds()
+
+        data = np.empty(self.box_shape, dtype=wr.dtype)
+        nx, ny, nz = self.ngfft
+        for ir in range(self.nrpt):
+            # FFT values produced by Fortran: ix is the fastest index.
+            data[np.ix_(xinds[ir], yinds[ir], zinds[ir])] = wr[:, ir].reshape(nz, ny, nx).T
+
+        return data
+
+    def create_xsf(self, iatom=0, red_dir=(1, 0, 0), u=1.0, ispden=0, prefix=None, cplx_mode="re", verbose=0):
+        """
+        Write the short-range and the long-range part of W(r - R) in the supercell in XSF format.
+        The two datagrids are built and written one after the other to reduce memory.
+
+        Args:
+            iatom, red_dir, u, ispden: See read_wr.
+            prefix: Prefix for the output files. Default: basename of the netcdf file without extension.
+            cplx_mode: Data to write. "re" for real part, "im" for imaginary part, "abs" for absolute value.
+            verbose: Verbosity level.
 
-        def dump_xsf(filename, data):
-            from abipy.iotools import xsf
-            xsf.xsf_write_structure_and_data_to_path(filename, super_structure, data, cplx_mode="abs")
+        Return: List with the paths of the XSF files.
+        """
+        from abipy.iotools import xsf
+        if prefix is None:
+            prefix = os.path.splitext(os.path.basename(self.filepath))[0]
+
+        if verbose:
+            print("ngqpt:", self.ngqpt, "nrpt:", self.nrpt)
+            print("Unit cell FFT shape:", self.ngfft, "Big box shape:", self.box_shape)
+            print("Origin of datagrid set at R0:", -(self.ngqpt - 1) // 2)
 
-        dump_xsf("foo_lr.xsf", data_lr)
-        dump_xsf("foo_sr.xsf", data_sr)
+        super_structure = self.structure * self.ngqpt
+        paths = []
+        for what in ("lr", "sr"):
+            data = self.get_wr_box(what=what, iatom=iatom, red_dir=red_dir, u=u, ispden=ispden)
+            if verbose:
+                print("Max |Re W%s|:" % what, np.max(np.abs(data.real)), "Max |Im W%s|:" % what, np.max(np.abs(data.imag)))
+            path = "%s_%s.xsf" % (prefix, what)
+            xsf.xsf_write_structure_and_data_to_path(path, super_structure, data, cplx_mode=cplx_mode)
+            paths.append(path)
+            del data
+
+        return paths
 
     @lazy_property
     def structure(self):
@@ -262,4 +241,4 @@ if __name__ == "__main__":
 
     #print(ncfile)
     ncfile.plot_maxw(scale="semilogy", ax=None, fontsize=8)
-    #ncfile.create_xsf(iatom=0, red_dict=(-1, +1, +1), u=0.1)
+    #ncfile.create_xsf(iatom=0, red_dir=(-1, +1, +1), u=0.1)
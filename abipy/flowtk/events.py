@@ -20,12 +20,13 @@ from monty.json import MontyDecoder
 from pymatgen.core.structure import Structure
 from monty.json import MSONable
 from pymatgen.util.serialization import pmg_serialize
-from pymatgen.io.abinit.abiinspect import YamlTokenizer
+from pymatgen.io.abinit.abiinspect import YamlTokenizer, YamlDoc
 
 logger = logging.getLogger(__name__)
 
 __all__ = [
     "EventsParser",
+    "IncrementalEventsParser",
     "get_event_handler_classes",
     "ScfConvergenceWarning",
     "NscfConvergenceWarning",
@@ -419,48 +420,52 @@ class EventsParser(object):
         filename = os.path.abspath(filename)
         report = EventReport(filename)
 
-        w = WildCard("*Error|*Warning|*Comment|*Bug|*ERROR|*WARNING|*COMMENT|*BUG")
-        import warnings
-        warnings.simplefilter('ignore', yaml.error.UnsafeLoaderWarning)
         with YamlTokenizer(filename) as tokens:
             for doc in tokens:
-                if w.match(doc.tag):
-                    #print("got doc.tag", doc.tag,"--")
-                    try:
-                        #print(doc.text)
-                        event = yaml.load(doc.text)   # Can't use ruamel safe_load!
-                        #yaml.load(doc.text, Loader=ruamel.yaml.Loader)
-                        #print(event.yaml_tag, type(event))
-                    except Exception:
-                        #raise
-                        # Wrong YAML doc. Check tha doc tag and instantiate the proper event.
-                        message = "Malformatted YAML document at line: %d\n" % doc.lineno
-                        message += doc.text
-
-                        # This call is very expensive when we have many exceptions due to malformatted YAML docs.
-                        if verbose:
-                            message += "Traceback:\n %s" % straceback()
-
-                        if "error" in doc.tag.lower():
-                            print("It seems an error. doc.tag:", doc.tag)
-                            event = AbinitYamlError(message=message, src_file=__file__, src_line=0)
-                        else:
-                            event = AbinitYamlWarning(message=message, src_file=__file__, src_line=0)
-
-                    event.lineno = doc.lineno
+                event = self.doc_to_event(doc, verbose=verbose)
+                if event is not None:
                     report.append(event)
 
                 # Check whether the calculation completed.
                 if doc.tag == "!FinalSummary":
-                    #print(doc)
                     run_completed = True
                     d = doc.as_dict()
-                    #print(d)
                     start_datetime, end_datetime = d["start_datetime"], d["end_datetime"]
 
         report.set_run_completed(run_completed, start_datetime, end_datetime)
         return report
 
+    _EVENT_WILDCARD = WildCard("*Error|*Warning|*Comment|*Bug|*ERROR|*WARNING|*COMMENT|*BUG")
+
+    def doc_to_event(self, doc, verbose=0):
+        """
+        Build an :class:`AbinitEvent` from a YAML document. Return None if the document is not an event.
+        """
+        if doc.tag is None or not self._EVENT_WILDCARD.match(doc.tag):
+            return None
+
+        import warnings
+        warnings.simplefilter('ignore', yaml.error.UnsafeLoaderWarning)
+        try:
+            event = yaml.load(doc.text)   # Can't use ruamel safe_load!
+        except Exception:
+            # Wrong YAML doc. Check tha doc tag and instantiate the proper event.
+            message = "Malformatted YAML document at line: %d\n" % doc.lineno
+            message += doc.text
+
+            # This call is very expensive when we have many exceptions due to malformatted YAML docs.
+            if verbose:
+                message += "Traceback:\n %s" % straceback()
+
+            if "error" in doc.tag.lower():
+                print("It seems an error. doc.tag:", doc.tag)
+                event = AbinitYamlError(message=message, src_file=__file__, src_line=0)
+            else:
+                event = AbinitYamlWarning(message=message, src_file=__file__, src_line=0)
+
+        event.lineno = doc.lineno
+        return event
+
     def report_exception(self, filename, exc):
         """
         This method is used when self.parser raises an Exception so that
@@ -471,6 +476,108 @@ class EventsParser(object):
         return EventReport(filename, events=[event])
 
 
+class IncrementalEventsParser(EventsParser):
+    """
+    Parser for files that are still being written (e.g. the log file of a running task).
+
+    The parser keeps track of the offset of the last complete line that has been analyzed
+    and of the YAML document that is being read so that each call of :meth:`parse` only
+    reads the bytes appended to the file since the previous call.
+    The :class:`EventReport` is cached and returned immediately if size and mtime of
+    the file did not change. The file is parsed from scratch if it has been truncated or replaced.
+    """
+
+    # Number of bytes at the beginning of the file used to detect if the file has been rewritten.
+    _HEAD_SIZE = 1024
+
+    def __init__(self, filename, verbose=0):
+        self.filename = os.path.abspath(filename)
+        self.verbose = verbose
+        self.reset()
+
+    def reset(self):
+        """Reset the internal state. The next call to parse will analyze the entire file."""
+        self._stat_key = None
+        self._head = b""
+        self._offset, self._lineno = 0, 0
+        self._doc_lines, self._doc_lineno = None, 0
+        self._events = []
+        self._run_completed, self._start_datetime, self._end_datetime = False, None, None
+        self._report = None
+
+    @property
+    def offset(self):
+        """Number of bytes that have been analyzed."""
+        return self._offset
+
+    def parse(self, filename=None, verbose=None):
+        """
+        Parse the new content of the file. Return :class:`EventReport`.
+        """
+        if filename is not None and os.path.abspath(filename) != self.filename:
+            raise ValueError("%s can only parse %s" % (self.__class__.__name__, self.filename))
+        if verbose is not None: self.verbose = verbose
+
+        stat = os.stat(self.filename)
+        stat_key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if stat_key == self._stat_key and self._report is not None:
+            return self._report
+
+        with open(self.filename, "rb") as fh:
+            # Parse from scratch if the file has been replaced, truncated or rewritten.
+            if (self._stat_key is not None and
+                (stat.st_ino != self._stat_key[0] or stat.st_size < self._offset or
+                 fh.read(len(self._head)) != self._head)):
+                self.reset()
+
+            if len(self._head) < self._HEAD_SIZE and self._offset < stat.st_size:
+                fh.seek(0)
+                self._head = fh.read(min(self._HEAD_SIZE, stat.st_size))
+
+            fh.seek(self._offset)
+            data = fh.read(stat.st_size - self._offset)
+
+        # Analyze only complete lines. The last line will be read again at the next call.
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        self._stat_key = stat_key
+        for line in data[:end].decode("utf-8", errors="replace").splitlines(keepends=True):
+            self._parse_line(line)
+
+        report = EventReport(self.filename, events=self._events)
+        report.set_run_completed(self._run_completed, self._start_datetime, self._end_datetime)
+        self._report = report
+        return report
+
+    def _parse_line(self, line):
+        """Process a new line of the file."""
+        self._lineno += 1
+
+        if line.startswith("---"):
+            # Begin a new document (an unterminated document is discarded).
+            self._doc_lines, self._doc_lineno = [line], self._lineno
+
+        elif self._doc_lines is not None:
+            self._doc_lines.append(line)
+            if line.startswith("..."):
+                tokens = self._doc_lines[0][3:].split()
+                doc = YamlDoc(text="".join(self._doc_lines), lineno=self._doc_lineno,
+                              tag=tokens[0] if tokens else None)
+                self._doc_lines = None
+                self._add_doc(doc)
+
+    def _add_doc(self, doc):
+        """Process a complete YAML document."""
+        event = self.doc_to_event(doc, verbose=self.verbose)
+        if event is not None:
+            self._events.append(event)
+
+        if doc.tag == "!FinalSummary":
+            self._run_completed = True
+            d = doc.as_dict()
+            self._start_datetime, self._end_datetime = d["start_datetime"], d["end_datetime"]
+
+
 class EventHandler(MSONable, metaclass=abc.ABCMeta):
     """
     Abstract base class defining the interface for an EventHandler.
@@ -784,10 +784,35 @@ class Flow(Node, NodeContainer, MSONable):
 
         Args:
             show: True to show the status of the flow.
+            only_active: True if only the tasks whose status can change without an action of the
+                scheduler (submitted, running or done) should be checked. Tasks whose dependencies
+                have been completed are always set to ready.
+            nthreads: Number of threads used to inspect the files of the tasks (default: 1).
             kwargs: keyword arguments passed to show_status
         """
-        for work in self:
-            work.check_status()
+        only_active = kwargs.pop("only_active", False)
+        nthreads = int(kwargs.pop("nthreads", 1))
+
+        if not only_active and nthreads <= 1:
+            for work in self:
+                work.check_status()
+        else:
+            # The files of the tasks are inspected concurrently (IO bound).
+            # Statuses are then updated serially as callbacks are not thread-safe.
+            active = (self.S_SUB, self.S_RUN, self.S_DONE)
+            tasks = [task for task in self.iflat_tasks() if task.status not in (self.S_OK, self.S_LOCKED)
+                     and (not only_active or task.status in active)]
+
+            if nthreads > 1 and len(tasks) > 1:
+                from concurrent.futures import ThreadPoolExecutor
+                with ThreadPoolExecutor(max_workers=nthreads) as executor:
+                    probes = list(executor.map(lambda task: task.probe_files(), tasks))
+            else:
+                probes = [task.probe_files() for task in tasks]
+
+            probes = {task.node_id: probe for task, probe in zip(tasks, probes)}
+            for work in self:
+                work.check_status(probes=probes)
 
         if kwargs.pop("show", False):
             self.show_status(**kwargs)
@@ -312,6 +312,10 @@ class PyFlowScheduler(object):
                 completed successfully. (DEFAULT: "no")
             killjobs_if_errors: "yes" if the scheduler should try to kill all the runnnig jobs
                 before exiting due to an error. (DEFAULT: "yes")
+            status_sweep_nthreads: If > 0, only the tasks that are submitted or running are checked
+                at each iteration and their files are inspected with a pool of `status_sweep_nthreads`
+                threads. Recommended for large flows on parallel filesystems.
+                (int, DEFAULT: 0 i.e. all the tasks are checked serially)
         """
         # Options passed to the scheduler.
         self.sched_options = AttrDict(
@@ -342,6 +346,7 @@ class PyFlowScheduler(object):
         self.fix_qcritical = as_bool(kwargs.pop("fix_qcritical", False))
         self.rmflow = as_bool(kwargs.pop("rmflow", False))
         self.killjobs_if_errors = as_bool(kwargs.pop("killjobs_if_errors", True))
+        self.status_sweep_nthreads = int(kwargs.pop("status_sweep_nthreads", 0))
 
         self.customer_service_dir = kwargs.pop("customer_service_dir", None)
         if self.customer_service_dir is not None:
@@ -591,9 +596,14 @@ class PyFlowScheduler(object):
             nqjobs = (len(list(flow.iflat_tasks(status=flow.S_RUN))) +
                       len(list(flow.iflat_tasks(status=flow.S_SUB))))
 
+        # Options for the status sweep.
+        check_kwargs = {}
+        if self.status_sweep_nthreads > 0:
+            check_kwargs = dict(only_active=True, nthreads=self.status_sweep_nthreads)
+
         if nqjobs >= self.max_njobs_inqueue:
             print("Too many jobs in the queue: %s. No job will be submitted." % nqjobs)
-            flow.check_status(show=False)
+            flow.check_status(show=False, **check_kwargs)
             return
 
         if self.max_nlaunches == -1:
@@ -602,7 +612,7 @@ class PyFlowScheduler(object):
             max_nlaunch = min(self.max_njobs_inqueue - nqjobs, self.max_nlaunches)
 
         # check status.
-        flow.check_status(show=False)
+        flow.check_status(show=False, **check_kwargs)
 
         # This check is not perfect, we should make a list of tasks to sumbit
         # and select only the subset so that we don't exceeed mac_ncores_used
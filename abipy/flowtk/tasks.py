@@ -21,7 +21,7 @@ from monty.json import MSONable
 from monty.fnmatch import WildCard
 from pymatgen.core.units import Memory
 from pymatgen.util.serialization import json_pretty_dump, pmg_serialize
-from .utils import File, Directory, irdvars_for_ext, abi_splitext, FilepathFixer, Condition, SparseHistogram
+from .utils import File, Directory, DirectorySnapshot, irdvars_for_ext, abi_splitext, FilepathFixer, Condition, SparseHistogram
 from .qadapters import make_qadapter, QueueAdapter, QueueAdapterError
 from . import qutils as qu
 from .db import DBConnector
@@ -1386,9 +1386,9 @@ class Task(Node, metaclass=abc.ABCMeta):
 
         In this case we just remove the process since Subprocess objects cannot be pickled.
         This is the reason why we have to store the returncode in self._returncode instead
-        of using self.process.returncode.
+        of using self.process.returncode. The cache with the events parsers is not saved.
         """
-        return {k: v for k, v in self.__dict__.items() if k not in ["_process"]}
+        return {k: v for k, v in self.__dict__.items() if k not in ["_process", "_events_parsers"]}
 
     #@check_spectator
     def set_workdir(self, workdir, chroot=False):
@@ -1903,10 +1903,41 @@ class Task(Node, metaclass=abc.ABCMeta):
 
         return status
 
-    def check_status(self):
+    def probe_files(self):
+        """
+        Collect the information needed by :meth:`check_status` with a single ``os.scandir``
+        of the working directory. The (small) error files are read and the events
+        in the log file are parsed. This method does not change the status of the task
+        hence it can be executed in a thread pool.
+
+        Return: :class:`AttrDict` with the :class:`DirectorySnapshot` ``files``, the |EventReport|
+            ``report`` (None if not available) and ``report_exc``, the exception raised by the parser.
+        """
+        files = DirectorySnapshot(self.workdir)
+        probe = AttrDict(files=files, report=None, report_exc=None)
+
+        if files.exists(self.mpiabort_file):
+            # check_status returns immediately.
+            return probe
+
+        for f in (self.stderr_file, self.qerr_file, self.qout_file):
+            if files.getsize(f) != 0: files.read(f)
+
+        if files.exists(self.output_file) and files.exists(self.log_file):
+            try:
+                probe.report = self.get_events_parser(self.log_file.path).parse()
+            except Exception as exc:
+                probe.report_exc = exc
+
+        return probe
+
+    def check_status(self, probe=None):
         """
         This function checks the status of the task by inspecting the output and the
         error files produced by the application and by the queue manager.
+
+        Args:
+            probe: Object returned by :meth:`probe_files`. If None, the files are inspected here.
         """
         # 1) see it the job is blocked
         # 2) see if an error occured at submitting the job the job was submitted, TODO these problems can be solved
@@ -1928,35 +1959,40 @@ class Task(Node, metaclass=abc.ABCMeta):
             msg = "job.sh return code: %s\nPerhaps the job was not submitted properly?" % self.returncode
             return self.set_status(self.S_QCRITICAL, msg=msg)
 
+        if probe is None:
+            probe = self.probe_files()
+        files = probe.files
+
         # If we have an abort file produced by Abinit
-        if self.mpiabort_file.exists:
+        if files.exists(self.mpiabort_file):
             return self.set_status(self.S_ABICRITICAL, msg="Found ABINIT abort file")
 
         # Analyze the stderr file for Fortran runtime errors.
         # getsize is 0 if the file is empty or it does not exist.
         err_msg = None
-        if self.stderr_file.getsize() != 0:
-            err_msg = self.stderr_file.read()
+        if files.getsize(self.stderr_file) != 0:
+            err_msg = files.read(self.stderr_file)
 
         # Analyze the stderr file of the resource manager runtime errors.
         # TODO: Why are we looking for errors in queue.qerr?
         qerr_info = None
-        if self.qerr_file.getsize() != 0:
-            qerr_info = self.qerr_file.read()
+        if files.getsize(self.qerr_file) != 0:
+            qerr_info = files.read(self.qerr_file)
 
         # Analyze the stdout file of the resource manager (needed for PBS !)
         qout_info = None
-        if self.qout_file.getsize():
-            qout_info = self.qout_file.read()
+        if files.getsize(self.qout_file):
+            qout_info = files.read(self.qout_file)
 
         # Start to check ABINIT status if the output file has been created.
         #if self.output_file.getsize() != 0:
-        if self.output_file.exists:
-            try:
-                report = self.get_event_report()
-            except Exception as exc:
-                msg = "%s exception while parsing event_report:\n%s" % (self, exc)
-                return self.set_status(self.S_ABICRITICAL, msg=msg)
+        if files.exists(self.output_file):
+            report = probe.report
+            if probe.report_exc is not None:
+                # Return a report with an error entry with info on the exception (see get_event_report).
+                msg = "%s: Exception while parsing ABINIT events:\n %s" % (self.log_file, str(probe.report_exc))
+                self.set_status(self.S_ABICRITICAL, msg=msg)
+                report = events.EventsParser().report_exception(self.log_file.path, probe.report_exc)
 
             if report is None:
                 return self.set_status(self.S_ERROR, msg="got None report!")
@@ -1990,16 +2026,16 @@ class Task(Node, metaclass=abc.ABCMeta):
                 return self.set_status(self.S_ABICRITICAL, msg=msg)
 
             # 5)
-            if self.stderr_file.exists and not err_msg:
-                if self.qerr_file.exists and not qerr_info:
+            if files.exists(self.stderr_file) and not err_msg:
+                if files.exists(self.qerr_file) and not qerr_info:
                     # there is output and no errors
                     # The job still seems to be running
                     return self.set_status(self.S_RUN, msg='there is output and no errors: job still seems to be running')
 
         # 6)
-        if not self.output_file.exists:
+        if not files.exists(self.output_file):
             #self.history.debug("output_file does not exists")
-            if not self.stderr_file.exists and not self.qerr_file.exists:
+            if not files.exists(self.stderr_file) and not files.exists(self.qerr_file):
                 # No output at allThe job is still in the queue.
                 return self.status
 
@@ -2057,8 +2093,8 @@ class Task(Node, metaclass=abc.ABCMeta):
         # print('the job still seems to be running maybe it is hanging without producing output... ')
 
         # Check time of last modification.
-        if self.output_file.exists and \
-           (time.time() - self.output_file.get_stat().st_mtime > self.manager.policy.frozen_timeout):
+        if files.exists(self.output_file) and \
+           (time.time() - files.get_stat(self.output_file).st_mtime > self.manager.policy.frozen_timeout):
             msg = "Task seems to be frozen, last change more than %s [s] ago" % self.manager.policy.frozen_timeout
             return self.set_status(self.S_ERROR, msg=msg)
 
@@ -2178,6 +2214,22 @@ class Task(Node, metaclass=abc.ABCMeta):
         self.make_links()
         self.setup()
 
+    def get_events_parser(self, filepath):
+        """
+        Return the :class:`IncrementalEventsParser` associated to ``filepath``.
+        Parsers are cached in the task so that each call of ``check_status`` only analyzes
+        the lines written since the previous check.
+        """
+        try:
+            parsers = self._events_parsers
+        except AttributeError:
+            parsers = self._events_parsers = {}
+
+        if filepath not in parsers:
+            parsers[filepath] = events.IncrementalEventsParser(filepath)
+
+        return parsers[filepath]
+
     def get_event_report(self, source="log"):
         """
         Analyzes the main logfile of the calculation for possible Errors or Warnings.
@@ -2206,8 +2258,12 @@ class Task(Node, metaclass=abc.ABCMeta):
                 return abort_report
 
         try:
+            if not self.mpiabort_file.exists:
+                # Only the lines appended since the last call are parsed.
+                # The report is cached by the parser and should not be modified.
+                return self.get_events_parser(ofile.path).parse()
+
             report = parser.parse(ofile.path)
-            #self._prev_reports[source] = report
 
             # Add events found in the ABI_MPIABORTFILE.
             if self.mpiabort_file.exists:
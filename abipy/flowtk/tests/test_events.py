@@ -62,6 +62,41 @@ class EventsParserTest(AbipyTest):
         assert len(report.get_events_of_type(events.AbinitYamlWarning)) == 1
         assert len(report.get_events_of_type(events.AbinitYamlError)) == 1
 
+    def test_incremental_parser(self):
+        """Testing IncrementalEventsParser with a log file that is being written."""
+        with open(ref_file("mgb2_nscf.log"), "rb") as fh:
+            data = fh.read()
+
+        ref_report = events.EventsParser().parse(ref_file("mgb2_nscf.log"))
+        filepath = self.get_tmpname(text=True)
+        with open(filepath, "wb") as fh:
+            fh.write(data[:1000])
+
+        parser = events.IncrementalEventsParser(filepath)
+        report = parser.parse()
+        assert len(report) == 0 and not report.run_completed
+        assert parser.offset <= 1000
+        # The report is cached if the file did not change.
+        assert parser.parse() is report
+
+        # Append data in chunks that do not end with a complete line.
+        for start in range(1000, len(data), 4321):
+            with open(filepath, "ab") as fh:
+                fh.write(data[start:start + 4321])
+            report = parser.parse()
+
+        assert parser.offset == len(data)
+        assert report.run_completed
+        assert (report.num_errors, report.num_warnings, report.num_comments) == (0, 2, 0)
+        assert [type(ev) for ev in report] == [type(ev) for ev in ref_report]
+        assert report.end_datetime == ref_report.end_datetime
+
+        # The file is parsed from scratch if it's rewritten.
+        with open(filepath, "wb") as fh:
+            fh.write(data[:1000])
+        report = parser.parse()
+        assert len(report) == 0 and not report.run_completed
+
 
 class EventHandlersTest(AbipyTest):
     def test_events(self):
@@ -211,6 +211,15 @@ class FlowTest(FlowUnitTest):
         df_vars = flow.get_vars_dataframe("ecut", "acell")
         assert "ecut" in df_vars
 
+        # Test check_status with the parallel status sweep.
+        init_status = task0_w0.status
+        task0_w0.set_status(task0_w0.S_SUB, msg="Submitted")
+        probe = task0_w0.probe_files()
+        assert probe.report is None and not probe.files.exists(task0_w0.output_file)
+        flow.check_status(only_active=True, nthreads=2)
+        assert task0_w0.status == task0_w0.S_SUB
+        task0_w0.set_status(init_status, msg="Reset status")
+
         # Test show_status
         flow.show_status()
         flow.show_tricky_tasks()
@@ -1,4 +1,6 @@
 # coding: utf-8
+import os
+
 from abipy.core.testing import AbipyTest
 from abipy.flowtk.utils import *
 
@@ -70,3 +72,29 @@ class SparseHistogramTest(AbipyTest):
         hist = SparseHistogram([iv for iv in enumerate(items)], key=lambda t: t[1], step=1)
         assert hist.binvals == [1.0, 2.0, 3.0]
         assert hist.values == [[(0, 1)], [(1, 2), (2, 2.9)], [(3, 4)]]
+
+
+class DirectorySnapshotTest(AbipyTest):
+    def test_snapshot(self):
+        """Testing DirectorySnapshot."""
+        tmpdir = self.mkdtemp()
+        afile = File(os.path.join(tmpdir, "foo.txt"))
+        afile.write("hello")
+        missing = File(os.path.join(tmpdir, "missing.txt"))
+        outside = File(os.path.abspath(__file__))
+
+        snap = DirectorySnapshot(tmpdir)
+        assert snap.exists(afile) and afile in snap
+        assert snap.getsize(afile) == afile.getsize()
+        assert snap.read(afile) == "hello\n"
+        assert not snap.exists(missing) and snap.getsize(missing) == 0
+        with self.assertRaises(FileNotFoundError):
+            snap.get_stat(missing)
+        assert snap.exists(outside)
+
+        # The snapshot does not see the files created afterwards.
+        missing.write("world")
+        assert not snap.exists(missing)
+        assert DirectorySnapshot(tmpdir).exists(missing)
+        nodir = os.path.join(tmpdir, "nonexistent")
+        assert not DirectorySnapshot(nodir).exists(File(os.path.join(nodir, "foo.txt")))
@@ -150,6 +150,57 @@ class File(object):
         return os.path.getsize(self.path)
 
 
+class DirectorySnapshot(object):
+    """
+    Snapshot of the files in a directory obtained with a single call to ``os.scandir``.
+    Provides the ``exists``, ``getsize``, ``get_stat`` and ``read`` methods of :class:`File`
+    so that several checks on the files of the directory do not require additional system calls.
+    The content of the files is cached. Files located in other directories are accessed directly.
+    """
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        try:
+            with os.scandir(self.path) as it:
+                self._entries = {entry.name: entry for entry in it}
+        except FileNotFoundError:
+            self._entries = {}
+
+        self._contents = {}
+
+    def __contains__(self, afile):
+        return self.exists(afile)
+
+    def _in_dir(self, afile):
+        return afile.dirname == self.path
+
+    def exists(self, afile):
+        """True if :class:`File` afile exists."""
+        if not self._in_dir(afile): return afile.exists
+        return afile.basename in self._entries
+
+    def get_stat(self, afile):
+        """Results from os.stat. The value is cached by ``os.DirEntry``."""
+        if not self._in_dir(afile): return afile.get_stat()
+        try:
+            return self._entries[afile.basename].stat()
+        except KeyError:
+            raise FileNotFoundError("No such file: %s" % afile.path)
+
+    def getsize(self, afile):
+        """
+        Return the size, in bytes, of afile.
+        Return 0 if the file is empty or it does not exist.
+        """
+        if not self.exists(afile): return 0
+        return self.get_stat(afile).st_size
+
+    def read(self, afile):
+        """Read data from file."""
+        if afile.path not in self._contents:
+            self._contents[afile.path] = afile.read()
+        return self._contents[afile.path]
+
+
 class Directory(object):
     """
     Very simple class that provides helper functions
@@ -768,13 +768,22 @@ class Work(BaseWork, NodeContainer):
         else:
             return status_list
 
-    def check_status(self):
-        """Check the status of the tasks."""
+    def check_status(self, probes=None):
+        """
+        Check the status of the tasks.
+
+        Args:
+            probes: Optional dictionary node_id --> object returned by :meth:`Task.probe_files`.
+                If not None, only the tasks in probes are checked.
+        """
         # Recompute the status of the tasks
         # Ignore OK and LOCKED tasks.
         for task in self:
             if task.status in (task.S_OK, task.S_LOCKED): continue
-            task.check_status()
+            if probes is None:
+                task.check_status()
+            elif task.node_id in probes:
+                task.check_status(probe=probes[task.node_id])
 
         # Take into account possible dependencies. Use a list instead of generators
         for task in self:
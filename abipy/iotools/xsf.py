@@ -4,7 +4,6 @@
 import numpy as np
 
 from pymatgen.core.units import Energy, EnergyArray #, ArrayWithUnit
-from abipy.tools.numtools import transpose_last3dims, add_periodic_replicas
 
 
 __all__ = [
@@ -91,37 +90,33 @@ def xsf_write_data(file, structure, data, add_replicas=True, cplx_mode=None):
     """
     fwrite = file.write
 
-    # Check this one
-    if add_replicas:
-        data = add_periodic_replicas(data)
-
     if np.iscomplexobj(data):
         if cplx_mode is None:
             raise TypeError("cplx_mode must be specified when data is a complex array.")
         cplx_mode = cplx_mode.lower()
-        if cplx_mode == "re":
-            data = data.real
-        elif cplx_mode == "im":
-            data = data.imag
-        elif cplx_mode == "abs":
-            data = np.abs(data)
-        else:
+        if cplx_mode not in ("re", "im", "abs"):
             raise ValueError("Wrong value for cplx_mode: %s" % cplx_mode)
+        tofloat = {"re": np.real, "im": np.imag, "abs": np.abs}[cplx_mode]
+    else:
+        tofloat = np.asarray
 
-    shape, ndim = data.shape, data.ndim
-
+    ndim = data.ndim
     if ndim == 3:
         ngrids = 1
-        data = np.asarray([data])
+        data = data[np.newaxis]
     elif ndim == 4:
-        ngrids = shape[0]
+        ngrids = data.shape[0]
     else:
         raise ValueError("ndim %d is not supported" % ndim)
 
-    # Xcrysden uses Fortran-order.
-    # Transpose (...,x,y,z) --> (...,z,y,x) to speed up the write below.
-    fdata = transpose_last3dims(data)
-    fgrid = fdata.shape[-3:]
+    # Xcrysden uses Fortran-order and the periodic replicas must be written explicitly.
+    # Data is written one z-plane at a time using index arrays so that we don't need to allocate
+    # the transposed array with replicas (important for large datagrids e.g. supercells).
+    if add_replicas:
+        xinds, yinds, zinds = [np.arange(n + 1) % n for n in data.shape[-3:]]
+    else:
+        xinds, yinds, zinds = [np.arange(n) for n in data.shape[-3:]]
+    fgrid = (len(xinds), len(yinds), len(zinds))
 
     cell = structure.lattice_vectors(space="r")
     origin = np.zeros(3)
@@ -131,17 +126,16 @@ def xsf_write_data(file, structure, data, add_replicas=True, cplx_mode=None):
 
     for dg in range(ngrids):
         fwrite(" BEGIN_DATAGRID_3Dgrid#" + str(dg+1) + "\n")
-        fwrite('%d %d %d\n' % shape[-3:])
+        fwrite('%d %d %d\n' % fgrid)
 
         fwrite('%f %f %f\n' % tuple(origin))
         for i in range(3):
             fwrite('%f %f %f\n' % tuple(cell[i]))
 
-        for z in range(fgrid[0]):
-            for y in range(fgrid[1]):
-                slice_x = fdata[dg,z,y]
-                fwrite(' '.join(['%f' % d for d in slice_x]))
-                fwrite('\n')
+        for z in zinds:
+            # (x, y) plane --> (y, x) so that x is the fastest index.
+            plane = tofloat(data[dg, :, :, z][np.ix_(xinds, yinds)]).T
+            np.savetxt(file, plane, fmt="%f", delimiter=" ")
             fwrite('\n')
 
         fwrite(' END_DATAGRID_3D\n')
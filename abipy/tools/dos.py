@@ -0,0 +1,194 @@
+# coding: utf-8
+"""
+Vectorized engines for the computation of densities of states on linear meshes.
+
+The DOS is obtained by accumulating the contributions of all the states with numpy
+(no python loop over k-points and bands). Only the mesh points close to each state are
+computed and the states are processed in chunks so that the memory does not depend on
+the number of k-points. Multiple weights (e.g. projections) can be accumulated at once.
+"""
+import itertools
+import numpy as np
+import scipy.sparse
+
+# Number of (k, band) states (or tetrahedra) treated in each chunk.
+DEFAULT_CHUNKSIZE = 100000
+
+
+def _check_linear_mesh(mesh):
+    """Return (mesh, step) after having checked that mesh is linear."""
+    mesh = np.asarray(mesh, dtype=np.double)
+    if len(mesh) < 2:
+        raise ValueError("Mesh must contain at least two points.")
+    step = mesh[1] - mesh[0]
+    if not np.allclose(np.diff(mesh), step, rtol=1e-6, atol=0):
+        raise ValueError("The DOS engine requires a linear mesh.")
+
+    return mesh, step
+
+
+def _reshape_weights(weights, size):
+    """Reshape weights to (nc, size). Return (weights, squeeze)."""
+    if weights is None:
+        return np.ones((1, size)), True
+
+    weights = np.asarray(weights)
+    squeeze = weights.size == size
+    return np.reshape(weights, (-1, size)), squeeze
+
+
+def gaussian_dos(mesh, eigens, width, weights=None, chunksize=DEFAULT_CHUNKSIZE, nsigma=6):
+    r"""
+    Compute :math:`\sum_i w_i g(\omega - e_i)` where g is a normalized gaussian.
+
+    Args:
+        mesh: Linear mesh.
+        eigens: Array with the energies of the states (arbitrary shape).
+        width: Standard deviation of the gaussian.
+        weights: Weights of the states. Either None (all weights set to one), an array with the
+            same shape as eigens or an array of shape (nc,) + eigens.shape to compute nc DOSes at once.
+        chunksize: Number of states treated in each chunk.
+        nsigma: The gaussians are truncated at ``nsigma`` standard deviations.
+
+    Return: Array of shape (nw,) or (nc, nw) depending on weights.
+    """
+    mesh, step = _check_linear_mesh(mesh)
+    eigens = np.ravel(eigens)
+    weights, squeeze = _reshape_weights(weights, eigens.size)
+    nw, nc = len(mesh), len(weights)
+
+    # Contributions are computed only for the mesh points within nsigma * width.
+    nhalf = int(np.ceil(nsigma * width / step))
+    offsets = np.arange(-nhalf, nhalf + 1)
+    values = np.zeros((nc, nw))
+
+    for start in range(0, eigens.size, chunksize):
+        ene = eigens[start:start + chunksize]
+        iw = np.rint((ene - mesh[0]) / step).astype(np.int)[:, None] + offsets[None, :]
+        ok = (iw >= 0) & (iw < nw)
+        gauss = np.exp(-0.5 * ((mesh[np.where(ok, iw, 0)] - ene[:, None]) / width) ** 2)
+        irow, icol = np.nonzero(ok)
+        # Sparse matrix (nw, nstates) so that all the weights are accumulated with a single matmul.
+        mat = scipy.sparse.csr_matrix((gauss[ok], (iw[ok], irow)), shape=(nw, len(ene)))
+        values += (mat @ weights[:, start:start + chunksize].T).T
+
+    values /= width * np.sqrt(2 * np.pi)
+    return values[0] if squeeze else values
+
+
+def get_tetra_vertices(ngkpt, gprimd):
+    """
+    Split the homogeneous k-mesh in tetrahedra.
+    Each sub-cell of the mesh is divided in 6 tetrahedra sharing the shortest main diagonal.
+
+    Args:
+        ngkpt: Number of divisions of the mesh.
+        gprimd: Reciprocal lattice vectors (rows).
+
+    Return: (6 * nkbz, 4) array with the indices of the vertices. The points of the mesh
+        are indexed in C-order i.e. ``ik = np.ravel_multi_index((i0, i1, i2), ngkpt)``.
+    """
+    ngkpt = np.asarray(ngkpt, dtype=np.int)
+    corners = np.array(list(itertools.product(range(2), repeat=3)))
+
+    # Select the shortest main diagonal of the sub-cell.
+    diags = [(0, 7), (1, 6), (2, 5), (3, 4)]
+    lens = [np.linalg.norm(((corners[j] - corners[i]) / ngkpt) @ gprimd) for i, j in diags]
+    i0, i7 = diags[int(np.argmin(lens))]
+    others = [i for i in range(8) if i not in (i0, i7)]
+
+    # The 6 tetrahedra are defined by the diagonal and two adjacent corners
+    # i.e. corners that differ by one unit vector.
+    tetras = []
+    for a, b in itertools.permutations(others, 2):
+        path = [corners[i0], corners[a], corners[b], corners[i7]]
+        if all(np.abs(path[i + 1] - path[i]).sum() == 1 for i in range(3)):
+            tetras.append([i0, a, b, i7])
+    assert len(tetras) == 6
+
+    grid = np.array(list(itertools.product(*[range(n) for n in ngkpt])))
+    vertices = np.empty((len(grid), 6, 4), dtype=np.int)
+    for it, tetra in enumerate(tetras):
+        for iv, ic in enumerate(tetra):
+            vertices[:, it, iv] = np.ravel_multi_index(((grid + corners[ic]) % ngkpt).T, ngkpt)
+
+    return vertices.reshape(-1, 4)
+
+
+def _tetra_idos(ene, e1, e2, e3, e4):
+    """
+    Integrated DOS of the linear tetrahedron method (normalized to one) evaluated
+    at ``ene`` for tetrahedra with sorted energies e1 <= e2 <= e3 <= e4.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x1, x2 = ene - e1, ene - e2
+        n1 = x1 ** 3 / ((e2 - e1) * (e3 - e1) * (e4 - e1))
+        n2 = ((e2 - e1) ** 2 + 3 * (e2 - e1) * x2 + 3 * x2 ** 2 -
+              (e3 - e1 + e4 - e2) / ((e3 - e2) * (e4 - e2)) * x2 ** 3) / ((e3 - e1) * (e4 - e1))
+        n3 = 1 - (e4 - ene) ** 3 / ((e4 - e1) * (e4 - e2) * (e4 - e3))
+
+    return np.where(ene < e2, n1, np.where(ene < e3, n2, n3))
+
+
+def tetra_dos(mesh, eigens, ngkpt, gprimd, weights=None, chunksize=DEFAULT_CHUNKSIZE):
+    r"""
+    Compute the DOS with the linear tetrahedron method.
+    The value at each mesh point is the average of the DOS inside the bin of width step
+    so that the integral of the DOS is exact.
+
+    Args:
+        mesh: Linear mesh.
+        eigens: (nkbz, nband) array with the energies on the homogeneous k-mesh. The k-points
+            must be ordered as in :func:`get_tetra_vertices`. The mesh can be shifted.
+        ngkpt: Number of divisions of the k-mesh.
+        gprimd: Reciprocal lattice vectors (rows).
+        weights: None, (nkbz, nband) or (nc, nkbz, nband) array with the weights of the states.
+            The weight of a tetrahedron is given by the average of the weights on the vertices.
+        chunksize: Number of tetrahedra treated in each chunk.
+
+    Return: Array of shape (nw,) or (nc, nw) depending on weights. The DOS is normalized
+        to the number of bands if weights is None.
+    """
+    mesh, step = _check_linear_mesh(mesh)
+    nkbz = np.prod(ngkpt)
+    eigens = np.reshape(eigens, (nkbz, -1))
+    nband = eigens.shape[1]
+    weights, squeeze = _reshape_weights(weights, eigens.size)
+    weights = np.reshape(weights, (-1, nkbz, nband))
+    nw, nc = len(mesh), len(weights)
+
+    vertices = get_tetra_vertices(ngkpt, gprimd)
+    ntetra = len(vertices)
+    edges = np.concatenate([mesh - 0.5 * step, [mesh[-1] + 0.5 * step]])
+    values = np.zeros((nc, nw))
+
+    # Loop over chunks of tetrahedra. All the bands are treated together.
+    tchunk = max(1, chunksize // nband)
+    for start in range(0, ntetra, tchunk):
+        vert = vertices[start:start + tchunk]
+        # Sorted energies of the vertices with shape (nt * nband, 4)
+        etet = np.sort(eigens[vert].transpose(0, 2, 1).reshape(-1, 4), axis=1)
+        # Tetra weights (average over the vertices) with shape (nc, nt * nband)
+        wtet = weights[:, vert].mean(axis=2).reshape(nc, -1) / ntetra
+
+        # The IDOS of a tetrahedron is 0 for e <= e1 and 1 for e >= e4. Compute its increments
+        # for the edges in [i1, i4] where i1 (i4) is the first edge >= e1 (e4).
+        i1 = np.searchsorted(edges, etet[:, 0])
+        i4 = np.searchsorted(edges, etet[:, 3])
+        lens = i4 - i1 + 1
+        itet = np.repeat(np.arange(len(etet)), lens)
+        iedge = i1[itet] + np.arange(lens.sum()) - np.repeat(np.cumsum(lens) - lens, lens)
+        e = etet[itet]
+        idos = _tetra_idos(edges[np.minimum(iedge, nw)], e[:, 0], e[:, 1], e[:, 2], e[:, 3])
+        idos[iedge == i4[itet]] = 1.0
+        incr = np.diff(idos, prepend=0.0)
+        incr[np.cumsum(lens) - lens] = idos[np.cumsum(lens) - lens]
+
+        # The increment between edge i-1 and edge i goes to bin i-1.
+        ibin = iedge - 1
+        ok = (ibin >= 0) & (ibin < nw)
+        mat = scipy.sparse.csr_matrix((incr[ok], (ibin[ok], itet[ok])), shape=(nw, len(etet)))
+        values += (mat @ wtet.T).T
+
+    values /= step
+    return values[0] if squeeze else values
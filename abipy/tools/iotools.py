@@ -1,6 +1,8 @@
 # coding: utf-8
 """IO related utilities."""
 import os
+import queue
+import threading
 
 from contextlib import ExitStack
 from subprocess import call
@@ -41,6 +43,57 @@ class ExitStackWithFiles(ExitStack):
         return self.files.__getitem__(slice)
 
 
+def prefetch_iterator(iterable, size=1):
+    """
+    Generator that consumes ``iterable`` in a background thread so that the production of the
+    next ``size`` items (e.g. IO) overlaps with the processing of the current one in the caller.
+    Exceptions raised in the background thread are re-raised in the caller.
+    If ``iterable`` is a generator, it is closed in the background thread when the iteration ends
+    so that resources acquired by the generator are released by the thread that uses them.
+
+    .. note::
+
+        The producer runs in a different thread hence ``iterable`` should not share
+        non thread-safe resources (e.g. an open netcdf file) with the consumer.
+    """
+    items = queue.Queue(maxsize=max(1, size))
+    stop = threading.Event()
+    sentinel = object()
+
+    def put(item):
+        # Use a timeout so that the thread can exit if the consumer stops iterating.
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def producer():
+        it = iter(iterable)
+        try:
+            for item in it:
+                if not put((item, None)): return
+            put((sentinel, None))
+        except BaseException as exc:
+            put((sentinel, exc))
+        finally:
+            if hasattr(it, "close"): it.close()
+
+    thread = threading.Thread(target=producer, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, exc = items.get()
+            if exc is not None: raise exc
+            if item is sentinel: break
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
 def ask_yes_no(prompt, default=None):  # pragma: no cover
     """
     Ask a question and return a boolean (y/n) answer.
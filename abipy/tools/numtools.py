@@ -44,18 +44,7 @@ def add_periodic_replicas(arr):
 
     else:
         # Add periodic replica along the last three directions.
-        oshape[-3:] = oshape[-3:] + 1
-        oarr = np.empty(oshape, dtype=arr.dtype)
-
-        for x in range(ishape[-3]):
-            for y in range(ishape[-2]):
-                oarr[..., x, y, :-1] = arr[..., x, y, :]
-                oarr[..., x, y, -1] = arr[..., x, y, 0]
-
-            oarr[..., x, y + 1, :-1] = arr[..., x, 0, :]
-            oarr[..., x, y + 1, -1] = arr[..., x, 0, 0]
-
-        oarr[..., x + 1, :, :] = oarr[..., 0, :, :]
+        oarr = np.pad(arr, [(0, 0)] * (ndim - 3) + [(0, 1)] * 3, mode="wrap")
 
     return oarr
 
@@ -0,0 +1,66 @@
+"""Tests for dos module."""
+import numpy as np
+
+from abipy.tools.dos import gaussian_dos, tetra_dos, get_tetra_vertices
+from abipy.tools.numtools import gaussian
+from abipy.core.testing import AbipyTest
+
+
+class TestDos(AbipyTest):
+    """Test DOS engines."""
+
+    def test_gaussian_dos(self):
+        """Testing gaussian_dos"""
+        rng = np.random.RandomState(0)
+        eigens = rng.uniform(low=-2, high=2, size=(10, 4))
+        weights = rng.uniform(size=eigens.shape)
+        mesh = np.linspace(-3, 3, num=301)
+        width = 0.1
+
+        ref = np.zeros(len(mesh))
+        for e, w in zip(eigens.ravel(), weights.ravel()):
+            ref += w * gaussian(mesh, width, center=e)
+
+        values = gaussian_dos(mesh, eigens, width, weights=weights, chunksize=7)
+        self.assert_almost_equal(values, ref)
+
+        # Multiple channels at once.
+        values = gaussian_dos(mesh, eigens, width, weights=[weights, 2 * weights])
+        assert values.shape == (2, len(mesh))
+        self.assert_almost_equal(values[0], ref)
+        self.assert_almost_equal(values[1], 2 * ref)
+
+        # Without weights, the integral gives the number of states.
+        values = gaussian_dos(mesh, eigens, width)
+        self.assert_almost_equal(np.sum(values) * (mesh[1] - mesh[0]), eigens.size)
+
+        with self.assertRaises(ValueError):
+            gaussian_dos(mesh[[0, 1, 3]], eigens, width)
+
+    def test_tetra_dos(self):
+        """Testing tetra_dos"""
+        ngkpt = [6, 6, 6]
+        gprimd = np.eye(3)
+        vertices = get_tetra_vertices(ngkpt, gprimd)
+        assert vertices.shape == (6 * 6 ** 3, 4)
+        # Each point of the mesh belongs to 24 tetrahedra.
+        assert np.all(np.bincount(vertices.ravel()) == 24)
+
+        # Free-electron like band with two copies shifted in energy.
+        grid = np.array(np.unravel_index(np.arange(6 ** 3), ngkpt)).T / 6.0
+        grid = grid - np.rint(grid)
+        eigens = np.sum(grid ** 2, axis=1)
+        eigens = np.stack([eigens, eigens + 1], axis=1)
+        mesh = np.linspace(-0.5, 2.5, num=301)
+
+        values = tetra_dos(mesh, eigens, ngkpt, gprimd)
+        self.assert_almost_equal(np.sum(values) * (mesh[1] - mesh[0]), 2)
+        self.assert_almost_equal(values[mesh < -0.01], 0)
+
+        # Weights and multiple channels.
+        weights = np.zeros(eigens.shape)
+        weights[:, 1] = 1.0
+        values = tetra_dos(mesh, eigens, ngkpt, gprimd, weights=[weights, 1 - weights], chunksize=100)
+        assert values.shape == (2, len(mesh))
+        self.assert_almost_equal(np.sum(values, axis=1) * (mesh[1] - mesh[0]), [1, 1])
+        self.assert_almost_equal(values[1, mesh > 0.76], 0)
@@ -255,7 +255,8 @@ class PWWaveFunction(WaveFunction):
         space = space.lower()
 
         if space == "g":
-            return np.real(np.vdot(self.ug, self.ug))
+            ug_mesh = self.gsphere.tofftmesh(self.mesh, self.ug)
+            return np.real(np.vdot(ug_mesh, ug_mesh))
         elif space == "gsphere":
             return np.real(np.vdot(self.ug, self.ug))
         elif space == "r":
@@ -98,3 +98,34 @@ class TestWFKFile(AbipyTest):
             wfk.write_notebook(nbpath=self.get_tmpname(text=True))
 
         wfk.close()
+
+    def test_wfk_blocks_and_density(self):
+        """Testing band-block reader and density from WFK file."""
+        from abipy.core.fields import Density
+        with WfkFile(abidata.ref_file("si_scf_WFK.nc")) as wfk:
+            # Blocks must agree with the wavefunctions read one band at a time.
+            blocks = list(wfk.iter_ug_blocks(kpoints=[1], band_block=3))
+            assert [b[2] for b in blocks] == [range(0, 3), range(3, 6), range(6, 8)]
+            for spin, ik, bands, ug in blocks:
+                assert ug.shape == (len(bands), wfk.nspinor, wfk.gspheres[ik].npw)
+                for i, band in enumerate(bands):
+                    self.assert_almost_equal(ug[i], wfk.get_wave(spin, ik, band).ug)
+
+            # Prefetch in a background thread gives the same results.
+            ref_blocks = list(wfk.iter_ug_blocks(band_range=(1, 5), band_block=3))
+            blocks = list(wfk.iter_ug_blocks(band_range=(1, 5), band_block=3, prefetch=True))
+            assert len(blocks) == len(ref_blocks) == 2 * wfk.nkpt
+            for b1, b2 in zip(blocks, ref_blocks):
+                assert b1[:3] == b2[:3]
+                self.assert_equal(b1[3], b2[3])
+
+            ur2 = wfk.get_ur2_bands(0, 0, band_block=3)
+            assert ur2.shape == (wfk.nband_sk[0, 0],) + wfk.fft_mesh.shape
+            self.assert_almost_equal(ur2[2], wfk.get_wave(0, 0, 2).ur2)
+            self.assert_almost_equal(ur2.mean(axis=(1, 2, 3)), 1.0)
+
+            # Density from wavefunctions in the IBZ must agree with the one computed by Abinit.
+            rho = wfk.get_density(band_block=2, prefetch=True)
+            ref_rho = Density.from_file(abidata.ref_file("si_DEN.nc"))
+            self.assert_almost_equal(rho.datar, ref_rho.datar)
+            self.assert_almost_equal(rho.mesh.integrate(rho.datar[0]), 8)
@@ -1,15 +1,17 @@
 # coding: utf-8
 """Wavefunction file."""
-#import numpy as np
+import numpy as np
 
 from monty.functools import lazy_property
 from monty.string import marquee
 from abipy.core import Mesh3D, GSphere
+from abipy.core.fields import Density
 from abipy.core.mixins import AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, NotebookWriter
 from abipy.iotools import Visualizer
 from abipy.electrons.ebands import ElectronsReader
 from abipy.waves.pwwave import PWWaveFunction
 from abipy.tools import duck
+from abipy.tools.iotools import prefetch_iterator
 
 __all__ = [
     "WfkFile",
@@ -155,6 +157,106 @@ class WfkFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, Notebo
 
         return wave
 
+    def iter_ug_blocks(self, spins=None, kpoints=None, band_range=None, band_block=None, prefetch=False):
+        """
+        Generator yielding blocks of wavefunctions in G-space without building
+        :class:`PWWaveFunction` objects. See :meth:`WFK_Reader.iter_ug_blocks`.
+
+        Yields: (spin, ik, bands, ug) where ``bands`` is a range with the band indices and
+            ``ug`` is a complex array of shape (len(bands), nspinor, npw_k).
+        """
+        return self.reader.iter_ug_blocks(spins=spins, kpoints=kpoints, band_range=band_range,
+                                          band_block=band_block, prefetch=prefetch)
+
+    def iter_ur_blocks(self, spins=None, kpoints=None, band_range=None, band_block=None, mesh=None, prefetch=False):
+        """
+        Generator yielding blocks of periodic parts u(r) computed with a single batched FFT per block.
+        Arguments are passed to :meth:`iter_ug_blocks`.
+
+        Args:
+            mesh: |Mesh3D| object. If None, the FFT mesh reported in the WFK file is used.
+
+        Yields: (spin, ik, bands, ur) where ``ur`` has shape (len(bands), nspinor, nx, ny, nz)
+        """
+        mesh = self.fft_mesh if mesh is None else mesh
+        for spin, ik, bands, ug in self.iter_ug_blocks(spins=spins, kpoints=kpoints, band_range=band_range,
+                                                       band_block=band_block, prefetch=prefetch):
+            ug_mesh = self.gspheres[ik].tofftmesh(mesh, ug)
+            ug_mesh = np.reshape(ug_mesh, ug.shape[:-1] + mesh.shape)
+            yield spin, ik, bands, mesh.fft_g2r(ug_mesh, fg_ishifted=False)
+
+    def get_ur2_bands(self, spin, kpoint, band_range=None, band_block=None, mesh=None):
+        """
+        Compute :math:`|u_{nk}(r)|^2` (summed over spinors) for all bands in ``band_range``.
+
+        Return: |numpy-array| of shape (nb, nx, ny, nz).
+        """
+        blocks = [(ur.real ** 2 + ur.imag ** 2).sum(axis=1) for _, _, _, ur in
+                  self.iter_ur_blocks(spins=[spin], kpoints=[kpoint], band_range=band_range,
+                                      band_block=band_block, mesh=mesh)]
+        return np.concatenate(blocks)
+
+    def get_density(self, symmetrize=True, band_block=None, prefetch=False):
+        """
+        Compute the electron density from the wavefunctions and the occupation factors
+        stored in the file. Only the bands with non-zero occupation are read.
+
+        Args:
+            symmetrize: True if the density should be symmetrized with the operations of the
+                space group. Required if the file contains the wavefunctions in the IBZ.
+            band_block: Number of bands read and transformed with a single operation.
+            prefetch: True to read the next block in a background thread.
+
+        Return: |Density| object.
+        """
+        if self.nspinor != 1:
+            raise NotImplementedError("nspinor %s is not supported" % self.nspinor)
+
+        mesh = self.fft_mesh
+        occ_skb = self.ebands.occfacts * self.kpoints.weights[None, :, None]
+        nband_occ = np.nonzero(np.any(np.abs(occ_skb) > 1e-12, axis=(0, 1)))[0]
+        nband_occ = nband_occ[-1] + 1 if len(nband_occ) else 0
+
+        rhor = np.zeros((self.nsppol,) + mesh.shape)
+        for spin, ik, bands, ur in self.iter_ur_blocks(band_range=(0, nband_occ), band_block=band_block,
+                                                       prefetch=prefetch):
+            ur2 = (ur.real ** 2 + ur.imag ** 2).sum(axis=1)
+            rhor[spin] += np.tensordot(occ_skb[spin, ik, bands.start:bands.stop], ur2, axes=1)
+
+        # u(r) are normalized to the volume of the unit cell (Angstrom).
+        rhor /= self.structure.volume
+        if symmetrize:
+            rhor = self._symmetrize_rhor(rhor)
+
+        return Density(self.nspinor, self.nsppol, self.nsppol, rhor, self.structure, iorder="c")
+
+    def _symmetrize_rhor(self, rhor):
+        r"""
+        Symmetrize the density rhor[nsppol, nx, ny, nz] in G-space.
+        Using :math:`\rho(r) = 1/N \sum_S \rho(S r + \tau)`, the contribution of :math:`\rho(G)`
+        goes to :math:`S^T G` with the phase :math:`e^{i 2\pi G \cdot \tau}`.
+        AFM operations exchange the two spin channels.
+        """
+        spgrp = self.structure.abi_spacegroup
+        if spgrp is None:
+            raise ValueError("Structure does not have Abinit spacegroup. Cannot symmetrize the density.")
+
+        mesh = self.fft_mesh
+        rhog = np.reshape(mesh.fft_r2g(rhor), (len(rhor), -1))
+        gvecs = mesh.gvecs
+        sym_rhog = np.zeros_like(rhog)
+
+        for symrel, tnons, afm in zip(spgrp.symrel, spgrp.tnons, spgrp.symafm):
+            ig_rot = np.ravel_multi_index((np.dot(gvecs, symrel) % mesh.shape).T, mesh.shape)
+            phase = np.exp(2j * np.pi * np.dot(gvecs, tnons))
+            for spin in range(len(rhor)):
+                values = rhog[spin if afm == 1 else len(rhor) - 1 - spin] * phase
+                sym_rhog[spin] += (np.bincount(ig_rot, weights=values.real, minlength=mesh.size) +
+                                   1j * np.bincount(ig_rot, weights=values.imag, minlength=mesh.size))
+
+        sym_rhog /= len(spgrp.symrel)
+        return mesh.fft_g2r(np.reshape(sym_rhog, rhor.shape)).real.copy()
+
     def export_ur2(self, filepath, spin, kpoint, band, visu=None):
         """
         Export :math:`|u(r)|^2` on file filename.
@@ -381,3 +483,69 @@ class WFK_Reader(ElectronsReader):
         var = self.rootgrp.variables["coefficients_of_wavefunctions"]
         value = var[spin, ik, band, :, :npw_k, :]
         return value[..., 0] + 1j*value[..., 1]  # Build complex array
+
+    def read_ug_block(self, spin, kpoint, bstart=0, bstop=None):
+        """
+        Read the Fourier components of the wavefunctions with band index in [bstart, bstop)
+        with a single hyperslab read.
+
+        Return: complex array of shape (bstop - bstart, nspinor, npw_k)
+        """
+        ik = self.kindex(kpoint)
+        if bstop is None: bstop = self.nband_sk[spin, ik]
+        if self.cplex_ug != 2:
+            raise NotImplementedError("")
+
+        return self._read_ug_block(self.rootgrp, spin, ik, bstart, bstop)
+
+    def _read_ug_block(self, rootgrp, spin, ik, bstart, bstop):
+        """Read the bands in [bstart, bstop) with a single hyperslab from the netcdf handle ``rootgrp``."""
+        var = rootgrp.variables["coefficients_of_wavefunctions"]
+        value = var[spin, ik, bstart:bstop, :, :self.npwarr[ik], :]
+        return value[..., 0] + 1j*value[..., 1]
+
+    def iter_ug_blocks(self, spins=None, kpoints=None, band_range=None, band_block=None, prefetch=False):
+        """
+        Generator yielding contiguous blocks of bands for each (spin, k-point).
+        Each block is obtained with a single read.
+
+        Args:
+            spins: List of spin indices. None for all spins.
+            kpoints: List of k-points (:class:`Kpoint` objects or integers). None for all k-points.
+            band_range: (start, stop) tuple. Only bands in [start, stop) are read.
+                None to read all the bands. stop is automatically reduced to nband_sk[spin, ik].
+            band_block: Maximum number of bands in each block. None to read all bands at once.
+            prefetch: True to read the next block in a background thread while the caller
+                processes the current one. The background thread reads through a private netcdf handle
+                that is closed when the iteration ends.
+
+        Yields: (spin, ik, bands, ug) where ``bands`` is a range with the band indices and
+            ``ug`` is a complex array of shape (len(bands), nspinor, npw_k).
+        """
+        spins = range(self.nsppol) if spins is None else spins
+        kinds = range(len(self.kpoints)) if kpoints is None else [self.kindex(k) for k in kpoints]
+        bstart, bstop = (0, None) if band_range is None else band_range
+
+        def blocks(rootgrp):
+            for spin in spins:
+                for ik in kinds:
+                    nband = self.nband_sk[spin, ik] if bstop is None else min(bstop, self.nband_sk[spin, ik])
+                    step = max(nband - bstart, 1) if band_block is None else band_block
+                    for start in range(bstart, nband, step):
+                        stop = min(start + step, nband)
+                        yield spin, ik, range(start, stop), self._read_ug_block(rootgrp, spin, ik, start, stop)
+
+        if not prefetch:
+            return blocks(self.rootgrp)
+
+        def private_blocks():
+            # netcdf handles are not thread-safe: the producer thread must not use self.rootgrp.
+            import netCDF4
+            rootgrp = netCDF4.Dataset(self.path, mode="r")
+            rootgrp.set_auto_mask(False)
+            try:
+                yield from blocks(rootgrp)
+            finally:
+                rootgrp.close()
+
+        return prefetch_iterator(private_blocks())